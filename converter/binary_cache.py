@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+"""Versioned binary format for converted instance data, as an alternative to
+the pickled `.dat` files.
+
+The matrices are stored as `.npy` files and loaded with `np.load(...,
+mmap_mode='r')`, which returns read-only `np.memmap` arrays. Loading is then
+near-instant, pages are only read from disk once they are used, and different
+solver processes that load the same instance share one page-cache copy of
+the data. The scalar and list problem info is stored in a small JSON header,
+which also has the format version, and is written last, so that an
+interrupted conversion is never mistaken for a complete one.
+
+For an instance key `Lpr_IF-c-01` the following files are written:
+
+    Lpr_IF-c-01_problem_info.json: header with the problem info.
+    Lpr_IF-c-01_info_lists.pkl: pickled display info lists.
+    Lpr_IF-c-01_d.npy: shortest path costs between required arcs.
+    Lpr_IF-c-01_if_cost.npy: cost of visiting the best IF between them.
+    Lpr_IF-c-01_if_arc.npy: best IF to visit between them.
+    Lpr_IF-c-01_nn_list.npy: nearest neighbour lists of required arcs.
+    Lpr_IF-c-01_d_full.npy: shortest path costs between all arcs, not written
+        for instances converted with `required_only`.
+    Lpr_IF-c-01_p_full.npy: shortest path predecessors between all arcs, or
+        from the required arcs only.
+
+The display info lists are still pickled, since they consist of
+dictionaries and are only needed to write solutions, but under their own
+extension, so that both formats can exist side by side.
+"""
+
+import os
+import json
+import numpy as np
+from converter.shortest_path import RequiredArcPaths
+
+BINARY_FORMAT_VERSION = 1
+
+HEADER_EXTENSION = '_problem_info.json'
+
+INFO_LISTS_EXTENSION = '_info_lists.pkl'
+
+ARRAY_EXTENSIONS = {'d': '_d.npy',
+                    'if_cost': '_if_cost.npy',
+                    'if_arc': '_if_arc.npy',
+                    'nn_list': '_nn_list.npy',
+                    'd_full': '_d_full.npy',
+                    'p_full': '_p_full.npy'}
+
+#  Files that always exist for a complete conversion, `d_full` is optional.
+REQUIRED_EXTENSIONS = [INFO_LISTS_EXTENSION, HEADER_EXTENSION] + \
+    [ARRAY_EXTENSIONS[key] for key in ['d', 'if_cost', 'if_arc', 'nn_list',
+                                       'p_full']]
+
+ALL_EXTENSIONS = REQUIRED_EXTENSIONS + [ARRAY_EXTENSIONS['d_full']]
+
+#  Order of the problem info in `WriteSpIfInputData.return_sp_info`.
+PROBLEM_INFO_FIELDS = ('name',
+                       'capacity',
+                       'maxTrip',
+                       'dumpCost',
+                       'nArcs',
+                       'reqArcList',
+                       'reqArcListActual',
+                       'depotnewkey',
+                       'IFarcsnewkey',
+                       'ACarcsnewkey',
+                       'reqEdgesPure',
+                       'reqArcsPure',
+                       'reqInvArcL',
+                       'serveCostL',
+                       'demandL')
+
+
+def _json_default(value):
+    """Convert numpy scalars and arrays for json."""
+    if isinstance(value, np.integer):
+        return int(value)
+    if isinstance(value, np.floating):
+        return float(value)
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    raise TypeError('{0} is not JSON serializable'.format(type(value)))
+
+
+def _save_array(file_path, array):
+    """Save array as int32 `.npy` via a temporary file, so that a partly
+    written file never replaces a complete one."""
+    temp_path = file_path + '.tmp'
+    with open(temp_path, 'wb') as output_file:
+        np.save(output_file, np.asarray(array, dtype=np.int32))
+    os.replace(temp_path, file_path)
+
+
+def write_binary_instance(path_prefix, sp_info, instance_info_data, nn_lists):
+    """Write converted instance data in the binary format.
+
+    Args:
+        path_prefix (str): output folder and instance key, for example
+            `data/Lpr_IF/Lpr_IF-c-01`.
+        sp_info (tuple): (d_full, p_full) as returned by
+            `WriteSpIfInputData.return_sp_info`.
+        instance_info_data (tuple): problem info followed by the d, if_cost
+            and if_arc matrices, as returned by
+            `WriteSpIfInputData.return_sp_info`.
+        nn_lists (n*n matrix): nearest neighbour lists.
+    """
+    n_fields = len(PROBLEM_INFO_FIELDS)
+    problem_info = dict(zip(PROBLEM_INFO_FIELDS,
+                            instance_info_data[:n_fields]))
+    d_req, if_cost, if_arc = instance_info_data[n_fields:]
+    d_full, p_full = sp_info
+
+    required_only = isinstance(p_full, RequiredArcPaths)
+    if required_only:
+        p_full_sources = p_full.sources
+        p_full = p_full.predecessors
+    else:
+        p_full_sources = None
+
+    arrays = {'d': d_req,
+              'if_cost': if_cost,
+              'if_arc': if_arc,
+              'nn_list': nn_lists,
+              'p_full': p_full}
+    if d_full is not None:
+        arrays['d_full'] = d_full
+
+    #  Remove old files first, so that a stale `d_full` can't be picked up.
+    for extension in [HEADER_EXTENSION] + list(ARRAY_EXTENSIONS.values()):
+        if os.path.isfile(path_prefix + extension):
+            os.remove(path_prefix + extension)
+
+    for key, array in arrays.items():
+        _save_array(path_prefix + ARRAY_EXTENSIONS[key], array)
+
+    header = {'format_version': BINARY_FORMAT_VERSION,
+              'problem_info': problem_info,
+              'arrays': sorted(arrays.keys()),
+              'required_only': required_only,
+              'p_full_sources': p_full_sources}
+
+    header_path = path_prefix + HEADER_EXTENSION
+    with open(header_path + '.tmp', 'w') as output_file:
+        json.dump(header, output_file, default=_json_default)
+    os.replace(header_path + '.tmp', header_path)
+
+
+def read_header(path_prefix):
+    """Read and check the header of a binary converted instance.
+
+    Raises:
+        ValueError: if the files were written with a different format version.
+
+    Return:
+        header (dict): format info, with the problem info under
+            `problem_info`.
+    """
+    with open(path_prefix + HEADER_EXTENSION, 'r') as input_file:
+        header = json.load(input_file)
+
+    if header.get('format_version') != BINARY_FORMAT_VERSION:
+        raise ValueError('`{0}` has binary format version {1}, expected {2}. '
+                         'Convert the instance again with '
+                         '`overwrite=True`.'.format(
+                            path_prefix + HEADER_EXTENSION,
+                            header.get('format_version'),
+                            BINARY_FORMAT_VERSION))
+    return header
+
+
+def load_array(path_prefix, key, mmap_mode='r'):
+    """Load one of the instance matrices.
+
+    Args:
+        path_prefix (str): folder and instance key.
+        key (str): one of `ARRAY_EXTENSIONS`.
+        mmap_mode (str): memory-map mode of `np.load`, None to read the full
+            array into memory.
+
+    Return:
+        array (np.memmap): read-only memory-mapped array.
+    """
+    array = np.load(path_prefix + ARRAY_EXTENSIONS[key], mmap_mode=mmap_mode)
+    array = np.asarray(array)
+    if array.size == 0:
+        #  Same as the pickled format for instances without IFs.
+        return []
+    return array
+
+
+def load_sp_info(path_prefix, header=None, mmap_mode='r'):
+    """Load the all arc shortest path cost and predecessor matrices.
+
+    Return:
+        d_full (np.memmap): None for `required_only` instances.
+        p_full (np.memmap or RequiredArcPaths): predecessor matrix.
+    """
+    if header is None:
+        header = read_header(path_prefix)
+
+    p_full = load_array(path_prefix, 'p_full', mmap_mode)
+    if header['required_only']:
+        return None, RequiredArcPaths(header['p_full_sources'], p_full)
+    return load_array(path_prefix, 'd_full', mmap_mode), p_full
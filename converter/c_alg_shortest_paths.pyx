@@ -100,331 +100,68 @@ def SP(cL, sL, penDict=None):
 #    
 #    return(d_np)
 
-def SP_IFs(cL, sL, reqArcList, dumpCost, depotArc, IFarcsnewkey = None):
+def SP_IFs(cL, sL, reqArcList, dumpCost, depotArc, IFarcsnewkey = None, block_size = 128):
     '''
     Addaptation of the Floyd Warshall algorithm for computing arc to 
     arc shortest paths, instead of node to node. Combined with calculating
-    best IFs to visit.
+    best IFs to visit. Same as SP_IFs_complete, but without the predecessor
+    matrix, which is not calculated at all.
     '''
-    
-    print('')
-    print('Starting shortest path calculations (3 procedures)')
-    print('')
-
-    huge = 1000000# Infinity
-     
-    cdef int i, j, k, nArcs
-    cdef int **d
-    cdef int nSucs   
-    
-    nArcs = len(cL)
-    
-    #d_np = np.ndarray(shape=(nArcs, nArcs), dtype=np.int16)
-    d = <int **>malloc(nArcs * sizeof(int *))
-
-    print('    1 of 3: Initialise matrices')
-    
-    for i from 0 <= i < nArcs:
-        d[i] = <int *>malloc(nArcs * sizeof(int *))
-
-    for i from 0 <= i < nArcs:
-        for j from 0 <= j < nArcs:
-            if i == j: d[i][j] = 0# Distance from an arc to itself is zero   
-            else: d[i][j] = huge
-            
-    #for i from 0 <= i < nArcs:
-    #    d[i][j] = 0 #Distance from all arcs to last arc is zero????
-    
-    for i from 0 <= i < nArcs:
-        sL_i = sL[i]
-        nSucs = len(sL_i)
-        for j in xrange(nSucs):
-            d[i][sL_i[j]] = 0          
+    return SP_IFs_complete(cL, sL, reqArcList, dumpCost, depotArc,
+                           IFarcsnewkey, block_size, predecessors=False)
 
-    cdef int cL_k, d_i_k
-
-    print('    2 of 3: Calculate shortest paths')
-    print('') 
-    for k from 0 <= k < nArcs:
-        print('        2 of 3: SP calc %i out of %i' %(k+1,nArcs))
-        cL_k = cL[k]
-        for i from 0 <= i < nArcs:
-            d_i_k = d[i][k]
-            for j from 0 <= j < nArcs:
-                if d_i_k + d[k][j] + cL_k < d[i][j]:#If moving from arc i to arc j via arc k is shorter than moving directly from arc i to j:
-                    #Note that we have to add the cost of traversing arc k
-                    d[i][j] = d_i_k + d[k][j] + cL_k#Update distance from arc i to j
-    
-    print('')
-    print('    3 of 3: Populating numpy array')
-
-    d_np = []
-    for i from 0 <= i < nArcs:
-        d_np.append([0]*nArcs)
-        for j from 0 <= j < nArcs:
-            d_np[i][j] = d[i][j]
- 
-    print('')
-    print('    Done: shortest path calculations')
-    print('')
-    
-    print('')
-    print('    Starting best IF calculations (1 procedure)')
-    print('')
-    
-    cdef int nReqArcs, nIFs, k_if, i_req, j_req, d_c, visitCi, visitCj, visitT
-    
-    nReqArcs = len(reqArcList)
-    
-    print('    1 of 3: Initialise matrices')
-
-    d_np_req = []
-    if_np_req = []
-    ifc_np_req = []
-    
-    d_req = <int **>malloc(nReqArcs * sizeof(int *))
-    d_req_ifc = <int **>malloc(nReqArcs * sizeof(int *))
-    d_req_if = <int **>malloc(nReqArcs * sizeof(int *))
-    
-    for i from 0 <= i < nReqArcs:
-        d_req[i] = <int *>malloc(nReqArcs * sizeof(int *))
-        d_req_ifc[i] = <int *>malloc(nReqArcs * sizeof(int *))
-        d_req_if[i] = <int *>malloc(nReqArcs * sizeof(int *))
-
-    for i from 0 <= i < nReqArcs:
-        i_req = reqArcList[i]
-        d_np_req.append([0]*nReqArcs)
-        for j from 0 <= j < nReqArcs:
-            j_req = reqArcList[j]
-            d_c = d[i_req][j_req]
-            d_req[i][j] = d_c
-            d_np_req[i][j] = d_c
-
-    print('    1 of 3: Calculate best IF')
-    print('') 
-
-    if IFarcsnewkey:
-        nIfs = len(IFarcsnewkey)
-        for j from 0 <= j < nReqArcs:
-            d_req_ifc[0][j] = d_req[0][j]
-            d_req_if[0][j] = 0                
-        print('')
-        for i from 0 <= i < nReqArcs:
-            print('        2 of 3: Best IF calc %i out of %i' %(i+1,nReqArcs))
-            k_if = IFarcsnewkey[0]
-            visitCi = d_req[i][k_if]
-            for j from 0 <= j < nReqArcs:
-                d_req_ifc[i][j] = huge
-                for k from 0 <= k < nIfs:
-                    k_if = IFarcsnewkey[k]
-                    visitCi = d_req[i][k_if]
-                    visitCj = d_req[k_if][j]
-                    visitT = visitCi + dumpCost + visitCj               
-                    if visitT < d_req_ifc[i][j]:
-                        d_req_ifc[i][j] = visitT
-                        d_req_if[i][j] = k_if                
-        print('')
-        print('    3 of 3: Populating numpy array')
-    
-        for i from 0 <= i < nReqArcs:
-            ifc_np_req.append([0]*nReqArcs)
-            if_np_req.append([0]*nReqArcs)
-            for j from 0 <= j < nReqArcs:
-                ifc_np_req[i, j] = d_req_ifc[i][j]
-                if_np_req[i, j] = d_req_if[i][j]
-
-    print('')
-    print('    Done: shortest path calculations')
-    print('')
-
-    
-    for i from 0 <= i < nArcs:
-        free(d[i])
-    free(d)
-    
-    for i from 0 <= i < nReqArcs:
-        free(d_req[i])
-        free(d_req_ifc[i])
-        free(d_req_if[i])
-        
-    free(d_req)
-    free(d_req_ifc)
-    free(d_req_if)
-    
-    p_np = None
-    
-    return(d_np, p_np, d_np_req, ifc_np_req, if_np_req)
-
-def SP_IFs_complete(cL, sL, reqArcList, dumpCost, depotArc, IFarcsnewkey = None):
+def SP_IFs_complete(cL, sL, reqArcList, dumpCost, depotArc, IFarcsnewkey = None, block_size = 128, predecessors = True):
     '''
     Addaptation of the Floyd Warshall algorithm for computing arc to 
     arc shortest paths, instead of node to node. Combined with calculating
     best IFs to visit.
-    '''
-    
-    print('')
-    print('Starting shortest path calculations (3 procedures)')
-    print('')
 
-    huge = 1000000# Infinity
-     
-    cdef int i, j, k, nArcs
-    cdef int **d, **p
-    cdef int nSucs   
-    
-    nArcs = len(cL)
-    
-    d_np = []
-    p_np = []
-    d = <int **>malloc(nArcs * sizeof(int *))
-    p = <int **>malloc(nArcs * sizeof(int *))
+    The paths are calculated with the blocked Floyd-Warshall kernel over
+    contiguous int32 matrices, see `converter.shortest_paths.SP`. With
+    `block_size` smaller than the number of arcs, predecessors can point to
+    a different, but equally short, path than the classic k, i, j order,
+    which is used when `block_size` is None.
 
-    print('    1 of 3: Initialise matrices')
-    
-    for i from 0 <= i < nArcs:
-        d[i] = <int *>malloc(nArcs * sizeof(int *))
-        p[i] = <int *>malloc(nArcs * sizeof(int *))
+    cL can also be a `converter.csr_graph.CSRGraph`, with sL None, as with
+    the Dijkstra versions below.
 
-    for i from 0 <= i < nArcs:
-        for j from 0 <= j < nArcs:
-            if i == j: 
-                d[i][j] = 0# Distance from an arc to itself is zero   
-                p[i][j] = i #TODO: fixed!
-            else: 
-                d[i][j] = huge
-                p[i][j] = -1
-            
-#    for i from 0 <= i < nArcs:
-#        d[i][j] = 0
+    The full m x m cost and predecessor matrices are returned as the int32
+    arrays of the kernel, only the required arc matrices are converted to
+    lists. With `predecessors` False the predecessor matrix is None.
+    '''
+    import converter.shortest_paths as shortest_paths
     
-    for i from 0 <= i < nArcs:
-        sL_i = sL[i]
-        nSucs = len(sL_i)
-        for j in xrange(nSucs):
-            d[i][sL_i[j]] = 0
-            p[i][sL_i[j]] = i          
+    print('')
+    print('Starting shortest path calculations (2 procedures)')
+    print('')
 
-    cdef int cL_k, d_i_k
+    if block_size is None:
+        block_size = max(len(cL), 1)
 
-    print('    2 of 3: Calculate shortest paths')
-    print('') 
-    for k from 0 <= k < nArcs:
-        print('        2 of 3: SP calc %i out of %i' %(k+1,nArcs))
-        cL_k = cL[k]
-        for i from 0 <= i < nArcs:
-            d_i_k = d[i][k]
-            for j from 0 <= j < nArcs:
-                if d_i_k + d[k][j] + cL_k < d[i][j]:#If moving from arc i to arc j via arc k is shorter than moving directly from arc i to j:
-                    #Note that we have to add the cost of traversing arc k
-                    d[i][j] = d_i_k + d[k][j] + cL_k#Update distance from arc i to j
-                    p[i][j] = p[k][j]
-    
-    print('')
-    print('    3 of 3: Populating numpy array')
+    print('    1 of 2: Calculate shortest paths')
+    d_full, p_full = shortest_paths.SP(cL, sL, block_size=block_size,
+                                       predecessors=predecessors)
 
-    for i from 0 <= i < nArcs:
-        d_np.append([0]*nArcs)
-        p_np.append([0]*nArcs)
-        for j from 0 <= j < nArcs:
-            d_np[i][j] = d[i][j]
-            p_np[i][j] = p[i][j]
-            if d[i][j] < 0: 
-                print('ERROR')
-                a = input('')
-            if d_np[i][j] < 0:
-                print('ERROR', i,j, d[i][j], d_np[i,j])
-                a = input('')               
- 
     print('')
     print('    Done: shortest path calculations')
     print('')
-    
-    print('')
-    print('    Starting best IF calculations (1 procedure)')
-    print('')
-    
-    cdef int nReqArcs, nIFs, k_if, i_req, j_req, d_c, visitCi, visitCj, visitT
-    
-    nReqArcs = len(reqArcList)
-    
-    print('    1 of 3: Initialise matrices')
 
-    d_np_req = []
-    if_np_req = []
-    ifc_np_req = []
-    
-    d_req = <int **>malloc(nReqArcs * sizeof(int *))
-    d_req_ifc = <int **>malloc(nReqArcs * sizeof(int *))
-    d_req_if = <int **>malloc(nReqArcs * sizeof(int *))
-    
-    for i from 0 <= i < nReqArcs:
-        d_req[i] = <int *>malloc(nReqArcs * sizeof(int *))
-        d_req_ifc[i] = <int *>malloc(nReqArcs * sizeof(int *))
-        d_req_if[i] = <int *>malloc(nReqArcs * sizeof(int *))
-
-    for i from 0 <= i < nReqArcs:
-        i_req = reqArcList[i]
-        d_np_req.append([0]*nReqArcs)
-        for j from 0 <= j < nReqArcs:
-            j_req = reqArcList[j]
-            d_c = d[i_req][j_req]
-            d_req[i][j] = d_c
-            d_np_req[i][j] = d_c
-
-
-    print('    1 of 3: Calculate best IF')
-    print('') 
+    req_index = np.array(reqArcList, dtype=np.int32)
+    d_req = d_full[np.ix_(req_index, req_index)]
 
+    ifc_np_req = []
+    if_np_req = []
     if IFarcsnewkey:
-        nIfs = len(IFarcsnewkey)
-        for j from 0 <= j < nReqArcs:
-            d_req_ifc[0][j] = d_req[0][j]
-            d_req_if[0][j] = 0                
-        print('')
-        for i from 0 <= i < nReqArcs:
-            print('        2 of 3: Best IF calc %i out of %i' %(i+1,nReqArcs))
-            k_if = IFarcsnewkey[0]
-            visitCi = d_req[i][k_if]
-            for j from 0 <= j < nReqArcs:
-                d_req_ifc[i][j] = huge
-                for k from 0 <= k < nIfs:
-                    k_if = IFarcsnewkey[k]
-                    visitCi = d_req[i][k_if]
-                    visitCj = d_req[k_if][j]
-                    visitT = visitCi + dumpCost + visitCj               
-                    if visitT < d_req_ifc[i][j]:
-                        d_req_ifc[i][j] = visitT
-                        d_req_if[i][j] = k_if                
-        print('')
-        print('    3 of 3: Populating numpy array')
-    
-        for i from 0 <= i < nReqArcs:
-            ifc_np_req.append([0]*nReqArcs)
-            if_np_req.append([0]*nReqArcs)
-            for j from 0 <= j < nReqArcs:
-                ifc_np_req[i][j] = d_req_ifc[i][j]
-                if_np_req[i][j] = d_req_if[i][j]
+        print('    2 of 2: Calculate best IF')
+        ifc_np_req, if_np_req = best_IFs(d_req, IFarcsnewkey, dumpCost)
+        ifc_np_req = ifc_np_req.tolist()
+        if_np_req = if_np_req.tolist()
 
     print('')
-    print('    Done: shortest path calculations')
+    print('    Done: best IF calculations')
     print('')
- 
-    for i from 0 <= i < nArcs:
-        free(d[i])
-        free(p[i])
-    free(d)
-    free(p)
     
-    for i from 0 <= i < nReqArcs:
-        free(d_req[i])
-        free(d_req_ifc[i])
-        free(d_req_if[i])
-        
-    free(d_req)
-    free(d_req_ifc)
-    free(d_req_if)
-    
-    return(d_np, p_np, d_np_req, ifc_np_req, if_np_req)
+    return(d_full, p_full, d_req.tolist(), ifc_np_req, if_np_req)
 
 def SP_IFs_complete2(cL, sL, reqArcList, dumpCost, depotArc, IFarcsnewkey = None):
     '''
@@ -581,3 +318,119 @@ def SP_IFs_complete2(cL, sL, reqArcList, dumpCost, depotArc, IFarcsnewkey = None
     
     return(d_np, p_np, d_np_req, ifc_np_req, if_np_req)
 
+
+def SP_IFs_complete_dijkstra(cL, sL, reqArcList, dumpCost, depotArc, IFarcsnewkey = None, n_workers = 1):
+    '''
+    Same outputs as SP_IFs_complete, but the arc to arc shortest paths are
+    calculated with a one-to-all Dijkstra from every arc over the successor
+    lists, see `converter.shortest_paths.SP_dijkstra`. Runs in
+    O(m(m + e) log m) instead of O(m^3), which is what makes large road
+    networks feasible. Source arcs are split over `n_workers` threads.
+    As with SP_IFs_complete, the full matrices are returned as arrays.
+    '''
+    import converter.shortest_paths as shortest_paths
+
+    print('')
+    print('Starting Dijkstra shortest path calculations')
+    print('')
+
+    d_full, p_full = shortest_paths.SP_dijkstra(cL, sL, n_workers=n_workers)
+
+    print('    Done: shortest path calculations')
+    print('')
+
+    req_index = np.array(reqArcList, dtype=np.int32)
+    d_req = d_full[np.ix_(req_index, req_index)]
+
+    ifc_np_req = []
+    if_np_req = []
+    if IFarcsnewkey:
+        print('    Starting best IF calculations')
+        ifc_np_req, if_np_req = best_IFs(d_req, IFarcsnewkey, dumpCost)
+        ifc_np_req = ifc_np_req.tolist()
+        if_np_req = if_np_req.tolist()
+
+    print('    Done: best IF calculations')
+    print('')
+
+    return(d_full, p_full, d_req.tolist(), ifc_np_req, if_np_req)
+
+def SP_IFs_required_dijkstra(cL, sL, reqArcList, dumpCost, depotArc, IFarcsnewkey = None, n_workers = 1):
+    '''
+    Same as SP_IFs_complete_dijkstra, but shortest paths are only calculated
+    from the required arcs, including the depot and IFs. The full m x m
+    matrices are never created: the all arc cost matrix is returned as None,
+    and the predecessors as a `converter.shortest_path.RequiredArcPaths`
+    object with an n x m predecessor matrix, from which paths between
+    required arcs can be retrieved. Memory use is O(nm) instead of O(m^2).
+    '''
+    import converter.shortest_paths as shortest_paths
+    from converter.shortest_path import RequiredArcPaths
+
+    print('')
+    print('Starting required arc Dijkstra shortest path calculations')
+    print('')
+
+    req_index = np.array(reqArcList, dtype=np.int32)
+    d_src, p_src = shortest_paths.SP_dijkstra(cL, sL, sources=req_index,
+                                              n_workers=n_workers)
+    d_req = np.ascontiguousarray(d_src[:, req_index])
+    del d_src
+
+    print('    Done: shortest path calculations')
+    print('')
+
+    ifc_np_req = []
+    if_np_req = []
+    if IFarcsnewkey:
+        print('    Starting best IF calculations')
+        ifc_np_req, if_np_req = best_IFs(d_req, IFarcsnewkey, dumpCost)
+        ifc_np_req = ifc_np_req.tolist()
+        if_np_req = if_np_req.tolist()
+
+    print('    Done: best IF calculations')
+    print('')
+
+    p_req = RequiredArcPaths(reqArcList, p_src)
+
+    return(None, p_req, d_req.tolist(), ifc_np_req, if_np_req)
+
+def best_IFs(d_req, IFarcsnewkey, dumpCost):
+    '''
+    Cost of the best IF to visit, including the offload cost, between all
+    required arcs, as well as the IF itself. Ties go to the first IF in
+    `IFarcsnewkey`, same as with SP_IFs_complete.
+
+    Arg:
+        d_req (n x n int32 array): shortest path costs between required arcs.
+        IFarcsnewkey (list): required arc indices of the IFs.
+        dumpCost (int): cost of offloading at an IF.
+
+    Return:
+        ifc_np_req (n x n int32 array): cost of visiting the best IF.
+        if_np_req (n x n int32 array): best IF to visit.
+    '''
+    cdef int i, j, k, k_if, visitT, nReqArcs, nIfs, huge
+    cdef int dump = dumpCost
+    cdef int[:, ::1] d = np.ascontiguousarray(d_req, dtype=np.int32)
+    cdef int[::1] ifs = np.array(IFarcsnewkey, dtype=np.int32)
+
+    huge = 2147483647
+    nReqArcs = d.shape[0]
+    nIfs = ifs.shape[0]
+
+    ifc_np_req = np.full((nReqArcs, nReqArcs), huge, dtype=np.int32)
+    if_np_req = np.zeros((nReqArcs, nReqArcs), dtype=np.int32)
+    cdef int[:, ::1] ifc = ifc_np_req
+    cdef int[:, ::1] if_arc = if_np_req
+
+    for i from 0 <= i < nReqArcs:
+        for k from 0 <= k < nIfs:
+            k_if = ifs[k]
+            for j from 0 <= j < nReqArcs:
+                visitT = d[i, k_if] + dump + d[k_if, j]
+                if visitT < ifc[i, j]:
+                    ifc[i, j] = visitT
+                    if_arc[i, j] = k_if
+
+    return(ifc_np_req, if_np_req)
@@ -0,0 +1,224 @@
+# -*- coding: utf-8 -*-
+"""Content-hashed cache of converted instance data, shared between jobs.
+
+Converted data is stored in a central cache directory, in one folder per
+entry, named after a hash of the raw instance file's content and the
+conversion settings that change the converted data. Renaming or copying a raw
+file therefore still finds its entry, while changing the file or the settings
+never reuses a stale one.
+
+Entries are converted into a temporary folder which is then renamed, so a
+half-written entry is never visible to other jobs. The total size of the
+cache can be bounded, in which case the least recently used entries are
+evicted after a new entry is added.
+
+Example:
+
+    >>> from converter import load_instance
+    >>> info = load_instance('data/Lpr_IF/Lpr_IF-c-01.txt',
+    ...                      cache_dir='~/.cache/mcarptif')
+"""
+
+import os
+import json
+import shutil
+import hashlib
+import logging
+import tempfile
+from converter.input_converter import Converter
+import converter.binary_cache as binary_cache
+
+#  Increase when the converted data changes for the same raw file and settings.
+CACHE_VERSION = 1
+
+#  Used if no cache directory is given.
+CACHE_DIR_ENVIRONMENT_VARIABLE = 'MCARPTIF_CACHE_DIR'
+DEFAULT_CACHE_DIR = os.path.join('~', '.cache', 'mcarptif')
+
+#  File key of the converted data in each entry, independent of the raw file
+#  name so that renamed copies share the entry.
+ENTRY_FILE_KEY = 'instance'
+
+
+def default_cache_dir():
+    """Cache directory from `MCARPTIF_CACHE_DIR`, or `~/.cache/mcarptif`."""
+    cache_dir = os.environ.get(CACHE_DIR_ENVIRONMENT_VARIABLE,
+                               DEFAULT_CACHE_DIR)
+    return os.path.expanduser(cache_dir)
+
+
+def hash_file(file_path, block_size=2 ** 20):
+    """Return the sha256 hex digest of a file's content."""
+    file_hash = hashlib.sha256()
+    with open(file_path, 'rb') as input_file:
+        for block in iter(lambda: input_file.read(block_size), b''):
+            file_hash.update(block)
+    return file_hash.hexdigest()
+
+
+def _folder_size(folder):
+    """Total size of the files in a folder, in bytes."""
+    size = 0
+    for file_name in os.listdir(folder):
+        file_path = os.path.join(folder, file_name)
+        if os.path.isfile(file_path):
+            size += os.path.getsize(file_path)
+    return size
+
+
+class ConversionCache(object):
+    """Central, content-hashed store of converted instance data."""
+
+    def __init__(self, cache_dir=None, max_size=None):
+        """
+        Kwargs:
+            cache_dir (str): cache directory, created if it does not exist.
+                See `default_cache_dir` if None.
+            max_size (int): maximum total size of the cache in bytes, least
+                recently used entries are evicted beyond it. Not bounded if
+                None.
+        """
+        if cache_dir is None:
+            cache_dir = default_cache_dir()
+        self.cache_dir = os.path.expanduser(cache_dir)
+        self.max_size = max_size
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    @staticmethod
+    def entry_key(file_path, settings):
+        """Key of a raw file converted with specific settings.
+
+        Args:
+            file_path (str): path to raw input file.
+            settings (dict): conversion settings that change the converted
+                data, must be json serialisable.
+
+        Return:
+            key (str): sha256 hex digest.
+        """
+        key_info = {'cache_version': CACHE_VERSION,
+                    'binary_format_version':
+                        binary_cache.BINARY_FORMAT_VERSION,
+                    'file_hash': hash_file(file_path),
+                    'settings': settings}
+        key_string = json.dumps(key_info, sort_keys=True)
+        return hashlib.sha256(key_string.encode('utf-8')).hexdigest()
+
+    def entry_folder(self, key):
+        """Return the folder of a cache entry."""
+        return os.path.join(self.cache_dir, key) + '/'
+
+    def _entry_keys(self):
+        """Keys of all complete entries, temporary folders are skipped."""
+        return [key for key in os.listdir(self.cache_dir)
+                if os.path.isdir(os.path.join(self.cache_dir, key))
+                and not key.startswith('.')]
+
+    def _touch(self, key):
+        """Mark an entry as used, for LRU eviction."""
+        os.utime(self.entry_folder(key), None)
+
+    def remove(self, key):
+        """Remove an entry, if it exists."""
+        entry_folder = self.entry_folder(key)
+        if os.path.isdir(entry_folder):
+            logging.info('Removing cache entry {}'.format(entry_folder))
+            shutil.rmtree(entry_folder, ignore_errors=True)
+
+    def size(self):
+        """Total size of all entries, in bytes."""
+        return sum(_folder_size(self.entry_folder(key))
+                   for key in self._entry_keys())
+
+    def evict(self, keep=None):
+        """Remove least recently used entries until the cache is within
+        `max_size`.
+
+        Kwargs:
+            keep (str): key of an entry that should never be evicted, such as
+                the one that was just added.
+
+        Return:
+            evicted (list <str>): keys of removed entries.
+        """
+        if self.max_size is None:
+            return []
+
+        entries = []
+        total_size = 0
+        for key in self._entry_keys():
+            entry_folder = self.entry_folder(key)
+            size = _folder_size(entry_folder)
+            entries.append((os.path.getmtime(entry_folder), key, size))
+            total_size += size
+
+        evicted = []
+        for _, key, size in sorted(entries):
+            if total_size <= self.max_size:
+                break
+            if key == keep:
+                continue
+            self.remove(key)
+            total_size -= size
+            evicted.append(key)
+        return evicted
+
+    def fetch(self, file_path, settings, overwrite=False, sp_workers=1):
+        """Return the folder and instance name of a raw file's converted
+        data, converting and adding it to the cache if needed.
+
+        Args:
+            file_path (str): path to raw input file.
+            settings (dict): `sp_solver`, `required_only` and `binary`
+                arguments for `Converter`.
+
+        Kwargs:
+            overwrite (bool): convert again even if an entry exists.
+            sp_workers (int): number of Dijkstra threads, which does not
+                change the converted data.
+
+        Return:
+            entry_folder (str): folder with the converted data.
+            instance_name (str): file key of the converted data.
+        """
+        instance_name = ENTRY_FILE_KEY
+        key = self.entry_key(file_path, settings)
+        entry_folder = self.entry_folder(key)
+
+        if overwrite:
+            self.remove(key)
+
+        if os.path.isdir(entry_folder):
+            print('Converted input data found in cache `{0}`, proceeding to '
+                  'load data\n'.format(entry_folder))
+            self._touch(key)
+            return entry_folder, instance_name
+
+        #  Convert into a temporary folder that is renamed once complete.
+        temp_folder = tempfile.mkdtemp(prefix='.' + key + '-',
+                                       dir=self.cache_dir) + '/'
+        saved = False
+        try:
+            conv = Converter(file_path, output_folder=temp_folder,
+                             outfile_key=instance_name,
+                             sp_workers=sp_workers, **settings)
+            conv.convert_instance()
+            try:
+                os.rename(temp_folder, entry_folder)
+                saved = True
+            except OSError:
+                if not os.path.isdir(entry_folder):
+                    logging.error('Could not add cache entry `{0}`'.format(
+                        entry_folder))
+                    raise
+                #  Another job added the same entry first.
+                logging.info('Cache entry {} already added'.format(key))
+        finally:
+            shutil.rmtree(temp_folder, ignore_errors=True)
+
+        if saved:
+            print('Saved converted data files to cache `{0}`'.format(
+                entry_folder))
+        self._touch(key)
+        self.evict(keep=key)
+        return entry_folder, instance_name
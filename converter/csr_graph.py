@@ -0,0 +1,231 @@
+# -*- coding: utf-8 -*-
+"""Compact compressed sparse row (CSR) representation of the arc graph, used
+to pass networks between the converter, network preparation and shortest
+path calculations.
+
+Shortest paths are calculated between arcs, so the vertices of the graph are
+the arcs of the network, and arc i is connected to each of its successor
+arcs, those that start where i ends. The graph is stored as int32 arrays:
+
+    offsets (m + 1): the successors of arc i are
+        targets[offsets[i]:offsets[i + 1]].
+    targets (e): successor arc indices, in increasing order for each arc.
+    costs (m): cost of traversing each arc.
+    inverse (m): index of the inverse arc of arcs that belong to an edge, -1
+        for pure arcs.
+    required (m, bool): whether an arc requires service.
+
+This takes a fraction of the memory of lists of successor lists, and all
+`converter.shortest_paths` routines accept a `CSRGraph` in place of the arc
+cost and successor lists:
+
+    >>> graph = CSRGraph.from_arc_lists(info_list)
+    >>> graph.save('Lpr_IF-c-01_graph.npz')
+    >>> graph = CSRGraph.load('Lpr_IF-c-01_graph.npz')
+    >>> d, p = shortest_paths.SP_dijkstra(graph)
+"""
+
+import logging
+import numpy as np
+import tables as tb
+
+#  Arrays stored with `save`, in order.
+GRAPH_ARRAYS = ('offsets', 'targets', 'costs', 'inverse', 'required')
+
+#  Group of the arrays in HDF5 files.
+HDF5_GROUP = 'csr_graph'
+
+
+def successor_csr_from_arcs(arc_u, arc_v):
+    """Find successor arc indices based on arc start vertices, arc_u, and end
+    vertices arc_v, as a CSR pair.
+
+    The arcs are sorted once on their start vertices, after which the
+    successors of each arc are the group of sorted arcs that start at its
+    end vertex, found with a binary search. All successor lists are
+    therefore found in O(m log m), instead of O(m^2) with a search per arc.
+
+    Args:
+        arc_u (list/np.array): start vertices of arcs
+        arc_v (list/np.array): end vertices of arcs
+
+    Returns:
+        offsets (np.array <int32>): successors of arc i are stored at
+            offsets[i]:offsets[i + 1].
+        targets (np.array <int32>): successor arc indices, in increasing
+            order for each arc.
+    """
+    u_np = np.asarray(arc_u)
+    v_np = np.asarray(arc_v)
+    n_arcs = len(u_np)
+
+    arc_order = np.argsort(u_np, kind='stable')
+    u_sorted = u_np[arc_order]
+    group_start = np.searchsorted(u_sorted, v_np, side='left')
+    group_end = np.searchsorted(u_sorted, v_np, side='right')
+    n_successors = group_end - group_start
+
+    offsets = np.zeros(n_arcs + 1, dtype=np.int32)
+    np.cumsum(n_successors, out=offsets[1:])
+
+    #  Position k of the targets of arc i is taken from its group at
+    #  group_start[i] + k - offsets[i].
+    shift = np.repeat(offsets[:-1] - group_start, n_successors)
+    sorted_position = np.arange(offsets[-1]) - shift
+    targets = arc_order[sorted_position].astype(np.int32)
+    return offsets, targets
+
+
+def successor_csr_from_lists(successor_lists):
+    """Convert successor index lists into a CSR pair.
+
+    Arg:
+        successor_lists (list <list>): successor arc indices of each arc.
+
+    Returns:
+        offsets (np.array <int32>): successors of arc i are stored at
+            offsets[i]:offsets[i + 1].
+        targets (np.array <int32>): successor arc indices.
+    """
+    n_arcs = len(successor_lists)
+    n_successors = np.fromiter((len(x) for x in successor_lists),
+                               dtype=np.int32, count=n_arcs)
+    offsets = np.zeros(n_arcs + 1, dtype=np.int32)
+    np.cumsum(n_successors, out=offsets[1:])
+    if offsets[-1] == 0:
+        targets = np.zeros(0, dtype=np.int32)
+    else:
+        targets = np.concatenate(
+            [np.asarray(x, dtype=np.int32) for x in successor_lists])
+    return offsets, targets
+
+
+class CSRGraph(object):
+    """Arc graph stored as int32 CSR arrays, see the module docstring."""
+
+    def __init__(self, offsets, targets, costs, inverse=None, required=None):
+        """
+        Args:
+            offsets (np.array <int32>): successors of arc i are stored at
+                targets[offsets[i]:offsets[i + 1]].
+            targets (np.array <int32>): successor arc indices.
+            costs (list/np.array <int>): cost of traversing each arc.
+
+        Kwargs:
+            inverse (list/np.array): inverse arc of each arc, None or -1 for
+                pure arcs. All -1 if None.
+            required (list/np.array <bool>): whether each arc requires
+                service. All False if None.
+
+        Raise:
+            ValueError: if the array lengths do not match.
+        """
+        self.offsets = np.ascontiguousarray(offsets, dtype=np.int32)
+        self.targets = np.ascontiguousarray(targets, dtype=np.int32)
+        self.costs = np.ascontiguousarray(costs, dtype=np.int32)
+        n_arcs = self.costs.shape[0]
+
+        if inverse is None:
+            self.inverse = np.full(n_arcs, -1, dtype=np.int32)
+        else:
+            self.inverse = np.array([-1 if x is None else x for x in inverse],
+                                    dtype=np.int32)
+        if required is None:
+            self.required = np.zeros(n_arcs, dtype=bool)
+        else:
+            self.required = np.ascontiguousarray(required, dtype=bool)
+
+        if self.offsets.shape[0] != n_arcs + 1 or \
+                self.offsets[-1] != self.targets.shape[0] or \
+                self.inverse.shape[0] != n_arcs or \
+                self.required.shape[0] != n_arcs:
+            logging.error('CSR graph arrays do not match: {} arcs, {} '
+                          'offsets, {} targets, {} inverse arcs and {} '
+                          'required flags'.format(n_arcs,
+                                                  self.offsets.shape[0],
+                                                  self.targets.shape[0],
+                                                  self.inverse.shape[0],
+                                                  self.required.shape[0]))
+            raise ValueError
+
+    @classmethod
+    def from_arcs(cls, arc_u, arc_v, costs, inverse=None, required=None):
+        """Create the graph from the start and end vertices of the arcs, see
+        `successor_csr_from_arcs`."""
+        offsets, targets = successor_csr_from_arcs(arc_u, arc_v)
+        return cls(offsets, targets, costs, inverse, required)
+
+    @classmethod
+    def from_successor_lists(cls, costs, successor_lists, inverse=None,
+                             required=None):
+        """Create the graph from successor index lists, such as `sucArcL`."""
+        offsets, targets = successor_csr_from_lists(successor_lists)
+        return cls(offsets, targets, costs, inverse, required)
+
+    @classmethod
+    def from_arc_lists(cls, info_list):
+        """Create the graph from generated or loaded instance lists.
+
+        Arg:
+            info_list (class): `py_data_write.ArcConvertLists` or
+                `py_data_read.ReadArcConvertLists`, with `travelCostL`,
+                `sucArcL`, `invArcL`, `reqArcList` and `reqArcListActual`.
+        """
+        required = np.zeros(len(info_list.travelCostL), dtype=bool)
+        required[[info_list.reqArcList[i]
+                  for i in info_list.reqArcListActual]] = True
+        return cls.from_successor_lists(info_list.travelCostL,
+                                        info_list.sucArcL,
+                                        inverse=info_list.invArcL,
+                                        required=required)
+
+    @property
+    def n_arcs(self):
+        return self.costs.shape[0]
+
+    def __len__(self):
+        return self.n_arcs
+
+    @property
+    def nbytes(self):
+        """Memory used by the graph arrays, in bytes."""
+        return sum(getattr(self, name).nbytes for name in GRAPH_ARRAYS)
+
+    def successors(self, arc):
+        """Return the successor arc indices of an arc, as a view."""
+        return self.targets[self.offsets[arc]:self.offsets[arc + 1]]
+
+    def successor_lists(self):
+        """Return the successor arc indices of each arc, as views."""
+        return np.split(self.targets, self.offsets[1:-1])
+
+    def save(self, path):
+        """Save the graph arrays to an `.npz` file, or an HDF5 file if the
+        path ends with `.h5` or `.hdf5`. Existing HDF5 files are added to.
+        """
+        if path.endswith(('.h5', '.hdf5')):
+            with tb.open_file(path, 'a') as h5file:
+                if '/' + HDF5_GROUP in h5file:
+                    h5file.remove_node(h5file.root, HDF5_GROUP,
+                                       recursive=True)
+                group = h5file.create_group(h5file.root, HDF5_GROUP,
+                                            'Arc graph in CSR format')
+                for name in GRAPH_ARRAYS:
+                    h5file.create_carray(group, name, obj=getattr(self, name),
+                                         filters=tb.Filters(1))
+        else:
+            np.savez(path, **{name: getattr(self, name)
+                              for name in GRAPH_ARRAYS})
+
+    @classmethod
+    def load(cls, path):
+        """Load a graph saved with `save`."""
+        if path.endswith(('.h5', '.hdf5')):
+            with tb.open_file(path, 'r') as h5file:
+                group = h5file.get_node(h5file.root, HDF5_GROUP)
+                arrays = [group._f_get_child(name).read()
+                          for name in GRAPH_ARRAYS]
+        else:
+            with np.load(path) as graph_file:
+                arrays = [graph_file[name] for name in GRAPH_ARRAYS]
+        return cls(*arrays)
@@ -22,7 +22,6 @@ def convert_file(file_path):
 
     convert = Converter(file_path)
     instance_info = convert.extract_inputs()
-    success_array = np.array([np.array(x) for x in instance_info['sucArcL']])
     instance_df = pd.DataFrame(
         {'arc_u': instance_info['beginL'], 'arc_v': instance_info['endL'],
          'arc_cost': instance_info['travelCostL']})
@@ -34,8 +33,7 @@ def convert_file(file_path):
         instance_df['arc_inverse_index'] == -1, 'arc_oneway'] = True
     instance_df.loc[
         instance_df['arc_inverse_index'] != -1, 'arc_oneway'] = False
-    instance_df['arc_successor_index_list'] = np.nan
-    instance_df['arc_successor_index_list'] = instance_df[
-        'arc_successor_index_list'].astype(object)
-    instance_df.at[:, 'arc_successor_index_list'] = success_array
+    instance_df['arc_successor_index_list'] = pd.Series(
+        [np.array(x) for x in instance_info['sucArcL']],
+        index=instance_df.index, dtype=object)
     return instance_df
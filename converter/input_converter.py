@@ -29,6 +29,8 @@ import pickle
 from pprint import pprint
 import converter.py_data_write as data_write
 import converter.py_gen_nearest_neighbour_lists as gen_nn
+import converter.binary_cache as binary_cache
+from converter.lazy_data import LazyContents, LazyField
 
 
 class Converter(object):
@@ -38,7 +40,8 @@ class Converter(object):
 
     def __init__(self, instance_path=None, instance_folder=None,
                  output_folder=None, out_to_in=False, outfile_key=None,
-                 overwrite=False):
+                 overwrite=False, sp_solver='Floyd-Warshall',
+                 required_only=False, sp_workers=1, binary=False):
         """Set the instance path to raw file, or to an instance folder
         with different instance files. Set the output path to write raw folders,
         and the file key name to use to write the output files, set
@@ -59,6 +62,23 @@ class Converter(object):
                 preceding extensions.
             overwrite (bool): Overwrites existing data files that have the same
                 name as the intended output files.
+            sp_solver (str): Shortest path algorithm, either `Floyd-Warshall`
+                or `Dijkstra`. Dijkstra is much faster on large sparse road
+                networks, and gives the same costs, but can choose a different
+                path where there are ties.
+            required_only (bool): Only calculate shortest paths from the
+                required arcs, including the depot and IFs, using Dijkstra.
+                The full all arc matrices are then not stored: `d_full` is
+                None and `p_full` is a compact
+                `converter.shortest_path.RequiredArcPaths` object, which is
+                all that `convert_df_full` needs. Use for large networks
+                where only a fraction of the streets require service.
+            sp_workers (int): Number of threads used by Dijkstra, with the
+                source arcs split between them. All cores are used if None.
+            binary (bool): Write the problem info, shortest path and nearest
+                neighbour data in the versioned binary format of
+                `converter.binary_cache`, which can be memory-mapped, instead
+                of pickled `.dat` files.
 
         TODO:
             Convert to _input_path instead of _instance_path
@@ -71,11 +91,20 @@ class Converter(object):
         self._out_to_in = out_to_in
         self._outfile_key = outfile_key
         self._overwrite = overwrite
-
-        self._output_extensions = ('_info_lists_pickled.dat',
-                                   '_problem_info.dat',
-                                   '_sp_data_full.dat',
-                                   '_nn_list.dat')
+        self._sp_solver = sp_solver
+        self._required_only = required_only
+        self._sp_workers = sp_workers
+        self._binary = binary
+
+        if binary:
+            self._output_extensions = tuple(binary_cache.REQUIRED_EXTENSIONS)
+            self._info_lists_extension = binary_cache.INFO_LISTS_EXTENSION
+        else:
+            self._info_lists_extension = '_info_lists_pickled.dat'
+            self._output_extensions = ('_info_lists_pickled.dat',
+                                       '_problem_info.dat',
+                                       '_sp_data_full.dat',
+                                       '_nn_list.dat')
 
         self._ignores = {'start': ['.'],
                          'extension': ['py']}
@@ -242,17 +271,26 @@ class Converter(object):
         pprint('Converting {0}...'.format(self._instance_path))
         info_list = data_write.ArcConvertLists(self._instance_path)
         info_list_data = info_list.return_data()
-        self._write_data(info_list_data, '_info_lists_pickled.dat')
+        self._write_data(info_list_data, self._info_lists_extension)
 
         # Generate, return and write shortest path costs, and full instance info
         gen_sp_list = data_write.WriteSpIfInputData(info_list)
+        gen_sp_list.sp_solver = self._sp_solver
+        gen_sp_list.required_only = self._required_only
+        gen_sp_list.sp_workers = self._sp_workers
         (sp_info, instance_info_data) = gen_sp_list.return_sp_info(info_list)
-        self._write_data(sp_info, '_sp_data_full.dat')
-        self._write_data(instance_info_data, '_problem_info.dat')
 
         # Generate, return and write nearest neighbour lists based on SP.
         nn_lists = gen_nn.return_nn_lists(instance_info_data[-3])
-        self._write_data(nn_lists, '_nn_list.dat')
+
+        if self._binary:
+            binary_cache.write_binary_instance(
+                self._output_folder + self._outfile_key, sp_info,
+                instance_info_data, nn_lists)
+        else:
+            self._write_data(sp_info, '_sp_data_full.dat')
+            self._write_data(instance_info_data, '_problem_info.dat')
+            self._write_data(nn_lists, '_nn_list.dat')
 
     def _check_all_files_in_directory(self):
         """Check generation conditions for all non-python based files in a
@@ -320,7 +358,11 @@ class Converter(object):
                                   output_folder=self._output_folder,
                                   out_to_in=self._out_to_in,
                                   outfile_key=None,
-                                  overwrite=self._overwrite)
+                                  overwrite=self._overwrite,
+                                  sp_solver=self._sp_solver,
+                                  required_only=self._required_only,
+                                  sp_workers=self._sp_workers,
+                                  binary=self._binary)
 
             converter.convert_instance(check_inputs)
 
@@ -331,7 +373,8 @@ class InstanceInfo(object):
     nearest neighbours.
     """
 
-    def __init__(self, instance_folder, instance_name, check_inputs=True):
+    def __init__(self, instance_folder, instance_name, check_inputs=True,
+                 binary=False):
         """Set the path to the instance folder, and its name from where the
         instance information can be extracted.
 
@@ -345,6 +388,11 @@ class InstanceInfo(object):
 
         Kwargs:
             check_inputs (bool): Check inputs for obvious errors.
+            binary (bool): Read the problem info, shortest path and nearest
+                neighbour data from the binary format of
+                `converter.binary_cache`. The matrices are then read-only
+                `np.memmap` arrays instead of lists, and the `extension`
+                arguments of the setters are ignored.
 
         TODO:
             change `instance` to file and `instance_name` to `file_name_start`.
@@ -354,6 +402,7 @@ class InstanceInfo(object):
         """
 
         self._check_inputs = check_inputs
+        self._binary = binary
 
         self._instance_folder = instance_folder
         self._instance_name = instance_name
@@ -508,6 +557,8 @@ class InstanceInfo(object):
                 index value.
         """
         self._check_instance_locations()
+        if self._binary:
+            extension = binary_cache.INFO_LISTS_EXTENSION
         file_lists = self._return_file_contents(extension)
 
         (self.name,
@@ -679,6 +730,10 @@ class InstanceInfo(object):
         """
 
         self._check_instance_locations()
+        if self._binary:
+            self._set_binary_instance_info()
+            return None
+
         file_lists = self._return_file_contents(extension)
 
         (self.name,
@@ -702,6 +757,17 @@ class InstanceInfo(object):
 
         return None
 
+    def _set_binary_instance_info(self):
+        """Set the required arc instance info from the binary format, see
+        `set_required_arc_instance_info`."""
+        path_prefix = self._instance_folder + self._instance_name
+        header = binary_cache.read_header(path_prefix)
+        for field, value in header['problem_info'].items():
+            setattr(self, field, value)
+        self.d_np_req = binary_cache.load_array(path_prefix, 'd')
+        self.if_cost_np = binary_cache.load_array(path_prefix, 'if_cost')
+        self.if_arc_np = binary_cache.load_array(path_prefix, 'if_arc')
+
     def set_nn_lists(self, extension='_nn_list.dat'):
         """Set the nearest neighbour lists for all required arcs.
 
@@ -716,7 +782,11 @@ class InstanceInfo(object):
                 increasing order from closest to furthest arc.
         """
         self._check_instance_locations()
-        self.nn_list = self._return_file_contents(extension)
+        if self._binary:
+            self.nn_list = binary_cache.load_array(
+                self._instance_folder + self._instance_name, 'nn_list')
+        else:
+            self.nn_list = self._return_file_contents(extension)
 
     def set_sp_lists(self, extension='_sp_data_full.dat'):
         """Set the shortest path matrices for all arcs.
@@ -729,6 +799,42 @@ class InstanceInfo(object):
             info.d_full (n*n matrix): shortest path cost between arcs u and v.
             info.p_full (n*n matrix): direct arc before v on the shortest path
                 between arcs u and v.
+
+        If the instance was converted with `required_only`, d_full is None and
+        p_full is a `converter.shortest_path.RequiredArcPaths` object, that
+        only has paths from the required arcs.
+        """
+        self._check_instance_locations()
+        if self._binary:
+            (self.d_full, self.p_full) = binary_cache.load_sp_info(
+                self._instance_folder + self._instance_name)
+        else:
+            (self.d_full, self.p_full) = self._return_file_contents(extension)
+
+    def set_lazy_display_lists(self, sp_extension='_sp_data_full.dat',
+                               lists_extension='_info_lists_pickled.dat'):
+        """Set the display info, `d_full`, `p_full`, `allIndexD`,
+        `travelCostL` and `reqArcs_map`, as `converter.lazy_data.LazyField`
+        proxies that only read their files on first access.
+
+        Kwargs:
+            sp_extension (str): extension used to store shortest-path info.
+            lists_extension (str): extension used to store instance lists.
         """
         self._check_instance_locations()
-        (self.d_full, self.p_full) = self._return_file_contents(extension)
+        path_prefix = self._instance_folder + self._instance_name
+        if self._binary:
+            sp_contents = LazyContents(
+                lambda: binary_cache.load_sp_info(path_prefix))
+            lists_extension = binary_cache.INFO_LISTS_EXTENSION
+        else:
+            sp_contents = LazyContents(
+                lambda: self._return_file_contents(sp_extension))
+        lists_contents = LazyContents(
+            lambda: self._return_file_contents(lists_extension))
+
+        self.d_full = LazyField(sp_contents, 0)
+        self.p_full = LazyField(sp_contents, 1)
+        self.travelCostL = LazyField(lists_contents, 11)
+        self.allIndexD = LazyField(lists_contents, 15)
+        self.reqArcs_map = LazyField(lists_contents, 18)
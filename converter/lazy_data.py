@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+"""Proxies that load converted instance data on first access.
+
+The display info, `d_full`, `p_full`, `allIndexD`, `travelCostL` and
+`reqArcs_map`, is only needed by `solution_converter.convert_df_full` and
+`shortest_path.sp_full`, once a solution has been found, but the full arc
+matrices are by far the largest part of the converted data. Loading them
+lazily lets solver workers start without paying for them.
+
+Fields that are stored in the same file share one `LazyContents` object, so
+that the file is read once, and released together.
+
+Example:
+
+    >>> info = load_instance('data/Lpr_IF/Lpr_IF-c-01.txt', lazy_display=True)
+    >>> info.d_full.loaded
+    False
+    >>> info.d_full[5][93]
+    113
+    >>> info.d_full.loaded
+    True
+    >>> info.d_full.release()
+"""
+
+import logging
+import numpy as np
+
+
+class LazyContents(object):
+    """Contents of a converted data file, read on first use."""
+
+    def __init__(self, load):
+        """
+        Arg:
+            load (function): called without arguments to read the contents.
+        """
+        self._load = load
+        self._contents = None
+        self.loaded = False
+
+    def get(self):
+        """Return the contents, reading them if needed."""
+        if not self.loaded:
+            logging.info('Loading lazy display info')
+            self._contents = self._load()
+            self.loaded = True
+        return self._contents
+
+    def release(self):
+        """Release the contents, they are read again on the next use."""
+        self._contents = None
+        self.loaded = False
+
+
+class LazyField(object):
+    """Proxy for one field of `LazyContents`.
+
+    Indexing, `len`, iteration, membership, comparison and attribute access
+    are passed on to the loaded field, so it can be used in place of the
+    field itself. Use `value` for the field itself, for example for
+    `isinstance` checks.
+    """
+
+    def __init__(self, contents, index=None):
+        """
+        Arg:
+            contents (LazyContents): contents that the field belongs to.
+
+        Kwarg:
+            index (int): position of the field in the contents, the contents
+                are the field if None.
+        """
+        self._lazy_contents = contents
+        self._lazy_index = index
+
+    @property
+    def value(self):
+        """Return the field, loading it if needed."""
+        contents = self._lazy_contents.get()
+        if self._lazy_index is None:
+            return contents
+        return contents[self._lazy_index]
+
+    @property
+    def loaded(self):
+        return self._lazy_contents.loaded
+
+    def release(self):
+        """Release the field, and the other fields of its contents."""
+        self._lazy_contents.release()
+
+    def __getattr__(self, name):
+        if name.startswith('_lazy_'):
+            raise AttributeError(name)
+        return getattr(self.value, name)
+
+    def __getitem__(self, key):
+        return self.value[key]
+
+    def __len__(self):
+        return len(self.value)
+
+    def __iter__(self):
+        return iter(self.value)
+
+    def __contains__(self, item):
+        return item in self.value
+
+    def __eq__(self, other):
+        if isinstance(other, LazyField):
+            other = other.value
+        return self.value == other
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __array__(self, dtype=None):
+        return np.asarray(self.value, dtype=dtype)
+
+    def __repr__(self):
+        if not self.loaded:
+            return '<LazyField, not loaded>'
+        return repr(self.value)
+
+
+def release_display_info(info):
+    """Release the lazily loaded display info of an instance.
+
+    Arg:
+        info (namedtuple or InstanceInfo): returned by `load_instance`.
+    """
+    for field in ('d_full', 'p_full', 'allIndexD', 'travelCostL',
+                  'reqArcs_map'):
+        value = getattr(info, field, None)
+        if isinstance(value, LazyField):
+            value.release()
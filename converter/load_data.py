@@ -31,15 +31,19 @@ import os
 import collections
 from converter.input_converter import Converter
 from converter.input_converter import InstanceInfo
+import converter.binary_cache as binary_cache
+from converter.conversion_cache import ConversionCache
 
 
 class ConvertedInputs(object):
     """Checking and manipulating converted input data"""
 
-    def __init__(self, file_path):
+    def __init__(self, file_path, binary=False):
         """
         Arg:
             file_path (str): path to raw input file.
+            binary (bool): check and remove the binary format files of
+                `converter.binary_cache` instead of the pickled ones.
         """
 
         self._file_path = file_path
@@ -48,10 +52,15 @@ class ConvertedInputs(object):
         self._striped_file_path = self.folder_path + self.file_name
 
         #  Standardised converted input data extensions
-        self._input_extensions = ['_info_lists_pickled.dat',
-                                  '_nn_list.dat',
-                                  '_problem_info.dat',
-                                  '_sp_data_full.dat']
+        if binary:
+            self._input_extensions = binary_cache.REQUIRED_EXTENSIONS
+            self._optional_extensions = [binary_cache.ARRAY_EXTENSIONS['d_full']]
+        else:
+            self._input_extensions = ['_info_lists_pickled.dat',
+                                      '_nn_list.dat',
+                                      '_problem_info.dat',
+                                      '_sp_data_full.dat']
+            self._optional_extensions = []
 
     def extract_folder(self):
         """Extract folder path from file path
@@ -101,14 +110,17 @@ class ConvertedInputs(object):
 
     def remove_converted_input(self):
         """Remove converted input files from file folder"""
-        for ext in self._input_extensions:
+        for ext in self._input_extensions + self._optional_extensions:
             check_file = self._striped_file_path + ext
             if os.path.isfile(check_file):
                 print('Removing `{0}`'.format(check_file))
                 os.remove(check_file)
 
 
-def load_instance(file_path, display_info=True, cache=True, overwrite=False, name_tuple=True):
+def load_instance(file_path, display_info=True, cache=True, overwrite=False,
+                  name_tuple=True, sp_solver='Floyd-Warshall',
+                  required_only=False, sp_workers=1, binary=False,
+                  cache_dir=None, cache_max_size=None, lazy_display=False):
     """Load problem instance info required to solve the instance and optionally
     display the solution in the format of the raw input file.
 
@@ -125,6 +137,36 @@ def load_instance(file_path, display_info=True, cache=True, overwrite=False, nam
             present in the input data folder.
         name_tuple (bool): if output should be converted to a named tuples. If this is
             the case, they can't be changed, accidently or otherwise.
+        sp_solver (str): shortest path algorithm used when converting the
+            input data, either `Floyd-Warshall` or `Dijkstra`. Use `Dijkstra`
+            for large road networks.
+        required_only (bool): only calculate shortest paths from the required
+            arcs when converting the input data. Memory use then falls from
+            O(m^2) to O(nm). `info.d_full` will be None, and `info.p_full`
+            only has paths from required arcs, which is enough for
+            `convert_df_full`.
+        sp_workers (int): number of threads used for Dijkstra shortest path
+            calculations, all cores if None.
+        binary (bool): store the converted input data in the versioned binary
+            format of `converter.binary_cache`, and load it memory-mapped.
+            `info.d`, `info.if_cost_np`, `info.if_arc_np`, `info.nn_list`,
+            `info.d_full` and `info.p_full` are then read-only `np.memmap`
+            arrays, which load near-instantly and are shared between solver
+            processes through the page-cache.
+        cache_dir (str): store and look up the converted input data in a
+            central `converter.conversion_cache.ConversionCache` folder,
+            keyed on the content of the raw input file and the conversion
+            settings, instead of next to the raw input file. Entries are
+            shared between jobs and kept regardless of `cache`. Use `''` for
+            `$MCARPTIF_CACHE_DIR` or `~/.cache/mcarptif`.
+        cache_max_size (int): maximum size of `cache_dir` in bytes, least
+            recently used entries are evicted beyond it.
+        lazy_display (bool): with `display_info`, only load `d_full`,
+            `p_full`, `allIndexD`, `travelCostL` and `reqArcs_map` on first
+            access, through `converter.lazy_data.LazyField` proxies. They can
+            be released again with `converter.lazy_data.release_display_info`.
+            The converted input data are then kept regardless of `cache`, so
+            that they can still be loaded.
 
     Raises:
         FileNotFoundError: raw input file not found.
@@ -368,25 +410,46 @@ def load_instance(file_path, display_info=True, cache=True, overwrite=False, nam
     """
 
     #  Object for manipulating converted input files.
-    inputs = ConvertedInputs(file_path)
+    inputs = ConvertedInputs(file_path, binary=binary)
 
     if not os.path.isfile(file_path):
         raise FileNotFoundError('`{0}` not found'.format(file_path))
 
-    if overwrite or not inputs.check_converted_input_exists():
+    if cache_dir is not None:
+        conversion_cache = ConversionCache(cache_dir=cache_dir or None,
+                                           max_size=cache_max_size)
+        settings = {'sp_solver': sp_solver,
+                    'required_only': required_only,
+                    'binary': binary}
+        instance_folder, instance_name = conversion_cache.fetch(
+            file_path, settings, overwrite=overwrite, sp_workers=sp_workers)
+        #  Cache entries are managed by the cache, not removed after loading.
+        cache = True
+    elif overwrite or not inputs.check_converted_input_exists():
         #  Object for creating and storing converted input data.
-        conv = Converter(file_path, out_to_in=True, overwrite=overwrite)
+        conv = Converter(file_path, out_to_in=True, overwrite=overwrite,
+                         sp_solver=sp_solver, required_only=required_only,
+                         sp_workers=sp_workers, binary=binary)
         conv.convert_instance()
         print('Saving converted data files to `{0}`'.format(inputs.folder_path))
     else:
         print('Converted input data exist in `{0}`, proceeding to load '
               'data\n'.format(inputs.folder_path))
 
-    #  Object of retrieving stored converted input data
-    instance = InstanceInfo(instance_folder=inputs.folder_path,
-                            instance_name=inputs.file_name)
+    if cache_dir is None:
+        instance_folder = inputs.folder_path
+        instance_name = inputs.file_name
 
-    if display_info is True:
+    #  Object of retrieving stored converted input data
+    instance = InstanceInfo(instance_folder=instance_folder,
+                            instance_name=instance_name,
+                            binary=binary)
+
+    if display_info is True and lazy_display:
+        instance.set_lazy_display_lists('_sp_data_full.dat',
+                                        '_info_lists_pickled.dat')
+        cache = True
+    elif display_info is True:
         instance.set_sp_lists('_sp_data_full.dat')
         instance.set_instance_lists('_info_lists_pickled.dat')
 
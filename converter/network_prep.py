@@ -18,6 +18,7 @@ import logging
 import os
 import tables as tb
 import converter.shortest_paths as shortest_paths
+from converter.csr_graph import CSRGraph, successor_csr_from_arcs
 from time import perf_counter as clock
 from scipy.sparse.csgraph import shortest_path
 import numpy as np
@@ -63,23 +64,50 @@ def key_columns_not_exists(df, place_holder_columns):
         raise AttributeError
 
 
-def return_successor_arcs_indices(u, v):
+def return_successor_arcs_csr(u, v):
     """Find successor arc indices based on arc start vertices, u, and end
-    vertices v. u and v have to be in the order of the their arcs.
+    vertices v, as a compressed sparse row (CSR) pair in O(m log m), see
+    `csr_graph.successor_csr_from_arcs`. u and v have to be in the order of
+    the their arcs.
 
     Args:
         u (list/np.array): start vertices of arcs
         v (list/np.array): end vertices of arcs
 
     Returns:
-        successor_list (np.array <np.array>) = a mixed numpy array with the
-        index of each arc that is a successor of arc i.
+        successor_offsets (np.array <int32>): successors of arc i are stored
+            at successor_offsets[i]:successor_offsets[i + 1].
+        successor_indices (np.array <int32>): successor arc indices, in
+            increasing order for each arc.
+    """
+    return successor_csr_from_arcs(u, v)
+
+
+def split_successor_csr(successor_offsets, successor_indices):
+    """Split a CSR successor pair into a list of successor index arrays,
+    which are views on `successor_indices`.
+
+    Returns:
+        successor_list (list <np.array>): index of each arc that is a
+            successor of arc i.
     """
-    u_np = np.array(u)
-    v_np = np.array(v)
+    return np.split(successor_indices, successor_offsets[1:-1])
 
-    successor_list = np.array([np.where(x == u_np)[0] for x in v_np])
-    return successor_list
+
+def return_successor_arcs_indices(u, v):
+    """Find successor arc indices based on arc start vertices, u, and end
+    vertices v. u and v have to be in the order of the their arcs. See
+    `return_successor_arcs_csr`.
+
+    Args:
+        u (list/np.array): start vertices of arcs
+        v (list/np.array): end vertices of arcs
+
+    Returns:
+        successor_list (list <np.array>): index of each arc that is a
+            successor of arc i.
+    """
+    return split_successor_csr(*return_successor_arcs_csr(u, v))
 
 
 def check_if_pytable_exists(path, overwrite=False):
@@ -123,9 +151,16 @@ class Network:
             arc_u (np.array): start vertex of each arc 'i'
             arc_v (np.array): end vertex of each arc 'i'
             arc_pair (np.array <str>): arc pair secondary key <'arc_u-arc_v'>
-            generate_successor_list (np.array <np.array>): multi-dimensional
-                array with the successor arc indices (in an array) of each
-                arc, again, per index.
+            arc_successor_offsets (np.array <int32>): CSR offsets of the
+                successor arcs, those of arc i are stored at
+                arc_successor_offsets[i]:arc_successor_offsets[i + 1].
+            arc_successor_indices (np.array <int32>): CSR successor arc
+                indices.
+            arc_successor_index_list (list <np.array>): the successor arc
+                indices (in an array) of each arc, again, per index. Views on
+                `arc_successor_indices`.
+            graph (csr_graph.CSRGraph): the successor arcs and arc costs as
+                a CSR graph, for the shortest path calculations.
             secondary_key (np.array): optional secondary key, for tracing the
                 arcs back to their origins.
 
@@ -145,7 +180,10 @@ class Network:
 
         self.arc_pair = self.arc_pair.values.astype(str)
 
+        self.arc_successor_offsets = None
+        self.arc_successor_indices = None
         self.arc_successor_index_list = None
+        self.graph = None
         if calc_successor:
             self.generate_successor_list()
 
@@ -161,8 +199,13 @@ class Network:
     def generate_successor_list(self):
         """Prepare network and generate successor arcs, those where v == u.
         """
-        self.arc_successor_index_list = return_successor_arcs_indices(self.arc_u,
-                                                                      self.arc_v)
+        (self.arc_successor_offsets,
+         self.arc_successor_indices) = return_successor_arcs_csr(self.arc_u,
+                                                                 self.arc_v)
+        self.arc_successor_index_list = split_successor_csr(
+            self.arc_successor_offsets, self.arc_successor_indices)
+        self.graph = CSRGraph(self.arc_successor_offsets,
+                              self.arc_successor_indices, self.arc_cost)
 
     def update_network_df(self, include_successor_list=True):
         """Update the network data.frame with the generated network info
@@ -186,12 +229,9 @@ class Network:
                 logging.warning('Successor index list not yet calculated')
                 raise AttributeError
 
-            self.network_df['arc_successor_index_list'] = np.nan
-            self.network_df['arc_successor_index_list'] = self.network_df[
-                'arc_successor_index_list'].astype(object)
-
-            self.network_df.at[:, 'arc_successor_index_list'] = \
-                self.arc_successor_index_list
+            self.network_df['arc_successor_index_list'] = pd.Series(
+                self.arc_successor_index_list, index=self.network_df.index,
+                dtype=object)
 
     def create_pytable(self,
                        path,
@@ -223,7 +263,8 @@ class Network:
         arc_v = self.arc_v
         arc_cost = self.arc_cost
         second_key = self.secondary_arc_key
-        arc_successor_index_list = self.arc_successor_index_list
+        arc_successor_offsets = self.arc_successor_offsets
+        arc_successor_indices = self.arc_successor_indices
 
         with tb.open_file(path, 'w') as h5file:
             logging.info('Creating a network pytable at {}'.format(path))
@@ -246,14 +287,17 @@ class Network:
                 h5file.create_array(arc_info_group, 'secondary_key',
                                     second_key, "Secondary key to trace the "
                                                 "network back to its origins")
-            vlarray = h5file.create_vlarray(arc_info_group,
-                                            'arc_successor_index_list',
-                                            tb.Atom.from_dtype(arc_v.dtype),
-                                            "Successor arc indices of arc u-v",
-                                            filters=tb.Filters(1))
             logging.info('Writing successor arcs')
-            for success_index in arc_successor_index_list:
-                vlarray.append(success_index)
+            filters = tb.Filters(1)
+            h5file.create_carray(arc_info_group, 'arc_successor_offsets',
+                                 obj=arc_successor_offsets,
+                                 title="Successor arcs of arc i are at "
+                                       "offsets[i]:offsets[i + 1]",
+                                 filters=filters)
+            h5file.create_carray(arc_info_group, 'arc_successor_indices',
+                                 obj=arc_successor_indices,
+                                 title="Successor arc indices of arc u-v",
+                                 filters=filters)
             logging.info('Pytable successfully created.')
             logging.info(h5file)
 
@@ -265,22 +309,33 @@ class ShortestPath:
 
     def __init__(self,
                  solver='Floyd-Warshall',
-                 in_memory=False):
+                 in_memory=False,
+                 n_workers=1):
         """
         Arg:
-            solver (str): shortest-path algorithm to use, currently only
-                Floyd-Warshall is supported.
+            solver (str): shortest-path algorithm to use, either
+                `Floyd-Warshall` or `Dijkstra`. Dijkstra runs a one-to-all
+                search from every arc over the successor lists, and is much
+                faster on large sparse road networks.
             in_memory (bool): whether shortest path calculations should be
                 done in memory and stored in the class, or stored in a pytable.
+            n_workers (int): number of threads for Dijkstra, with the source
+                arcs split between them. All cores are used if None.
+                Floyd-Warshall is always serial.
         """
+        if solver not in ('Floyd-Warshall', 'Dijkstra'):
+            logging.error('Unknown shortest path solver `{}`'.format(solver))
+            raise ValueError
         self.solver = solver
         self.in_memory = in_memory
+        self.n_workers = n_workers
         self.arc_u = None
         self.arc_v = None
         self.arc_cost = None
         self.arc_index = None
         self.arc_pair = None
         self.arc_successor_index_list = None
+        self.graph = None
         self.pytable_path = None
         self.cost_matrix = None
         self.predecessor_matrix = None
@@ -301,8 +356,15 @@ class ShortestPath:
             self.arc_u = arc_info.arc_u.read()
             self.arc_v = arc_info.arc_v.read()
             self.arc_cost = arc_info.arc_cost.read()
-            self.arc_successor_index_list = np.array([np.array(x) for x in
-                arc_info.arc_successor_index_list])
+            if 'arc_successor_offsets' in arc_info:
+                self.graph = CSRGraph(arc_info.arc_successor_offsets.read(),
+                                      arc_info.arc_successor_indices.read(),
+                                      self.arc_cost)
+            else:
+                #  Pytables written before the CSR successor arrays.
+                self.graph = CSRGraph.from_successor_lists(
+                    self.arc_cost, arc_info.arc_successor_index_list)
+            self.arc_successor_index_list = None
 
         self.pytable_path = path
 
@@ -317,8 +379,27 @@ class ShortestPath:
         self.arc_u = network.arc_u
         self.arc_v = network.arc_v
         self.arc_cost = network.arc_cost
-        self.arc_successor_index_list = np.array([np.array(x) for x in
-            network.arc_successor_index_list])
+        self.graph = network.graph
+        self.arc_successor_index_list = None
+
+    def load_from_graph(self, graph):
+        """Load the arc costs and successor arcs from a CSR graph, without
+        the arc info.
+
+        Arg:
+            graph (csr_graph.CSRGraph): arc graph, for example loaded with
+                `CSRGraph.load`.
+        """
+        self.arc_cost = graph.costs
+        self.graph = graph
+        self.arc_successor_index_list = None
+
+    def _sp_inputs(self):
+        """Inputs of the shortest path routines: the CSR graph, or the arc
+        costs and successor lists if the latter were set directly."""
+        if self.arc_successor_index_list is not None:
+            return self.arc_cost, self.arc_successor_index_list
+        return self.graph, None
 
     def set_network(self, arc_u, arc_v, arc_cost=None):
         """Set the network properties directly and calculate additional once if
@@ -344,8 +425,14 @@ class ShortestPath:
         """Calculate the shortest path and set the distance matrix internally.
         """
         t_start = clock()
-        d_np, p_np = shortest_paths.SP(self.arc_cost,
-                                       self.arc_successor_index_list)
+        arc_cost, arc_successor_index_list = self._sp_inputs()
+        if self.solver == 'Dijkstra':
+            d_np, p_np = shortest_paths.SP_dijkstra(
+                arc_cost, arc_successor_index_list,
+                n_workers=self.n_workers)
+        else:
+            d_np, p_np = shortest_paths.SP(arc_cost,
+                                           arc_successor_index_list)
         self.cost_matrix = d_np
         self.predecessor_matrix = p_np
         self.shortest_path_processing_time = clock() - t_start
@@ -390,54 +477,96 @@ class ShortestPath:
             logging.info('Shortest path info added.')
             logging.info(h5file)
 
-    def calc_shortest_path_pytable(self, pytable_path=None):
+    def calc_shortest_path_pytable(self, pytable_path=None, resume=False,
+                                   block_size=None):
         """Calculate the shortest path and set the distance matrix in pytable.
 
+        With Dijkstra the calculations are out-of-core: blocks of rows are
+        written to chunked, compressed carrays as they are completed, and a
+        progress marker is kept, see `shortest_paths.SP_pytable_dijkstra`.
+        An interrupted run can be continued with `resume=True`.
+
         Arg:
             pytable_path (str): path to pytable, if not set, the internally
                 flagged one will be used. A new table can be created,
                 but it is STRONGLY advised against, since it will only have
                 the index pairs. The remaining network info is critical for
                 using it.
+            resume (bool): continue the calculations already in the
+                pytable from the last completed block. Only for Dijkstra.
+            block_size (int): number of rows calculated and written at a
+                time with Dijkstra, set automatically if None.
+
+        Raise:
+            ValueError: if resuming Floyd-Warshall calculations, or if there
+                are no calculations to resume.
         """
 
         t_start = clock()
         if pytable_path is None:
             pytable_path = self.pytable_path
 
+        if resume and self.solver != 'Dijkstra':
+            logging.error('Only Dijkstra shortest path calculations can be '
+                          'resumed')
+            raise ValueError
+
         with tb.open_file(pytable_path, 'a') as h5file:
             logging.info(
                 'Writing shortest path info to {}'.format(pytable_path))
             filters = tb.Filters(complevel=1)
-            sp_info = h5file.create_group(h5file.root, 'shortest_path_info',
-                                          'Shortest path info for network')
 
             l = self.arc_cost.shape[0]
 
-            cost_matrix = h5file.create_carray(sp_info,
-                                               'cost_matrix',
-                                               tb.Int32Col(),
-                                               shape=(l, l),
-            title='shortest path cost matrix between all arc indices',
-                                               filters=filters)
-            predecessor_matrix = h5file.create_carray(sp_info,
-                                                      'predecessor_matrix',
-                                                      tb.Int32Col(),
-                                                      shape=(l, l),
-            title='shortest path predecessor index matrix between all arc indices',
-                                                      filters=filters)
+            if resume:
+                if '/shortest_path_info' not in h5file:
+                    logging.error('No shortest path calculations to resume '
+                                  'in {}'.format(pytable_path))
+                    raise ValueError
+                sp_info = h5file.root.shortest_path_info
+                cost_matrix = sp_info.cost_matrix
+                predecessor_matrix = sp_info.predecessor_matrix
+            else:
+                sp_info = h5file.create_group(h5file.root,
+                                              'shortest_path_info',
+                                              'Shortest path info for network')
+                chunkshape = (max(1, min(l, 2 ** 16 // max(l, 1))), l)
+                cost_matrix = h5file.create_carray(sp_info,
+                                                   'cost_matrix',
+                                                   tb.Int32Col(),
+                                                   shape=(l, l),
+                title='shortest path cost matrix between all arc indices',
+                                                   filters=filters,
+                                                   chunkshape=chunkshape)
+                predecessor_matrix = h5file.create_carray(sp_info,
+                                                          'predecessor_matrix',
+                                                          tb.Int32Col(),
+                                                          shape=(l, l),
+                title='shortest path predecessor index matrix between all arc indices',
+                                                          filters=filters,
+                                                          chunkshape=chunkshape)
+
+            arc_cost, arc_successor_index_list = self._sp_inputs()
+            if self.solver == 'Dijkstra':
+                shortest_paths.SP_pytable_dijkstra(
+                    arc_cost, arc_successor_index_list,
+                    cost_matrix, predecessor_matrix, block_size=block_size,
+                    n_workers=self.n_workers)
+            else:
+                shortest_paths.SP_pytable(arc_cost,
+                                          arc_successor_index_list,
+                                          cost_matrix, predecessor_matrix)
 
             logging.info('Shortest path info added.')
 
-            shortest_paths.SP_pytable(self.arc_cost,
-                                      self.arc_successor_index_list,
-                                      cost_matrix, predecessor_matrix)
-
             t_end = clock() - t_start
             self.shortest_path_processing_time = t_end
             logging.info('Shortest path calculations took {} seconds'.format(
                 round(t_end, 0)))
 
+            # With resumed calculations, only the time of the last run.
+            if '/shortest_path_info/calculation_time' in h5file:
+                h5file.remove_node(sp_info, 'calculation_time')
             h5file.create_array(sp_info, 'calculation_time', np.array([t_end]),
                                 "Shortest path calculation time (seconds)")
             logging.info('Done')
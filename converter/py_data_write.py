@@ -14,6 +14,7 @@ import numpy
 pyximport.install(setup_args={"include_dirs":numpy.get_include()})
 
 from copy import copy
+from functools import partial
 import pickle
 import os
 import pandas as pd
@@ -23,6 +24,7 @@ import pandas as pd
 
 import converter.py_data_read as py_data_read
 import converter.c_alg_shortest_paths as c_alg_shortest_paths
+from converter.csr_graph import CSRGraph, successor_csr_from_arcs
 
 #===============================================================================
 # Read data from standard text file
@@ -339,15 +341,17 @@ class ArcConvertLists(ArcInfo):
 
     def genSuccessorArcsDF(self):
         """
-        Generate successor arc using pandas dataframe functions, instead of
-        iterating through everything.
+        Generate successor arcs by sorting the arcs on their begin vertices
+        and grouping them, instead of iterating through everything, see
+        `csr_graph.successor_csr_from_arcs`.
         """
-        pd_keys = pd.DataFrame(
-            {'u': self.beginL, 'v': self.endL})
-        pd_keys['i'] = pd_keys.index
-        sucArcL = list(pd_keys['v'].apply(
-            lambda x: list(pd_keys.loc[pd_keys['u'] == x]['i'].values)))
-        self.sucArcL = copy(sucArcL)
+        offsets, targets = successor_csr_from_arcs(self.beginL, self.endL)
+        self.sucArcL = [x.tolist() for x in
+                        numpy.split(targets, offsets[1:-1])]
+
+    def csr_graph(self):
+        """Return the arc graph as a `csr_graph.CSRGraph`."""
+        return CSRGraph.from_arc_lists(self)
 
     def generateLists(self):
         '''
@@ -564,10 +568,26 @@ class WriteSpIfInputData(object):
         self.info_out_subfolder = 'problem_info/'
         self.info_out_extension = '_problem_info.dat'
         self.pre_calc = True
+        self.sp_solver = 'Floyd-Warshall' # or 'Dijkstra' for large sparse networks
+        self.required_only = False # only calculate paths from required arcs
+        self.sp_workers = 1 # threads for Dijkstra, None uses all cores
+
+    def _sp_ifs_complete(self):
+        '''
+        Return the shortest path and best IF function of the set solver.
+        '''
+        if self.required_only:
+            return partial(c_alg_shortest_paths.SP_IFs_required_dijkstra,
+                           n_workers=self.sp_workers)
+        if self.sp_solver == 'Floyd-Warshall':
+            return c_alg_shortest_paths.SP_IFs_complete
+        elif self.sp_solver == 'Dijkstra':
+            return partial(c_alg_shortest_paths.SP_IFs_complete_dijkstra,
+                           n_workers=self.sp_workers)
+        raise ValueError('Unknown shortest path solver `{0}`, use '
+                         '`Floyd-Warshall` or `Dijkstra`.'.format(self.sp_solver))
 
     def return_sp_info(self, info_list):
-        cL = info_list.travelCostL
-        sL = info_list.sucArcL
         reqArcList = info_list.reqArcList
         dumpCost = info_list.dumpCost
         IFarcsnewkey = info_list.IFarcsnewkey
@@ -577,9 +597,10 @@ class WriteSpIfInputData(object):
          p_np,
          d_np_req,
          if_cost_np,
-         if_arc_np) = c_alg_shortest_paths.SP_IFs_complete(cL, sL, reqArcList,
-                                                            dumpCost, depotArc,
-                                                            IFarcsnewkey)
+         if_arc_np) = self._sp_ifs_complete()(CSRGraph.from_arc_lists(
+                                                  info_list), None,
+                                              reqArcList, dumpCost, depotArc,
+                                              IFarcsnewkey)
         sp_info = (d_np, p_np)
         instance_info_data = ( info_list.name,
                                info_list.capacity,
@@ -620,7 +641,7 @@ class WriteSpIfInputData(object):
              self.p_np,
              self.d_np_req,
              self.if_cost_np,
-             self.if_arc_np) = c_alg_shortest_paths.SP_IFs_complete(cL, sL, reqArcList, dumpCost, depotArc, IFarcsnewkey)
+             self.if_arc_np) = self._sp_ifs_complete()(cL, sL, reqArcList, dumpCost, depotArc, IFarcsnewkey)
         else:
             (self.d_np, 
              self.p_np, 
@@ -7,6 +7,8 @@ import numpy as np
 import pyximport
 pyximport.install(setup_args={"include_dirs":np.get_include()})
 
+import converter.shortest_paths as shortest_paths
+from converter.csr_graph import CSRGraph
 import converter.py_return_problem_data as py_return_problem_data
 from converter.py_return_problem_data  import return_problem_data
 from converter.py_return_problem_data  import return_problem_data_list
@@ -17,6 +19,13 @@ import pickle
 import os
 
 def return_nn_lists(d):
+    '''
+    Arcs ordered by their shortest path cost from each arc. d is the shortest
+    path cost matrix, or a `csr_graph.CSRGraph`, in which case the costs are
+    first calculated with `shortest_paths.SP_dijkstra`.
+    '''
+    if isinstance(d, CSRGraph):
+        d = shortest_paths.SP_dijkstra(d)[0]
     nArcs = len(d)
     nearest_neighbour_list = np.zeros((nArcs, nArcs), dtype="int")
     for i in range(nArcs):
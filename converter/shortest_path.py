@@ -61,3 +61,51 @@ def sp_full(p_full, origin, destination, full=False):
         path.append(destination)
 
     return path
+
+
+class RequiredArcPaths(object):
+    """Compact shortest path predecessors from the required arcs only.
+
+    Stores a n*m predecessor matrix, one row per required arc (including the
+    depot and IFs), instead of the full m*m matrix. Indexing with a full arc
+    index returns its predecessor row, so it can be used in place of p_full
+    with `sp_full`, as long as the origin is a required arc.
+
+    Example:
+
+        >>> paths = RequiredArcPaths(info.reqArcList, p_req)
+        >>> sp_full(paths, info.reqArcList[5], info.reqArcList[8])
+    """
+
+    def __init__(self, sources, predecessors):
+        """
+        Arg:
+            sources (list): full arc index of each predecessor row, typically
+                `reqArcList`.
+            predecessors (n*m matrix): predecessor arc before v on the
+                shortest path from sources[r] to v, in row r.
+        """
+        self.sources = list(sources)
+        self.predecessors = predecessors
+        self._source_row = {arc: row for row, arc in enumerate(self.sources)}
+
+    def __getitem__(self, origin):
+        """Return the predecessor row of origin arc.
+
+        Raises:
+            KeyError: if the origin arc is not a required arc.
+        """
+        if origin not in self._source_row:
+            raise KeyError('Shortest paths are only stored from required '
+                           'arcs, `{0}` is not one.'.format(origin))
+        return self.predecessors[self._source_row[origin]]
+
+    def __len__(self):
+        return len(self.sources)
+
+    def __contains__(self, origin):
+        return origin in self._source_row
+
+    def path(self, origin, destination, full=False):
+        """Return the shortest path between two arcs, see `sp_full`."""
+        return sp_full(self, origin, destination, full)
@@ -12,6 +12,11 @@
 # Derived from the book:
 # Cormen, T., Leiserson, C., Rivest, R. (1990). Introduction to algorithms
 # Chapter 26 pages 558-562.
+
+# A one-to-all Dijkstra option over the successor lists is also available
+# for large sparse road networks, where Floyd-Warshall's O(m^3) is too slow.
+# Its rows are independent, so its pytables option writes them out a block
+# at a time and can resume interrupted calculations.
 #===============================================================================
 cimport cython
 import numpy as np
@@ -19,100 +24,243 @@ cimport numpy as np
 from numpy import int32
 from numpy cimport int32_t
 
-from libc.stdlib cimport malloc, free
+from concurrent.futures import ThreadPoolExecutor
 import logging
+import os
+
+from converter.csr_graph import CSRGraph, successor_csr_from_lists
 
 ctypedef np.int_t DTYPE_t
 
 
-def SP(cL, sL, huge=None):
+cdef void _min_plus_tile(int *d,
+                         int *p,
+                         int *arc_cost,
+                         int n_arcs,
+                         int i_start, int i_stop,
+                         int j_start, int j_stop,
+                         int k_start, int k_stop,
+                         int huge) nogil:
     '''
-    Adaptation of the Floyd Warshall algorithm for computing arc to
-    arc shortest paths, instead of node to node. Combined with calculating
-    best IFs to visit.
+    Min-plus tile kernel: relax the (i, j) tile of the row major `d` and `p`
+    buffers through the intermediate arcs k_start:k_stop, in place:
+
+        d[i][j] = min(d[i][j], d[i][k] + cost[k] + d[k][j])
+
+    The inner loop runs over contiguous j, and a tile of rows is small
+    enough to stay in cache for all the intermediate arcs of the block.
+    With `p` NULL only the costs are relaxed.
+    '''
+    cdef int i, j, k, d_i_k, d_new, d_old, mask
+    cdef int *d_i
+    cdef int *p_i
+    cdef int *d_k
+    cdef int *p_k
+
+    if p == NULL:
+        for k in range(k_start, k_stop):
+            d_k = d + <Py_ssize_t>k * n_arcs
+            for i in range(i_start, i_stop):
+                d_i = d + <Py_ssize_t>i * n_arcs
+                if d_i[k] >= huge:
+                    continue
+                d_i_k = d_i[k] + arc_cost[k]
+                for j in range(j_start, j_stop):
+                    d_new = d_i_k + d_k[j]
+                    if d_new < d_i[j]:
+                        d_i[j] = d_new
+        return
+
+    for k in range(k_start, k_stop):
+        d_k = d + <Py_ssize_t>k * n_arcs
+        p_k = p + <Py_ssize_t>k * n_arcs
+        for i in range(i_start, i_stop):
+            d_i = d + <Py_ssize_t>i * n_arcs
+            if d_i[k] >= huge:
+                continue
+            p_i = p + <Py_ssize_t>i * n_arcs
+            d_i_k = d_i[k] + arc_cost[k]
+            # Branch free select with a bit mask, so that the compiler can
+            # vectorise the loop.
+            for j in range(j_start, j_stop):
+                d_new = d_i_k + d_k[j]
+                d_old = d_i[j]
+                mask = -(d_new < d_old)
+                p_i[j] = (p_k[j] & mask) | (p_i[j] & ~mask)
+                d_i[j] = (d_new & mask) | (d_old & ~mask)
+
+
+def floyd_warshall_blocked(int[:, ::1] d,
+                           int[:, ::1] p,
+                           arc_cost,
+                           int block_size=128,
+                           huge=None):
     '''
+    Blocked arc to arc Floyd-Warshall, in place on contiguous int32 cost and
+    predecessor matrices, which have to be initialised with the direct
+    successor costs, see `SP`. Each round of `block_size` intermediate arcs
+    first solves the diagonal tile, then the tiles in its row and column,
+    and then the remaining tiles, all with `_min_plus_tile`.
 
-    logging.info('Starting shortest path calculations (3 procedures)')
+    Arg:
+        d (m x m int32 array): cost matrix, updated in place.
+        p (m x m int32 array): predecessor matrix, updated in place, or None
+            to only calculate the costs.
+        arc_cost (list int): cost of traversing arc
+        block_size (int): tile width.
+    '''
+    if huge is None:
+        huge = 1000000# Infinity
+
+    cdef int n_arcs = d.shape[0]
+    cdef int n_blocks, i_b, j_b, k_b
+    cdef int i_start, i_stop, j_start, j_stop, k_start, k_stop
+    cdef int big = huge
+    cdef int[::1] cost_c = np.ascontiguousarray(arc_cost, dtype=np.int32)
+    cdef int *d_ptr
+    cdef int *p_ptr
+    cdef int *cost_ptr
+
+    if n_arcs == 0:
+        return
+    if block_size < 1:
+        raise ValueError('block_size has to be positive')
+
+    n_blocks = (n_arcs + block_size - 1) // block_size
+    d_ptr = &d[0, 0]
+    p_ptr = NULL if p is None else &p[0, 0]
+    cost_ptr = &cost_c[0]
+
+    with nogil:
+        for k_b in range(n_blocks):
+            k_start = k_b * block_size
+            k_stop = min(k_start + block_size, n_arcs)
+
+            _min_plus_tile(d_ptr, p_ptr, cost_ptr, n_arcs, k_start, k_stop,
+                           k_start, k_stop, k_start, k_stop, big)
+
+            for j_b in range(n_blocks):
+                if j_b == k_b:
+                    continue
+                j_start = j_b * block_size
+                j_stop = min(j_start + block_size, n_arcs)
+                _min_plus_tile(d_ptr, p_ptr, cost_ptr, n_arcs, k_start, k_stop,
+                               j_start, j_stop, k_start, k_stop, big)
+
+            for i_b in range(n_blocks):
+                if i_b == k_b:
+                    continue
+                i_start = i_b * block_size
+                i_stop = min(i_start + block_size, n_arcs)
+                _min_plus_tile(d_ptr, p_ptr, cost_ptr, n_arcs, i_start, i_stop,
+                               k_start, k_stop, k_start, k_stop, big)
+
+            for i_b in range(n_blocks):
+                if i_b == k_b:
+                    continue
+                i_start = i_b * block_size
+                i_stop = min(i_start + block_size, n_arcs)
+                for j_b in range(n_blocks):
+                    if j_b == k_b:
+                        continue
+                    j_start = j_b * block_size
+                    j_stop = min(j_start + block_size, n_arcs)
+                    _min_plus_tile(d_ptr, p_ptr, cost_ptr, n_arcs,
+                                   i_start, i_stop, j_start, j_stop,
+                                   k_start, k_stop, big)
+
+
+def init_sp_matrices(arc_successor_index_list, huge=None, d=None, p=None,
+                     predecessors=True):
+    '''
+    Cost and predecessor matrices before any shortest path calculations:
+    zero cost from an arc to itself and to its direct successors, and
+    `huge` elsewhere.
 
+    Arg:
+        arc_successor_index_list (array <array>): multi-dimensional array
+            of successor arc index of arc i, or a `csr_graph.CSRGraph`.
+        d, p (m x m int32 array): buffers to initialise, new ones are
+            created if None.
+        predecessors (bool): if False, p is not created and None is
+            returned in its place.
+
+    Return:
+        d (m x m int32 array): initial cost matrix.
+        p (m x m int32 array): initial predecessor matrix.
+    '''
     if huge is None:
         huge = 1000000# Infinity
 
-    cdef int i, j, k, nArcs
-    cdef int **d, **p
-    cdef int nSucs
+    n_arcs = len(arc_successor_index_list)
+    if d is None:
+        d = np.empty((n_arcs, n_arcs), dtype=np.int32)
+    if p is None and predecessors:
+        p = np.empty((n_arcs, n_arcs), dtype=np.int32)
+    d.fill(huge)
 
-    nArcs = len(cL)
+    diagonal = np.arange(n_arcs)
+    d[diagonal, diagonal] = 0
 
-    d = <int **>malloc(nArcs * sizeof(int *))
-    p = <int **>malloc(nArcs * sizeof(int *))
+    successor_offsets, successor_indices = successor_csr(
+        arc_successor_index_list)
+    rows = np.repeat(np.arange(n_arcs, dtype=np.int32),
+                     np.diff(successor_offsets))
+    d[rows, successor_indices] = 0
 
-    d_np = np.ndarray(shape=(nArcs, nArcs), dtype=np.int32)
-    p_np = np.ndarray(shape=(nArcs, nArcs), dtype=np.int32)
+    if predecessors:
+        p.fill(-1)
+        p[diagonal, diagonal] = diagonal
+        p[rows, successor_indices] = rows
+    else:
+        p = None
+    return d, p
 
-    logging.info('1 of 3: Initialise matrices')
 
-    for i from 0 <= i < nArcs:
-        d[i] = <int *>malloc(nArcs * sizeof(int *))
-        p[i] = <int *>malloc(nArcs * sizeof(int *))
+def SP(cL, sL=None, huge=None, block_size=128, predecessors=True):
+    '''
+    Adaptation of the Floyd Warshall algorithm for computing arc to
+    arc shortest paths, instead of node to node. Combined with calculating
+    best IFs to visit.
 
-    for i from 0 <= i < nArcs:
-        for j from 0 <= j < nArcs:
-            if i == j:
-                d[i][j] = 0# Distance from an arc to itself is zero
-                p[i][j] = i #TODO: fixed from previous error.
-            else:
-                d[i][j] = huge
-                p[i][j] = -1
-        # push
+    The matrices are single contiguous int32 arrays that are updated in
+    place by the blocked kernel, see `floyd_warshall_blocked`, and returned
+    as is.
 
+    Arg:
+        cL (list int): cost of traversing arc, or a `csr_graph.CSRGraph`
+            in which case sL is not needed.
+        sL (array <array>): multi-dimensional array of successor arc index
+            of arc i
+        block_size (int): tile width. Costs do not depend on it, but where
+            there are ties between shortest paths, the predecessor can point
+            to a different, but equally short, path. With a block_size of
+            at least the number of arcs the classic k, i, j order is used.
+        predecessors (bool): if False, only the cost matrix is calculated,
+            and None is returned for the predecessor matrix.
+    '''
 
-#    for i from 0 <= i < nArcs:
-#        d[i][j] = 0
+    logging.info('Starting shortest path calculations (2 procedures)')
 
-    for i from 0 <= i < nArcs:
-        sL_i = sL[i]
-        nSucs = len(sL_i)
-        for j in xrange(nSucs):
-            d[i][sL_i[j]] = 0
-            p[i][sL_i[j]] = i
+    if huge is None:
+        huge = 1000000# Infinity
 
-    cdef int cL_k, d_i_k
+    if isinstance(cL, CSRGraph):
+        cL, sL = cL.costs, cL
 
-    logging.info('2 of 3: Calculate shortest paths')
-    
-    for k from 0 <= k < nArcs:
-        logging.debug('2 of 3: SP calc %i out of %i' %(k+1,nArcs))
-        cL_k = cL[k]
-        for i from 0 <= i < nArcs:
-            d_i_k = d[i][k]
-            for j from 0 <= j < nArcs:
-                if d_i_k + d[k][j] + cL_k < d[i][j]:#If moving from arc i to arc j via arc k is shorter than moving directly from arc i to j:
-                    #Note that we have to add the cost of traversing arc k
-                    d[i][j] = d_i_k + d[k][j] + cL_k#Update distance from arc i to j
-                    p[i][j] = p[k][j]
-            # can update distance array here and store i, j, k values,
-            # if it crashes above this point, it's fine since it will
-            # restart this calc in any case.
-
-    logging.info('3 of 3: Populating numpy array')
-
-    for i from 0 <= i < nArcs:
-        for j from 0 <= j < nArcs:
-            d_np[i][j] = d[i][j]
-            p_np[i][j] = p[i][j]
-            if d[i][j] < 0:
-                logging.info('ERROR')
-                a = input('')
-            if p[i][j] < 0:
-                raise ValueError('Not all paths calculated: i {} j {} d {}'.format(i,j, d[i][j]))
+    logging.info('1 of 2: Initialise matrices')
+    d_np, p_np = init_sp_matrices(sL, huge, predecessors=predecessors)
 
-    logging.info('    Done: shortest path calculations')
+    logging.info('2 of 2: Calculate shortest paths')
+    floyd_warshall_blocked(d_np, p_np, cL, block_size, huge)
+
+    unreachable = d_np >= huge if p_np is None else p_np < 0
+    if unreachable.any():
+        i, j = np.argwhere(unreachable)[0]
+        raise ValueError('Not all paths calculated: i {} j {} d {}'.format(
+            i, j, d_np[i, j]))
 
-    for i from 0 <= i < nArcs:
-        free(d[i])
-        free(p[i])
-    free(d)
-    free(p)
+    logging.info('    Done: shortest path calculations')
 
     return d_np, p_np
 
@@ -121,20 +269,24 @@ def SP_pytable(arc_cost,
                arc_successor_index_list,
                cost_matrix,
                predecessor_matrix,
-               huge=None):
+               huge=None,
+               block_size=128):
     '''
     Adaptation of the Floyd Warshall algorithm for computing arc to
     arc shortest paths, instead of node to node. Combined with calculating
     best IFs to visit.
 
     Arg:
-        arc_cost (list int): cost of traversing arc
+        arc_cost (list int): cost of traversing arc, or a
+            `csr_graph.CSRGraph`, with arc_successor_index_list None.
         arc_successor_index_list (array <array>): multi-dimensional array
             of successor arc index of arc i
         cost_matrix (pytable.carray): carray to which the cost matrix info
             will be written.
         predecessor_matrix (pytable.carray): carray to which the predecessor
             into will be written.
+        block_size (int): tile width of `floyd_warshall_blocked`, also the
+            number of rows written to the carrays at a time.
     '''
 
     logging.info('Starting shortest path calculations (3 procedures)')
@@ -142,79 +294,389 @@ def SP_pytable(arc_cost,
     if huge is None:
         huge = 1000000# Infinity
 
-    cdef int i, j, k, nArcs
-    cdef int **d, **p
-    cdef int nSucs
+    if isinstance(arc_cost, CSRGraph):
+        arc_cost, arc_successor_index_list = arc_cost.costs, arc_cost
 
-    nArcs = len(arc_cost)
+    logging.info('1 of 3: Initialise matrices')
+    d_np, p_np = init_sp_matrices(arc_successor_index_list, huge)
 
-    d = <int **>malloc(nArcs * sizeof(int *))
-    p = <int **>malloc(nArcs * sizeof(int *))
+    logging.info('2 of 3: Calculate shortest paths')
+    floyd_warshall_blocked(d_np, p_np, arc_cost, block_size, huge)
 
-    arc_cost = list(arc_cost)
-    arc_successor_index_list = list(arc_successor_index_list)
+    logging.info('3 of 3: Writing outputs to pytable')
+    if (p_np < 0).any():
+        i, j = np.argwhere(p_np < 0)[0]
+        logging.warning('Not all paths calculated: i {} j {} d {}'.format(
+            i, j, d_np[i, j]))
 
-    logging.info('1 of 3: Initialise matrices')
+    n_arcs = d_np.shape[0]
+    for i in range(0, n_arcs, block_size):
+        cost_matrix[i:i + block_size, :] = d_np[i:i + block_size, :]
+        predecessor_matrix[i:i + block_size, :] = p_np[i:i + block_size, :]
 
-    for i from 0 <= i < nArcs:
-        d[i] = <int *>malloc(nArcs * sizeof(int *))
-        p[i] = <int *>malloc(nArcs * sizeof(int *))
+    logging.info('Done: shortest path calculations')
 
-    for i from 0 <= i < nArcs:
-        for j from 0 <= j < nArcs:
-            if i == j:
-                d[i][j] = 0# Distance from an arc to itself is zero
-                p[i][j] = 0
-            else:
-                d[i][j] = huge
-                p[i][j] = -1
 
-    for i from 0 <= i < nArcs:
-        sL_i = arc_successor_index_list[i]
-        nSucs = len(sL_i)
-        for j in xrange(nSucs):
-            d[i][sL_i[j]] = 0
-            p[i][sL_i[j]] = i
+def successor_csr(arc_successor_index_list):
+    '''
+    Convert the successor index list into a compressed sparse row pair.
 
-    cdef int cL_k, d_i_k
+    Arg:
+        arc_successor_index_list (array <array>): multi-dimensional array
+            of successor arc index of arc i, or a `csr_graph.CSRGraph`,
+            whose arrays are returned as is.
 
-    logging.info('2 of 3: Calculate shortest paths')
+    Return:
+        successor_offsets (np.array <int32>): successors of arc i are stored
+            at successor_offsets[i]:successor_offsets[i + 1].
+        successor_indices (np.array <int32>): successor arc indices.
+    '''
+    if isinstance(arc_successor_index_list, CSRGraph):
+        return (arc_successor_index_list.offsets,
+                arc_successor_index_list.targets)
+    return successor_csr_from_lists(arc_successor_index_list)
 
-    for k from 0 <= k < nArcs:
-        logging.debug('2 of 3: SP calc %i out of %i' %(k+1,nArcs))
-        cL_k = arc_cost[k]
-        for i from 0 <= i < nArcs:
-            d_i_k = d[i][k]
-            for j from 0 <= j < nArcs:
-                if d_i_k + d[k][j] + cL_k < d[i][j]:#If moving from arc i to arc j via arc k is shorter than moving directly from arc i to j:
-                    #Note that we have to add the cost of traversing arc k
-                    d[i][j] = d_i_k + d[k][j] + cL_k#Update distance from arc i to j
-                    p[i][j] = p[k][j]
-            # can update distance array here and store i, j, k values,
-            # if it crashes above this point, it's fine since it will
-            # restart this calc in any case.
 
-    logging.info('3 of 3: Writing outputs to pytable')
+def graph_arrays(arc_cost, arc_successor_index_list=None):
+    '''
+    Arc costs and successor CSR arrays for the shortest path routines, which
+    take either arc costs and successor lists, or a `csr_graph.CSRGraph` as
+    `arc_cost`, with `arc_successor_index_list` left out.
+
+    Return:
+        cost_np (np.array <int32>): cost of traversing arc.
+        successor_offsets (np.array <int32>): see `successor_csr`.
+        successor_indices (np.array <int32>): see `successor_csr`.
+    '''
+    if isinstance(arc_cost, CSRGraph):
+        return arc_cost.costs, arc_cost.offsets, arc_cost.targets
+    successor_offsets, successor_indices = successor_csr(
+        arc_successor_index_list)
+    return (np.ascontiguousarray(arc_cost, dtype=np.int32), successor_offsets,
+            successor_indices)
+
+
+cdef inline void _heap_swap(int *heap, int *pos, int a, int b) nogil:
+    cdef int arc_a = heap[a]
+    cdef int arc_b = heap[b]
+    heap[a] = arc_b
+    heap[b] = arc_a
+    pos[arc_b] = a
+    pos[arc_a] = b
+
+
+cdef inline void _heap_up(int *heap, int *pos, int *d, int i) nogil:
+    cdef int parent
+    while i > 0:
+        parent = (i - 1) >> 1
+        if d[heap[i]] >= d[heap[parent]]:
+            break
+        _heap_swap(heap, pos, i, parent)
+        i = parent
+
+
+cdef inline void _heap_down(int *heap, int *pos, int *d, int i,
+                            int heap_size) nogil:
+    cdef int left, smallest
+    while True:
+        left = 2 * i + 1
+        if left >= heap_size:
+            break
+        smallest = left
+        if left + 1 < heap_size and d[heap[left + 1]] < d[heap[left]]:
+            smallest = left + 1
+        if d[heap[smallest]] >= d[heap[i]]:
+            break
+        _heap_swap(heap, pos, i, smallest)
+        i = smallest
+
+
+cdef int _dijkstra_row(int source,
+                       int n_arcs,
+                       int *arc_cost,
+                       int *successor_offsets,
+                       int *successor_indices,
+                       int *d,
+                       int *p,
+                       int *heap,
+                       int *pos,
+                       int huge) nogil:
+    '''
+    One-to-all arc to arc Dijkstra from `source`, written directly into the
+    cost row `d` and predecessor row `p`. Uses an indexed binary heap, with
+    `heap` and `pos` as n_arcs sized work buffers. Returns the number of
+    unreachable arcs.
+
+    The cost of the source and destination arcs are excluded, same as with
+    Floyd-Warshall, so the label of a successor of arc k is d[k] + cost[k],
+    and successors of the source are reached at zero cost.
+    '''
+    cdef int i, k, j, s, d_k_j
+    cdef int heap_size = 0
+    cdef int n_unreached = 0
+
+    for i in range(n_arcs):
+        d[i] = huge
+        p[i] = -1
+        pos[i] = -1
+
+    d[source] = 0
+    p[source] = source
+
+    for i in range(successor_offsets[source], successor_offsets[source + 1]):
+        s = successor_indices[i]
+        if s == source or pos[s] != -1:
+            continue
+        d[s] = 0
+        p[s] = source
+        heap[heap_size] = s
+        pos[s] = heap_size
+        heap_size += 1
+
+    while heap_size > 0:
+        k = heap[0]
+        heap_size -= 1
+        pos[k] = -2  # Label is permanent
+        if heap_size > 0:
+            heap[0] = heap[heap_size]
+            pos[heap[0]] = 0
+            _heap_down(heap, pos, d, 0, heap_size)
+
+        d_k_j = d[k] + arc_cost[k]
+        for i in range(successor_offsets[k], successor_offsets[k + 1]):
+            j = successor_indices[i]
+            if j == source or pos[j] == -2:
+                continue
+            if d_k_j < d[j]:
+                d[j] = d_k_j
+                p[j] = k
+                if pos[j] == -1:
+                    heap[heap_size] = j
+                    pos[j] = heap_size
+                    heap_size += 1
+                _heap_up(heap, pos, d, pos[j])
+
+    for i in range(n_arcs):
+        if p[i] < 0:
+            n_unreached += 1
+
+    return n_unreached
+
+
+def _dijkstra_block(int[::1] cost_c,
+                    int[::1] offsets_c,
+                    int[::1] indices_c,
+                    int[::1] sources_c,
+                    int start,
+                    int stop,
+                    int[:, ::1] d,
+                    int[:, ::1] p,
+                    int huge):
+    '''
+    Dijkstra from sources[start:stop] into rows start:stop of `d` and `p`,
+    with the GIL released, so that blocks can be run on different threads.
+    Each call uses its own heap buffers.
 
-    d_np = np.ndarray(shape=(nArcs, nArcs), dtype=np.int32)
-    p_np = np.ndarray(shape=(nArcs, nArcs), dtype=np.int32)
-
-    for i from 0 <= i < nArcs:
-        for j from 0 <= j < nArcs:
-            d_np[i, j] = d[i][j]
-            p_np[i, j] = p[i][j]
-            if d[i][j] < 0:
-                logging.warning('Not all paths calculated: i {} j '
-                                          '{} d {}'.format(i,j, d[i][j]))
-            if p[i][j] < 0:
-                logging.warning('Not all paths calculated: i {} j {} d {}'.format(i,j, d[i][j]))
-        cost_matrix[i, :] = d_np[i, :]
-        predecessor_matrix[i, :] = p_np[i, :]
+    Return:
+        unreached (int): index of the first source from which not all arcs
+            could be reached, -1 if all could be reached.
+    '''
+    cdef int i
+    cdef int n_arcs = cost_c.shape[0]
+    cdef int unreached = -1
+    cdef int[::1] heap = np.empty(n_arcs, dtype=np.int32)
+    cdef int[::1] pos = np.empty(n_arcs, dtype=np.int32)
+
+    with nogil:
+        for i in range(start, stop):
+            if _dijkstra_row(sources_c[i], n_arcs, &cost_c[0], &offsets_c[0],
+                             &indices_c[0], &d[i, 0], &p[i, 0],
+                             &heap[0], &pos[0], huge) and unreached == -1:
+                unreached = i
+    return unreached
+
+
+def SP_dijkstra(arc_cost, arc_successor_index_list=None, huge=None, sources=None,
+                n_workers=1, block_size=None):
+    '''
+    Arc to arc shortest paths by running a one-to-all Dijkstra from every
+    arc over the successor lists. Gives the same cost matrix as `SP`, and a
+    predecessor matrix with the same meaning, in O(m(m + e) log m) instead of
+    O(m^3). Where there are ties between shortest paths, the predecessor can
+    point to a different, but equally short, path than Floyd-Warshall.
 
-    logging.info('Done: shortest path calculations')
+    Every source row is independent, so with more than one worker the
+    sources are split into blocks that are run on a thread pool, with the
+    GIL released, and written directly into the shared output matrices.
+    The results are identical to the serial calculation.
+
+    Arg:
+        arc_cost (list int): cost of traversing arc, or a
+            `csr_graph.CSRGraph`, in which case arc_successor_index_list is
+            not needed.
+        arc_successor_index_list (array <array>): multi-dimensional array
+            of successor arc index of arc i
+        sources (list int): only calculate the shortest paths from these
+            arcs, for example the required arcs. Row r of the outputs then
+            belongs to arc sources[r]. All arcs are used if not set.
+        n_workers (int): number of threads to use, all available cores if
+            None.
+        block_size (int): number of source rows per work block. Set
+            automatically if None.
+
+    Return:
+        d_np (np.array <int32>): m x m, or len(sources) x m, shortest path
+            cost matrix.
+        p_np (np.array <int32>): m x m, or len(sources) x m, shortest path
+            predecessor matrix.
+    '''
+
+    logging.info('Starting Dijkstra shortest path calculations')
+
+    if huge is None:
+        huge = 1000000# Infinity
+
+    if n_workers is None:
+        n_workers = os.cpu_count() or 1
+
+    cdef int n_arcs, n_sources
+
+    n_arcs = len(arc_cost)
+    if sources is None:
+        sources = np.arange(n_arcs, dtype=np.int32)
+    sources_np = np.array(sources, dtype=np.int32).reshape(-1)
+    n_sources = sources_np.shape[0]
+    if n_arcs == 0 or n_sources == 0:
+        return (np.zeros((n_sources, n_arcs), dtype=np.int32),
+                np.zeros((n_sources, n_arcs), dtype=np.int32))
+
+    cost_np, successor_offsets, successor_indices = graph_arrays(
+        arc_cost, arc_successor_index_list)
+
+    d_np, p_np = _dijkstra_sources(cost_np, successor_offsets,
+                                   successor_indices, sources_np, huge,
+                                   n_workers, block_size)
+
+    logging.info('    Done: shortest path calculations')
+
+    return d_np, p_np
+
+
+def _dijkstra_sources(cost_np, successor_offsets, successor_indices,
+                      sources_np, huge, n_workers, block_size):
+    '''
+    Dijkstra from each of `sources_np` over the successor CSR arrays, see
+    `SP_dijkstra`.
+    '''
+    n_arcs = cost_np.shape[0]
+    n_sources = sources_np.shape[0]
+    if successor_indices.shape[0] == 0:
+        successor_indices = np.zeros(1, dtype=np.int32)
+
+    d_np = np.empty((n_sources, n_arcs), dtype=np.int32)
+    p_np = np.empty((n_sources, n_arcs), dtype=np.int32)
+
+    if block_size is None:
+        # A few blocks per worker to even out the load.
+        block_size = max(1, -(-n_sources // (4 * n_workers)))
+    blocks = [(start, min(start + block_size, n_sources))
+              for start in range(0, n_sources, block_size)]
+
+    def run_block(block):
+        logging.debug('SP calc rows %i to %i out of %i' % (block[0] + 1,
+                                                          block[1],
+                                                          n_sources))
+        return _dijkstra_block(cost_np, successor_offsets, successor_indices,
+                               sources_np, block[0], block[1], d_np, p_np,
+                               huge)
+
+    if n_workers == 1 or len(blocks) == 1:
+        unreached = [run_block(block) for block in blocks]
+    else:
+        logging.info('Using {} workers'.format(n_workers))
+        with ThreadPoolExecutor(max_workers=n_workers) as pool:
+            unreached = list(pool.map(run_block, blocks))
+
+    for i in unreached:
+        if i != -1:
+            raise ValueError('Not all paths calculated: arcs not reachable '
+                             'from arc {}'.format(sources_np[i]))
+
+    return d_np, p_np
+
+
+def SP_pytable_dijkstra(arc_cost,
+                        arc_successor_index_list,
+                        cost_matrix,
+                        predecessor_matrix,
+                        huge=None,
+                        block_size=None,
+                        n_workers=1):
+    '''
+    Out-of-core version of `SP_dijkstra`. Rows are calculated a block at a
+    time and written to the cost and predecessor carrays, after which the
+    number of completed rows is stored as the `rows_completed` attribute of
+    `cost_matrix` and the file is flushed. Only one block is kept in memory,
+    and if the calculations are interrupted, calling the function again on
+    the same carrays continues from the first incomplete block.
+
+    Arg:
+        arc_cost (list int): cost of traversing arc, or a
+            `csr_graph.CSRGraph`, with arc_successor_index_list None.
+        arc_successor_index_list (array <array>): multi-dimensional array
+            of successor arc index of arc i
+        cost_matrix (pytable.carray): m x m carray to which the cost matrix
+            info will be written.
+        predecessor_matrix (pytable.carray): m x m carray to which the
+            predecessor into will be written.
+        block_size (int): number of rows per block, set so that a block
+            takes about 64MB per matrix if None.
+        n_workers (int): number of threads used within a block, all
+            available cores if None.
+
+    Return:
+        rows_completed (int): number of rows calculated in this call.
+    '''
+    if huge is None:
+        huge = 1000000# Infinity
+
+    if n_workers is None:
+        n_workers = os.cpu_count() or 1
+
+    n_arcs = len(arc_cost)
+    if block_size is None:
+        block_size = max(1, 2 ** 24 // max(n_arcs, 1))
+
+    start_row = 0
+    if 'rows_completed' in cost_matrix.attrs:
+        start_row = int(cost_matrix.attrs.rows_completed)
+    if start_row >= n_arcs:
+        logging.info('Shortest path calculations already completed')
+        return 0
+    if start_row:
+        logging.info('Resuming shortest path calculations from row '
+                     '{} of {}'.format(start_row + 1, n_arcs))
+    else:
+        logging.info('Starting out-of-core Dijkstra shortest path '
+                     'calculations')
+
+    cost_np, successor_offsets, successor_indices = graph_arrays(
+        arc_cost, arc_successor_index_list)
+
+    for start in range(start_row, n_arcs, block_size):
+        stop = min(start + block_size, n_arcs)
+        logging.info('SP calc rows {} to {} out of {}'.format(start + 1, stop,
+                                                              n_arcs))
+        sources_np = np.arange(start, stop, dtype=np.int32)
+        d_np, p_np = _dijkstra_sources(cost_np, successor_offsets,
+                                       successor_indices, sources_np, huge,
+                                       n_workers, None)
+        cost_matrix[start:stop, :] = d_np
+        predecessor_matrix[start:stop, :] = p_np
+        # The marker is only moved once both blocks are written.
+        cost_matrix.attrs.rows_completed = stop
+        cost_matrix._v_file.flush()
+
+    logging.info('    Done: shortest path calculations')
 
-    for i from 0 <= i < nArcs:
-        free(d[i])
-        free(p[i])
-    free(d)
-    free(p)
+    return n_arcs - start_row
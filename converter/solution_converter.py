@@ -259,6 +259,9 @@ def convert_df_full(info, solution_df, p_full=None):
             `load_data` for more information.
         solution_df (df): a user-friendly pandas data frame of the solution,
             see `convert_df` for more detail.
+        p_full (n*n matrix): predecessor matrix to use instead of
+            `info.p_full`. Can also be a `shortest_path.RequiredArcPaths`
+            object, which only has the paths from the required arcs.
 
     Returns:
         solution_df_full (df): a user-friendly pandas data frame of the
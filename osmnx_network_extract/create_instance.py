@@ -95,6 +95,7 @@ import pandas as pd
 import numpy as np
 import networkx as nx
 import logging
+from converter.csr_graph import CSRGraph
 
 
 def test_column_exists(df, *column_names):
@@ -1113,3 +1114,40 @@ class CreateMcarptifFormat:
         with open(file_name, 'w') as file:
             file.write(self._output_str)
         print('done')
+
+
+def network_graph(network, df_edges=None, df_required_arcs=None):
+    """Arc network as a `converter.csr_graph.CSRGraph`, with arc lengths as
+    costs, to pass to the shortest path routines instead of the network
+    frame. Costs are int32, so lengths are rounded to the nearest integer,
+    which is metres for OSM lengths. Use a scaled `length` column, as with
+    `travel_cost`, if more accuracy is required.
+
+    Args:
+        network (pd.DataFrame): network with `arc_index`, `u`, `v` and
+            `length` columns. Arcs are indexed by `arc_index`.
+        df_edges (pd.DataFrame): edges with `arc_index` and `arc_index_inv`
+            columns, used for the inverse arcs.
+        df_required_arcs (pd.DataFrame): required arcs with an `arc_index`
+            column, used for the required-arc mask.
+
+    Return graph (CSRGraph): arc network.
+    """
+    network = network.sort_values('arc_index')
+    inverse = np.full(network.shape[0], -1, dtype=np.int32)
+    if df_edges is not None:
+        inverse[df_edges['arc_index'].values] = \
+            df_edges['arc_index_inv'].values
+    required = None
+    if df_required_arcs is not None:
+        required = network['arc_index'].isin(
+            df_required_arcs['arc_index']).values
+    lengths = network['length'].values
+    costs = np.rint(lengths)
+    if (costs != lengths).any():
+        logging.info('Rounding arc lengths to integer graph costs')
+    return CSRGraph.from_arcs(network['u'].values,
+                              network['v'].values,
+                              costs,
+                              inverse=inverse,
+                              required=required)
@@ -14,7 +14,7 @@ import logging
 import pandas as pd
 import numpy as np
 import tables as tb
-from osmnx_network_extract.create_instance import create_arc_id
+from osmnx_network_extract.create_instance import create_arc_id, network_graph
 from converter.shortest_path import sp_full
 from osmnx_network_extract.network_code import create_gdf, create_latlon_gdf
 from visualise.customer_plots import color_df
@@ -183,6 +183,13 @@ class NetworkExtract:
         self.df_edges = edges_list.copy()
         self.df_arcs = arcs_index.copy()
 
+    def graph(self):
+        """Return the arc network as a `converter.csr_graph.CSRGraph`, see
+        `create_instance.network_graph`.
+        """
+        return network_graph(self.network, self.df_edges,
+                             self.df_required_arcs)
+
     def load_required_arcs(self, required_arcs, merge_network=True):
         """Load required arcs. Should not contain both arcs of an edge
         (will raise a warning if it does)
@@ -15,13 +15,44 @@ sys = sysPath.addInputPaths(sys)
 mainPath = sysPath.returnPath()
 
 import random
+from collections import namedtuple
 import solver.calcMoveCost as calcMoveCost
+from solver.calcMoveCostMCARPTIF_c import MoveHeap
 import solver.py_display_solution as py_display_solution
 from copy import deepcopy
 import pickle
 from time import perf_counter as clock
 from solver.py_reduce_number_trips import Reduce_Trips as ReduceRoutes
 from solver.py_solution_builders import build_CLARPIF_dict_correct
+from solver.py_solution_builders import build_CLARPIF_correct_route_dict
+from solver.array_solution import ArraySolution, InstanceArrays
+from solver.granular_neighbours import GranularNeighbours, granular_threshold
+
+# Unbounded search budget, as used by the original experiments.
+NO_LIMIT = 1e300000
+
+# Summary of an improvement run, returned with the incumbent. stop_reason is
+# 'local_optimum' if the search ended by itself, or 'time_limit', 'move_limit'
+# or 'no_improvement' if it ran out of budget.
+SearchStats = namedtuple('SearchStats', ['initial_cost',
+                                         'cost',
+                                         'initial_vehicles',
+                                         'vehicles',
+                                         'iterations',
+                                         'moves',
+                                         'time',
+                                         'stop_reason'])
+
+# Giant route section and arc classifications of a single route, kept by
+# CalcMoveCosts to update the giant route of changed routes only.
+RouteMapping = namedtuple('RouteMapping', ['trips',
+                                           'arcs',
+                                           'dummyDepotArcPositions',
+                                           'dummyIFArcPositions',
+                                           'specialArcs',
+                                           'solutionArcs',
+                                           'normalArcs',
+                                           'normalArcsF'])
 
 class TestLocalSeach(object):
     '''
@@ -887,6 +918,7 @@ class CalcMoveCosts(object):
     '''
     def __init__(self, info, nnList, cModules = True, autoInvCosts = False):
         self._info = info
+        self._nnList = nnList
         self._MoveCosts = calcMoveCost.CalcMoveCosts(info, cModules = cModules, nnList = nnList)
         self._MoveCosts_MCARPTIF = calcMoveCost.CalcMoveCostsMCARPTIFspecial(info, cModules = cModules, nnList = nnList)
         self._MoveCosts.autoInvCosts = autoInvCosts
@@ -909,6 +941,9 @@ class CalcMoveCosts(object):
         self.nonAdjacentRestrictionCross = False
         self.nonAdjacentInsertArcs = set()
         self.nonAdjacentExchangeArcs = set()
+        self._moveHeap = None
+        self._granularNeighbours = None
+        self._granularThreshold = None
         
         self.movesToUse = ['flip', 
                            'cross', 
@@ -938,6 +973,7 @@ class CalcMoveCosts(object):
         self.nnFracUse = self.nnFrac
         #self._MoveCosts.initiateCmodules()
         self._MoveCosts_MCARPTIF.initiateCmodules_MCARPTIF()
+        self._resetRouteMappings()
     
     def setInputValues(self, threshold = None, nnFrac = None):
         if threshold: self.thresholdUse = threshold
@@ -948,46 +984,113 @@ class CalcMoveCosts(object):
     def freeInputValues(self):
         #self._MoveCosts.freeCmodules()
         self._MoveCosts_MCARPTIF.freeCmodules_MCARPTIF()
+        self._resetRouteMappings()
     
     def setSolution(self, solution):
         self._solution = solution
-        (giantRoute, 
-         self._solutionArcs, 
-         self._specialArcs, 
-         self._normalArcs, 
-         self._normalArcsF, 
-         self._dummyDepotArcPositions, 
-         self._dummyIFArcPositions) = self._genMCARPTIFgiantRouteMapping(solution)
-        (self._beginRouteArcs, 
-         self._beginRouteArcsF, 
-         self._beginTripArcs, 
-         self._beginTripArcsF, 
-         self._endRouteArcs, 
-         self._endRouteArcsF, 
-         self._endTripArcs, 
-         self._endTripArcsF,
-         self.singleRouteArcs, 
-         self.singleRouteArcsF, 
-         self.singleTripArcs, 
-         self.singleTripArcsF, 
-         self.verySpecialArcs) = self._specialArcs
-        self._MoveCosts_MCARPTIF.setRoute_MCARPTIF(giantRoute)
+        self._updateMCARPTIFgiantRouteMapping(solution)
         self._setNonAdjacentArcs()
         
     def freeSolution(self):
         self._MoveCosts_MCARPTIF.freeRoute_MCARPTIF()
+        self._resetRouteMappings()
         
     def terminateSearch(self):
         self.freeInputValues()
         self.freeSolution
+
+    def startMoveSelection(self, maxMoves = None):
+        '''
+        Keep only the `maxMoves` cheapest moves of the next move cost
+        calculations, in a bounded `MoveHeap`, or all moves, in the order they
+        are calculated, if None. See `finishMoveSelection`.
+        '''
+        if not maxMoves:
+            self._moveHeap = None
+        elif self._moveHeap is None or self._moveHeap.maxMoves != maxMoves:
+            self._moveHeap = MoveHeap(maxMoves)
+        else:
+            self._moveHeap.clear()
+        self._MoveCosts_MCARPTIF.setMoveHeap(self._moveHeap)
+
+    def finishMoveSelection(self, savings):
+        '''
+        Return the selected moves, cheapest first. Moves in `savings`, such as
+        those of the MCARP move costs that are not offered to the heap, are
+        added to the selection.
+        '''
+        if self._moveHeap is None: return(savings)
+        for moveInfo in savings:
+            self._moveHeap.push(moveInfo)
+        return(self._moveHeap.moves())
+
+    def setMoveCache(self, moveCache):
+        '''
+        Cache move costs between calculations, and only recalculate those of
+        arcs in changed routes.
+        '''
+        self._MoveCosts_MCARPTIF.setMoveCache(moveCache)
+
+    def setMoveCostThreads(self, nThreads):
+        '''
+        Calculate move costs on a pool of `nThreads` threads, each evaluating
+        part of the candidate arcs without the GIL.
+        '''
+        if nThreads != self._MoveCosts_MCARPTIF.nThreads:
+            self._MoveCosts_MCARPTIF.setThreads(nThreads)
+
+    def setGranularThreshold(self, threshold):
+        '''
+        Only consider the neighbours of arcs whose deadhead cost is at most
+        `threshold`, see `granular_neighbours`, or a fraction of their nearest
+        neighbours if None. The neighbour lists are only recalculated when the
+        threshold changes.
+        '''
+        if threshold == self._granularThreshold: return
+        self._granularThreshold = threshold
+        if threshold is None:
+            self._MoveCosts_MCARPTIF.setGranularNeighbours(None, None)
+            return
+        if self._granularNeighbours is None:
+            nnList = self._nnList if self._nnList is not None else self._info.nn_list
+            self._granularNeighbours = GranularNeighbours(self._info.d, nnList)
+        self._MoveCosts_MCARPTIF.setGranularNeighbours(*self._granularNeighbours.lists(threshold))
+
+    def moveCacheStats(self):
+        '''
+        Return the number of move cache hits and misses, and the hit rate.
+        '''
+        (hits, misses) = self._MoveCosts_MCARPTIF.moveCacheStats()
+        hitRate = hits/(hits + misses) if hits + misses else 0
+        return(hits, misses, hitRate)
+
+    def moveSelectionTruncated(self):
+        '''
+        Check if the move heap of the last selection dropped any moves.
+        '''
+        return(self._moveHeap is not None and self._moveHeap.truncated)
         
-    def _genMCARPTIFgiantRouteMapping(self, solution):
+    def _resetRouteMappings(self):
         '''
-        Takes an initial solution and generates a giant route with the necessary giant route arc position mapping. 
+        Forget the route mappings of the previous solution, so that the next
+        giant route is generated from scratch.
         '''
+        self._routeMappings = []
+        self._routeStarts = []
+        self._giantRoute = None
+        self._solutionArcs = set()
+        self._normalArcs = set()
+        self._normalArcsF = set()
+        
+    def _genMCARPTIFrouteMapping(self, trips):
+        '''
+        Generates the giant route section of a single route, with its dummy
+        arc positions relative to the start of the section, and its arc
+        classifications.
+        '''
+        arcs = []
         solutionArcs = set()
-        giantRoute = [self._depot] # Giant route starts with depot.        
-        dummyDepotArcPositions = [0]
+        dummyDepotArcPositions = []
         dummyIFArcPositions = []
         
         endTripArcs = set()
@@ -1003,56 +1106,75 @@ class CalcMoveCosts(object):
         normalArcs = set()
         normalArcsF = set()
         
-        k = 0
-        for i in range(solution['nVehicles']):
-            nSubtrips = len(solution[i]['Trips'])
-            for j in range(nSubtrips):
-                subtrip = solution[i]['Trips'][j]
-                nArcs = len(subtrip)
-                for n, arc in enumerate(subtrip): # Each route consists of a start and end depot visit, with only one needed in the giant route.
-                    
-                    if n == 0: continue
-                    
-                    k += 1
-                    
-                    normalPosition = True
-                    if j == 0 and n == 1:
-                        beginRouteArcs.add(arc)
-                        beginRouteArcsF.add(arc)
-                        if arc in self._edgesS: beginRouteArcsF.add(self._inv[arc])
-                        normalPosition = False
-                    if j > 0 and n == 1:
-                        beginTripArcs.add(arc)
-                        beginTripArcsF.add(arc)
-                        if arc in self._edgesS: beginTripArcsF.add(self._inv[arc])
-                        normalPosition = False   
-                    if j == nSubtrips - 1 and n >= len(subtrip) - 3: 
-                        normalPosition = False 
-                        if n == len(subtrip) - 3:
-                            endRouteArcs.add(arc)
-                            endRouteArcsF.add(arc)
-                            if arc in self._edgesS: endRouteArcsF.add(self._inv[arc])
-                    if j < nSubtrips - 1 and n >= len(subtrip) - 2:
-                        normalPosition = False 
-                        if n == len(subtrip) - 2:
-                            endTripArcs.add(arc)
-                            endTripArcsF.add(arc)
-                            if arc in self._edgesS: endTripArcsF.add(self._inv[arc])
-                                          
-                    giantRoute.append(arc)
-
-                    if j == nSubtrips - 1 and n == nArcs - 2:
-                        dummyIFArcPositions.append(k)
-                    elif j == nSubtrips - 1 and n == nArcs - 1:
-                        dummyDepotArcPositions.append(k)
-                    elif n == nArcs - 1:
-                        dummyIFArcPositions.append(k)
-                    else:
-                        solutionArcs.add(arc)
-                        if normalPosition == True:
-                            normalArcs.add(arc)
-                            normalArcsF.add(arc)
-                            if arc in self._edgesS: normalArcsF.add(self._inv[arc])
+        k = -1
+        nSubtrips = len(trips)
+        for j in range(nSubtrips):
+            subtrip = trips[j]
+            nArcs = len(subtrip)
+            for n, arc in enumerate(subtrip): # Each route consists of a start and end depot visit, with only one needed in the giant route.
+                
+                if n == 0: continue
+                
+                k += 1
+                
+                normalPosition = True
+                if j == 0 and n == 1:
+                    beginRouteArcs.add(arc)
+                    beginRouteArcsF.add(arc)
+                    if arc in self._edgesS: beginRouteArcsF.add(self._inv[arc])
+                    normalPosition = False
+                if j > 0 and n == 1:
+                    beginTripArcs.add(arc)
+                    beginTripArcsF.add(arc)
+                    if arc in self._edgesS: beginTripArcsF.add(self._inv[arc])
+                    normalPosition = False   
+                if j == nSubtrips - 1 and n >= len(subtrip) - 3: 
+                    normalPosition = False 
+                    if n == len(subtrip) - 3:
+                        endRouteArcs.add(arc)
+                        endRouteArcsF.add(arc)
+                        if arc in self._edgesS: endRouteArcsF.add(self._inv[arc])
+                if j < nSubtrips - 1 and n >= len(subtrip) - 2:
+                    normalPosition = False 
+                    if n == len(subtrip) - 2:
+                        endTripArcs.add(arc)
+                        endTripArcsF.add(arc)
+                        if arc in self._edgesS: endTripArcsF.add(self._inv[arc])
+                                      
+                arcs.append(arc)
+
+                if j == nSubtrips - 1 and n == nArcs - 2:
+                    dummyIFArcPositions.append(k)
+                elif j == nSubtrips - 1 and n == nArcs - 1:
+                    dummyDepotArcPositions.append(k)
+                elif n == nArcs - 1:
+                    dummyIFArcPositions.append(k)
+                else:
+                    solutionArcs.add(arc)
+                    if normalPosition == True:
+                        normalArcs.add(arc)
+                        normalArcsF.add(arc)
+                        if arc in self._edgesS: normalArcsF.add(self._inv[arc])
+        
+        specialArcs = (beginRouteArcs, beginRouteArcsF, beginTripArcs, beginTripArcsF, endRouteArcs, endRouteArcsF, endTripArcs, endTripArcsF)
+        return(RouteMapping([trip[:] for trip in trips], arcs, dummyDepotArcPositions, dummyIFArcPositions, 
+                            specialArcs, solutionArcs, normalArcs, normalArcsF))
+    
+    def _combineMCARPTIFrouteMappings(self, routeMappings, routeStarts):
+        '''
+        Combines the dummy arc positions and special arc classifications of
+        the routes, which are small compared to the routes themselves.
+        '''
+        dummyDepotArcPositions = [0]
+        dummyIFArcPositions = []
+        specialArcs = [set() for i in range(8)]
+        for routeMapping, routeStart in zip(routeMappings, routeStarts):
+            dummyDepotArcPositions += [routeStart + k for k in routeMapping.dummyDepotArcPositions]
+            dummyIFArcPositions += [routeStart + k for k in routeMapping.dummyIFArcPositions]
+            for arcs, routeArcs in zip(specialArcs, routeMapping.specialArcs):
+                arcs.update(routeArcs)
+        
+        (beginRouteArcs, beginRouteArcsF, beginTripArcs, beginTripArcsF, endRouteArcs, endRouteArcsF, endTripArcs, endTripArcsF) = specialArcs
                             
         singleRouteArcs = beginRouteArcs.intersection(endRouteArcs)
         singleTripArcs = (beginRouteArcs.union(beginTripArcs)).intersection(endRouteArcs.union(endTripArcs))
@@ -1073,7 +1195,104 @@ class CalcMoveCosts(object):
         specialArcs = (beginRouteArcs, beginRouteArcsF, beginTripArcs, beginTripArcsF, endRouteArcs, endRouteArcsF, endTripArcs, endTripArcsF, 
                        singleRouteArcs, singleRouteArcsF, 
                        singleTripArcs, singleTripArcsF, verySpecialArcs)
+        return(specialArcs, dummyDepotArcPositions, dummyIFArcPositions)
+
+    def _genMCARPTIFgiantRouteMapping(self, solution):
+        '''
+        Takes an initial solution and generates a giant route with the necessary giant route arc position mapping. 
+        '''
+        routeMappings = [self._genMCARPTIFrouteMapping(solution[i]['Trips']) for i in range(solution['nVehicles'])]
+        giantRoute = [self._depot] # Giant route starts with depot.
+        routeStarts = []
+        solutionArcs = set()
+        normalArcs = set()
+        normalArcsF = set()
+        for routeMapping in routeMappings:
+            routeStarts.append(len(giantRoute))
+            giantRoute += routeMapping.arcs
+            solutionArcs.update(routeMapping.solutionArcs)
+            normalArcs.update(routeMapping.normalArcs)
+            normalArcsF.update(routeMapping.normalArcsF)
+        (specialArcs, dummyDepotArcPositions, dummyIFArcPositions) = self._combineMCARPTIFrouteMappings(routeMappings, routeStarts)
         return(giantRoute, solutionArcs, specialArcs, normalArcs, normalArcsF, dummyDepotArcPositions, dummyIFArcPositions)
+    
+    def _updateMCARPTIFgiantRouteMapping(self, solution):
+        '''
+        Updates the giant route and its arc position mapping for the routes
+        that changed since the previous solution, such as the routes changed
+        by compound moves. Routes are compared on their trips, and the giant
+        route and its mapping are only regenerated from the first changed
+        route onwards.
+        '''
+        nRoutes = solution['nVehicles']
+        routeMappings = self._routeMappings
+        nMapped = len(routeMappings)
+        changedRoutes = [i for i in range(nRoutes) if i >= nMapped or routeMappings[i].trips != solution[i]['Trips']]
+        
+        if self._giantRoute is not None and not changedRoutes and nMapped == nRoutes: return
+        
+        # Cached moves of arcs in unchanged routes remain valid, see `calcMoveCostMCARPTIF_c.MoveCostContext`.
+        if self._giantRoute is None or nMapped != nRoutes:
+            self._MoveCosts_MCARPTIF.clearMoveCache()
+        
+        # Remove all old arcs before adding new ones, since arcs move between routes.
+        for i in changedRoutes + list(range(nRoutes, nMapped)):
+            if i >= nMapped: continue
+            self._MoveCosts_MCARPTIF.invalidateMoveCache(routeMappings[i].solutionArcs)
+            self._solutionArcs.difference_update(routeMappings[i].solutionArcs)
+            self._normalArcs.difference_update(routeMappings[i].normalArcs)
+            self._normalArcsF.difference_update(routeMappings[i].normalArcsF)
+        del routeMappings[nRoutes:]
+        
+        for i in changedRoutes:
+            routeMapping = self._genMCARPTIFrouteMapping(solution[i]['Trips'])
+            if i < len(routeMappings): routeMappings[i] = routeMapping
+            else: routeMappings.append(routeMapping)
+            self._MoveCosts_MCARPTIF.invalidateMoveCache(routeMapping.solutionArcs)
+            self._solutionArcs.update(routeMapping.solutionArcs)
+            self._normalArcs.update(routeMapping.normalArcs)
+            self._normalArcsF.update(routeMapping.normalArcsF)
+        
+        if changedRoutes: firstChanged = changedRoutes[0]
+        else: firstChanged = nRoutes
+        
+        newGiantRoute = self._giantRoute is None
+        if newGiantRoute:
+            firstChanged = 0
+            self._giantRoute = [self._depot] # Giant route starts with depot.
+        
+        routeStarts = self._routeStarts[:firstChanged]
+        giantRoute = self._giantRoute
+        if firstChanged < len(self._routeStarts): 
+            del giantRoute[self._routeStarts[firstChanged]:]
+        for routeMapping in routeMappings[firstChanged:]:
+            routeStarts.append(len(giantRoute))
+            giantRoute += routeMapping.arcs
+        updateStart = routeStarts[firstChanged] if firstChanged < nRoutes else len(giantRoute)
+        self._routeStarts = routeStarts
+        
+        (self._specialArcs, 
+         self._dummyDepotArcPositions, 
+         self._dummyIFArcPositions) = self._combineMCARPTIFrouteMappings(routeMappings, routeStarts)
+        (self._beginRouteArcs, 
+         self._beginRouteArcsF, 
+         self._beginTripArcs, 
+         self._beginTripArcsF, 
+         self._endRouteArcs, 
+         self._endRouteArcsF, 
+         self._endTripArcs, 
+         self._endTripArcsF,
+         self.singleRouteArcs, 
+         self.singleRouteArcsF, 
+         self.singleTripArcs, 
+         self.singleTripArcsF, 
+         self.verySpecialArcs) = self._specialArcs
+        
+        if newGiantRoute:
+            self._MoveCosts_MCARPTIF.setRoute_MCARPTIF(giantRoute)
+        else:
+            dummyArcPositions = sorted(self._dummyDepotArcPositions + self._dummyIFArcPositions)
+            self._MoveCosts_MCARPTIF.updateRoute_MCARPTIF(giantRoute, updateStart, dummyArcPositions)
 
     def calcRelocatePreIFMoves(self, relocateCandidates = None, insertCandidates = None, dummyArcPositions = None):
 
@@ -1837,6 +2056,7 @@ class MakeMovesMCARPTIF(object):
         self._searchPhase = 'unknown'
         self._testMoves = TestLocalSeach(info)
         self._testAll = testMoves
+        self.changedRoutes = set() # Routes whose trip costs and loads have to be recalculated.
         self._printEachMove = True
         
     def setSolution(self, solution):
@@ -1885,6 +2105,7 @@ class MakeMovesMCARPTIF(object):
         '''
         Update solution with cost and route change
         '''
+        self.changedRoutes.add(routeI)
         self.solution[routeI]['CumUpdate'] = False
         self.solution[routeI]['TripLoads'][tripI] += loadChange
         self.solution[routeI]['Cost'] += costChange
@@ -1894,6 +2115,7 @@ class MakeMovesMCARPTIF(object):
         '''
         Update solution with cost and route change
         '''
+        self.changedRoutes.add(routeI)
         self.solution = updateMCARPcumulitiveSolution(self.info, self.solution, routeI)
         nTrips = len(self.solution[routeI]['Trips'])
         self.solution[routeI]['TripLoads'] = []
@@ -2925,6 +3147,55 @@ class LS_MCARPTIF(object):
         self.displaySolution = py_display_solution.display_solution_stats(info)
 
         self._ReduceFleet = ReduceFleetSize(info)
+        
+        # Passes between checks of the incrementally updated route costs and loads, never if 0.
+        self.verifyRouteInfo = 0
+        
+        # Number of cheapest moves kept per pass, and tried cheapest first. All moves, in the order they are calculated, if None.
+        self.moveHeapSize = None
+        
+        # Reuse the move costs of arcs in unchanged routes between passes.
+        self.moveCache = False
+        
+        # Threads used to calculate move costs.
+        self.moveCostThreads = 1
+        
+        # Only consider neighbours closer than granularBeta times the average deadhead of the starting solution, instead of nnFrac. Not used if None.
+        self.granularBeta = None
+        self._granularThreshold = None
+
+        self.setSearchBudget()
+        self._startSearchBudget()
+
+    def setSearchBudget(self, tLimit = None, moveLimit = None, maxNonImprovingMoves = None):
+        '''
+        Bound the search on wall-clock seconds, compound moves (iterations),
+        and consecutive compound moves without a cost improvement. The budget
+        is checked between compound moves, and None is unbounded.
+        '''
+        self.tLimit = NO_LIMIT if tLimit is None else tLimit
+        self.moveLimit = NO_LIMIT if moveLimit is None else moveLimit
+        self.maxNonImprovingMoves = NO_LIMIT if maxNonImprovingMoves is None else maxNonImprovingMoves
+
+    def _startSearchBudget(self):
+        self._budgetStart = clock()
+        self._budgetIterations = 0
+        self._budgetNonImproving = 0
+        self.stopReason = 'local_optimum'
+
+    def _searchBudgetExhausted(self):
+        '''
+        Set the stop reason and return True once the budget is used up.
+        '''
+        if clock() - self._budgetStart >= self.tLimit:
+            self.stopReason = 'time_limit'
+        elif self._budgetIterations >= self.moveLimit:
+            self.stopReason = 'move_limit'
+        elif self._budgetNonImproving >= self.maxNonImprovingMoves:
+            self.stopReason = 'no_improvement'
+        else:
+            return(False)
+        return(True)
 
     def setNonAdjacentArcRestriction(self):
         self._MoveCosts.nonAdjacentRestrictionInsert = self.nonAdjacentRestrictionInsert
@@ -2997,15 +3268,33 @@ class LS_MCARPTIF(object):
         
         return(savings)
     
-    def _calculateMoveCosts(self, solution, candidateSearch = False):
+    def _setGranularThreshold(self, solution):
+        '''
+        Set the granular neighbour threshold from the deadhead of the first
+        solution of a search, see `granular_neighbours.granular_threshold`.
+        Called by each search when its first solution is set.
+        '''
+        if not self.granularBeta:
+            self._granularThreshold = None
+        else:
+            nRoutes = solution['nVehicles']
+            deadhead = sum(solution[i]['Deadhead'] for i in range(nRoutes))
+            self._granularThreshold = granular_threshold(deadhead, len(self.info.reqArcListActual), nRoutes, self.granularBeta)
+
+    def _calculateMoveCosts(self, solution, candidateSearch = False, allMoves = False):
         self._MoveCosts.setInputValues(self.thresholdUse, self.nnFrac)
+        self._MoveCosts.setGranularThreshold(self._granularThreshold)
+        self._MoveCosts.setMoveCache(self.moveCache)
+        self._MoveCosts.setMoveCostThreads(self.moveCostThreads)
         self._MoveCosts.setSolution(solution)
         self.setNonAdjacentArcRestriction()
+        if allMoves: self._MoveCosts.startMoveSelection(None)
+        else: self._MoveCosts.startMoveSelection(self.moveHeapSize)
         if not candidateSearch:
             savings = self._MoveCosts.calcAllPossibleMoveCosts()
         else:
             savings = self._candidateCalculations(solution)
-        self._MoveCosts.freeSolution()
+        savings = self._MoveCosts.finishMoveSelection(savings)
         return(savings)
 
     def _makeCompoundMoves(self, savings, solution):
@@ -3107,21 +3396,26 @@ class LS_MCARPTIF(object):
         
         solution = addMCARPcumulativeSolution(self.info, solution)
         candidateSearch = False
+        allMoves = False
         self.setNonAdjacentArcRestriction()
         reducedFleet = False        
+        self._MovesMaker.changedRoutes = set(range(solution['nVehicles']))
+        nPasses = 0
         
         while True:
             
+            if self._searchBudgetExhausted(): break
+            self._budgetIterations += 1
             self._nCompoundMoves += 1
             self._nMovesPrevious = self._nMoves
             if self._printEachMove:
                 #pass
                 print('')            
             if self._testAll: self._testMoves._testSolution(solution)
-            savings = self._calculateMoveCosts(solution, candidateSearch)
+            savings = self._calculateMoveCosts(solution, candidateSearch, allMoves)
             if not savings: break
             candidateSearch = self.candidateMoves
-            savings.sort(key=lambda x: x if isinstance(x, str) else "")
+            allMoves = False
             
             self._movesNotUsed = []
             self._MovesCompound.resetMoveInfluencers()
@@ -3149,15 +3443,24 @@ class LS_MCARPTIF(object):
                     feasibleMoves.append(feasibleMove)
 
             if not True in feasibleMoves: 
+                if self._MoveCosts.moveSelectionTruncated():
+                    # Moves dropped by the move heap may still be feasible, so all moves are tried before stopping.
+                    candidateSearch = False
+                    allMoves = True
+                    continue
                 break
             else:
                 nMovesMade = self._nMoves - self._nMovesPrevious
                 self._solutionChange = solution['TotalCost'] - self._previousCost
                 self._previousCost = solution['TotalCost']
+                if self._solutionChange < 0: self._budgetNonImproving = 0
+                else: self._budgetNonImproving += 1
                 if self._printEachMove:
                     print('I: %i \t Saving: %i \t # Moves %i \t Moves made %i'%(self._nCompoundMoves, self._solutionChange, self._nMoves, nMovesMade))
             
-            solution = build_CLARPIF_dict_correct(solution, self.info)
+            solution = self._updateChangedRouteInfo(solution)
+            nPasses += 1
+            if self.verifyRouteInfo and nPasses % self.verifyRouteInfo == 0: self._verifyRouteInfo(solution)
             #self.displaySolution.display_CLARPIF_solution_info(solution)
             (solution, reducedFleet) = self._ReduceFleet.reduceFleet(solution)
             #input('a=enter')
@@ -3165,6 +3468,37 @@ class LS_MCARPTIF(object):
             
         return(solution, reducedFleet)
     
+    def _updateChangedRouteInfo(self, solution):
+        '''
+        Recalculate the trip costs and loads of the routes changed by the
+        moves of the last pass, instead of those of all the routes.
+        '''
+        changedRoutes = self._MovesMaker.changedRoutes
+        for i in sorted(changedRoutes):
+            if i < solution['nVehicles']:
+                solution = build_CLARPIF_correct_route_dict(solution, i, self.info.d, self.info.serveCostL, self.info.dumpCost, self.info.demandL)
+        changedRoutes.clear()
+        return(solution)
+    
+    def _verifyRouteInfo(self, solution):
+        '''
+        Check the incrementally updated route costs and loads, and the total
+        cost, against a full recalculation.
+        '''
+        checkSolution = build_CLARPIF_dict_correct(deepcopy(solution), self.info)
+        errorsFound = False
+        for i in range(solution['nVehicles']):
+            for key in ['nTrips', 'TripLoads', 'TripCosts', 'TripServices', 'TripDeadheads', 'Load', 'Cost', 'Service', 'Deadhead']:
+                if solution[i][key] != checkSolution[i][key]:
+                    errorsFound = True
+                    print('ERROR: Updated %s of route %i not the same as recalculated: %s vs %s'%(key, i, solution[i][key], checkSolution[i][key]))
+        totalCost = sum([checkSolution[i]['Cost'] for i in range(solution['nVehicles'])])
+        if solution['TotalCost'] != totalCost:
+            errorsFound = True
+            print('ERROR: Updated total cost not the same as recalculated: %i vs %i'%(solution['TotalCost'], totalCost))
+        if errorsFound:
+            raise NameError('Errors found with updated route costs and loads, please see comments above.')
+    
     def twoPhaseCompoundLocalSearch(self, solution):
         self._previousCost = solution['TotalCost']
         self.nnFrac = 0.1
@@ -3182,7 +3516,9 @@ class LS_MCARPTIF(object):
     
     def localSearch(self, solutionStart, nnFrac = 1, candidateMoves = True, compoundMoves = True):
         t = clock()
+        self._startSearchBudget()
         solution = deepcopy(solutionStart)
+        self._setGranularThreshold(solution)
         self._initialCost = solution['TotalCost']
         self._initialK = solution['nVehicles']
         self.nnFrac = nnFrac
@@ -3225,14 +3561,29 @@ class LS_MCARPTIF(object):
 
     def locaSearchImbedded(self, solutionStart):#, nnFrac = 1, candidateMoves = True, compoundMoves = True):
         t = clock()
+        self._startSearchBudget()
         solution = deepcopy(solutionStart)
+        self._setGranularThreshold(solution)
         self._initialCost = solution['TotalCost']
+        self._initialK = solution['nVehicles']
         self._previousCost = solution['TotalCost']
+        nMovesStart = self._nMoves
         (solution, reducedFleet) = self.compoundLocalSearch(solution)
         self.executionTime = clock() - t
+        self.searchStats = SearchStats(self._initialCost, solution['TotalCost'],
+                                       self._initialK, solution['nVehicles'],
+                                       self._budgetIterations,
+                                       self._nMoves - nMovesStart,
+                                       self.executionTime, self.stopReason)
         return(deepcopy(solution))
 
-    def improveSolution(self, solutionStart):
+    def improveSolution(self, solutionStart, tLimit = None, moveLimit = None, maxNonImprovingMoves = None):
+        '''
+        Improve the solution until a local optimum is reached or the budget
+        runs out, see `setSearchBudget`. A summary of the run is stored in
+        `searchStats`.
+        '''
+        self.setSearchBudget(tLimit, moveLimit, maxNonImprovingMoves)
         return self.locaSearchImbedded(solutionStart)
 
     def locaSearchFree(self):
@@ -3263,6 +3614,8 @@ class LS_MCARPTIF(object):
             print('')
             print('Exec time (sec):    %.4f'%self.executionTime)
             print('# Iterations:       %i \t (per iteration: %.4f)'%(self._nCompoundMoves, self.executionTime/max([1, self._nCompoundMoves])))
+            if self.moveCache:
+                print('Move cache hits:    %i \t (hit rate: %.4f)'%self._MoveCosts.moveCacheStats()[::2])
             print('# Moves:            %i \t (per move:      %.4f)'%(self._nMoves, self.executionTime/max([1, self._nMoves])))
             print('================================================================\n')
     
@@ -3282,6 +3635,7 @@ class TabuFunctions():
         self._edgesS = set(self._edgesL)
         self.tabuTenure = 5
         self.compoundTabuList = True
+        self._instanceArrays = InstanceArrays(info)
         
         self._incZ = 1e3000000
         self._incZ_k = 1e3000000
@@ -3292,7 +3646,7 @@ class TabuFunctions():
         self._incK_nM = []
         self._incK_nCM = []
         self._incZsol = {}
-        self._incKsol = {}
+        self._incKsnapshot = None
     
     def resetTabuFunctions(self):
         self._tabuListMove = [0]*len(self.info.d)
@@ -3389,7 +3743,7 @@ class TabuFunctions():
         self._incK_nM = []
         self._incK_nCM = []
         self._incZsol = {}
-        self._incKsol = {}
+        self._incKsnapshot = None
     
     def checkIncumbent(self, solution):
         newIncumbent = False
@@ -3411,11 +3765,27 @@ class TabuFunctions():
             newIncumbent = True
             self._incK = solution['nVehicles']
             self._incK_z = solution['TotalCost']
-            self._incKsol = deepcopy(solution)
+            self._incKsnapshot = ArraySolution.from_dict(solution, self._instanceArrays)
             self._incK_nM += [self._nMoves]
             self._incK_nCM += [self._nCompoundMoves]
         return(newIncumbent)
     
+    @property
+    def _incKsol(self):
+        '''
+        Incumbent solution, decoded from its array snapshot, empty if there
+        is none.
+        '''
+        if self._incKsnapshot is None: return({})
+        return(self._incKsnapshot.to_dict())
+    
+    def copySolution(self, solution):
+        '''
+        Copy of the trips, costs and loads of a solution, via its array
+        snapshot, which is much faster than a deepcopy.
+        '''
+        return(ArraySolution.from_dict(solution, self._instanceArrays).to_dict())
+    
     def returnIncumbentCopy(self):
         return(deepcopy(self._incZsol), deepcopy(self._incKsol))
 
@@ -3443,6 +3813,11 @@ class TabuSearch_MCARPTIF(object):
         self.useAspirations = False
         self.saveSolution = False
         self.suppressOutput = False
+        self.stopReason = 'local_optimum'
+        self.moveHeapSize = None
+        self.moveCache = False
+        self.moveCostThreads = 1
+        self.granularBeta = None
         
     def setOutputString(self, problemSet, initial, experimentName, experimentNumber, outputFile):
         self.saveOutput = True
@@ -3529,6 +3904,10 @@ class TabuSearch_MCARPTIF(object):
         self._LSfun.setScreenPrint(printMoves = self._printOutput)
         self._LSfun.thresholdUse = self.tabuThreshold
         self._LSfun.nnFrac = self.nnFrac
+        self._LSfun.moveHeapSize = self.moveHeapSize
+        self._LSfun.moveCache = self.moveCache
+        self._LSfun.moveCostThreads = self.moveCostThreads
+        self._LSfun.granularBeta = self.granularBeta
         self._TSfun.tabuTenure = self.tabuTenure
 
     def _makeTabuFeasibleCompoundMoves(self, savings, solution):
@@ -3581,7 +3960,7 @@ class TabuSearch_MCARPTIF(object):
     def _makeBestMoves(self, savings, originalSolution):
         
         #print('Aspiration criteria')
-        solution = deepcopy(originalSolution)    
+        solution = self._TSfun.copySolution(originalSolution)
         self._LSfun.threshold = self.improveThreshold    
         
         self._LSfun._nCompoundMoves = 0
@@ -3624,9 +4003,18 @@ class TabuSearch_MCARPTIF(object):
         candidateSearch = False
         reducedFleet = False
         tprint = clock()
-        i = 0
-        while (self.totalTime < tLimit) and (i < moveLimit) and (self.nMovesSinceInc < self._nMovesNoImprovement):     
-            i += 1  
+        while True:
+            self.totalTime = clock() - timeStart
+            if self.totalTime >= tLimit:
+                self.stopReason = 'time_limit'
+                break
+            if self.nIterations >= moveLimit:
+                self.stopReason = 'move_limit'
+                break
+            if self.nMovesSinceInc >= self._nMovesNoImprovement:
+                self.stopReason = 'no_improvement'
+                break
+            self.nIterations += 1
             tpassedprint = clock() - tprint
             if tpassedprint > 0.5:
                 p = True
@@ -3643,7 +4031,6 @@ class TabuSearch_MCARPTIF(object):
             self.nMovesSinceInc = self._TSfun._nCompoundMoves - self._TSfun._incK_nCM[-1]
             
             savings = self._LSfun._calculateMoveCosts(solution, candidateSearch)
-            savings.sort(key=lambda x: x if isinstance(x, str) else "")
             candidateSearch = self.candidateMoves
             self.totalTime = clock() - timeStart       
             
@@ -3677,6 +4064,7 @@ class TabuSearch_MCARPTIF(object):
 
     def compoundTabuSearch(self, solution, tLimit, moveLimit):
         
+        self._LSfun._setGranularThreshold(solution)
         self._previousCost = solution['TotalCost']
         self._initialCost = self._previousCost
         self._initialK = solution['nVehicles']
@@ -3684,34 +4072,61 @@ class TabuSearch_MCARPTIF(object):
         timeStart = clock()
         self.totalTime = 0
         self.nMovesSinceInc = 0
+        self.nIterations = 0
+        self.stopReason = 'local_optimum'
+        nMoves = 0
         self.writeOutput(solution)        
     
         while True:
             self._initiateTabuSearch()
             (solution, reducedFleet) = self.moveSearch(solution, tLimit, timeStart, moveLimit)
+            nMoves += self._TSfun._nMoves
             if not reducedFleet: break
         
+        # The budget ran out before the first move was made.
+        if self._TSfun._incKsnapshot is None: self._TSfun.checkIncumbent(solution)
+        
         if not self.suppressOutput:
             print('\nInitial and incumbent cost: %i \t %i'%(self._TSfun._incK_z, self._initialCost))
             print('Initial and incumbent fleet size: %i \t %i\n'%(self._TSfun._incK, self._initialK))
+            if self.moveCache:
+                print('Move cache hits: %i \t (hit rate: %.4f)\n'%self._LSfun._MoveCosts.moveCacheStats()[::2])
+
+        self.searchStats = SearchStats(self._initialCost, self._TSfun._incK_z,
+                                       self._initialK, self._TSfun._incK,
+                                       self.nIterations, nMoves,
+                                       clock() - timeStart, self.stopReason)
         
-    def tabuSearch(self, solution, tLimit = 1e300000, moveLimit = 1e300000):
+    def tabuSearch(self, solution, tLimit = NO_LIMIT, moveLimit = NO_LIMIT):
         #
         #self._initiateTabuSearch()
         solution = self.compoundTabuSearch(solution, tLimit, moveLimit)
         self._LSfun._MoveCosts.freeInputValues()
-        return(deepcopy(self._TSfun._incKsol))
+        return(self._TSfun._incKsol)
 
 
     def clearCythonModules(self):
         self._LSfun._MoveCosts.freeInputValues()
         
         
-    def improveSolution(self, solution):
-        #
-        self._initiateTabuSearch()
-        solution = self.compoundTabuSearch(solution, tLimit = 1e300000, moveLimit = 1e300000)
-        return(deepcopy(self._TSfun._incKsol)) 
+    def improveSolution(self, solution, tLimit = None, moveLimit = None, maxNonImprovingMoves = None):
+        '''
+        Improve the solution until the budget runs out, and return the
+        incumbent. `maxNonImprovingMoves` replaces the limit set with
+        `setTabuSearchParameters` for this call only, and a summary of the run
+        is stored in `searchStats`.
+        '''
+        if tLimit is None: tLimit = NO_LIMIT
+        if moveLimit is None: moveLimit = NO_LIMIT
+        nMovesNoImprovement = self._nMovesNoImprovement
+        if maxNonImprovingMoves is not None:
+            self._nMovesNoImprovement = maxNonImprovingMoves
+        try:
+            self._initiateTabuSearch()
+            solution = self.compoundTabuSearch(solution, tLimit = tLimit, moveLimit = moveLimit)
+        finally:
+            self._nMovesNoImprovement = nMovesNoImprovement
+        return(self._TSfun._incKsol) 
 
 
     def returnStatsFormat(self, pSet, initial, nSol, initTime):
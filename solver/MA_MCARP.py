@@ -66,7 +66,6 @@ class MemeticCARP(object):
         else: self._dispalyUnits = 1
         
         # MA procedures
-        split.populate_c(info) # Split through Ulusoy partitioning
         self._splitGiantRoute = split.Ulusoys(info)
         #local_search_tabu.populate_c_local_searc(info) # Efficient Local search procedures within Tabu Search
         #self._localSearch_tabu = LS_MCARP.LS_MCARP(info, nn_list, testAll = True)   
@@ -91,7 +90,6 @@ class MemeticCARP(object):
         '''
         Free all Cython parameters. Program stops working if this is not done. 
         '''
-        split.free_c()
         if self._parametersLocalSearchSet:
             self._localSearch.locaSearchFree()
     
@@ -0,0 +1,231 @@
+# -*- coding: utf-8 -*-
+"""Compact array-backed representation of MCARPTIF solutions.
+
+Solutions are passed between the solvers as dictionaries keyed by route
+index, with nested lists of trips and lists of trip costs and loads, see
+`py_solution_builders.build_CLARPIF_dict`. Copying them with `deepcopy`, for
+example to keep an incumbent, walks every nested object. `ArraySolution`
+stores the same solution in a few flat numpy arrays:
+
+    arcs (int32): the trips of all routes, one after the other, each trip
+        starting and ending with its depot or IF visits, as in
+        `solution[i]['Trips']`.
+    trip_offsets (int32, n_trips + 1): trip t is
+        arcs[trip_offsets[t]:trip_offsets[t + 1]].
+    route_offsets (int32, n_routes + 1): route i consists of trips
+        route_offsets[i]:route_offsets[i + 1].
+    cum_load, cum_service, cum_deadhead (int64, n_arcs + 1): prefix sums of
+        demand, service cost and deadhead cost along `arcs`, with the
+        deadhead into the first arc of each trip set to zero. The load of
+        arcs[a:b] is cum_load[b] - cum_load[a].
+    positions (int32): position in `arcs` of each required arc and its
+        inverse, -1 for arcs that are not serviced.
+
+Copies are then a handful of `memcpy` calls, costs and loads of trips and
+routes are differences of the prefix sums, and the position of an arc is a
+single lookup. The instance data is converted once per instance with
+`InstanceArrays`:
+
+    >>> instance = InstanceArrays(info)
+    >>> snapshot = ArraySolution.from_dict(solution, instance)
+    >>> snapshot.total_cost == solution['TotalCost']
+    True
+    >>> solution = snapshot.to_dict()
+"""
+
+import numpy as np
+from solver.c_buffers import int32_buffer, inverse_arc_buffer
+
+
+class InstanceArrays(object):
+    """Instance data used by `ArraySolution`, converted once per instance."""
+
+    def __init__(self, info):
+        """
+        Arg:
+            info (namedtuple): converted input data of a problem instance. See
+                help(`converter.load_data.load_instance`) for more info.
+        """
+        self.d = int32_buffer(info.d)
+        self.demand = np.asarray(info.demandL, dtype=np.int64)
+        self.service = np.asarray(info.serveCostL, dtype=np.int64)
+        self.inverse = inverse_arc_buffer(info.reqInvArcList)
+        self.required = np.zeros(self.d.shape[0], dtype=bool)
+        self.required[list(info.reqArcListActual)] = True
+        self.dump_cost = info.dumpCost
+
+
+def _prefix_sum(values):
+    """Prefix sums of values, starting with zero."""
+    prefix = np.zeros(len(values) + 1, dtype=np.int64)
+    np.cumsum(values, out=prefix[1:])
+    return prefix
+
+
+class ArraySolution(object):
+    """MCARPTIF solution stored in flat arrays, see the module docstring."""
+
+    def __init__(self, instance, arcs, trip_offsets, route_offsets):
+        """
+        Args:
+            instance (InstanceArrays): instance data.
+            arcs (np.array <int32>): trips of all routes, one after the other.
+            trip_offsets (np.array <int32>): start of each trip in `arcs`,
+                followed by len(arcs).
+            route_offsets (np.array <int32>): first trip of each route,
+                followed by the number of trips.
+        """
+        self.instance = instance
+        self.arcs = arcs
+        self.trip_offsets = trip_offsets
+        self.route_offsets = route_offsets
+        self._set_prefix_sums()
+        self._set_positions()
+
+    @classmethod
+    def from_dict(cls, solution, instance):
+        """Create the array solution from a standardised solution dictionary.
+
+        Args:
+            solution (dict): MCARPTIF solution with `Trips` for each route.
+            instance (InstanceArrays): instance data.
+        """
+        trips = [trip for i in range(solution['nVehicles'])
+                 for trip in solution[i]['Trips']]
+        n_trips = np.fromiter((len(trip) for trip in trips), dtype=np.int32,
+                              count=len(trips))
+        trip_offsets = np.zeros(len(trips) + 1, dtype=np.int32)
+        np.cumsum(n_trips, out=trip_offsets[1:])
+        n_route_trips = np.fromiter((len(solution[i]['Trips'])
+                                     for i in range(solution['nVehicles'])),
+                                    dtype=np.int32,
+                                    count=solution['nVehicles'])
+        route_offsets = np.zeros(solution['nVehicles'] + 1, dtype=np.int32)
+        np.cumsum(n_route_trips, out=route_offsets[1:])
+        arcs = np.fromiter((arc for trip in trips for arc in trip),
+                           dtype=np.int32, count=trip_offsets[-1])
+        return cls(instance, arcs, trip_offsets, route_offsets)
+
+    def _set_prefix_sums(self):
+        """Set the load, service and deadhead prefix sums along `arcs`."""
+        instance = self.instance
+        arcs = self.arcs
+        deadhead = np.zeros(len(arcs), dtype=np.int64)
+        if len(arcs) > 1:
+            deadhead[1:] = instance.d[arcs[:-1], arcs[1:]]
+        deadhead[self.trip_offsets[:-1]] = 0
+        self.cum_load = _prefix_sum(instance.demand[arcs])
+        self.cum_service = _prefix_sum(instance.service[arcs])
+        self.cum_deadhead = _prefix_sum(deadhead)
+
+    def _set_positions(self):
+        """Set the position of each serviced arc and its inverse."""
+        instance = self.instance
+        self.positions = np.full(len(instance.required), -1, dtype=np.int32)
+        serviced = np.flatnonzero(instance.required[self.arcs])
+        serviced_arcs = self.arcs[serviced]
+        self.positions[serviced_arcs] = serviced
+        inverse_arcs = instance.inverse[serviced_arcs]
+        edges = inverse_arcs != -1
+        self.positions[inverse_arcs[edges]] = serviced[edges]
+
+    def copy(self):
+        """Return an independent copy, sharing only the instance data."""
+        solution = ArraySolution.__new__(ArraySolution)
+        solution.instance = self.instance
+        for name in ('arcs', 'trip_offsets', 'route_offsets', 'cum_load',
+                     'cum_service', 'cum_deadhead', 'positions'):
+            setattr(solution, name, getattr(self, name).copy())
+        return solution
+
+    @property
+    def n_routes(self):
+        return len(self.route_offsets) - 1
+
+    @property
+    def n_trips(self):
+        return len(self.trip_offsets) - 1
+
+    def _trip_sums(self, prefix):
+        return prefix[self.trip_offsets[1:]] - prefix[self.trip_offsets[:-1]]
+
+    def trip_loads(self):
+        """Return the load of each trip, of all routes."""
+        return self._trip_sums(self.cum_load)
+
+    def trip_services(self):
+        """Return the service cost of each trip, of all routes."""
+        return self._trip_sums(self.cum_service)
+
+    def trip_deadheads(self):
+        """Return the deadhead cost of each trip, including the dump cost."""
+        return self._trip_sums(self.cum_deadhead) + self.instance.dump_cost
+
+    def trip_costs(self):
+        """Return the total cost of each trip, of all routes."""
+        return self.trip_services() + self.trip_deadheads()
+
+    def route_costs(self):
+        """Return the total cost of each route."""
+        trip_costs = self.trip_costs()
+        if not self.n_trips:
+            return np.zeros(self.n_routes, dtype=trip_costs.dtype)
+        return np.add.reduceat(trip_costs, self.route_offsets[:-1])
+
+    @property
+    def total_cost(self):
+        return int(self.trip_costs().sum())
+
+    def arc_position(self, arc):
+        """Return the position of a required arc, or its inverse, in `arcs`,
+        -1 if it is not serviced."""
+        return int(self.positions[arc])
+
+    def arc_trip(self, arc):
+        """Return the route, trip in the route, and position in the trip, of
+        a required arc, as used in `solution[route]['Trips'][trip][position]`.
+
+        Raise:
+            ValueError: if the arc is not serviced.
+        """
+        position = self.positions[arc]
+        if position == -1:
+            raise ValueError('Arc {} is not serviced'.format(arc))
+        trip = np.searchsorted(self.trip_offsets, position, side='right') - 1
+        route = np.searchsorted(self.route_offsets, trip, side='right') - 1
+        return (int(route), int(trip - self.route_offsets[route]),
+                int(position - self.trip_offsets[trip]))
+
+    def to_dict(self):
+        """Return the standardised solution dictionary, with the costs and
+        loads of `py_solution_builders.build_CLARPIF_dict`."""
+        arcs = self.arcs.tolist()
+        trip_offsets = self.trip_offsets.tolist()
+        route_offsets = self.route_offsets.tolist()
+        trip_deadheads = self.trip_deadheads().tolist()
+        trip_services = self.trip_services().tolist()
+        trip_costs = self.trip_costs().tolist()
+        trip_loads = self.trip_loads().tolist()
+
+        solution = {}
+        total_cost = 0
+        for i in range(self.n_routes):
+            first, last = route_offsets[i], route_offsets[i + 1]
+            route_dict = {}
+            route_dict['TripDeadheads'] = trip_deadheads[first:last]
+            route_dict['TripServices'] = trip_services[first:last]
+            route_dict['TripCosts'] = trip_costs[first:last]
+            route_dict['TripLoads'] = trip_loads[first:last]
+            route_dict['Trips'] = [arcs[trip_offsets[t]:trip_offsets[t + 1]]
+                                   for t in range(first, last)]
+            route_dict['nTrips'] = last - first
+            route_dict['Cost'] = sum(route_dict['TripCosts'])
+            route_dict['Load'] = sum(route_dict['TripLoads'])
+            route_dict['Deadhead'] = sum(route_dict['TripDeadheads'])
+            route_dict['Service'] = sum(route_dict['TripServices'])
+            solution[i] = route_dict
+            total_cost += route_dict['Cost']
+        solution['ProblemType'] = 'CLARPIF'
+        solution['TotalCost'] = total_cost
+        solution['nVehicles'] = self.n_routes
+        return solution
@@ -6,402 +6,488 @@ Created on 01 Oct 2011
 import numpy as np
 #cimport numpy as np
 
-cimport libc.stdlib
-
-from libc.stdlib cimport realloc, malloc, free 
-#from libcpp.vector cimport vector
 from math import ceil
+from solver.c_buffers import int32_buffer
 
 huge = 1e30000# Infinity
 
 from copy import deepcopy
-cdef int **d, nArcs, depot, *demand, capacity, dumpCost, **if_cost, maxTrip, *service
 
-def set_input(info, full = False):
+cdef class UnservedArcs:
+    '''
+    Required arcs that still have to be serviced, with O(1) removal. The arcs
+    are stored in `arcs[:count]`, in no particular order, `position` gives the
+    index of each unserved arc in `arcs`, and `unserved` flags them, so that
+    path scanning can skip served arcs without searching a Python list.
     
-    d_old = info.d
-    depot_old = info.depotnewkey
-    inv_list_old = info.reqInvArcList
-    demand_old = info.demandL
-    capacity_old = info.capacity
-    dumpCostOld = info.dumpCost
-    if full: 
-        if_cost_old = info.if_cost_np
-        maxTrip_old = info.maxTrip
-    else:
-        maxTrip_old = 100000
-    service_old = info.serveCostL
+    Can be used in place of the list of unserved arcs with `len`, `in`,
+    iteration and `remove`.
+    '''
     
-    global d, nArcs, depot, inv_list, demand, capacity, dumpCost, if_cost, maxTrip, service
+    cdef int[::1] arcs, position
+    cdef unsigned char[::1] unserved
+    cdef public int count
     
-    nArcs = len(d_old)
-    d = <int **>malloc(nArcs * sizeof(int *))
-    if full: if_cost = <int **>malloc(nArcs * sizeof(int *))
-    inv_list = inv_list_old #< int *>malloc(nArcs * sizeof(int *))
-    demand = < int *>malloc(nArcs * sizeof(int *)) 
-    service = < int *>malloc(nArcs * sizeof(int *))
-    depot = depot_old
-    capacity = capacity_old
-    dumpCost = dumpCostOld
-    maxTrip = maxTrip_old
-    if full: 
-        for i from 0 <= i < nArcs:
-            d[i] = <int *>malloc(nArcs * sizeof(int *))
-            if_cost[i] = <int *>malloc(nArcs * sizeof(int *))
-            demand[i] = demand_old[i]
-            service[i] = service_old[i]
-            
-        for i from 0 <= i < nArcs:
-            for j from 0 <= j < nArcs:
-                d[i][j] = d_old[i][j]
-                if_cost[i][j] = if_cost_old[i][j]
-    else:
-        for i from 0 <= i < nArcs:
-            d[i] = <int *>malloc(nArcs * sizeof(int *))
-            demand[i] = demand_old[i]
-            service[i] = service_old[i]
-            
-        for i from 0 <= i < nArcs:
-            for j from 0 <= j < nArcs:
-                d[i][j] = d_old[i][j]       
-
-def free_input(full):
-    if full: 
-        for i from 0 <= i < nArcs:
-            free(d[i])
-            free(if_cost[i])
-        free(d)
-        free(if_cost)
-        free(demand)
-        free(service)
-    else:
-        for i from 0 <= i < nArcs:
-            free(d[i])
-        free(d)
-        free(demand)
-        free(service)
-
-def findnearestarcs_sub1(previousarc, unservedarcs):
-    '''
-    Find nearest arc without taking capacity and maxtrip into consideration. New comments
-    '''
+    def __cinit__(self, int nArcs, reqArcs):
+        cdef int i, arc
+        self.arcs = np.array(reqArcs, dtype = np.int32)
+        self.count = self.arcs.shape[0]
+        self.position = np.full(nArcs, -1, dtype = np.int32)
+        self.unserved = np.zeros(nArcs, dtype = np.uint8)
+        for i in range(self.count):
+            arc = self.arcs[i]
+            self.position[arc] = i
+            self.unserved[arc] = 1
     
-    cdef int nReqArcs, nextarc, disttoarc, i, j
-    cdef double nearest
+    def __len__(self):
+        return(self.count)
     
-    nearest = huge
-    nearestarcs = []
+    def __contains__(self, int arc):
+        return(self.unserved[arc] == 1)
     
-    nReqArcs = len(unservedarcs)
-    for i from 0 <= i < nReqArcs:
-        nextarc = unservedarcs[i]
-        disttoarc = d[previousarc][nextarc]
-        if disttoarc < nearest:
-            nearest = disttoarc
-            nearestarcs = [nextarc]
-        elif disttoarc == nearest:
-            nearestarcs.append(nextarc)
+    def __iter__(self):
+        return(iter(np.asarray(self.arcs[:self.count]).tolist()))
     
-    return(nearestarcs, nearest)
+    cpdef remove(self, int arc):
+        '''
+        Remove an arc by moving the last unserved arc to its position.
+        '''
+        cdef int i = self.position[arc]
+        cdef int lastArc
+        if i == -1:
+            raise ValueError('Arc {} is already served'.format(arc))
+        self.count -= 1
+        lastArc = self.arcs[self.count]
+        self.arcs[i] = lastArc
+        self.position[lastArc] = i
+        self.position[arc] = -1
+        self.unserved[arc] = 0
 
-def testload(arc, tripload):
-    '''
-    Test if an arc can be added without exceeding vehicle capacity.
+cdef class PathScanningContext:
     '''
-    if (tripload + demand[arc]) <= capacity:
-        return(True)
-    else: return(False)
+    Instance data used by Extended Path Scanning, read through typed
+    memoryviews of C-contiguous int32 buffers, which are not copied if they
+    already are such buffers, see `solver.c_buffers`. Each path scanning
+    instance has its own context, so that they can run side by side.
     
-def testtriplimit(arc, arcdist, routecost):
-    '''
-    Test if an arc can be added without exceeding max trip length.
-    '''
-    if (routecost + arcdist + service[arc] + if_cost[arc][depot]) <= maxTrip:
-        return(True)
-    else: return(False)
-
-def testtriplimit_est(arc, arcdist, routecost, estimate_if_cost):
-    '''
-    Test if an arc can be added without exceeding max trip length.
-    '''
-    if (routecost + arcdist + service[arc] + if_cost[arc][depot] + estimate_if_cost) <= maxTrip:
-        return(True)
-    else: return(False)
-
-def checknearestarcs(nearestarcs, arcdist, tripload, routecost):
-    '''
-    Check which nearest arcs does not exceed capacity and maxtrip restrictions.
-    '''
-    cdef int nReqArcs
-    nextarcfine = []
-    nReqArcs = len(nearestarcs)
-    for i from 0 <= i < nReqArcs:
-        arc = nearestarcs[i]
-        if (testload(arc, tripload) == True) & (testtriplimit(arc, arcdist, routecost) == True): 
-            nextarcfine.append(arc)
-    return(nextarcfine)
-
-def checknearestarcs_noload(nearestarcs, arcdist, tripload, routecost, estimate_if_cost):
-    '''
-    Check which nearest arcs does not exceed capacity and maxtrip restrictions.
+    The IF costs are only used if `full` is True, otherwise the max trip
+    length is ignored.
     '''
-    cdef int nReqArcs
-    nextarcfine = []
-    nReqArcs = len(nearestarcs)
-    for i from 0 <= i < nReqArcs:
-        arc = nearestarcs[i]
-        if testtriplimit_est(arc, arcdist, routecost, estimate_if_cost):
-            nextarcfine.append(arc)
-    return(nextarcfine)
-
-def findnearestarcs(previousarc,  unservedarcs, tripload, routecost):
-    '''
-    Find the nearest servisable arc, while taking 
-    into account load and maxtrip restrictions.
-    '''
-    cdef int nReqArcs, nextarc, disttoarc, i
-    cdef double nearest
     
-    nearest = huge
-    nearestarcs = []
+    cdef const int[:, ::1] d
+    cdef int nArcs, depot, capacity, dumpCost, maxTrip
+    cdef const int[::1] demand
+    cdef const int[::1] service
+    cdef const int[:, ::1] if_cost
+    cdef object inv_list
+    cdef const int[:, ::1] nnList
+    cdef object reqArcRank
+    cdef public bint has_nn_list
     
-    nReqArcs = len(unservedarcs)
-    for i from 0 <= i < nReqArcs:
-        nextarc = unservedarcs[i]
-        disttoarc = d[previousarc][nextarc]
-            
-        if disttoarc <= nearest:
+    def __cinit__(self, info, full = False):
         
-            loadflag = testload(nextarc, tripload)
-            triplimitflag = testtriplimit(nextarc, disttoarc, routecost)
-            
-            if (loadflag == True) & (triplimitflag == True):
+        self.d = int32_buffer(info.d)
+        self.nArcs = self.d.shape[0]
+        self.depot = info.depotnewkey
+        self.inv_list = info.reqInvArcList
+        self.demand = int32_buffer(info.demandL)
+        self.service = int32_buffer(info.serveCostL)
+        self.capacity = info.capacity
+        self.dumpCost = info.dumpCost
+        if full: 
+            self.if_cost = int32_buffer(info.if_cost_np)
+            self.maxTrip = info.maxTrip
+        else:
+            self.maxTrip = 100000
+        self.has_nn_list = False
+
+    def set_nn_list(self, nn_list, reqArcs):
+        '''
+        Set the nearest neighbour lists used by `findnearestarcs_nn`, nearest
+        first, such as `info.nn_list`. Ties are returned in the order of
+        `reqArcs`, as when scanning the list of unserved arcs.
+        '''
+        self.nnList = int32_buffer(nn_list)
+        rank = [self.nArcs]*self.nArcs
+        for i, arc in enumerate(reqArcs):
+            rank[arc] = i
+        self.reqArcRank = rank
+        self.has_nn_list = True
+
+    def findnearestarcs_nn(self, int previousarc, UnservedArcs unservedarcs, int tripload, double routecost):
+        '''
+        Find the nearest servisable arcs, as `findnearestarcs`, by walking the
+        nearest neighbours of `previousarc` until the first distance band with
+        an arc that does not exceed capacity and maxtrip restrictions. Falls
+        back to scanning all unserved arcs if the list of `previousarc` is
+        truncated and runs out.
+        '''
+        cdef int k, nextarc, disttoarc
+        cdef int nNearest = self.nnList.shape[1]
+        cdef double nearest = huge
+        cdef const unsigned char[::1] unserved = unservedarcs.unserved
+
+        nearestarcs = []
+        for k in range(nNearest):
+            nextarc = self.nnList[previousarc, k]
+            if not unserved[nextarc]: continue
+            disttoarc = self.d[previousarc, nextarc]
+            if disttoarc > nearest: break
+            if (tripload + self.demand[nextarc] <= self.capacity) and \
+                    (routecost + disttoarc + self.service[nextarc] + self.if_cost[nextarc, self.depot] <= self.maxTrip):
+                nearest = disttoarc
+                nearestarcs.append(nextarc)
+        else:
+            if nNearest < self.nArcs:
+                return(self.findnearestarcs(previousarc, sorted(unservedarcs, key = self.reqArcRank.__getitem__), tripload, routecost))
+
+        if len(nearestarcs) > 1:
+            nearestarcs.sort(key = self.reqArcRank.__getitem__)
+        return(nearestarcs, nearest)
+
+    def findnearestIFarcs_nn(self, int previousarc, UnservedArcs unservedarcs, double routecost):
+        '''
+        Find the nearest servisable arcs after an IF visit, as
+        `findnearestIFarcs`, scanning the unserved arcs in C.
+        '''
+        cdef int i, nextarc, disttoarc
+        cdef double nearest = huge
+        cdef const int[::1] arcs = unservedarcs.arcs
+
+        nearestarcs = []
+        for i in range(unservedarcs.count):
+            nextarc = arcs[i]
+            disttoarc = self.if_cost[previousarc, nextarc]
+            if disttoarc <= nearest and \
+                    (routecost + disttoarc + self.service[nextarc] + self.if_cost[nextarc, self.depot] <= self.maxTrip):
                 if disttoarc < nearest:
                     nearest = disttoarc
                     nearestarcs = [nextarc]
-                elif disttoarc == nearest:
-                    nearestarcs.append(nextarc)           
-                
-    return(nearestarcs, nearest)
+                else:
+                    nearestarcs.append(nextarc)
 
-def findnearestarcs_elipse(previousarc, unservedarcs, tripload, routecost, _tc, _ned):
-    '''
-    Find the nearest servisable arc, while taking 
-    into account load and maxtrip restrictions.
-    '''
-    
-    cdef int nReqArcs, nextarc, disttoarc, i
-    cdef double nearest
-    
-    nearest = huge
-    nearestarcs = []
+        if len(nearestarcs) > 1:
+            nearestarcs.sort(key = self.reqArcRank.__getitem__)
+        return(nearestarcs, nearest)
+
+    def findnearestarcs_sub1(self, previousarc, unservedarcs):
+        '''
+        Find nearest arc without taking capacity and maxtrip into consideration. New comments
+        '''
+
+        cdef int nReqArcs, nextarc, disttoarc, i, j
+        cdef double nearest
+
+        nearest = huge
+        nearestarcs = []
+
+        nReqArcs = len(unservedarcs)
+        for i from 0 <= i < nReqArcs:
+            nextarc = unservedarcs[i]
+            disttoarc = self.d[previousarc, nextarc]
+            if disttoarc < nearest:
+                nearest = disttoarc
+                nearestarcs = [nextarc]
+            elif disttoarc == nearest:
+                nearestarcs.append(nextarc)
+
+        return(nearestarcs, nearest)
+
+    def testload(self, arc, tripload):
+        '''
+        Test if an arc can be added without exceeding vehicle capacity.
+        '''
+        if (tripload + self.demand[arc]) <= self.capacity:
+            return(True)
+        else: return(False)
+
+    def testtriplimit(self, arc, arcdist, routecost):
+        '''
+        Test if an arc can be added without exceeding max trip length.
+        '''
+        if (routecost + arcdist + self.service[arc] + self.if_cost[arc, self.depot]) <= self.maxTrip:
+            return(True)
+        else: return(False)
+
+    def testtriplimit_est(self, arc, arcdist, routecost, estimate_if_cost):
+        '''
+        Test if an arc can be added without exceeding max trip length.
+        '''
+        if (routecost + arcdist + self.service[arc] + self.if_cost[arc, self.depot] + estimate_if_cost) <= self.maxTrip:
+            return(True)
+        else: return(False)
+
+    def checknearestarcs(self, nearestarcs, arcdist, tripload, routecost):
+        '''
+        Check which nearest arcs does not exceed capacity and maxtrip restrictions.
+        '''
+        cdef int nReqArcs
+        nextarcfine = []
+        nReqArcs = len(nearestarcs)
+        for i from 0 <= i < nReqArcs:
+            arc = nearestarcs[i]
+            if (self.testload(arc, tripload) == True) & (self.testtriplimit(arc, arcdist, routecost) == True): 
+                nextarcfine.append(arc)
+        return(nextarcfine)
+
+    def checknearestarcs_noload(self, nearestarcs, arcdist, tripload, routecost, estimate_if_cost):
+        '''
+        Check which nearest arcs does not exceed capacity and maxtrip restrictions.
+        '''
+        cdef int nReqArcs
+        nextarcfine = []
+        nReqArcs = len(nearestarcs)
+        for i from 0 <= i < nReqArcs:
+            arc = nearestarcs[i]
+            if self.testtriplimit_est(arc, arcdist, routecost, estimate_if_cost):
+                nextarcfine.append(arc)
+        return(nextarcfine)
+
+    def findnearestarcs(self, previousarc,  unservedarcs, tripload, routecost):
+        '''
+        Find the nearest servisable arc, while taking 
+        into account load and maxtrip restrictions.
+        '''
+        cdef int nReqArcs, nextarc, disttoarc, i
+        cdef double nearest
+
+        nearest = huge
+        nearestarcs = []
+
+        nReqArcs = len(unservedarcs)
+        for i from 0 <= i < nReqArcs:
+            nextarc = unservedarcs[i]
+            disttoarc = self.d[previousarc, nextarc]
 
-    disttodepot_direct = if_cost[previousarc][depot]
-    k = 0
-    
-    nReqArcs = len(unservedarcs)
-    for i from 0 <= i < nReqArcs:
-        nextarc = unservedarcs[i]
-        disttoarc = d[previousarc][nextarc]
-        serveC = service[nextarc]
-        disttodepot = if_cost[nextarc][depot]
-        if (disttoarc + serveC + disttodepot) <= (_tc/float(_ned) + disttodepot_direct):
-            k += 1
             if disttoarc <= nearest:
-                loadflag = testload(nextarc, tripload)
-                triplimitflag = testtriplimit(nextarc, disttoarc, routecost)
+
+                loadflag = self.testload(nextarc, tripload)
+                triplimitflag = self.testtriplimit(nextarc, disttoarc, routecost)
+
                 if (loadflag == True) & (triplimitflag == True):
                     if disttoarc < nearest:
                         nearest = disttoarc
                         nearestarcs = [nextarc]
                     elif disttoarc == nearest:
-                        nearestarcs.append(nextarc)
-  
-    return(nearestarcs, nearest, k)
+                        nearestarcs.append(nextarc)           
+
+        return(nearestarcs, nearest)
+
+    def findnearestarcs_elipse(self, previousarc, unservedarcs, tripload, routecost, _tc, _ned):
+        '''
+        Find the nearest servisable arc, while taking 
+        into account load and maxtrip restrictions.
+        '''
+
+        cdef int nReqArcs, nextarc, disttoarc, i
+        cdef double nearest
+
+        nearest = huge
+        nearestarcs = []
+
+        disttodepot_direct = self.if_cost[previousarc, self.depot]
+        k = 0
+
+        nReqArcs = len(unservedarcs)
+        for i from 0 <= i < nReqArcs:
+            nextarc = unservedarcs[i]
+            disttoarc = self.d[previousarc, nextarc]
+            serveC = self.service[nextarc]
+            disttodepot = self.if_cost[nextarc, self.depot]
+            if (disttoarc + serveC + disttodepot) <= (_tc/float(_ned) + disttodepot_direct):
+                k += 1
+                if disttoarc <= nearest:
+                    loadflag = self.testload(nextarc, tripload)
+                    triplimitflag = self.testtriplimit(nextarc, disttoarc, routecost)
+                    if (loadflag == True) & (triplimitflag == True):
+                        if disttoarc < nearest:
+                            nearest = disttoarc
+                            nearestarcs = [nextarc]
+                        elif disttoarc == nearest:
+                            nearestarcs.append(nextarc)
+
+        return(nearestarcs, nearest, k)
+
+    def findnearestarcs_cap_elipse(self, previousarc, unservedarcs, tripload, routecost, _tc, _ned, IFarcsnewkey):
+        '''
+        Find the nearest servisable arc, while taking 
+        into account load and maxtrip restrictions.
+        '''
+        cdef int nReqArcs, nextarc, disttoarc, i
+        cdef double nearest
+
+        nearest = huge
+        nearestarcs = []
+        disttodepot_direct = huge
+
+        for i in IFarcsnewkey:
+            if self.d[previousarc, i] < disttodepot_direct:
+                if_k = i
+                disttodepot_direct = self.d[previousarc, i]
+
+        k = 0
+
+        nReqArcs = len(unservedarcs)
+        for i from 0 <= i < nReqArcs:
+            nextarc = unservedarcs[i]
+            disttoarc = self.d[previousarc, nextarc]
+            serveC = self.service[nextarc]
+            disttodepot = self.d[nextarc, if_k]
+            if (disttoarc + serveC + disttodepot) <= (_tc/float(_ned) + disttodepot_direct):
+                k += 1
+                if disttoarc <= nearest:
+                    loadflag = self.testload(nextarc, tripload)
+                    triplimitflag = self.testtriplimit(nextarc, disttoarc, routecost)
+                    if (loadflag == True) & (triplimitflag == True):
+                        if disttoarc < nearest:
+                            nearest = disttoarc
+                            nearestarcs = [nextarc]
+                        elif disttoarc == nearest:
+                            nearestarcs.append(nextarc)
+
+        return(nearestarcs, nearest, k) 
+
+    def findnearestIFarcs_elipse(self, previousarc, unservedarcs, tripload, routecost, _tc, _ned, inc_frac):
+        '''
+        Find the nearest servisable arc, while taking 
+        into account load and maxtrip restrictions.
+        '''
+
+        cdef int nReqArcs, nextarc, disttoarc, i
+        cdef double nearest
+
+        nearest = huge
+        nearestarcs = []
+
+        disttodepot_direct = self.if_cost[previousarc, self.depot]
+        k = 0
+
+        nReqArcs = len(unservedarcs)
+        for i from 0 <= i < nReqArcs:
+            nextarc = unservedarcs[i]
+            disttoarc = self.if_cost[previousarc, nextarc]
+            serveC = self.service[nextarc]
+            disttodepot = self.if_cost[nextarc, self.depot]
+            if (disttoarc + serveC + disttodepot) <= inc_frac*(_tc/float(_ned) + disttodepot_direct):
+                k += 1
+                if disttoarc <= nearest:
+                    triplimitflag = self.testtriplimit(nextarc, disttoarc, routecost)
+                    if triplimitflag == True:
+                        if disttoarc < nearest:
+                            nearest = disttoarc
+                            nearestarcs = [nextarc]
+                        elif disttoarc == nearest:
+                            nearestarcs.append(nextarc)
+
+        return(nearestarcs, nearest, k)
+
+    def findnearestarcs_noload(self, previousarc,  unservedarcs, tripload, routecost, estimate_if_cost):
+        '''
+        Find the nearest servisable arc, while taking 
+        into account load and maxtrip restrictions.
+        '''
+        cdef int nReqArcs, nextarc, disttoarc, i
+        cdef double nearest
+
+        nearest = huge
+        nearestarcs = []
+
+        nReqArcs = len(unservedarcs)
+        for i from 0 <= i < nReqArcs:
+            nextarc = unservedarcs[i]
+            disttoarc = self.d[previousarc, nextarc]
 
-def findnearestarcs_cap_elipse(previousarc, unservedarcs, tripload, routecost, _tc, _ned, IFarcsnewkey):
-    '''
-    Find the nearest servisable arc, while taking 
-    into account load and maxtrip restrictions.
-    '''
-    cdef int nReqArcs, nextarc, disttoarc, i
-    cdef double nearest
-    
-    nearest = huge
-    nearestarcs = []
-    disttodepot_direct = huge
-    
-    for i in IFarcsnewkey:
-        if d[previousarc][i] < disttodepot_direct:
-            if_k = i
-            disttodepot_direct = d[previousarc][i]
-    
-    k = 0
-    
-    nReqArcs = len(unservedarcs)
-    for i from 0 <= i < nReqArcs:
-        nextarc = unservedarcs[i]
-        disttoarc = d[previousarc][nextarc]
-        serveC = service[nextarc]
-        disttodepot = d[nextarc][if_k]
-        if (disttoarc + serveC + disttodepot) <= (_tc/float(_ned) + disttodepot_direct):
-            k += 1
             if disttoarc <= nearest:
-                loadflag = testload(nextarc, tripload)
-                triplimitflag = testtriplimit(nextarc, disttoarc, routecost)
-                if (loadflag == True) & (triplimitflag == True):
+                triplimitflag = self.testtriplimit_est(nextarc, disttoarc, routecost, estimate_if_cost)
+                if (triplimitflag == True):
                     if disttoarc < nearest:
                         nearest = disttoarc
                         nearestarcs = [nextarc]
                     elif disttoarc == nearest:
-                        nearestarcs.append(nextarc)
-  
-    return(nearestarcs, nearest, k) 
+                        nearestarcs.append(nextarc)           
+        return(nearestarcs, nearest)
 
-def findnearestIFarcs_elipse(previousarc, unservedarcs, tripload, routecost, _tc, _ned, inc_frac):
-    '''
-    Find the nearest servisable arc, while taking 
-    into account load and maxtrip restrictions.
-    '''
-    
-    cdef int nReqArcs, nextarc, disttoarc, i
-    cdef double nearest
-    
-    nearest = huge
-    nearestarcs = []
+    def findnearestarcs_nolimit(self, previousarc, unservedarcs, tripload):
+        '''
+        Find nearest servisable arc while only taking capacity into consideration.
+        Used with classical CARP.
+        '''
+        cdef int nReqArcs, nextarc, disttoarc, i
+        cdef double nearest
+
+        nearest = huge
+        nearestarcs = []
+
+        nReqArcs = len(unservedarcs)
+        for i from 0 <= i < nReqArcs:
+            nextarc = unservedarcs[i]
+            disttoarc = self.d[previousarc, nextarc]
 
-    disttodepot_direct = if_cost[previousarc][depot]
-    k = 0
-    
-    nReqArcs = len(unservedarcs)
-    for i from 0 <= i < nReqArcs:
-        nextarc = unservedarcs[i]
-        disttoarc = if_cost[previousarc][nextarc]
-        serveC = service[nextarc]
-        disttodepot = if_cost[nextarc][depot]
-        if (disttoarc + serveC + disttodepot) <= inc_frac*(_tc/float(_ned) + disttodepot_direct):
-            k += 1
             if disttoarc <= nearest:
-                triplimitflag = testtriplimit(nextarc, disttoarc, routecost)
-                if triplimitflag == True:
+
+                loadflag = self.testload(nextarc, tripload)
+                if loadflag:
                     if disttoarc < nearest:
                         nearest = disttoarc
                         nearestarcs = [nextarc]
-                    elif disttoarc == nearest:
-                        nearestarcs.append(nextarc)
-  
-    return(nearestarcs, nearest, k)
+                    else:nearestarcs.append(nextarc)
+        return(nearestarcs, nearest)
 
-def findnearestarcs_noload(previousarc,  unservedarcs, tripload, routecost, estimate_if_cost):
-    '''
-    Find the nearest servisable arc, while taking 
-    into account load and maxtrip restrictions.
-    '''
-    cdef int nReqArcs, nextarc, disttoarc, i
-    cdef double nearest
-    
-    nearest = huge
-    nearestarcs = []
-    
-    nReqArcs = len(unservedarcs)
-    for i from 0 <= i < nReqArcs:
-        nextarc = unservedarcs[i]
-        disttoarc = d[previousarc][nextarc]
-            
-        if disttoarc <= nearest:
-            triplimitflag = testtriplimit_est(nextarc, disttoarc, routecost, estimate_if_cost)
-            if (triplimitflag == True):
-                if disttoarc < nearest:
-                    nearest = disttoarc
-                    nearestarcs = [nextarc]
-                elif disttoarc == nearest:
-                    nearestarcs.append(nextarc)           
-    return(nearestarcs, nearest)
+    def findnearestarcs_nolimit_elipse(self, previousarc, unservedarcs, tripload, _tc, _ned):
+        '''
+        Find nearest servisable arc while only taking capacity and elipse rule into consideration.
+        Used with classical CARP.
+        '''
+        cdef int nReqArcs, nextarc, disttoarc, i, disttodepot, disttodepot_direct, serveC
+        cdef double nearest
 
-def findnearestarcs_nolimit(previousarc, unservedarcs, tripload):
-    '''
-    Find nearest servisable arc while only taking capacity into consideration.
-    Used with classical CARP.
-    '''
-    cdef int nReqArcs, nextarc, disttoarc, i
-    cdef double nearest
-    
-    nearest = huge
-    nearestarcs = []
-    
-    nReqArcs = len(unservedarcs)
-    for i from 0 <= i < nReqArcs:
-        nextarc = unservedarcs[i]
-        disttoarc = d[previousarc][nextarc]
-        
-        if disttoarc <= nearest:
-            
-            loadflag = testload(nextarc, tripload)
-            if loadflag:
-                if disttoarc < nearest:
-                    nearest = disttoarc
-                    nearestarcs = [nextarc]
-                else:nearestarcs.append(nextarc)
-    return(nearestarcs, nearest)
+        nearest = huge
+        nearestarcs = []
+        disttodepot_direct = self.d[previousarc, self.depot]
+        nReqArcs = len(unservedarcs)
+        k = 0
+        for i from 0 <= i < nReqArcs:
+            nextarc = unservedarcs[i]
+            disttoarc = self.d[previousarc, nextarc]
+            disttodepot = self.d[nextarc, self.depot]
+            serveC = self.service[nextarc]
+            if (disttoarc + serveC + disttodepot) <= (_tc/float(_ned) + disttodepot_direct):
+                k += 1
+                if disttoarc <= nearest:
+                    loadflag = self.testload(nextarc, tripload)
+                    if (loadflag == True):
+                        if disttoarc < nearest:
+                            nearest = disttoarc
+                            nearestarcs = [nextarc]
+                        else:
+                            nearestarcs.append(nextarc)           
 
-def findnearestarcs_nolimit_elipse(previousarc, unservedarcs, tripload, _tc, _ned):
-    '''
-    Find nearest servisable arc while only taking capacity and elipse rule into consideration.
-    Used with classical CARP.
-    '''
-    cdef int nReqArcs, nextarc, disttoarc, i, disttodepot, disttodepot_direct, serveC
-    cdef double nearest
-    
-    nearest = huge
-    nearestarcs = []
-    disttodepot_direct = d[previousarc][depot]
-    nReqArcs = len(unservedarcs)
-    k = 0
-    for i from 0 <= i < nReqArcs:
-        nextarc = unservedarcs[i]
-        disttoarc = d[previousarc][nextarc]
-        disttodepot = d[nextarc][depot]
-        serveC = service[nextarc]
-        if (disttoarc + serveC + disttodepot) <= (_tc/float(_ned) + disttodepot_direct):
-            k += 1
+        return(nearestarcs, nearest, k)
+
+
+    def findnearestIFarcs(self, previousarc, unservedarcs, tripload, routecost):
+        '''
+        Find the nearest servisable arc that can be serviced after 
+        visiting a dumpsite while taking maxtrip restriction into account
+        '''
+        cdef int nReqArcs, nextarc, disttoarc, i
+        cdef double nearest
+
+        nearest = huge
+        nearestarcs = []
+
+        nReqArcs = len(unservedarcs)
+        for i from 0 <= i < nReqArcs:
+            nextarc = unservedarcs[i]
+            disttoarc = self.if_cost[previousarc, nextarc]
             if disttoarc <= nearest:
-                loadflag = testload(nextarc, tripload)
-                if (loadflag == True):
+
+                triplimitflag = self.testtriplimit(nextarc, disttoarc, routecost)    
+                if triplimitflag:
                     if disttoarc < nearest:
                         nearest = disttoarc
                         nearestarcs = [nextarc]
-                    else:
+                    elif disttoarc == nearest:
                         nearestarcs.append(nextarc)           
-            
-    return(nearestarcs, nearest, k)
-
-
-def findnearestIFarcs(previousarc, unservedarcs, tripload, routecost):
-    '''
-    Find the nearest servisable arc that can be serviced after 
-    visiting a dumpsite while taking maxtrip restriction into account
-    '''
-    cdef int nReqArcs, nextarc, disttoarc, i
-    cdef double nearest
-    
-    nearest = huge
-    nearestarcs = []
-    
-    nReqArcs = len(unservedarcs)
-    for i from 0 <= i < nReqArcs:
-        nextarc = unservedarcs[i]
-        disttoarc = if_cost[previousarc][nextarc]
-        if disttoarc <= nearest:
-        
-            triplimitflag = testtriplimit(nextarc, disttoarc, routecost)    
-            if triplimitflag:
-                if disttoarc < nearest:
-                    nearest = disttoarc
-                    nearestarcs = [nextarc]
-                elif disttoarc == nearest:
-                    nearestarcs.append(nextarc)           
-            
-    return(nearestarcs, nearest)
-
 
-    
\ No newline at end of file
+        return(nearestarcs, nearest)
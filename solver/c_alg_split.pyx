@@ -0,0 +1,684 @@
+# -*- coding: utf-8 -*-
+"""Split giant routes into MCARP and MCARPTIF solutions with array dynamic
+programmes.
+
+The Ulusoy splits of `py_alg_ulusoy_partition` and `alg_Ulusoy_part_c` build
+the auxiliary graph of each giant route as nested dictionaries, with an edge
+for every feasible sub-sequence, and then find the shortest path through it.
+`SplitEngine` finds the same shortest path without the graph, in the style of
+the linear Split of Vidal (2016). For a giant route a_0, ..., a_{n-1} it keeps
+prefix sums of the service cost, demand and deadhead between consecutive
+arcs:
+
+    S[t] = service cost of a_0, ..., a_{t-1}
+    L[t] = demand of a_0, ..., a_{t-1}
+    SP[t] = deadhead cost from a_0 to a_t along the giant route
+
+so that the cost of a trip serving a_i, ..., a_{j-1} is
+
+    d[depot][a_i] + S[j] - S[i] + SP[j - 1] - SP[i] + d[a_{j-1}][depot]
+        + dumpCost
+
+The part that depends on i is the same for every j, and the trips that can
+end at j are those with L[j] - L[i] <= capacity, a window that moves forward
+with j. The best trip start is kept at the front of a monotone deque, which
+gives the capacity split, `split_capacity`, in O(n).
+
+With intermediate facilities, `split`, a route starting at a_k consists of
+trips that end with the best IF visit to the next trip, `if_cost`, or to the
+depot. The cheapest route serving a_k, ..., a_{j-1} is found with the same
+deque, over the trip starts of the route, for all j at once. Routes are
+extended until they have to be longer than `maxTrip`, and the routes
+are then split over vehicles, minimising the number of vehicles, then the
+cost. This takes O(n m) time, with m the number of arcs per route, so it is
+linear in the length of the giant route if the route duration limits the
+number of arcs per route, and O(n^2) if it does not.
+
+`split_oriented` and `split_capacity_oriented` also choose the service
+direction of each edge task, which the other splits take as given. The
+cheapest trip serving a_b, ..., a_t depends on the orientations of a_b and
+a_t, and is found for all four with a two-state dynamic programme over the
+orientations of the arcs in between. The routes are then built as before,
+from trips that start and end in each orientation, with the IF costs
+between the end and start orientations of consecutive trips. The deque does
+not apply to these costs, so each trip end is compared with all trip starts
+within the capacity, which takes O(n m q) time, with q the number of arcs
+per trip.
+
+    >>> splitter = SplitEngine(info)
+    >>> cost, routes = splitter.split(giant_route)
+    >>> solution = splitter.solution(giant_route)
+    >>> solution['TotalCost'] == cost
+    True
+
+Costs include the dump cost of each trip, as in the solution dictionaries.
+With IFs it is part of `if_cost`.
+
+Vidal, T. (2016). Technical note: Split algorithm in O(n) for the capacitated
+vehicle routing problem. Computers & Operations Research, 69, 40-47.
+"""
+
+import logging
+import numpy as np
+cimport cython
+from solver.c_buffers import int32_buffer, inverse_arc_buffer
+import solver.py_solution_builders as build_solution
+
+cdef long long HUGE = 2 ** 62
+
+
+cdef class SplitEngine:
+    """Split giant routes without auxiliary graphs, see the module
+    docstring."""
+
+    cdef readonly object info
+    cdef readonly int depot
+    cdef readonly long long capacity, maxTrip, dumpCost
+    cdef int[:, ::1] d
+    cdef int[:, ::1] if_cost
+    cdef long long[::1] demand, service
+    cdef int[::1] inverse
+
+    #  Work arrays of the current giant route, see `_set_route`.
+    cdef Py_ssize_t n
+    cdef int[::1] route
+    cdef long long[::1] S, L, SP, IFnext, IFdepot
+    cdef long long[::1] T, key, R, K, C
+    cdef Py_ssize_t[::1] Tpred, Rpred, pred, queue
+
+    #  Work arrays of oriented splits, see `_set_oriented_route`.
+    cdef int[:, ::1] arcs
+    cdef long long[::1] W, MS, MD
+    cdef signed char[::1] Wpred
+    cdef Py_ssize_t[::1] W_start, W_length
+    cdef long long[:, ::1] T2, IF2depot
+    cdef long long[:, :, ::1] IF2next
+    cdef Py_ssize_t[:, :, ::1] T2pred
+    cdef Py_ssize_t[:, ::1] R2pred
+
+    def __init__(self, info):
+        """
+        Arg:
+            info (namedtuple): converted input data of a problem instance. See
+                help(`converter.load_data.load_instance`) for more info.
+        """
+        self.info = info
+        self.depot = info.depotnewkey
+        self.capacity = info.capacity
+        self.dumpCost = info.dumpCost
+        if getattr(info, 'maxTrip', None) is None:
+            self.maxTrip = HUGE
+        else:
+            self.maxTrip = info.maxTrip
+        self.d = int32_buffer(info.d)
+        if getattr(info, 'if_cost_np', None) is not None:
+            self.if_cost = int32_buffer(info.if_cost_np)
+        self.demand = np.asarray(info.demandL, dtype=np.int64)
+        self.service = np.asarray(info.serveCostL, dtype=np.int64)
+        self.inverse = inverse_arc_buffer(info.reqInvArcList)
+        self.n = 0
+
+    def _set_route(self, giant_route):
+        """Set the prefix sums and work arrays of a giant route.
+
+        Raise:
+            ValueError: if the demand of an arc exceeds the capacity.
+        """
+        cdef Py_ssize_t t, n
+        cdef int a, b
+        route = np.ascontiguousarray(giant_route, dtype=np.int32)
+        n = route.shape[0]
+        if n and np.asarray(self.demand)[route].max() > self.capacity:
+            logging.error('Arc demand exceeds the vehicle capacity, the giant '
+                          'route cannot be split')
+            raise ValueError
+        self.n = n
+        self.route = route
+        self.S = np.zeros(n + 1, dtype=np.int64)
+        self.L = np.zeros(n + 1, dtype=np.int64)
+        self.SP = np.zeros(n + 1, dtype=np.int64)
+        self.IFnext = np.zeros(n + 1, dtype=np.int64)
+        self.IFdepot = np.zeros(n + 1, dtype=np.int64)
+        self.T = np.zeros(n + 1, dtype=np.int64)
+        self.key = np.zeros(n + 1, dtype=np.int64)
+        self.R = np.zeros(n + 1, dtype=np.int64)
+        self.K = np.zeros(n + 1, dtype=np.int64)
+        self.C = np.zeros(n + 1, dtype=np.int64)
+        self.Tpred = np.zeros(n + 1, dtype=np.intp)
+        self.Rpred = np.zeros(n + 1, dtype=np.intp)
+        self.pred = np.zeros(n + 1, dtype=np.intp)
+        self.queue = np.zeros(n + 1, dtype=np.intp)
+
+        for t in range(n):
+            a = self.route[t]
+            self.S[t + 1] = self.S[t] + self.service[a]
+            self.L[t + 1] = self.L[t] + self.demand[a]
+            if t + 1 < n:
+                b = self.route[t + 1]
+                self.SP[t + 1] = self.SP[t] + self.d[a, b]
+        if self.if_cost is not None:
+            for t in range(n):
+                a = self.route[t]
+                self.IFdepot[t] = self.if_cost[a, self.depot]
+                if t + 1 < n:
+                    self.IFnext[t] = self.if_cost[a, self.route[t + 1]]
+
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    cdef Py_ssize_t _route_ends(self, Py_ssize_t k):
+        """Set R[j] to the cost of the cheapest route serving a_k, ..., a_{j-1}
+        with IF visits between its trips, for j = k + 1, ..., and return the
+        first j for which the route has to be longer than `maxTrip`.
+        Rpred[j] is the start of the last trip of the route and Tpred the
+        start of the trip before each trip, for `_route_trips`.
+
+        T[b] is the cheapest cost of serving a_k, ..., a_{b-1} and reaching
+        a_b from an IF, and key[b] = T[b] - S[b] - SP[b] is the part of the
+        cost of a trip starting at b that does not depend on its end.
+        """
+        cdef Py_ssize_t n = self.n
+        cdef Py_ssize_t head = 0, tail = 0, j, b
+        cdef long long d_start = self.d[self.depot, self.route[k]]
+        cdef long long base, lower_bound
+        self.T[k] = d_start
+        self.key[k] = d_start - self.S[k] - self.SP[k]
+        self.queue[tail] = k
+        tail += 1
+        for j in range(k + 1, n + 1):
+            lower_bound = d_start + self.S[j] - self.S[k] + self.SP[j - 1] - \
+                self.SP[k]
+            if j > k + 1 and lower_bound > self.maxTrip:
+                return j
+            while self.L[j] - self.L[self.queue[head]] > self.capacity:
+                head += 1
+            b = self.queue[head]
+            base = self.key[b] + self.S[j] + self.SP[j - 1]
+            self.R[j] = base + self.IFdepot[j - 1]
+            self.Rpred[j] = b
+            if j < n:
+                self.T[j] = base + self.IFnext[j - 1]
+                self.Tpred[j] = b
+                self.key[j] = self.T[j] - self.S[j] - self.SP[j]
+                while tail > head and self.key[self.queue[tail - 1]] >= \
+                        self.key[j]:
+                    tail -= 1
+                self.queue[tail] = j
+                tail += 1
+        return n + 1
+
+    cdef list _route_trips(self, Py_ssize_t k, Py_ssize_t j):
+        """Return the trips of the cheapest route serving a_k, ..., a_{j-1}."""
+        cdef Py_ssize_t b, end
+        self._route_ends(k)
+        route = np.asarray(self.route)
+        trips = []
+        end = j
+        b = self.Rpred[j]
+        while True:
+            trips.append(route[b:end].tolist())
+            if b == k:
+                break
+            end = b
+            b = self.Tpred[b]
+        trips.reverse()
+        return trips
+
+    cdef inline bint _better(self, long long k_new, long long c_new,
+                             long long k_old, long long c_old, bint min_k):
+        if min_k and k_new != k_old:
+            return k_new < k_old
+        return c_new < c_old
+
+    def split(self, giant_route, min_k=True):
+        """Split a giant route into routes with IF visits, that satisfy the
+        vehicle capacity on each trip and `maxTrip` on each route.
+
+        Arg:
+            giant_route (list <int>): required arcs in service order, without
+                depot and IF visits.
+
+        Kwarg:
+            min_k (bool): minimise the number of routes, then the cost, else
+                only the cost.
+
+        Return:
+            cost (int): total cost of the routes.
+            routes (list <list <list>>): trips of each route, without depot
+                and IF visits, as used by
+                `py_solution_builders.build_CLARPIF_dict`.
+
+        Raise:
+            ValueError: if the demand of an arc exceeds the capacity.
+        """
+        cdef Py_ssize_t n, k, j, j_end
+        cdef long long cost
+        if self.if_cost is None:
+            logging.error('The instance has no IF costs, use split_capacity')
+            raise ValueError
+        self._set_route(giant_route)
+        n = self.n
+        if n == 0:
+            return 0, []
+        cdef long long[::1] K = np.full(n + 1, HUGE, dtype=np.int64)
+        cdef long long[::1] C = np.full(n + 1, HUGE, dtype=np.int64)
+        K[0] = 0
+        C[0] = 0
+        for k in range(n):
+            if K[k] == HUGE:
+                continue
+            j_end = self._route_ends(k)
+            for j in range(k + 1, j_end):
+                if j > k + 1 and self.R[j] > self.maxTrip:
+                    continue
+                cost = C[k] + self.R[j]
+                if self._better(K[k] + 1, cost, K[j], C[j], min_k):
+                    K[j] = K[k] + 1
+                    C[j] = cost
+                    self.pred[j] = k
+
+        routes = []
+        j = n
+        while j > 0:
+            k = self.pred[j]
+            routes.append(self._route_trips(k, j))
+            j = k
+        routes.reverse()
+        return int(C[n]), routes
+
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    def split_capacity(self, giant_route, min_k=True):
+        """Split a giant route into depot-to-depot routes that satisfy the
+        vehicle capacity, in O(n). The route duration is not limited, as in
+        `py_alg_ulusoy_partition.Ulusoys`.
+
+        Arg:
+            giant_route (list <int>): required arcs in service order, without
+                depot visits.
+
+        Kwarg:
+            min_k (bool): minimise the number of routes, then the cost, else
+                only the cost.
+
+        Return:
+            cost (int): total cost of the routes.
+            routes (list <list>): arcs of each route, without depot visits.
+
+        Raise:
+            ValueError: if the demand of an arc exceeds the capacity.
+        """
+        cdef Py_ssize_t n, i, j, head = 0, tail = 0
+        self._set_route(giant_route)
+        n = self.n
+        if n == 0:
+            return 0, []
+        cdef int depot = self.depot
+        cdef long long[::1] K = self.K
+        cdef long long[::1] C = self.C
+        cdef long long[::1] key = self.key
+        K[0] = 0
+        C[0] = 0
+        key[0] = self.d[depot, self.route[0]]
+        self.queue[tail] = 0
+        tail += 1
+        for j in range(1, n + 1):
+            while self.L[j] - self.L[self.queue[head]] > self.capacity:
+                head += 1
+            i = self.queue[head]
+            K[j] = K[i] + 1
+            C[j] = key[i] + self.S[j] + self.SP[j - 1] + \
+                self.d[self.route[j - 1], depot] + self.dumpCost
+            self.pred[j] = i
+            if j < n:
+                #  Cost of routes before j plus the part of the cost of a
+                #  route starting at j that does not depend on its end.
+                key[j] = C[j] + self.d[depot, self.route[j]] - self.S[j] - \
+                    self.SP[j]
+                while tail > head and not self._better(
+                        K[self.queue[tail - 1]], key[self.queue[tail - 1]],
+                        K[j], key[j], min_k):
+                    tail -= 1
+                self.queue[tail] = j
+                tail += 1
+
+        route = np.asarray(self.route)
+        routes = []
+        j = n
+        while j > 0:
+            i = self.pred[j]
+            routes.append(route[i:j].tolist())
+            j = i
+        routes.reverse()
+        return int(C[n]), routes
+
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    def _set_oriented_route(self, giant_route):
+        """Set the work arrays of the oriented splits of a giant route.
+
+        arcs[t] holds a_t and its inverse, or a_t twice if it has none. W
+        holds the cheapest service and deadhead cost of each trip serving
+        a_b, ..., a_t within the capacity, with a_b in orientation o and a_t
+        in orientation p, at W[4 (W_start[b] + t - b) + 2 o + p], and Wpred
+        the orientation of a_{t-1} on that trip. MS and MD are prefix sums of
+        the cheapest service cost of each arc, and of the cheapest deadhead
+        between consecutive arcs, over their orientations, which bound the
+        duration of routes. IF2next and IF2depot are the IF costs from a_t to
+        a_{t+1} and to the depot, in each orientation.
+
+        Raise:
+            ValueError: if the demand of an arc exceeds the capacity.
+        """
+        cdef Py_ssize_t n, b, c, t, w
+        cdef int o, p, q, x, y
+        cdef long long cost, best
+        cdef signed char best_q
+        self._set_route(giant_route)
+        n = self.n
+        route = np.asarray(self.route)
+        inverse = np.asarray(self.inverse)[route]
+        arcs = np.empty((n, 2), dtype=np.int32)
+        arcs[:, 0] = route
+        arcs[:, 1] = np.where(inverse == -1, route, inverse)
+        self.arcs = arcs
+
+        L = np.asarray(self.L)
+        W_length = np.searchsorted(L, L[:n] + self.capacity, side='right') - \
+            1 - np.arange(n)
+        W_start = np.zeros(n + 1, dtype=np.intp)
+        np.cumsum(W_length, out=W_start[1:])
+        self.W_length = W_length.astype(np.intp)
+        self.W_start = W_start
+        self.W = np.full(4 * W_start[n], HUGE, dtype=np.int64)
+        self.Wpred = np.zeros(4 * W_start[n], dtype=np.int8)
+        for b in range(n):
+            w = self.W_start[b]
+            for o in range(2):
+                self.W[4 * w + 2 * o + o] = self.service[self.arcs[b, o]]
+            for c in range(1, self.W_length[b]):
+                t = b + c
+                w = self.W_start[b] + c
+                for o in range(2):
+                    for p in range(2):
+                        y = self.arcs[t, p]
+                        best = HUGE
+                        best_q = 0
+                        for q in range(2):
+                            cost = self.W[4 * (w - 1) + 2 * o + q]
+                            if cost == HUGE:
+                                continue
+                            cost += self.d[self.arcs[t - 1, q], y]
+                            if cost < best:
+                                best = cost
+                                best_q = q
+                        self.W[4 * w + 2 * o + p] = best + self.service[y]
+                        self.Wpred[4 * w + 2 * o + p] = best_q
+
+        self.MS = np.zeros(n + 1, dtype=np.int64)
+        self.MD = np.zeros(n + 1, dtype=np.int64)
+        for t in range(n):
+            x = self.arcs[t, 0]
+            y = self.arcs[t, 1]
+            self.MS[t + 1] = self.MS[t] + min(self.service[x], self.service[y])
+            if t + 1 < n:
+                best = HUGE
+                for o in range(2):
+                    for p in range(2):
+                        best = min(best, self.d[self.arcs[t, o],
+                                                self.arcs[t + 1, p]])
+                self.MD[t + 1] = self.MD[t] + best
+        if self.if_cost is not None:
+            if_cost = np.asarray(self.if_cost)
+            self.IF2depot = if_cost[arcs, self.depot].astype(np.int64)
+            if_next = np.zeros((n, 2, 2), dtype=np.int64)
+            if_next[:n - 1] = if_cost[arcs[:-1, :, None], arcs[1:, None, :]]
+            self.IF2next = if_next
+        self.T2 = np.full((n + 1, 2), HUGE, dtype=np.int64)
+        self.T2pred = np.zeros((n + 1, 2, 3), dtype=np.intp)
+        self.R2pred = np.zeros((n + 1, 3), dtype=np.intp)
+
+    cdef list _oriented_trip(self, Py_ssize_t b, int o, Py_ssize_t t, int p):
+        """Return the cheapest trip serving a_b, ..., a_t, with a_b in
+        orientation o and a_t in orientation p."""
+        cdef Py_ssize_t w
+        trip = [self.arcs[t, p]]
+        while t > b:
+            w = self.W_start[b] + t - b
+            p = self.Wpred[4 * w + 2 * o + p]
+            t -= 1
+            trip.append(self.arcs[t, p])
+        trip.reverse()
+        return trip
+
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    cdef Py_ssize_t _oriented_route_ends(self, Py_ssize_t k):
+        """Set R[j] to the cost of the cheapest route serving a_k, ..., a_{j-1}
+        with IF visits between its trips, in the best orientations, and
+        return the first j for which the route has to be longer than
+        `maxTrip`, as `_route_ends`.
+
+        T2[b, o] is the cheapest cost of serving a_k, ..., a_{b-1} and
+        reaching a_b in orientation o from an IF, and T2pred[b, o] the start,
+        start orientation and end orientation of the trip before it. R2pred
+        is the same for the last trip of the route. The trips that end at
+        a_t are compared first, so that the IF costs are only added once for
+        each orientation of a_t.
+        """
+        cdef Py_ssize_t n = self.n
+        cdef Py_ssize_t j_end, b, t, w
+        cdef int o, p, q
+        cdef long long d_start, cost, value
+        cdef long long end_cost[2]
+        cdef Py_ssize_t end_start[2]
+        cdef int end_orientation[2]
+        d_start = min(self.d[self.depot, self.arcs[k, 0]],
+                      self.d[self.depot, self.arcs[k, 1]])
+        j_end = k + 2
+        while j_end <= n and d_start + self.MS[j_end] - self.MS[k] + \
+                self.MD[j_end - 1] - self.MD[k] <= self.maxTrip:
+            j_end += 1
+        for t in range(k, j_end):
+            self.T2[t, 0] = HUGE
+            self.T2[t, 1] = HUGE
+            self.R[t] = HUGE
+        for o in range(2):
+            self.T2[k, o] = self.d[self.depot, self.arcs[k, o]]
+
+        for t in range(k, j_end - 1):
+            end_cost[0] = HUGE
+            end_cost[1] = HUGE
+            b = t
+            while b >= k and self.L[t + 1] - self.L[b] <= self.capacity:
+                w = self.W_start[b] + t - b
+                for o in range(2):
+                    if self.T2[b, o] == HUGE:
+                        continue
+                    for p in range(2):
+                        cost = self.W[4 * w + 2 * o + p]
+                        if cost == HUGE:
+                            continue
+                        cost += self.T2[b, o]
+                        if cost < end_cost[p]:
+                            end_cost[p] = cost
+                            end_start[p] = b
+                            end_orientation[p] = o
+                b -= 1
+            for p in range(2):
+                if end_cost[p] == HUGE:
+                    continue
+                value = end_cost[p] + self.IF2depot[t, p]
+                if value < self.R[t + 1]:
+                    self.R[t + 1] = value
+                    self.R2pred[t + 1, 0] = end_start[p]
+                    self.R2pred[t + 1, 1] = end_orientation[p]
+                    self.R2pred[t + 1, 2] = p
+                if t + 1 >= j_end - 1:
+                    continue
+                for q in range(2):
+                    value = end_cost[p] + self.IF2next[t, p, q]
+                    if value < self.T2[t + 1, q]:
+                        self.T2[t + 1, q] = value
+                        self.T2pred[t + 1, q, 0] = end_start[p]
+                        self.T2pred[t + 1, q, 1] = end_orientation[p]
+                        self.T2pred[t + 1, q, 2] = p
+        return j_end
+
+    cdef list _oriented_route_trips(self, Py_ssize_t k, Py_ssize_t j):
+        """Return the trips of the cheapest route serving a_k, ..., a_{j-1},
+        in the best orientations."""
+        cdef Py_ssize_t b, end
+        cdef int o, p, q
+        self._oriented_route_ends(k)
+        trips = []
+        end = j
+        b = self.R2pred[j, 0]
+        o = self.R2pred[j, 1]
+        p = self.R2pred[j, 2]
+        while True:
+            trips.append(self._oriented_trip(b, o, end - 1, p))
+            if b == k:
+                break
+            end = b
+            q = o
+            b = self.T2pred[end, q, 0]
+            o = self.T2pred[end, q, 1]
+            p = self.T2pred[end, q, 2]
+        trips.reverse()
+        return trips
+
+    def split_oriented(self, giant_route, min_k=True):
+        """Split a giant route as `split`, and choose the service direction
+        of each edge task, and so the IFs between trips, in the same
+        dynamic programme. Each position has one state per orientation, so
+        this takes about four times as long as `split`.
+
+        Arg:
+            giant_route (list <int>): required arcs in service order, without
+                depot and IF visits. Edges may be given in either direction.
+
+        Kwarg:
+            min_k (bool): minimise the number of routes, then the cost, else
+                only the cost.
+
+        Return:
+            cost (int): total cost of the routes.
+            routes (list <list <list>>): trips of each route, with edges in
+                their best directions.
+
+        Raise:
+            ValueError: if the demand of an arc exceeds the capacity.
+        """
+        cdef Py_ssize_t n, k, j, j_end
+        cdef long long cost
+        if self.if_cost is None:
+            logging.error('The instance has no IF costs, use '
+                          'split_capacity_oriented')
+            raise ValueError
+        self._set_oriented_route(giant_route)
+        n = self.n
+        if n == 0:
+            return 0, []
+        cdef long long[::1] K = np.full(n + 1, HUGE, dtype=np.int64)
+        cdef long long[::1] C = np.full(n + 1, HUGE, dtype=np.int64)
+        K[0] = 0
+        C[0] = 0
+        for k in range(n):
+            if K[k] == HUGE:
+                continue
+            j_end = self._oriented_route_ends(k)
+            for j in range(k + 1, j_end):
+                if j > k + 1 and self.R[j] > self.maxTrip:
+                    continue
+                cost = C[k] + self.R[j]
+                if self._better(K[k] + 1, cost, K[j], C[j], min_k):
+                    K[j] = K[k] + 1
+                    C[j] = cost
+                    self.pred[j] = k
+
+        routes = []
+        j = n
+        while j > 0:
+            k = self.pred[j]
+            routes.append(self._oriented_route_trips(k, j))
+            j = k
+        routes.reverse()
+        return int(C[n]), routes
+
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    def split_capacity_oriented(self, giant_route, min_k=True):
+        """Split a giant route as `split_capacity`, and choose the service
+        direction of each edge task in the same dynamic programme.
+
+        Arg:
+            giant_route (list <int>): required arcs in service order, without
+                depot visits. Edges may be given in either direction.
+
+        Kwarg:
+            min_k (bool): minimise the number of routes, then the cost, else
+                only the cost.
+
+        Return:
+            cost (int): total cost of the routes.
+            routes (list <list>): arcs of each route, with edges in their best
+                directions.
+
+        Raise:
+            ValueError: if the demand of an arc exceeds the capacity.
+        """
+        cdef Py_ssize_t n, i, j, c, w
+        cdef int o, p
+        cdef long long cost, k_new
+        self._set_oriented_route(giant_route)
+        n = self.n
+        if n == 0:
+            return 0, []
+        cdef int depot = self.depot
+        cdef long long[::1] K = np.full(n + 1, HUGE, dtype=np.int64)
+        cdef long long[::1] C = np.full(n + 1, HUGE, dtype=np.int64)
+        K[0] = 0
+        C[0] = 0
+        for i in range(n):
+            if K[i] == HUGE:
+                continue
+            k_new = K[i] + 1
+            for c in range(self.W_length[i]):
+                j = i + c + 1
+                w = self.W_start[i] + c
+                for o in range(2):
+                    for p in range(2):
+                        cost = self.W[4 * w + 2 * o + p]
+                        if cost == HUGE:
+                            continue
+                        cost += C[i] + self.d[depot, self.arcs[i, o]] + \
+                            self.d[self.arcs[j - 1, p], depot] + self.dumpCost
+                        if self._better(k_new, cost, K[j], C[j], min_k):
+                            K[j] = k_new
+                            C[j] = cost
+                            self.R2pred[j, 0] = i
+                            self.R2pred[j, 1] = o
+                            self.R2pred[j, 2] = p
+
+        routes = []
+        j = n
+        while j > 0:
+            i = self.R2pred[j, 0]
+            routes.append(self._oriented_trip(i, self.R2pred[j, 1], j - 1,
+                                              self.R2pred[j, 2]))
+            j = i
+        routes.reverse()
+        return int(C[n]), routes
+
+    def solution(self, giant_route, min_k=True, oriented=False):
+        """Return the MCARPTIF solution dictionary of `split`, or of
+        `split_oriented` if `oriented`."""
+        info = self.info
+        if oriented:
+            routes = self.split_oriented(giant_route, min_k)[1]
+        else:
+            routes = self.split(giant_route, min_k)[1]
+        return build_solution.build_CLARPIF_dict(routes, info.if_arc_np,
+                                                 self.depot, info.d,
+                                                 info.serveCostL,
+                                                 info.dumpCost, info.demandL)
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""Instance data as the C-contiguous int32 buffers used by the Cython
+kernels.
+
+The kernels read the matrices through typed memoryviews, so arrays that are
+already C-contiguous int32, such as the memory-mapped matrices of binary
+converted instances, are used without a copy. Python lists of lists, as
+loaded from the pickled format, are copied once with typed loops.
+"""
+
+import numpy as np
+
+
+def int32_buffer(values):
+    """Return values as a C-contiguous int32 array, without a copy if it
+    already is one.
+
+    Arg:
+        values (list/np.array): vector or matrix, such as `info.d`.
+
+    Return:
+        buffer (np.array <int32>): C-contiguous array, may be read-only.
+    """
+    if isinstance(values, np.ndarray) or not isinstance(values, list) or \
+            not values or not isinstance(values[0], list):
+        return np.ascontiguousarray(values, dtype=np.int32)
+    return _int32_matrix_from_lists(values)
+
+
+def _int32_matrix_from_lists(list values):
+    """Copy a list of equal length lists into an int32 matrix."""
+    cdef Py_ssize_t i, j, n_rows, n_columns
+    cdef list row
+    n_rows = len(values)
+    n_columns = len(values[0])
+    buffer = np.empty((n_rows, n_columns), dtype=np.int32)
+    cdef int[:, ::1] buffer_view = buffer
+    for i in range(n_rows):
+        row = values[i]
+        if len(row) != n_columns:
+            return np.ascontiguousarray(values, dtype=np.int32)
+        for j in range(n_columns):
+            buffer_view[i, j] = row[j]
+    return buffer
+
+
+def inverse_arc_buffer(inv_list):
+    """Return the inverse arc of each arc as an int32 array, with -1 for arcs
+    without an inverse.
+
+    Arg:
+        inv_list (list): inverse arc of each arc, None if it doesn't have
+            one, such as `info.reqInvArcList`.
+
+    Return:
+        buffer (np.array <int32>): inverse arcs.
+    """
+    return np.array([-1 if arc is None else arc for arc in inv_list],
+                    dtype=np.int32)
@@ -1430,6 +1430,7 @@ class CalcMoveCosts(object):
         self._edgesL = [arc for arc, invFlag in enumerate(self._inv) if invFlag != None]
         self._edgesS = set(self._edgesL)
         self.cModules = cModules
+        self._c_context = None # C move cost context, see `initiateCmodules`
         self.route = []
         self._dumpCost = info.dumpCost
         self._dummyArcs = {self._depot}
@@ -1447,19 +1448,19 @@ class CalcMoveCosts(object):
         '''
         '''
         if self.cModules:
-            c_calcMoveCost.init_input(self._d, self._nnList, self._inv, self._dumpCost, self._dummyArcs)
+            self._c_context = c_calcMoveCost.MoveCostContext(self._d, self._nnList, self._inv, self._dumpCost, self._dummyArcs)
         
     def freeCmodules(self):
         '''
         '''
         if self.cModules:
-            c_calcMoveCost.free_input()
+            self._c_context = None
     
     def setRoute(self, route):
         '''
         '''
         if self.cModules:
-            c_calcMoveCost.init_route(route)
+            self._c_context.init_route(route)
         else:
             self.route = route
             routeMapping = [-1]*len(self._d)
@@ -1474,14 +1475,14 @@ class CalcMoveCosts(object):
         '''
         '''
         if self.cModules:
-            c_calcMoveCost.free_route()     
+            self._c_context.free_route()     
     
     def _twoArcCost(self, preArc, arc):
         '''
         Calculate the cost between two arcs.
         '''
         if self.cModules: 
-            return(c_calcMoveCost._twoArcCost(preArc, arc))
+            return(self._c_context._twoArcCost(preArc, arc))
         else: 
             cost = self._d[preArc][arc]
         return(cost)
@@ -1491,7 +1492,7 @@ class CalcMoveCosts(object):
         Calculate the cost of two consecutive arcs in a route.
         '''
         if self.cModules: 
-            return(c_calcMoveCost._twoSeqCost(arcPosition))
+            return(self._c_context._twoSeqCost(arcPosition))
         else:
             preArc = self.route[arcPosition - 1]
             arc = self.route[arcPosition]
@@ -1503,7 +1504,7 @@ class CalcMoveCosts(object):
         Calculate the cost between three arcs.
         '''
         if self.cModules: 
-            return(c_calcMoveCost._threeArcCost(preArc, arc, postArc))
+            return(self._c_context._threeArcCost(preArc, arc, postArc))
         else:
             cost = self._d[preArc][arc] + self._d[arc][postArc]
         return(cost)
@@ -1513,7 +1514,7 @@ class CalcMoveCosts(object):
         Calculate the cost of three consecutive arcs in a route.
         '''
         if self.cModules:
-            return(c_calcMoveCost._threeSeqCost(arcPosition))
+            return(self._c_context._threeSeqCost(arcPosition))
         else:         
             preArc = self.route[arcPosition - 1]
             arc = self.route[arcPosition]
@@ -1526,7 +1527,7 @@ class CalcMoveCosts(object):
         Calculate the cost of removing an arc.
         '''
         if self.cModules:
-            return(c_calcMoveCost._calcRemoveCost(arcPosition))
+            return(self._c_context._calcRemoveCost(arcPosition))
         else:    
             (currentCost, preArc, currentArc, postArc) = self._threeSeqCost(arcPosition)
             newCost = self._twoArcCost(preArc, postArc)
@@ -1538,7 +1539,7 @@ class CalcMoveCosts(object):
         Calculate the cost of inserting an arc in a position.
         '''
         if self.cModules:
-            return(c_calcMoveCost._calcInsertCost(arcPosition, arc))
+            return(self._c_context._calcInsertCost(arcPosition, arc))
         else:  
             (currentCost, preArc, postArc) = self._twoSeqCost(arcPosition)
             newCost = self._threeArcCost(preArc, arc, postArc)
@@ -1550,7 +1551,7 @@ class CalcMoveCosts(object):
         Calculate the cost of replacing an arc in a position.
         '''
         if self.cModules:
-            return(c_calcMoveCost._calcReplaceCost(arcP, arc))
+            return(self._c_context._calcReplaceCost(arcP, arc))
         else:  
             preArc = self.route[arcP - 1]
             currentArc = self.route[arcP]
@@ -1595,7 +1596,7 @@ class CalcMoveCosts(object):
         an arc to the end of a route and replacing an arc with its inverse self.
         '''
         if self.cModules:
-            return(c_calcMoveCost._relocateToPositions(arcRelocate, arcPositionRemove, netCostRemove, arcToInsertAt, threshold))
+            return(self._c_context._relocateToPositions(arcRelocate, arcPositionRemove, netCostRemove, arcToInsertAt, threshold))
         else:
             savings = []
             for arcToRelocateBefore in arcToInsertAt:
@@ -1614,7 +1615,7 @@ class CalcMoveCosts(object):
         an arc to the end of a route and replacing an arc with its inverse self.
         '''
         if self.cModules:
-            return(c_calcMoveCost._relocateToPositions(arcRelocate, arcPositionRemove, netCostRemove, arcToInsertAt, threshold))
+            return(self._c_context._relocateToPositions(arcRelocate, arcPositionRemove, netCostRemove, arcToInsertAt, threshold))
         else:
             savings = []
             for arcToRelocateAfter in arcToInsertAt:
@@ -1635,9 +1636,9 @@ class CalcMoveCosts(object):
         an arc to the end of a route and replacing an arc with its inverse self.
         '''
         if self.cModules and self.autoInvCosts:
-            return(c_calcMoveCost.relocateMovesWithInv(relocateCandidates, arcToRelocateBeforeCandidates, threshold, nNearest))
+            return(self._c_context.relocateMovesWithInv(relocateCandidates, arcToRelocateBeforeCandidates, threshold, nNearest))
         elif self.cModules:
-            return(c_calcMoveCost.relocateMoves(relocateCandidates, arcToRelocateBeforeCandidates, threshold, nNearest))
+            return(self._c_context.relocateMoves(relocateCandidates, arcToRelocateBeforeCandidates, threshold, nNearest))
         else:
             savings = []
             (arcToRelocateBeforeCandidates, threshold) = self._initiateMoveCostCalculations(arcToRelocateBeforeCandidates, threshold)
@@ -1658,9 +1659,9 @@ class CalcMoveCosts(object):
         an arc to the end of a route and replacing an arc with its inverse self.
         '''
         if self.cModules and self.autoInvCosts:
-            return(c_calcMoveCost.relocateMovesWithInv(relocateCandidates, arcToRelocateBeforeCandidates, threshold, nNearest))
+            return(self._c_context.relocateMovesWithInv(relocateCandidates, arcToRelocateBeforeCandidates, threshold, nNearest))
         elif self.cModules:
-            return(c_calcMoveCost.relocateMoves(relocateCandidates, arcToRelocateBeforeCandidates, threshold, nNearest))
+            return(self._c_context.relocateMoves(relocateCandidates, arcToRelocateBeforeCandidates, threshold, nNearest))
         else:
             savings = []
             (arcToRelocateBeforeCandidates, threshold) = self._initiateMoveCostCalculations(arcToRelocateBeforeCandidates, threshold)
@@ -1680,7 +1681,7 @@ class CalcMoveCosts(object):
         Calculate the move cost of exchanging a specified arc with other arcs.
         '''
         if self.cModules and self.autoInvCosts:
-            return(c_calcMoveCost._exchangeWithPosition(arcsToExchange, arcExhangePosition1, preArc1, arcExchange1, postArc1, currenCost1, threshold))
+            return(self._c_context._exchangeWithPosition(arcsToExchange, arcExhangePosition1, preArc1, arcExchange1, postArc1, currenCost1, threshold))
         else:
             savings = []
             for arcExchange2 in arcsToExchange:
@@ -1732,9 +1733,9 @@ class CalcMoveCosts(object):
         exchange is determined, and its neighbours are used, which may include the depot arc.
         '''
         if self.cModules and self.autoInvCosts:
-            return(c_calcMoveCost.exchangeMovesWithInv(exchangeCandidatesI, exchangeCandidatesJ, threshold, nNearest))
+            return(self._c_context.exchangeMovesWithInv(exchangeCandidatesI, exchangeCandidatesJ, threshold, nNearest))
         elif self.cModules:
-            return(c_calcMoveCost.exchangeMoves(exchangeCandidatesI, exchangeCandidatesJ, threshold, nNearest))
+            return(self._c_context.exchangeMoves(exchangeCandidatesI, exchangeCandidatesJ, threshold, nNearest))
         else: 
             savings = []
             (exchangeCandidatesI, threshold) = self._initiateMoveCostCalculations(exchangeCandidatesI, threshold)
@@ -1752,7 +1753,7 @@ class CalcMoveCosts(object):
         Calculate the move costs with a specified arc and all others.
         '''
         if self.cModules:
-            return(c_calcMoveCost._exchangeWithPosition(arcsToExchange, arcExhangePosition1, preArc1, arcExchange1, currenCost1, threshold))
+            return(self._c_context._exchangeWithPosition(arcsToExchange, arcExhangePosition1, preArc1, arcExchange1, currenCost1, threshold))
         else:
             savings = []
             for arcExchange2 in arcsToExchange:
@@ -1774,7 +1775,7 @@ class CalcMoveCosts(object):
         Calculate the move cost of crossing two end sections in a route. Same principles applies as exchange.
         '''
         if self.cModules:
-            return(c_calcMoveCost.crossMoves(crossCandidatesI, crossCandidatesJ, threshold, nNearest))
+            return(self._c_context.crossMoves(crossCandidatesI, crossCandidatesJ, threshold, nNearest))
         else:
             savings = []
             (crossCandidatesI, threshold) = self._initiateMoveCostCalculations(crossCandidatesI, threshold)
@@ -1792,7 +1793,7 @@ class CalcMoveCosts(object):
         Calculate the move cost of inverting an edge arc task.
         '''
         if self.cModules:
-            return(c_calcMoveCost.flipMoves(flipCandidates, threshold))
+            return(self._c_context.flipMoves(flipCandidates, threshold))
         else:
             savings = []
             (flipCandidates, threshold) = self._initiateMoveCostCalculations(flipCandidates, threshold)
@@ -1814,9 +1815,9 @@ class CalcMoveCosts(object):
         First dummy arc(s) in the giant route should thus NOT be in dummyArcs set.
         '''
         if self.cModules and self.autoInvCosts:
-            return(c_calcMoveCost.relocateEndRouteMovesWithInv(relocateCandidates, routeDummyArcs, threshold, nNearest))
+            return(self._c_context.relocateEndRouteMovesWithInv(relocateCandidates, routeDummyArcs, threshold, nNearest))
         elif self.cModules:
-            return(c_calcMoveCost.relocateEndRouteMoves(relocateCandidates, routeDummyArcs, threshold, nNearest))
+            return(self._c_context.relocateEndRouteMoves(relocateCandidates, routeDummyArcs, threshold, nNearest))
         else:
             savings = []
             for dummyArcPosition in routeDummyArcs: # Arc will be inserted before the last dummy arc of a route, thus end of a route.
@@ -1852,7 +1853,7 @@ class CalcMoveCosts(object):
         Calculate the move cost of crossing two end sections in a route. Same principles applies as exchange.
         '''
         if self.cModules:
-            return(c_calcMoveCost.crossEndRouteMoves(crossCandidates, routeDummyArcs, threshold, nNearest))
+            return(self._c_context.crossEndRouteMoves(crossCandidates, routeDummyArcs, threshold, nNearest))
         else:
             savings = []
             for dummyArcPosition in routeDummyArcs: # Arc will be inserted before the last dummy arc of a route, thus end of a route.
@@ -1879,7 +1880,7 @@ class CalcMoveCosts(object):
         Calculate the cost between three arcs.
         '''
         if self.cModules: 
-            return(c_calcMoveCost._threeArcDoubleCost(preArc, arc1, arc2, postArc))
+            return(self._c_context._threeArcDoubleCost(preArc, arc1, arc2, postArc))
         else:
             cost = self._d[preArc][arc1] + self._d[arc2][postArc]
         return(cost)
@@ -1889,7 +1890,7 @@ class CalcMoveCosts(object):
         Calculate the cost of inserting an arc in a position.
         '''
         if self.cModules:
-            return(c_calcMoveCost._calcDoubleInsertCost(arcPosition, arc1, arc2))
+            return(self._c_context._calcDoubleInsertCost(arcPosition, arc1, arc2))
         else:  
             (currentCost, preArc, postArc) = self._twoSeqCost(arcPosition)
             newCost = self._threeArcDoubleCost(preArc, arc1, arc2, postArc)
@@ -1902,7 +1903,7 @@ class CalcMoveCosts(object):
         an arc to the end of a route and replacing an arc with its inverse self.
         '''
         if self.cModules:
-            return(c_calcMoveCost._doubleRelocateToPositions(arcRelocate1, arcRelocate2, removePreArc, removePostArc, arcPositionRemove, netCostRemove, arcToInsertAt, threshold))
+            return(self._c_context._doubleRelocateToPositions(arcRelocate1, arcRelocate2, removePreArc, removePostArc, arcPositionRemove, netCostRemove, arcToInsertAt, threshold))
         else:
             savings = []
             for arcToRelocateBefore in arcToInsertAt:
@@ -1920,7 +1921,7 @@ class CalcMoveCosts(object):
         Calculate the cost of three consecutive arcs in a route.
         '''
         if self.cModules:
-            return(c_calcMoveCost._threeSeqDoubleCost(arcPosition))
+            return(self._c_context._threeSeqDoubleCost(arcPosition))
         else:         
             preArc = self.route[arcPosition - 1]
             arc1 = self.route[arcPosition]
@@ -1934,7 +1935,7 @@ class CalcMoveCosts(object):
         Calculate the cost of removing an arc.
         '''
         if self.cModules:
-            return(c_calcMoveCost._calcDoubleRemoveCost(arcPosition))
+            return(self._c_context._calcDoubleRemoveCost(arcPosition))
         else:    
             (currentCost, preArc, currentArc1, currentArc2, postArc) = self._threeSeqDoubleCost(arcPosition)
             newCost = self._twoArcCost(preArc, postArc)
@@ -1947,7 +1948,7 @@ class CalcMoveCosts(object):
         an arc to the end of a route and replacing an arc with its inverse self.
         '''
         if self.cModules:
-            return(c_calcMoveCost.doubleRelocateMoves(relocateCandidates, arcToRelocateBeforeCandidates, threshold, nNearest))
+            return(self._c_context.doubleRelocateMoves(relocateCandidates, arcToRelocateBeforeCandidates, threshold, nNearest))
         else:
             savings = []
             (arcToRelocateBeforeCandidates, threshold) = self._initiateMoveCostCalculations(arcToRelocateBeforeCandidates, threshold)
@@ -1977,6 +1978,12 @@ class CalcMoveCostsMCARPTIFspecial(object):
         self._edgesL = [arc for arc, invFlag in enumerate(self._inv) if invFlag != None]
         self._edgesS = set(self._edgesL)
         self.cModules = cModules
+        self._c_context = None # C move cost context, see `initiateCmodules_MCARPTIF`
+        self.moveHeap = None # Keep all moves if None, see `setMoveHeap`
+        self.moveCache = False # See `setMoveCache`
+        self.nThreads = 1 # See `setThreads`
+        self.granularNeighbours = None # See `setGranularNeighbours`
+        self._granularSets = None
         self.route = []
         self._dumpCost = info.dumpCost
         
@@ -1997,20 +2004,104 @@ class CalcMoveCostsMCARPTIFspecial(object):
         '''
         '''
         if self.cModules:
-            calcMoveCostMCARPTIF_c.init_input(self._d, self._nnList, self._inv, self._dumpCost, self._dummyArcs, self._if_cost, self._ifs)
+            self._c_context = calcMoveCostMCARPTIF_c.MoveCostContext(self._d, self._nnList, self._inv, self._dumpCost, self._dummyArcs, self._if_cost, self._ifs)
+            self._c_context.moveHeap = self.moveHeap
+            self._c_context.enable_move_cache(self.moveCache)
+            self._c_context.set_threads(self.nThreads)
+            if self.granularNeighbours is not None:
+                self._c_context.set_granular_neighbours(*self.granularNeighbours)
         
     def freeCmodules_MCARPTIF(self):
         '''
         '''
         if self.cModules:
-            calcMoveCostMCARPTIF_c.free_input()
+            if self._c_context is not None: self._c_context.shutdown_threads()
+            self._c_context = None
             
+    def setMoveHeap(self, moveHeap):
+        '''
+        Offer moves to a bounded `calcMoveCostMCARPTIF_c.MoveHeap` instead of
+        returning them, in which case the move cost functions return empty
+        lists. Moves are returned again if `moveHeap` is None.
+        '''
+        self.moveHeap = moveHeap
+        if self.cModules and self._c_context is not None:
+            self._c_context.moveHeap = moveHeap
+
+    def setThreads(self, nThreads):
+        '''
+        Calculate the MCARPTIF move costs on a pool of `nThreads` threads, see
+        `MoveCostContext.set_threads`. Only the C move costs are threaded.
+        '''
+        self.nThreads = nThreads
+        if self.cModules and self._c_context is not None:
+            self._c_context.set_threads(nThreads)
+
+    def setGranularNeighbours(self, offsets, targets):
+        '''
+        Only consider the granular neighbours of arcs, stored in CSR format,
+        see `granular_neighbours.GranularNeighbours`, instead of a fraction
+        of their nearest neighbours. Fractions are used again if `offsets` is
+        None.
+        '''
+        if offsets is None:
+            self.granularNeighbours = None
+            self._granularSets = None
+        else:
+            self.granularNeighbours = (offsets, targets)
+            self._granularSets = [set(targets[offsets[arc]:offsets[arc + 1]].tolist()) for arc in range(len(offsets) - 1)]
+        if self.cModules and self._c_context is not None:
+            self._c_context.set_granular_neighbours(offsets, targets)
+
+    def setMoveCache(self, moveCache):
+        '''
+        Cache the move costs of pairs of arcs between calculations, see
+        `MoveCostContext.enable_move_cache`. Only the C move costs are cached.
+        '''
+        if moveCache == self.moveCache: return
+        self.moveCache = moveCache
+        if self.cModules and self._c_context is not None:
+            self._c_context.enable_move_cache(moveCache)
+
+    def invalidateMoveCache(self, arcs):
+        '''
+        Invalidate the cached moves of arcs whose route changed.
+        '''
+        if self.moveCache and self.cModules:
+            self._c_context.invalidate_arcs(arcs)
+
+    def clearMoveCache(self):
+        if self.moveCache and self.cModules and self._c_context is not None:
+            self._c_context.clear_move_cache()
+
+    def moveCacheStats(self):
+        '''
+        Return the number of cache hits and misses since the cache was
+        enabled.
+        '''
+        if self.cModules and self._c_context is not None:
+            return(self._c_context.cacheHits, self._c_context.cacheMisses)
+        return(0, 0)
+
+    def _keepMove(self, cost, threshold):
+        if cost >= threshold: return False
+        if self.moveHeap is not None and cost >= self.moveHeap.bound:
+            self.moveHeap.truncated = True
+            return False
+        return True
+
+    def _addMove(self, savings, move):
+        if self.moveHeap is None:
+            savings.append(move)
+        else:
+            self.moveHeap.push(move)
+
     def setRoute_MCARPTIF(self, route):
         '''
         '''
         if self.cModules:
             #pass
-            calcMoveCostMCARPTIF_c.init_route(route)
+            self._c_context.init_route(route)
         else:
             self.route = route
             routeMapping = [-1]*len(self._d)
@@ -2020,18 +2111,36 @@ class CalcMoveCostsMCARPTIFspecial(object):
                     routeMapping[self._inv[arc]] = i
             self.routeMapping = routeMapping
     
+    def updateRoute_MCARPTIF(self, route, start, dummyPositions):
+        '''
+        Update the route mapping after the giant route changed from position
+        `start` onwards, see `MoveCostContext.update_route`.
+        '''
+        if self.cModules:
+            self._c_context.update_route(route, start, dummyPositions)
+        else:
+            self.route = route
+            routeMapping = self.routeMapping
+            for i in range(start, len(route)):
+                arc = route[i]
+                routeMapping[arc] = i
+                if arc in self._edgesS:
+                    routeMapping[self._inv[arc]] = i
+            for i in dummyPositions:
+                routeMapping[route[i]] = i
+    
     def freeRoute_MCARPTIF(self):
         '''
         '''
         if self.cModules:
-            calcMoveCostMCARPTIF_c.free_route()   
+            self._c_context.free_route()   
 
     def _calcRemoveCostMCARPTIF(self, arcPosition):
         '''
         Calculate the cost of removing an arc.
         '''
         if self.cModules:
-            return(calcMoveCostMCARPTIF_c._calcRemoveCostMCARPTIF(arcPosition))
+            return(self._c_context._calcRemoveCostMCARPTIF(arcPosition))
         else:    
             preArc = self.route[arcPosition - 1]
             arc = self.route[arcPosition]
@@ -2046,7 +2155,7 @@ class CalcMoveCostsMCARPTIFspecial(object):
         Calculate the cost of removing an arc.
         '''
         if self.cModules:
-            return(calcMoveCostMCARPTIF_c._calcRemoveCostPostIF(arcPosition))
+            return(self._c_context._calcRemoveCostPostIF(arcPosition))
         else:    
             preArc = self.route[arcPosition - 2]
             arc = self.route[arcPosition]
@@ -2061,7 +2170,7 @@ class CalcMoveCostsMCARPTIFspecial(object):
         Calculate the cost of removing an arc.
         '''
         if self.cModules:
-            return(calcMoveCostMCARPTIF_c._calcRemoveCostPreIF(arcPosition))
+            return(self._c_context._calcRemoveCostPreIF(arcPosition))
         else:    
             preArc = self.route[arcPosition - 1]
             arc = self.route[arcPosition]
@@ -2076,7 +2185,7 @@ class CalcMoveCostsMCARPTIFspecial(object):
         Calculate the cost of removing an arc.
         '''
         if self.cModules:
-            return(calcMoveCostMCARPTIF_c._calcInsertCostPostIF( arcPosition, insertArc))
+            return(self._c_context._calcInsertCostPostIF( arcPosition, insertArc))
         else:    
             preArc = self.route[arcPosition - 2]
             arc = self.route[arcPosition]
@@ -2090,7 +2199,7 @@ class CalcMoveCostsMCARPTIFspecial(object):
         Calculate the cost of removing an arc.
         '''
         if self.cModules:
-            return(calcMoveCostMCARPTIF_c._calcInsertCostPreIF(arcPosition, insertArc))
+            return(self._c_context._calcInsertCostPreIF(arcPosition, insertArc))
         else:    
             arc = self.route[arcPosition]
             postArc = self.route[arcPosition + 2]
@@ -2104,7 +2213,7 @@ class CalcMoveCostsMCARPTIFspecial(object):
         Calculate the cost of removing an arc.
         '''
         if self.cModules:
-            return(calcMoveCostMCARPTIF_c._calcInsertCostPreIF(arcPosition, insertArc))
+            return(self._c_context._calcInsertCostPreIF(arcPosition, insertArc))
         else:    
             preArc = self.route[arcPosition - 1]
             arc = self.route[arcPosition]
@@ -2119,7 +2228,9 @@ class CalcMoveCostsMCARPTIFspecial(object):
         return(moveCandidates, threshold)
 
     def _findNearestNeighboursCandidates(self, arc, nNearest, candidates):
-        if nNearest: 
+        if self._granularSets is not None:
+            arcNearestCandidates = candidates.intersection(self._granularSets[arc])
+        elif nNearest: 
             if nNearest <= 1:
                 nIndex = int(ceil(len(self._nnList)*nNearest))
             else:
@@ -2136,7 +2247,7 @@ class CalcMoveCostsMCARPTIFspecial(object):
         an arc to the end of a route and replacing an arc with its inverse self.
         '''
         if self.cModules:
-            return(calcMoveCostMCARPTIF_c._relocateToPreIF(arcsToRelocate, arcRelocateAfter, threshold))
+            return(self._c_context._relocateToPreIF(arcsToRelocate, arcRelocateAfter, threshold))
         else:
             savings = []
             arcPositionInsert = self.routeMapping[arcRelocateAfter]
@@ -2157,8 +2268,8 @@ class CalcMoveCostsMCARPTIFspecial(object):
                     (netCostRemove, removePreArc, removePostArc) = self._calcRemoveCostMCARPTIF(arcPositionRemove)
                 (netCostInsert, arcToRelocateAfterPost) = self._calcInsertCostPreIF(arcPositionInsert, arcToRelocate)
                 relocateCost = netCostRemove + netCostInsert
-                if relocateCost < threshold:
-                    savings.append((relocateCost, (arcToRelocate, removePreArc, removePostArc, arcRelocateAfter, None, arcToRelocateAfterPost), 'relocate' + specialIF + '_PreIF', (netCostRemove, netCostInsert)))
+                if self._keepMove(relocateCost, threshold):
+                    self._addMove(savings, (relocateCost, (arcToRelocate, removePreArc, removePostArc, arcRelocateAfter, None, arcToRelocateAfterPost), 'relocate' + specialIF + '_PreIF', (netCostRemove, netCostInsert)))
             return(savings)
 
     def relocateMovesPreIF(self, relocateCandidates, arcToRelocateAfterCandidates, threshold = None, nNearest = None):
@@ -2167,7 +2278,7 @@ class CalcMoveCostsMCARPTIFspecial(object):
         an arc to the end of a route and replacing an arc with its inverse self.
         '''
         if self.cModules:
-            return(calcMoveCostMCARPTIF_c.relocateMovesPreIF(relocateCandidates, arcToRelocateAfterCandidates, threshold, nNearest))
+            return(self._c_context.relocateMovesPreIF(relocateCandidates, arcToRelocateAfterCandidates, threshold, nNearest))
         else:
             savings = []
             (relocateCandidates, threshold) = self._initiateMoveCostCalculations(relocateCandidates, threshold)
@@ -2182,7 +2293,7 @@ class CalcMoveCostsMCARPTIFspecial(object):
         an arc to the end of a route and replacing an arc with its inverse self.
         '''
         if self.cModules:
-            return(calcMoveCostMCARPTIF_c._relocateToPostIF(arcRelocate, arcToRelocateBeforeCandidates, threshold))
+            return(self._c_context._relocateToPostIF(arcRelocate, arcToRelocateBeforeCandidates, threshold))
         else:
             savings = []
             arcPositionRemove = self.routeMapping[arcRelocate]
@@ -2205,8 +2316,8 @@ class CalcMoveCostsMCARPTIFspecial(object):
                 if not relocateAccurate: continue
                 (netCostInsert, arcToRelocateBeforePre) = self._calcInsertCostPostIF(arcPositionInsert, arcRelocate)
                 relocateCost = netCostRemove + netCostInsert
-                if relocateCost < threshold:
-                    savings.append((relocateCost, (arcRelocate, removePreArc, removePostArc, arcToRelocateBefore, arcToRelocateBeforePre, None), 'relocate' + specialIF + '_PostIF', (netCostRemove, netCostInsert)))
+                if self._keepMove(relocateCost, threshold):
+                    self._addMove(savings, (relocateCost, (arcRelocate, removePreArc, removePostArc, arcToRelocateBefore, arcToRelocateBeforePre, None), 'relocate' + specialIF + '_PostIF', (netCostRemove, netCostInsert)))
             return(savings)
 
     def relocateMovesPostIF(self, relocateCandidates, arcToRelocateBeforeCandidates, threshold = None, nNearest = None):
@@ -2215,7 +2326,7 @@ class CalcMoveCostsMCARPTIFspecial(object):
         an arc to the end of a route and replacing an arc with its inverse self.
         '''
         if self.cModules:
-            return(calcMoveCostMCARPTIF_c.relocateMovesPostIF(relocateCandidates, arcToRelocateBeforeCandidates, threshold, nNearest))
+            return(self._c_context.relocateMovesPostIF(relocateCandidates, arcToRelocateBeforeCandidates, threshold, nNearest))
         else:
             savings = []
             (arcToRelocateBeforeCandidates, threshold) = self._initiateMoveCostCalculations(arcToRelocateBeforeCandidates, threshold)
@@ -2230,7 +2341,7 @@ class CalcMoveCostsMCARPTIFspecial(object):
         an arc to the end of a route and replacing an arc with its inverse self.
         '''
         if self.cModules:
-            return(calcMoveCostMCARPTIF_c._relocateBeforeArc(arcRelocate, arcToRelocateBeforeCandidates, threshold))
+            return(self._c_context._relocateBeforeArc(arcRelocate, arcToRelocateBeforeCandidates, threshold))
         else:
             savings = []
             arcPositionRemove = self.routeMapping[arcRelocate]
@@ -2256,8 +2367,8 @@ class CalcMoveCostsMCARPTIFspecial(object):
                 if not relocateAccurate: continue
                 (netCostInsert, arcToRelocateBeforePre) = self._calcInsertCostMCARPTIF(arcPositionInsert, arcRelocate)
                 relocateCost = netCostRemove + netCostInsert
-                if relocateCost < threshold:
-                    savings.append((relocateCost, (arcRelocate, removePreArc, removePostArc, arcToRelocateBefore, arcToRelocateBeforePre, None), 'relocate' + specialIF, (netCostRemove, netCostInsert)))
+                if self._keepMove(relocateCost, threshold):
+                    self._addMove(savings, (relocateCost, (arcRelocate, removePreArc, removePostArc, arcToRelocateBefore, arcToRelocateBeforePre, None), 'relocate' + specialIF, (netCostRemove, netCostInsert)))
             return(savings)
 
     def relocateMovesMCARPTIF(self, relocateCandidates, arcToRelocateBeforeCandidates, threshold = None, nNearest = None):
@@ -2266,7 +2377,7 @@ class CalcMoveCostsMCARPTIFspecial(object):
         an arc to the end of a route and replacing an arc with its inverse self.
         '''
         if self.cModules:
-            return(calcMoveCostMCARPTIF_c.relocateMovesMCARPTIF(relocateCandidates, arcToRelocateBeforeCandidates, threshold, nNearest))
+            return(self._c_context.relocateMovesMCARPTIF(relocateCandidates, arcToRelocateBeforeCandidates, threshold, nNearest))
         else:
             savings = []
             (arcToRelocateBeforeCandidates, threshold) = self._initiateMoveCostCalculations(arcToRelocateBeforeCandidates, threshold)
@@ -2280,7 +2391,7 @@ class CalcMoveCostsMCARPTIFspecial(object):
         Calculate the cost of three consecutive arcs in a route.
         '''
         if self.cModules:
-            return(calcMoveCostMCARPTIF_c._threeSeqCost(arcPosition))
+            return(self._c_context._threeSeqCost(arcPosition))
         else:         
             preArc = self.route[arcPosition - 1]
             arc = self.route[arcPosition]
@@ -2304,7 +2415,7 @@ class CalcMoveCostsMCARPTIFspecial(object):
         Calculate the cost of three consecutive arcs in a route.
         '''
         if self.cModules:
-            return(calcMoveCostMCARPTIF_c._replaceCost(replaceArc))
+            return(self._c_context._replaceCost(replaceArc))
         else:                     
             if exchangePos.find('excPostIF') != -1: 
                 cost = self._if_cost[preArc][replaceArc] + self._d[replaceArc][postArc]
@@ -2320,7 +2431,7 @@ class CalcMoveCostsMCARPTIFspecial(object):
         an arc to the end of a route and replacing an arc with its inverse self.
         '''
         if self.cModules:
-            return(calcMoveCostMCARPTIF_c.exchangeMovesMCARPTIF(exchangeCandidates1, exchangeCandidates2, threshold, nNearest))
+            return(self._c_context.exchangeMovesMCARPTIF(exchangeCandidates1, exchangeCandidates2, threshold, nNearest))
         else:
             savings = []
             (exchangeCandidates1, threshold) = self._initiateMoveCostCalculations(exchangeCandidates1, threshold)
@@ -2341,8 +2452,8 @@ class CalcMoveCostsMCARPTIFspecial(object):
                     netExc1 = cost1new - cost1
                     netExc2 = cost2new - cost2
                     netExc = netExc1 + netExc2
-                    if netExc1 + netExc2 < threshold:
-                        savings.append((netExc, (arcExchange1, preArc1, postArc1, arcExchange2, preArc2, postArc2), 'exchange' + exchangePos1 + exchangePos2, (netExc1, netExc2)))
+                    if self._keepMove(netExc, threshold):
+                        self._addMove(savings, (netExc, (arcExchange1, preArc1, postArc1, arcExchange2, preArc2, postArc2), 'exchange' + exchangePos1 + exchangePos2, (netExc1, netExc2)))
             return(savings)
 
     def flipMovesMCARPTIF(self, exchangeCandidates1, threshold = None):
@@ -2351,7 +2462,7 @@ class CalcMoveCostsMCARPTIFspecial(object):
         an arc to the end of a route and replacing an arc with its inverse self.
         '''
         if self.cModules:
-            return(calcMoveCostMCARPTIF_c.flipMovesMCARPTIF(exchangeCandidates1, threshold))
+            return(self._c_context.flipMovesMCARPTIF(exchangeCandidates1, threshold))
         else:
             savings = []
             (exchangeCandidates1, threshold) = self._initiateMoveCostCalculations(exchangeCandidates1, threshold)
@@ -2361,8 +2472,8 @@ class CalcMoveCostsMCARPTIFspecial(object):
                 (cost1, preArc1, arc1, postArc1, exchangePos1) = self._threeSeqCost(arcPositionExc1, n= '_')
                 cost1new = self._replaceCost(preArc1, postArc1, invExchange, exchangePos1)
                 netFlip = cost1new - cost1
-                if netFlip < threshold:
-                    savings.append((netFlip, (arcExchange1, preArc1, postArc1, invExchange, None, None), 'flip' + exchangePos1, (netFlip, 0)))
+                if self._keepMove(netFlip, threshold):
+                    self._addMove(savings, (netFlip, (arcExchange1, preArc1, postArc1, invExchange, None, None), 'flip' + exchangePos1, (netFlip, 0)))
             return(savings)
 
     def _twoSeqCost(self, arcPosition, n):
@@ -2370,7 +2481,7 @@ class CalcMoveCostsMCARPTIFspecial(object):
         Calculate the cost of three consecutive arcs in a route.
         '''
         if self.cModules:
-            return(calcMoveCostMCARPTIF_c._twoSeqCost(arcPosition, n))
+            return(self._c_context._twoSeqCost(arcPosition, n))
         else:         
             preArc = self.route[arcPosition - 1]
             arc = self.route[arcPosition]
@@ -2389,7 +2500,7 @@ class CalcMoveCostsMCARPTIFspecial(object):
         Calculate the cost of three consecutive arcs in a route.
         '''
         if self.cModules:
-            return(calcMoveCostMCARPTIF_c._relinkCost(preArc, relinkArc, crossPos))
+            return(self._c_context._relinkCost(preArc, relinkArc, crossPos))
         else:                     
             if crossPos.find('crossPostIF') != -1: 
                 cost = self._if_cost[preArc][relinkArc]
@@ -2403,7 +2514,7 @@ class CalcMoveCostsMCARPTIFspecial(object):
         an arc to the end of a route and replacing an arc with its inverse self.
         '''
         if self.cModules:
-            return(calcMoveCostMCARPTIF_c.crossMovesMCARPTIF(relinkCandidates1, relinkCandidates2, threshold, nNearest))
+            return(self._c_context.crossMovesMCARPTIF(relinkCandidates1, relinkCandidates2, threshold, nNearest))
         else:
             savings = []
             (relinkCandidates1, threshold) = self._initiateMoveCostCalculations(relinkCandidates1, threshold)
@@ -2424,8 +2535,8 @@ class CalcMoveCostsMCARPTIFspecial(object):
                     netLink1 = cost1new - cost1
                     netLink2 = cost2new - cost2
                     netLinkNew = netLink1 + netLink2
-                    if netLinkNew < threshold:
-                        savings.append((netLinkNew, (arcRelink1, preArc1, None, arcRelink2, preArc2, None), 'cross' + relinkPos1 + relinkPos2, (netLink1, netLink2)))
+                    if self._keepMove(netLinkNew, threshold):
+                        self._addMove(savings, (netLinkNew, (arcRelink1, preArc1, None, arcRelink2, preArc2, None), 'cross' + relinkPos1 + relinkPos2, (netLink1, netLink2)))
             return(savings)
 
     def _calcRemoveTripCost(self, arcPosition):
@@ -2560,7 +2671,7 @@ class MCARPmoveFunctions(object):
         an arc to the end of a route and replacing an arc with its inverse self.
         '''
         if self.cModules:
-            return(c_calcMoveCost.relocateMoves(insertCandidates, arcToRelocateBeforeCandidates, threshold, nNearest))
+            return(self._c_context.relocateMoves(insertCandidates, arcToRelocateBeforeCandidates, threshold, nNearest))
         else:
             savings = []
             (arcToRelocateBeforeCandidates, threshold) = self._initiateMoveCostCalculations(arcToRelocateBeforeCandidates, threshold)
@@ -2619,7 +2730,7 @@ class MCARPmoveFunctions(object):
         an arc to the end of a route and replacing an arc with its inverse self.
         '''
         if self.cModules:
-            return(c_calcMoveCost.relocateMoves(relocateCandidates, arcToRelocateBeforeCandidates, threshold, nNearest))
+            return(self._c_context.relocateMoves(relocateCandidates, arcToRelocateBeforeCandidates, threshold, nNearest))
         else:
             savings = []
             (arcToRelocateBeforeCandidates, threshold) = self._initiateMoveCostCalculations(arcToRelocateBeforeCandidates, threshold)
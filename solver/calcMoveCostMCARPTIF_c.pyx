@@ -25,467 +25,1101 @@ Zachariadis, E. E., & Kiranoudis, C. T. (2010). A strategy for reducing the comp
 
 from __future__ import division
 
-cimport libc.stdlib
-from libc.stdlib cimport malloc, free 
+cimport cython
 from math import ceil
+from heapq import heappush, heapreplace
+from itertools import chain
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from libc.math cimport INFINITY
+from solver.c_buffers import int32_buffer, inverse_arc_buffer
 
-cdef int  _nnListLength, _nArcs
-cdef int **_d
-cdef int **_nnListC
-cdef int *_inv
-#cdef int *route
-#cdef int *routeMapping,
 
-cdef int **_if_cost
+cdef class MoveHeap:
+    '''
+    Bounded heap of the `maxMoves` cheapest moves offered to it, used to
+    select the best moves of a neighbourhood evaluation without keeping, and
+    sorting, all of them.
+    
+    Once the heap is full, `bound` is the cost of the worst kept move, and a
+    move has to be cheaper to be kept. The move cost kernels check the bound
+    before creating a move tuple, so that most moves are never created.
+    Equally cheap moves are kept in the order they are offered. `truncated`
+    is set once a move is dropped, by the heap or by a check of its bound.
+    
+    Usage:
+        heap = MoveHeap(500)
+        context.moveHeap = heap
+        context.relocateMovesMCARPTIF(candidates, candidates) # returns []
+        savings = heap.moves()
+    '''
+
+    cdef public int maxMoves
+    cdef public long nOffered
+    cdef public double bound
+    cdef public bint truncated
+    cdef list _heap
+
+    def __cinit__(self, int maxMoves):
+        if maxMoves < 1:
+            raise ValueError('maxMoves has to be positive, not {}'.format(maxMoves))
+        self.maxMoves = maxMoves
+        self.clear()
+
+    def clear(self):
+        self._heap = []
+        self.nOffered = 0
+        self.bound = INFINITY
+        self.truncated = False
+
+    def __len__(self):
+        return len(self._heap)
+
+    cpdef push(self, tuple move):
+        '''
+        Offer a move, with its cost as first element, to the heap.
+        '''
+        cdef double cost = move[0]
+        
+        self.nOffered += 1
+        if cost >= self.bound:
+            self.truncated = True
+            return
+        
+        # Max-heap on cost, and on order offered for equally cheap moves.
+        entry = (-cost, -self.nOffered, move)
+        if len(self._heap) < self.maxMoves:
+            heappush(self._heap, entry)
+            if len(self._heap) == self.maxMoves:
+                self.bound = -self._heap[0][0]
+        else:
+            heapreplace(self._heap, entry)
+            self.bound = -self._heap[0][0]
+            self.truncated = True
+
+    def moves(self):
+        '''
+        Return the kept moves, cheapest first.
+        '''
+        return([entry[2] for entry in sorted(self._heap, reverse = True)])
+
+
+# Move families of cached moves, see `MoveCostContext._cachedMove`.
+cdef enum:
+    MOVE_RELOCATE_PRE_IF = 0
+    MOVE_RELOCATE_POST_IF = 1
+    MOVE_RELOCATE = 2
+    MOVE_EXCHANGE = 3
+    MOVE_CROSS = 4
+    MOVE_FLIP = 5
+
+# Move types of the threaded move costs, by position code of the arcs: 0 for
+# normal arcs, 1 for arcs after an IF and 2 for arcs before an IF.
+RELOCATE_TYPES = ('relocate', 'relocatePostArcIF', 'relocatePreArcIF')
+RELOCATE_POST_IF_TYPES = ('relocate_PostIF', 'relocatePostIF_PostIF', 'relocatePreIF_PostIF')
+RELOCATE_PRE_IF_TYPES = ('relocate_PreIF', 'relocatePostIF_PreIF', 'relocatePreIF_PreIF')
+EXCHANGE_TYPES = tuple(tuple('exchange' + exchangePos1 + exchangePos2 for exchangePos2 in ('', '_2excPostIF', '_2excPreIF')) for exchangePos1 in ('', '_1excPostIF', '_1excPreIF'))
+CROSS_TYPES = tuple(tuple('cross' + relinkPos1 + relinkPos2 for relinkPos2 in ('', '_2crossPostIF')) for relinkPos1 in ('', '_1crossPostIF'))
+FLIP_TYPES = ('flip', 'flip_excPostIF', 'flip_excPreIF')
+
 
-def init_input(d_py, nnList_py, inv_py, dumpCost_py, dummArcs_py, if_cost_py, ifs_py):
+cdef class MoveCostContext:
+    '''
+    Instance data and giant route used to calculate move costs. Each context
+    has its own view of the instance data, so that different local searches
+    can calculate move costs side by side, for example in different threads
+    or with different nearest neighbour lists.
     
-    global _d, _inv, _nnListC, _nnList, _nnListLength, _nArcs, _edgesS, _dumpCost, _dummyArcs, _if_cost, _ifs
+    The matrices are read through typed memoryviews of C-contiguous int32
+    buffers, and are not copied if they already are such buffers, see
+    `solver.c_buffers`.
     
-    _dummyArcs = dummArcs_py
-    _dumpCost = dumpCost_py
-    _nArcs = len(d_py)
-    _nnListLength = len(nnList_py)
-    _d = <int **>malloc(_nArcs * sizeof(int *))
-    _nnListC = <int **>malloc(_nnListLength * sizeof(int *))
-    _nnList = nnList_py
+    Move costs of pairs of arcs can be cached between calculations, see
+    `enable_move_cache`. A cached move stays valid until one of its arcs is
+    passed to `invalidate_arcs`, which should be done for all the arcs of
+    routes that changed. Moves only depend on the predecessors and
+    successors of their arcs, and on the order of arcs within the giant
+    route, neither of which change for arcs of unchanged routes.
     
-    _inv = <int *>malloc(_nArcs * sizeof(int *))
-    inv_py_new = inv_py[:]
-    _edgesS = set()
+    Unless the move cache is used, move costs are calculated by C kernels on
+    C copies of the giant route and its mapping, without the GIL. Moves can
+    then also be evaluated on a thread pool, see `set_threads`. The
+    candidate arcs are split into one part per thread, and the moves of the
+    parts are merged in order, so that the same moves are found, in the same
+    order, as without threads. The move cache is not used by threaded
+    evaluations.
     
-    for i, arc in enumerate(inv_py):
-        if arc == None:
-            inv_py_new[i] = -1
-        else:
-            _edgesS.add(arc)
+    Instead of a fraction of the nearest neighbours of each arc, only its
+    granular neighbours can be considered, see `set_granular_neighbours`.
     
-    if _nArcs == _nnListLength:
-        for i from 0 <= i < _nArcs:
-            _inv[i] = inv_py_new[i]
-            _d[i] = <int *>malloc(_nArcs * sizeof(int *))
-            _nnListC[i]  = <int *>malloc(_nArcs * sizeof(int *))
-
-        for i from 0 <= i < _nArcs:
-            for j from 0 <= j < _nArcs:
-                _d[i][j] = d_py[i][j]
-                _nnListC[i][j]  = nnList_py[i][j]
-
-    else:
-        for i from 0 <= i < _nArcs:
-            _d[i] = <int *>malloc(_nArcs * sizeof(int *))
+    Usage:
+        context = MoveCostContext(d, nnList, inv, dumpCost, dummyArcs, if_cost, ifs)
+        context.init_route(giantRoute)
+        savings = context.relocateMovesMCARPTIF(candidates, candidates)
+    '''
+
+    cdef int _nnListLength, _nArcs
+    cdef const int[:, ::1] _d
+    cdef const int[:, ::1] _nnListC
+    cdef const int[::1] _inv
+    cdef const int[:, ::1] _if_cost
+    cdef object _nnList, _edgesS, _dumpCost, _dummyArcs, _ifs
+    cdef public object route, routeMapping
+    cdef public MoveHeap moveHeap
+    cdef dict _moveCache
+    cdef int[::1] _arcVersion
+    cdef public long cacheHits, cacheMisses
+    cdef int[::1] _routeC, _routeMappingC
+    cdef unsigned char[::1] _isIF
+    cdef public int nThreads
+    cdef object _executor
+    cdef list _granularSets
+
+    def __cinit__(self, d_py, nnList_py, inv_py, dumpCost_py, dummArcs_py, if_cost_py, ifs_py):
+        
+        self._dummyArcs = dummArcs_py
+        self._dumpCost = dumpCost_py
+        self._d = int32_buffer(d_py)
+        self._nArcs = self._d.shape[0]
+        self._nnListC = int32_buffer(nnList_py)
+        self._nnListLength = self._nnListC.shape[0]
+        self._nnList = nnList_py
+        self._inv = inverse_arc_buffer(inv_py)
+        self._edgesS = set([arc for arc in inv_py if arc != None])
+        self.route = []
+        self.routeMapping = []
+        self._if_cost = int32_buffer(if_cost_py)
+        self._ifs = ifs_py
+        self.moveHeap = None
+        self._moveCache = None
+        self._arcVersion = np.zeros(self._nArcs, dtype = np.int32)
+        self.cacheHits = 0
+        self.cacheMisses = 0
+        self._isIF = np.zeros(self._nArcs, dtype = np.uint8)
+        for arc in ifs_py: self._isIF[arc] = 1
+        self._routeC = np.zeros(0, dtype = np.int32)
+        self._routeMappingC = np.zeros(self._nArcs, dtype = np.int32)
+        self.nThreads = 1
+        self._executor = None
+        self._granularSets = None
+
+    def init_route(self, route_py):
+        
+        self.route = route_py
+        nRoute = len(route_py)
+        routeMapping = [0]*self._nArcs
+         
+        for i in range(nRoute):
+              
+            arc = route_py[i]
+            routeMapping[arc] = i
+              
+            arcInv = self._inv[arc]
+            if arcInv != -1: 
+                routeMapping[arcInv] = i
+        
+        self.routeMapping = routeMapping
+        self._routeC = np.array(route_py, dtype = np.int32)
+        self._routeMappingC = np.array(routeMapping, dtype = np.int32)
+
+    def update_route(self, route_py, int start, dummyPositions):
+        '''
+        Update the route mapping of a giant route that only changed from
+        position `start` onwards. Dummy arcs are visited more than once, and
+        are mapped to their last position, as with `init_route`, by
+        reapplying the sorted `dummyPositions`.
+        '''
+        cdef int i, arc, arcInv
+        cdef int nRoute = len(route_py)
+        cdef int[::1] routeC = self._routeC
+        cdef int[::1] routeMappingC = self._routeMappingC
+        
+        self.route = route_py
+        routeMapping = self.routeMapping
+        
+        if routeC.shape[0] != nRoute:
+            routeC = np.empty(nRoute, dtype = np.int32)
+            start = min(start, self._routeC.shape[0])
+            routeC[:start] = self._routeC[:start]
+            self._routeC = routeC
+        
+        for i in range(start, nRoute):
             
-        for i from 0 <= i < _nnListLength:
-            _nnListC[i]  = <int *>malloc(_nnListLength * sizeof(int *))
-                    
-        for i from 0 <= i < _nArcs:
-            for j from 0 <= j < _nArcs:
-                _d[i][j] = d_py[i][j]          
-                     
-        for i from 0 <= i < _nnListLength:
-            for j from 0 <= j < _nnListLength:
-                _nnListC[i][j]  = nnList_py[i][j]    
-    
-    _if_cost = <int **>malloc(_nArcs * sizeof(int *))
-    _ifs = ifs_py
+            arc = route_py[i]
+            routeMapping[arc] = i
+            routeC[i] = arc
+            routeMappingC[arc] = i
+            
+            arcInv = self._inv[arc]
+            if arcInv != -1: 
+                routeMapping[arcInv] = i
+                routeMappingC[arcInv] = i
+        
+        for i in dummyPositions:
+            routeMapping[route_py[i]] = i
+            routeMappingC[route_py[i]] = i
 
-    for i from 0 <= i < _nArcs:
-        _if_cost[i] = <int *>malloc(_nArcs * sizeof(int *))
+    def free_route(self):
+        self.route = []
+        self.routeMapping = []
+        self._routeC = np.zeros(0, dtype = np.int32)
         
-    for i from 0 <= i < _nArcs:
-        for j from 0 <= j < _nArcs:
-            _if_cost[i][j] = if_cost_py[i][j]
+    cdef inline bint _keepMove(self, double cost, double threshold):
+        '''
+        Check if a move is below the threshold, and cheap enough to be kept
+        by the move heap, if one is used.
+        '''
+        if cost >= threshold: return False
+        if self.moveHeap is not None and cost >= self.moveHeap.bound:
+            self.moveHeap.truncated = True
+            return False
+        return True
 
-def init_route(route_py):
-    
-    global route, routeMapping
-    
-    route = route_py
-    nRoute = len(route_py)
-    routeMapping = [0]*_nArcs
-     
-    for i in range(nRoute):
-          
-        arc = route_py[i]
-        route[i] = arc
-        routeMapping[arc] = i
-          
-        arcInv = _inv[arc]
-        if arcInv != -1: 
-            routeMapping[arcInv] = i
-
-def free_input():
-    
-    global _d, _nnListC
-    
-    if _nArcs == _nnListLength:
-        for i from 0 <= i < _nArcs:
-            free(_d[i])
-            free(_nnListC[i])
-    else:
-        for i from 0 <= i < _nArcs:
-            free(_d[i])
-        for i from 0 <= i < _nnListLength:
-            free(_nnListC[i])
+    cdef _addMove(self, list savings, tuple move):
+        if self.moveHeap is None:
+            savings.append(move)
+        else:
+            self.moveHeap.push(move)
+
+    def enable_move_cache(self, bint useCache = True):
+        '''
+        Start or stop caching move costs. The cache is cleared in both cases,
+        so enabling it again starts from an empty cache.
+        '''
+        if useCache: self._moveCache = {}
+        else: self._moveCache = None
+        self.cacheHits = 0
+        self.cacheMisses = 0
+
+    def clear_move_cache(self):
+        if self._moveCache is not None: self._moveCache = {}
+
+    def invalidate_arcs(self, arcs):
+        '''
+        Invalidate the cached moves of arcs, and of their inverse arcs.
+        '''
+        cdef int arc, arcInv
+        if self._moveCache is None: return
+        for arc in arcs:
+            self._arcVersion[arc] += 1
+            arcInv = self._inv[arc]
+            if arcInv != -1: self._arcVersion[arcInv] += 1
+
+    cdef object _cachedMove(self, int moveFamily, int arcI, int arcJ, double threshold):
+        '''
+        Return the cached move of a pair of arcs, the move cost if it was not
+        kept when calculated, or None if the move has to be calculated.
+        '''
+        if self._moveCache is None: return None
+        entry = self._moveCache.get((moveFamily * self._nArcs + arcI) * self._nArcs + arcJ)
+        if entry is None or entry[0] != self._arcVersion[arcI] or entry[1] != self._arcVersion[arcJ]:
+            self.cacheMisses += 1
+            return None
+        move = entry[2]
+        if type(move) is not tuple and move < threshold:
+            # Cost is below the current threshold, but the move was not kept.
+            self.cacheMisses += 1
+            return None
+        self.cacheHits += 1
+        return move
+
+    cdef _cacheMove(self, int moveFamily, int arcI, int arcJ, move):
+        if self._moveCache is None: return
+        self._moveCache[(moveFamily * self._nArcs + arcI) * self._nArcs + arcJ] = (self._arcVersion[arcI], self._arcVersion[arcJ], move)
+
+    cdef _addCachedMove(self, list savings, move, double threshold):
+        if type(move) is tuple and self._keepMove(move[0], threshold):
+            self._addMove(savings, move)
+
+    def set_threads(self, int nThreads):
+        '''
+        Evaluate moves on a pool of `nThreads` threads, or in the calling
+        thread if `nThreads` is one.
+        '''
+        nThreads = max(nThreads, 1)
+        if nThreads == self.nThreads: return
+        self.shutdown_threads()
+        self.nThreads = nThreads
+        if nThreads > 1: self._executor = ThreadPoolExecutor(nThreads)
+
+    def shutdown_threads(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        self.nThreads = 1
+
+    def set_granular_neighbours(self, offsets, targets):
+        '''
+        Only consider the granular neighbours of each arc, stored in CSR
+        format, see `granular_neighbours.GranularNeighbours`, instead of a
+        fraction of its nearest neighbours. Nearest neighbour fractions are
+        used again if `offsets` is None.
+        '''
+        if offsets is None:
+            self._granularSets = None
+            return
+        offsets = np.asarray(offsets).tolist()
+        targets = np.asarray(targets).tolist()
+        self._granularSets = [set(targets[offsets[arc]:offsets[arc + 1]]) for arc in range(len(offsets) - 1)]
+
+    cdef inline bint _useKernels(self):
+        '''
+        Use the C kernels, see `_evaluateInThreads`, if threads are used or
+        if there is no move cache to read moves from.
+        '''
+        return self.nThreads > 1 or self._moveCache is None
+
+    def _evaluateInThreads(self, int moveFamily, outerArcs, candidateLists, double threshold):
+        '''
+        Calculate the moves of each outer arc with its candidate arcs, split
+        into one contiguous part of outer arcs per thread, and merge the moves
+        of the parts in order. With one thread the single part is evaluated
+        in the calling thread.
+        '''
+        cdef double bound = threshold
+        if self.moveHeap is not None: bound = min(bound, self.moveHeap.bound)
+        
+        nOuter = len(outerArcs)
+        nParts = max(1, min(self.nThreads, nOuter))
+        parts = []
+        for k in range(nParts):
+            first = nOuter*k//nParts
+            last = nOuter*(k + 1)//nParts
+            partCandidates = candidateLists[first:last]
+            offsets = np.zeros(last - first + 1, dtype = np.int32)
+            np.cumsum(np.fromiter((len(candidates) for candidates in partCandidates), dtype = np.int32, count = last - first), out = offsets[1:])
+            candidates = np.fromiter(chain.from_iterable(partCandidates), dtype = np.int32, count = offsets[-1])
+            parts.append((np.array(outerArcs[first:last], dtype = np.int32), offsets, candidates))
+        
+        if nParts == 1 or self._executor is None:
+            partMoves = [self._evaluatePart(moveFamily, part, threshold, bound) for part in parts]
+        else:
+            partMoves = self._executor.map(self._evaluatePart, [moveFamily]*nParts, parts, [threshold]*nParts, [bound]*nParts)
         
-    free(_d)
-    free(_nnListC)
-    free(_inv)
+        savings = []
+        for moves in partMoves:
+            if self.moveHeap is None: 
+                savings += moves
+            else:
+                for move in moves: self.moveHeap.push(move)
+        return(savings)
 
-    for i from 0 <= i < _nArcs:
-        free(_if_cost[i])   
+    def _evaluatePart(self, int moveFamily, part, double threshold, double bound):
+        '''
+        Moves of a part below `bound`. Moves below `threshold`, but not below
+        `bound`, are dropped, and mark the move heap as truncated.
+        '''
+        (outerArcs, offsets, candidates) = part
+        if moveFamily == MOVE_RELOCATE: (savings, dropped) = self._relocatePart(outerArcs, offsets, candidates, threshold, bound, False)
+        elif moveFamily == MOVE_RELOCATE_POST_IF: (savings, dropped) = self._relocatePart(outerArcs, offsets, candidates, threshold, bound, True)
+        elif moveFamily == MOVE_RELOCATE_PRE_IF: (savings, dropped) = self._relocatePreIFPart(outerArcs, offsets, candidates, threshold, bound)
+        elif moveFamily == MOVE_EXCHANGE: (savings, dropped) = self._exchangePart(outerArcs, offsets, candidates, threshold, bound)
+        elif moveFamily == MOVE_CROSS: (savings, dropped) = self._crossPart(outerArcs, offsets, candidates, threshold, bound)
+        else: (savings, dropped) = self._flipPart(outerArcs, threshold, bound)
+        if dropped: self.moveHeap.truncated = True
+        return(savings)
 
-    free(_if_cost)
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    cdef inline int _routeAt(self, Py_ssize_t i) nogil:
+        if i < 0: i += self._routeC.shape[0]
+        return self._routeC[i]
 
-def free_route():
-    pass
-    #free(route)
-    #free(routeMapping)
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    cdef int _removeCostC(self, int arcRemove, int *preArc, int *postArc, int *arcPos) nogil:
+        '''
+        Cost of removing an arc, with the arcs it is removed from between and
+        its position code, as in `_relocateBeforeArc`.
+        '''
+        cdef Py_ssize_t p = self._routeMappingC[arcRemove]
+        cdef int arc = self._routeAt(p)
+        cdef int pre = self._routeAt(p - 1)
+        cdef int post = self._routeAt(p + 1)
+        cdef int netCost
         
-def _initiateMoveCostCalculations(moveCandidates, threshold = None):
-    moveCandidates = set(moveCandidates)
-    if threshold == None: threshold = 1e300000
-    return(moveCandidates, threshold)
-
-def _findNearestNeighboursCandidates(arc, nNearest, candidates):
-    if nNearest: 
-        if nNearest <= 1:
-            nIndex = int(ceil(_nnListLength*nNearest))
+        if self._isIF[pre]:
+            arcPos[0] = 1
+            pre = self._routeAt(p - 2)
+            netCost = self._if_cost[pre, post] - self._if_cost[pre, arc] - self._d[arc, post]
+        elif self._isIF[post]:
+            arcPos[0] = 2
+            post = self._routeAt(p + 2)
+            netCost = self._if_cost[pre, post] - self._d[pre, arc] - self._if_cost[arc, post]
         else:
-            nIndex = nNearest
-        nearestArcSet = set(_nnList[arc][:nIndex])#set(nnList[arc][:nNearest])
-        arcNearestCandidates = candidates.intersection(nearestArcSet)
-    else: 
-        arcNearestCandidates = candidates
-    return(arcNearestCandidates)
+            arcPos[0] = 0
+            netCost = self._d[pre, post] - self._d[pre, arc] - self._d[arc, post]
+        preArc[0] = pre
+        postArc[0] = post
+        return netCost
 
-# ====================================== #
-# MCARPTIF move costs
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    cdef int _threeSeqCostC(self, Py_ssize_t p, int *preArc, int *postArc, int *arcPos) nogil:
+        '''
+        C version of `_threeSeqCost`, with position codes instead of names.
+        '''
+        cdef int arc = self._routeAt(p)
+        cdef int pre = self._routeAt(p - 1)
+        cdef int post = self._routeAt(p + 1)
+        cdef int cost
+        
+        if self._isIF[pre]:
+            arcPos[0] = 1
+            pre = self._routeAt(p - 2)
+            cost = self._if_cost[pre, arc] + self._d[arc, post]
+        elif self._isIF[post]:
+            arcPos[0] = 2
+            post = self._routeAt(p + 2)
+            cost = self._d[pre, arc] + self._if_cost[arc, post]
+        else:
+            arcPos[0] = 0
+            cost = self._d[pre, arc] + self._d[arc, post]
+        preArc[0] = pre
+        postArc[0] = post
+        return cost
 
-def _calcRemoveCostMCARPTIF(arcPosition):
-    '''
-    Calculate the cost of removing an arc.
-    '''  
-    preArc = route[arcPosition - 1]
-    arc = route[arcPosition]
-    postArc = route[arcPosition + 1]
-    currentCost = _d[preArc][arc] + _d[arc][postArc]
-    newCost = _d[preArc][postArc]
-    netCost = newCost - currentCost
-    return(netCost, preArc, postArc)
-    
-def _calcRemoveCostPostIF(arcPosition):
-    '''
-    Calculate the cost of removing an arc.
-    '''  
-    preArc = route[arcPosition - 2]
-    arc = route[arcPosition]
-    postArc = route[arcPosition + 1]
-    currentCost = _if_cost[preArc][arc] + _d[arc][postArc]
-    newCost = _if_cost[preArc][postArc]
-    netCost = newCost - currentCost
-    return(netCost, preArc, postArc)
-
-def _calcRemoveCostPreIF(arcPosition):
-    '''
-    Calculate the cost of removing an arc.
-    '''
-    preArc = route[arcPosition - 1]
-    arc = route[arcPosition]
-    postArc = route[arcPosition + 2]
-    currentCost = _d[preArc][arc] + _if_cost[arc][postArc]
-    newCost = _if_cost[preArc][postArc]
-    netCost = newCost - currentCost
-    return(netCost, preArc, postArc)
-
-def _calcInsertCostPostIF(arcPosition, insertArc):
-    '''
-    Calculate the cost of removing an arc.
-    '''
-    preArc = route[arcPosition - 2]
-    arc = route[arcPosition]
-    currentCost = _if_cost[preArc][arc]
-    newCost = _if_cost[preArc][insertArc] + _d[insertArc][arc]
-    netCost = newCost - currentCost
-    return(netCost, preArc)
-
-def _calcInsertCostPreIF(arcPosition, insertArc):
-    '''
-    Calculate the cost of removing an arc.
-    '''    
-    arc = route[arcPosition]
-    postArc = route[arcPosition + 2]
-    currentCost = _if_cost[arc][postArc]
-    newCost = _d[arc][insertArc] + _if_cost[insertArc][postArc]
-    netCost = newCost - currentCost
-    return(netCost, postArc)
-
-def _calcInsertCostMCARPTIF(arcPosition, insertArc):
-    '''
-    Calculate the cost of removing an arc.
-    '''  
-    preArc = route[arcPosition - 1]
-    arc = route[arcPosition]
-    currentCost = _d[preArc][arc]
-    newCost = _d[preArc][insertArc] + _d[insertArc][arc]
-    netCost = newCost - currentCost
-    return(netCost, preArc)
-
-def _relocateToPreIF(arcsToRelocate, arcRelocateAfter, threshold):
-    '''
-    Calculate the move cost of relocating a given from its current position to another. Exceptions are not calculated, such as moving
-    an arc to the end of a route and replacing an arc with its inverse 
-    '''
-    savings = []
-    arcPositionInsert = routeMapping[arcRelocateAfter]
-    for arcToRelocate in arcsToRelocate:
-        arcPositionRemove = routeMapping[arcToRelocate]
-        relocateAccurate = arcPositionRemove < arcPositionInsert or arcPositionInsert + 2 < arcPositionRemove
-        if not relocateAccurate: continue
-        preArc = route[arcPositionRemove - 1]
-        postArc = route[arcPositionRemove + 1]
-        if preArc in _ifs: 
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    cdef int _replaceCostC(self, int preArc, int postArc, int replaceArc, int arcPos) nogil:
+        if arcPos == 1: return self._if_cost[preArc, replaceArc] + self._d[replaceArc, postArc]
+        if arcPos == 2: return self._d[preArc, replaceArc] + self._if_cost[replaceArc, postArc]
+        return self._d[preArc, replaceArc] + self._d[replaceArc, postArc]
+
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    cdef tuple _relocatePart(self, const int[::1] outerArcs, const int[::1] offsets, const int[::1] candidates, double threshold, double bound, bint postIF):
+        '''
+        Moves of `_relocateBeforeArc`, or `_relocateToPostIF` if `postIF`, of
+        each outer arc with its candidates.
+        '''
+        cdef Py_ssize_t nOuter = outerArcs.shape[0], i, k
+        cdef int arc, p, q, arcPosAdd, insertArc, preArc
+        cdef int[::1] netRemove = np.empty(nOuter, dtype = np.int32)
+        cdef int[::1] removePre = np.empty(nOuter, dtype = np.int32)
+        cdef int[::1] removePost = np.empty(nOuter, dtype = np.int32)
+        cdef int[::1] removePos = np.empty(nOuter, dtype = np.int32)
+        cdef int[::1] netInsert = np.empty(candidates.shape[0], dtype = np.int32)
+        cdef int[::1] insertPre = np.empty(candidates.shape[0], dtype = np.int32)
+        cdef unsigned char[::1] keep = np.zeros(candidates.shape[0], dtype = np.uint8)
+        
+        with nogil:
+            for i in range(nOuter):
+                arc = outerArcs[i]
+                p = self._routeMappingC[arc]
+                netRemove[i] = self._removeCostC(arc, &removePre[i], &removePost[i], &removePos[i])
+                arcPosAdd = 2 if postIF or removePos[i] == 2 else 1
+                for k in range(offsets[i], offsets[i + 1]):
+                    q = self._routeMappingC[candidates[k]]
+                    if not (p > q or q > p + arcPosAdd): continue
+                    insertArc = self._routeAt(q)
+                    if postIF:
+                        preArc = self._routeAt(q - 2)
+                        netInsert[k] = self._if_cost[preArc, arc] + self._d[arc, insertArc] - self._if_cost[preArc, insertArc]
+                    else:
+                        preArc = self._routeAt(q - 1)
+                        netInsert[k] = self._d[preArc, arc] + self._d[arc, insertArc] - self._d[preArc, insertArc]
+                    insertPre[k] = preArc
+                    keep[k] = (netRemove[i] + netInsert[k] < threshold) + (netRemove[i] + netInsert[k] < bound)
+        
+        moveTypes = RELOCATE_POST_IF_TYPES if postIF else RELOCATE_TYPES
+        savings = []
+        dropped = False
+        for i in range(nOuter):
+            for k in range(offsets[i], offsets[i + 1]):
+                if keep[k] == 1: dropped = True
+                elif keep[k]:
+                    savings.append((netRemove[i] + netInsert[k], (outerArcs[i], removePre[i], removePost[i], candidates[k], insertPre[k], None), moveTypes[removePos[i]], (netRemove[i], netInsert[k])))
+        return(savings, dropped)
+
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    cdef tuple _relocatePreIFPart(self, const int[::1] outerArcs, const int[::1] offsets, const int[::1] candidates, double threshold, double bound):
+        '''
+        Moves of `_relocateToPreIF` of each outer arc, to relocate after, with
+        its candidates, to relocate.
+        '''
+        cdef Py_ssize_t nOuter = outerArcs.shape[0], i, k
+        cdef int p, q, arc, postArc
+        cdef int[::1] insertPost = np.empty(nOuter, dtype = np.int32)
+        cdef int[::1] netRemove = np.empty(candidates.shape[0], dtype = np.int32)
+        cdef int[::1] removePre = np.empty(candidates.shape[0], dtype = np.int32)
+        cdef int[::1] removePost = np.empty(candidates.shape[0], dtype = np.int32)
+        cdef int[::1] removePos = np.empty(candidates.shape[0], dtype = np.int32)
+        cdef int[::1] netInsert = np.empty(candidates.shape[0], dtype = np.int32)
+        cdef unsigned char[::1] keep = np.zeros(candidates.shape[0], dtype = np.uint8)
+        
+        with nogil:
+            for i in range(nOuter):
+                q = self._routeMappingC[outerArcs[i]]
+                arc = self._routeAt(q)
+                postArc = self._routeAt(q + 2)
+                insertPost[i] = postArc
+                for k in range(offsets[i], offsets[i + 1]):
+                    p = self._routeMappingC[candidates[k]]
+                    if not (p < q or q + 2 < p): continue
+                    netRemove[k] = self._removeCostC(candidates[k], &removePre[k], &removePost[k], &removePos[k])
+                    netInsert[k] = self._d[arc, candidates[k]] + self._if_cost[candidates[k], postArc] - self._if_cost[arc, postArc]
+                    keep[k] = (netRemove[k] + netInsert[k] < threshold) + (netRemove[k] + netInsert[k] < bound)
+        
+        savings = []
+        dropped = False
+        for i in range(nOuter):
+            for k in range(offsets[i], offsets[i + 1]):
+                if keep[k] == 1: dropped = True
+                elif keep[k]:
+                    savings.append((netRemove[k] + netInsert[k], (candidates[k], removePre[k], removePost[k], outerArcs[i], None, insertPost[i]), RELOCATE_PRE_IF_TYPES[removePos[k]], (netRemove[k], netInsert[k])))
+        return(savings, dropped)
+
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    cdef tuple _exchangePart(self, const int[::1] outerArcs, const int[::1] offsets, const int[::1] candidates, double threshold, double bound):
+        '''
+        Moves of `exchangeMovesMCARPTIF` of each outer arc with its candidates.
+        '''
+        cdef Py_ssize_t nOuter = outerArcs.shape[0], i, k
+        cdef int p1, p2, cost1, cost2, arcPos1, arcPos2, minGap
+        cdef int[::1] pre1 = np.empty(nOuter, dtype = np.int32)
+        cdef int[::1] post1 = np.empty(nOuter, dtype = np.int32)
+        cdef int[::1] pos1 = np.empty(nOuter, dtype = np.int32)
+        cdef int[::1] pre2 = np.empty(candidates.shape[0], dtype = np.int32)
+        cdef int[::1] post2 = np.empty(candidates.shape[0], dtype = np.int32)
+        cdef int[::1] pos2 = np.empty(candidates.shape[0], dtype = np.int32)
+        cdef int[::1] net1 = np.empty(candidates.shape[0], dtype = np.int32)
+        cdef int[::1] net2 = np.empty(candidates.shape[0], dtype = np.int32)
+        cdef unsigned char[::1] keep = np.zeros(candidates.shape[0], dtype = np.uint8)
+        
+        with nogil:
+            for i in range(nOuter):
+                p1 = self._routeMappingC[outerArcs[i]]
+                cost1 = self._threeSeqCostC(p1, &pre1[i], &post1[i], &pos1[i])
+                for k in range(offsets[i], offsets[i + 1]):
+                    p2 = self._routeMappingC[candidates[k]]
+                    cost2 = self._threeSeqCostC(p2, &pre2[k], &post2[k], &pos2[k])
+                    minGap = 2 if pos1[i] == 2 and pos2[k] == 1 else 1
+                    if not p2 > p1 + minGap: continue
+                    net1[k] = self._replaceCostC(pre1[i], post1[i], candidates[k], pos1[i]) - cost1
+                    net2[k] = self._replaceCostC(pre2[k], post2[k], outerArcs[i], pos2[k]) - cost2
+                    keep[k] = (net1[k] + net2[k] < threshold) + (net1[k] + net2[k] < bound)
+        
+        savings = []
+        dropped = False
+        for i in range(nOuter):
+            for k in range(offsets[i], offsets[i + 1]):
+                if keep[k] == 1: dropped = True
+                elif keep[k]:
+                    savings.append((net1[k] + net2[k], (outerArcs[i], pre1[i], post1[i], candidates[k], pre2[k], post2[k]), EXCHANGE_TYPES[pos1[i]][pos2[k]], (net1[k], net2[k])))
+        return(savings, dropped)
+
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    cdef tuple _crossPart(self, const int[::1] outerArcs, const int[::1] offsets, const int[::1] candidates, double threshold, double bound):
+        '''
+        Moves of `crossMovesMCARPTIF` of each outer arc with its candidates.
+        '''
+        cdef Py_ssize_t nOuter = outerArcs.shape[0], i, k
+        cdef int p1, p2, cost1, cost2, preArc
+        cdef int[::1] pre1 = np.empty(nOuter, dtype = np.int32)
+        cdef int[::1] pos1 = np.empty(nOuter, dtype = np.int32)
+        cdef int[::1] pre2 = np.empty(candidates.shape[0], dtype = np.int32)
+        cdef int[::1] pos2 = np.empty(candidates.shape[0], dtype = np.int32)
+        cdef int[::1] net1 = np.empty(candidates.shape[0], dtype = np.int32)
+        cdef int[::1] net2 = np.empty(candidates.shape[0], dtype = np.int32)
+        cdef unsigned char[::1] keep = np.zeros(candidates.shape[0], dtype = np.uint8)
+        
+        with nogil:
+            for i in range(nOuter):
+                p1 = self._routeMappingC[outerArcs[i]]
+                preArc = self._routeAt(p1 - 1)
+                pos1[i] = self._isIF[preArc]
+                if pos1[i]: preArc = self._routeAt(p1 - 2)
+                pre1[i] = preArc
+                cost1 = self._if_cost[preArc, self._routeAt(p1)] if pos1[i] else self._d[preArc, self._routeAt(p1)]
+                for k in range(offsets[i], offsets[i + 1]):
+                    p2 = self._routeMappingC[candidates[k]]
+                    if not p2 > p1 + 1: continue
+                    preArc = self._routeAt(p2 - 1)
+                    pos2[k] = self._isIF[preArc]
+                    if pos2[k]: preArc = self._routeAt(p2 - 2)
+                    pre2[k] = preArc
+                    cost2 = self._if_cost[preArc, self._routeAt(p2)] if pos2[k] else self._d[preArc, self._routeAt(p2)]
+                    net1[k] = (self._if_cost[pre1[i], candidates[k]] if pos1[i] else self._d[pre1[i], candidates[k]]) - cost1
+                    net2[k] = (self._if_cost[preArc, outerArcs[i]] if pos2[k] else self._d[preArc, outerArcs[i]]) - cost2
+                    keep[k] = (net1[k] + net2[k] < threshold) + (net1[k] + net2[k] < bound)
+        
+        savings = []
+        dropped = False
+        for i in range(nOuter):
+            for k in range(offsets[i], offsets[i + 1]):
+                if keep[k] == 1: dropped = True
+                elif keep[k]:
+                    savings.append((net1[k] + net2[k], (outerArcs[i], pre1[i], None, candidates[k], pre2[k], None), CROSS_TYPES[pos1[i]][pos2[k]], (net1[k], net2[k])))
+        return(savings, dropped)
+
+    @cython.boundscheck(False)
+    @cython.wraparound(False)
+    cdef tuple _flipPart(self, const int[::1] arcs, double threshold, double bound):
+        '''
+        Moves of `flipMovesMCARPTIF` of each arc.
+        '''
+        cdef Py_ssize_t nArcs = arcs.shape[0], i
+        cdef int invArc
+        cdef int[::1] preArcs = np.empty(nArcs, dtype = np.int32)
+        cdef int[::1] postArcs = np.empty(nArcs, dtype = np.int32)
+        cdef int[::1] arcPos = np.empty(nArcs, dtype = np.int32)
+        cdef int[::1] netFlip = np.empty(nArcs, dtype = np.int32)
+        cdef unsigned char[::1] keep = np.zeros(nArcs, dtype = np.uint8)
+        
+        with nogil:
+            for i in range(nArcs):
+                invArc = self._inv[arcs[i]]
+                if invArc == -1: continue
+                netFlip[i] = - self._threeSeqCostC(self._routeMappingC[arcs[i]], &preArcs[i], &postArcs[i], &arcPos[i])
+                netFlip[i] += self._replaceCostC(preArcs[i], postArcs[i], invArc, arcPos[i])
+                keep[i] = (netFlip[i] < threshold) + (netFlip[i] < bound)
+        
+        savings = []
+        dropped = False
+        for i in range(nArcs):
+            if keep[i] == 1: dropped = True
+            elif keep[i]:
+                savings.append((netFlip[i], (arcs[i], preArcs[i], postArcs[i], self._inv[arcs[i]], None, None), FLIP_TYPES[arcPos[i]], (netFlip[i], 0)))
+        return(savings, dropped)
+
+    def _initiateMoveCostCalculations(self, moveCandidates, threshold = None):
+        moveCandidates = set(moveCandidates)
+        if threshold == None: threshold = 1e300000
+        return(moveCandidates, threshold)
+
+    def _findNearestNeighboursCandidates(self, arc, nNearest, candidates):
+        if self._granularSets is not None:
+            arcNearestCandidates = candidates.intersection(self._granularSets[arc])
+        elif nNearest: 
+            if nNearest <= 1:
+                nIndex = int(ceil(self._nnListLength*nNearest))
+            else:
+                nIndex = nNearest
+            # From the C copy, so that rows of numpy nearest neighbour lists
+            # give python ints.
+            nIndex = min(nIndex, self._nnListLength)
+            nearestArcSet = set([self._nnListC[arc, k] for k in range(nIndex)])
+            arcNearestCandidates = candidates.intersection(nearestArcSet)
+        else: 
+            arcNearestCandidates = candidates
+        return(arcNearestCandidates)
+
+    # ====================================== #
+    # MCARPTIF move costs
+
+    def _calcRemoveCostMCARPTIF(self, arcPosition):
+        '''
+        Calculate the cost of removing an arc.
+        '''  
+        preArc = self.route[arcPosition - 1]
+        arc = self.route[arcPosition]
+        postArc = self.route[arcPosition + 1]
+        currentCost = self._d[preArc, arc] + self._d[arc, postArc]
+        newCost = self._d[preArc, postArc]
+        netCost = newCost - currentCost
+        return(netCost, preArc, postArc)
+
+    def _calcRemoveCostPostIF(self, arcPosition):
+        '''
+        Calculate the cost of removing an arc.
+        '''  
+        preArc = self.route[arcPosition - 2]
+        arc = self.route[arcPosition]
+        postArc = self.route[arcPosition + 1]
+        currentCost = self._if_cost[preArc, arc] + self._d[arc, postArc]
+        newCost = self._if_cost[preArc, postArc]
+        netCost = newCost - currentCost
+        return(netCost, preArc, postArc)
+
+    def _calcRemoveCostPreIF(self, arcPosition):
+        '''
+        Calculate the cost of removing an arc.
+        '''
+        preArc = self.route[arcPosition - 1]
+        arc = self.route[arcPosition]
+        postArc = self.route[arcPosition + 2]
+        currentCost = self._d[preArc, arc] + self._if_cost[arc, postArc]
+        newCost = self._if_cost[preArc, postArc]
+        netCost = newCost - currentCost
+        return(netCost, preArc, postArc)
+
+    def _calcInsertCostPostIF(self, arcPosition, insertArc):
+        '''
+        Calculate the cost of removing an arc.
+        '''
+        preArc = self.route[arcPosition - 2]
+        arc = self.route[arcPosition]
+        currentCost = self._if_cost[preArc, arc]
+        newCost = self._if_cost[preArc, insertArc] + self._d[insertArc, arc]
+        netCost = newCost - currentCost
+        return(netCost, preArc)
+
+    def _calcInsertCostPreIF(self, arcPosition, insertArc):
+        '''
+        Calculate the cost of removing an arc.
+        '''    
+        arc = self.route[arcPosition]
+        postArc = self.route[arcPosition + 2]
+        currentCost = self._if_cost[arc, postArc]
+        newCost = self._d[arc, insertArc] + self._if_cost[insertArc, postArc]
+        netCost = newCost - currentCost
+        return(netCost, postArc)
+
+    def _calcInsertCostMCARPTIF(self, arcPosition, insertArc):
+        '''
+        Calculate the cost of removing an arc.
+        '''  
+        preArc = self.route[arcPosition - 1]
+        arc = self.route[arcPosition]
+        currentCost = self._d[preArc, arc]
+        newCost = self._d[preArc, insertArc] + self._d[insertArc, arc]
+        netCost = newCost - currentCost
+        return(netCost, preArc)
+
+    def _relocateToPreIF(self, arcsToRelocate, arcRelocateAfter, threshold):
+        '''
+        Calculate the move cost of relocating a given from its current position to another. Exceptions are not calculated, such as moving
+        an arc to the end of a route and replacing an arc with its inverse 
+        '''
+        savings = []
+        arcPositionInsert = self.routeMapping[arcRelocateAfter]
+        for arcToRelocate in arcsToRelocate:
+            arcPositionRemove = self.routeMapping[arcToRelocate]
+            relocateAccurate = arcPositionRemove < arcPositionInsert or arcPositionInsert + 2 < arcPositionRemove
+            if not relocateAccurate: continue
+            move = self._cachedMove(MOVE_RELOCATE_PRE_IF, arcToRelocate, arcRelocateAfter, threshold)
+            if move is not None:
+                self._addCachedMove(savings, move, threshold)
+                continue
+            preArc = self.route[arcPositionRemove - 1]
+            postArc = self.route[arcPositionRemove + 1]
+            if preArc in self._ifs: 
+                specialIF = 'PostIF'
+                (netCostRemove, removePreArc, removePostArc) = self._calcRemoveCostPostIF(arcPositionRemove)
+            elif postArc in self._ifs: 
+                specialIF = 'PreIF'
+                (netCostRemove, removePreArc, removePostArc) = self._calcRemoveCostPreIF(arcPositionRemove)
+            else:
+                specialIF = ''
+                (netCostRemove, removePreArc, removePostArc) = self._calcRemoveCostMCARPTIF(arcPositionRemove)
+            (netCostInsert, arcToRelocateAfterPost) = self._calcInsertCostPreIF(arcPositionInsert, arcToRelocate)
+            relocateCost = netCostRemove + netCostInsert
+            if self._keepMove(relocateCost, threshold):
+                move = (relocateCost, (arcToRelocate, removePreArc, removePostArc, arcRelocateAfter, None, arcToRelocateAfterPost), 'relocate' + specialIF + '_PreIF', (netCostRemove, netCostInsert))
+                self._addMove(savings, move)
+            else:
+                move = relocateCost
+            self._cacheMove(MOVE_RELOCATE_PRE_IF, arcToRelocate, arcRelocateAfter, move)
+        return(savings)
+
+    def relocateMovesPreIF(self, relocateCandidates, arcToRelocateAfterCandidates, threshold = None, nNearest = None):
+        '''
+        Calculate the move cost of relocating an arc from current position to another. Exceptions are not calculated, such as moving
+        an arc to the end of a route and replacing an arc with its inverse 
+        '''
+        savings = []
+        (relocateCandidates, threshold) = self._initiateMoveCostCalculations(relocateCandidates, threshold)
+        if self._useKernels():
+            arcToRelocateAfterCandidates = list(arcToRelocateAfterCandidates)
+            candidateLists = [self._findNearestNeighboursCandidates(arcRelocateAfter, nNearest, relocateCandidates) for arcRelocateAfter in arcToRelocateAfterCandidates]
+            return(self._evaluateInThreads(MOVE_RELOCATE_PRE_IF, arcToRelocateAfterCandidates, candidateLists, threshold))
+        for arcRelocateAfter in arcToRelocateAfterCandidates:
+            arcsToRelocate = self._findNearestNeighboursCandidates(arcRelocateAfter, nNearest, relocateCandidates)      
+            savings += self._relocateToPreIF(arcsToRelocate, arcRelocateAfter, threshold)
+        return(savings)
+
+    def _relocateToPostIF(self, arcRelocate, arcToRelocateBeforeCandidates, threshold):
+        '''
+        Calculate the move cost of relocating a given from its current position to another. Exceptions are not calculated, such as moving
+        an arc to the end of a route and replacing an arc with its inverse 
+        '''
+        savings = []
+        arcPositionRemove = self.routeMapping[arcRelocate]
+        preArc = self.route[arcPositionRemove - 1]
+        postArc = self.route[arcPositionRemove + 1]            
+
+        if preArc in self._ifs: 
             specialIF = 'PostIF'
-            (netCostRemove, removePreArc, removePostArc) = _calcRemoveCostPostIF(arcPositionRemove)
-        elif postArc in _ifs: 
+            (netCostRemove, removePreArc, removePostArc) = self._calcRemoveCostPostIF(arcPositionRemove)
+        elif postArc in self._ifs: 
             specialIF = 'PreIF'
-            (netCostRemove, removePreArc, removePostArc) = _calcRemoveCostPreIF(arcPositionRemove)
+            (netCostRemove, removePreArc, removePostArc) = self._calcRemoveCostPreIF(arcPositionRemove)
         else:
             specialIF = ''
-            (netCostRemove, removePreArc, removePostArc) = _calcRemoveCostMCARPTIF(arcPositionRemove)
-        (netCostInsert, arcToRelocateAfterPost) = _calcInsertCostPreIF(arcPositionInsert, arcToRelocate)
-        relocateCost = netCostRemove + netCostInsert
-        if relocateCost < threshold:
-            savings.append((relocateCost, (arcToRelocate, removePreArc, removePostArc, arcRelocateAfter, None, arcToRelocateAfterPost), 'relocate' + specialIF + '_PreIF', (netCostRemove, netCostInsert)))
-    return(savings)
-
-def relocateMovesPreIF(relocateCandidates, arcToRelocateAfterCandidates, threshold = None, nNearest = None):
-    '''
-    Calculate the move cost of relocating an arc from current position to another. Exceptions are not calculated, such as moving
-    an arc to the end of a route and replacing an arc with its inverse 
-    '''
-    savings = []
-    (relocateCandidates, threshold) = _initiateMoveCostCalculations(relocateCandidates, threshold)
-    for arcRelocateAfter in arcToRelocateAfterCandidates:
-        arcsToRelocate = _findNearestNeighboursCandidates(arcRelocateAfter, nNearest, relocateCandidates)      
-        savings += _relocateToPreIF(arcsToRelocate, arcRelocateAfter, threshold)
-    return(savings)
-
-def _relocateToPostIF(arcRelocate, arcToRelocateBeforeCandidates, threshold):
-    '''
-    Calculate the move cost of relocating a given from its current position to another. Exceptions are not calculated, such as moving
-    an arc to the end of a route and replacing an arc with its inverse 
-    '''
-    savings = []
-    arcPositionRemove = routeMapping[arcRelocate]
-    preArc = route[arcPositionRemove - 1]
-    postArc = route[arcPositionRemove + 1]            
-
-    if preArc in _ifs: 
-        specialIF = 'PostIF'
-        (netCostRemove, removePreArc, removePostArc) = _calcRemoveCostPostIF(arcPositionRemove)
-    elif postArc in _ifs: 
-        specialIF = 'PreIF'
-        (netCostRemove, removePreArc, removePostArc) = _calcRemoveCostPreIF(arcPositionRemove)
-    else:
-        specialIF = ''
-        (netCostRemove, removePreArc, removePostArc) = _calcRemoveCostMCARPTIF(arcPositionRemove)
-    
-    for arcToRelocateBefore in arcToRelocateBeforeCandidates:
-        arcPositionInsert = routeMapping[arcToRelocateBefore]
-        relocateAccurate = arcPositionRemove > arcPositionInsert or arcPositionInsert > arcPositionRemove + 2
-        if not relocateAccurate: continue
-        (netCostInsert, arcToRelocateBeforePre) = _calcInsertCostPostIF(arcPositionInsert, arcRelocate)
-        relocateCost = netCostRemove + netCostInsert
-        if relocateCost < threshold:
-            savings.append((relocateCost, (arcRelocate, removePreArc, removePostArc, arcToRelocateBefore, arcToRelocateBeforePre, None), 'relocate' + specialIF + '_PostIF', (netCostRemove, netCostInsert)))
-    return(savings)
-
-def relocateMovesPostIF(relocateCandidates, arcToRelocateBeforeCandidates, threshold = None, nNearest = None):
-    '''
-    Calculate the move cost of relocating an arc from current position to another. Exceptions are not calculated, such as moving
-    an arc to the end of a route and replacing an arc with its inverse 
-    '''
-    savings = []
-    (arcToRelocateBeforeCandidates, threshold) = _initiateMoveCostCalculations(arcToRelocateBeforeCandidates, threshold)
-    for arcRelocate in relocateCandidates:
-        arcToRelocateBeforeCandidates = _findNearestNeighboursCandidates(arcRelocate, nNearest, arcToRelocateBeforeCandidates)      
-        savings += _relocateToPostIF(arcRelocate, arcToRelocateBeforeCandidates, threshold)
-    return(savings)
-
-def _relocateBeforeArc(arcRelocate, arcToRelocateBeforeCandidates, threshold):
-    '''
-    Calculate the move cost of relocating a given from its current position to another. Exceptions are not calculated, such as moving
-    an arc to the end of a route and replacing an arc with its inverse 
-    '''
-    savings = []
-    arcPositionRemove = routeMapping[arcRelocate]
-    preArc = route[arcPositionRemove - 1]
-    postArc = route[arcPositionRemove + 1]            
-
-    if preArc in _ifs: 
-        specialIF = 'PostArcIF'
-        (netCostRemove, removePreArc, removePostArc) = _calcRemoveCostPostIF(arcPositionRemove)
-        arcPositionRemoveAdd = + 1
-    elif postArc in _ifs: 
-        specialIF = 'PreArcIF'
-        (netCostRemove, removePreArc, removePostArc) = _calcRemoveCostPreIF(arcPositionRemove)
-        arcPositionRemoveAdd = + 2
-    else:
-        specialIF = ''
-        (netCostRemove, removePreArc, removePostArc) = _calcRemoveCostMCARPTIF(arcPositionRemove)
-        arcPositionRemoveAdd = + 1
-        
-    for arcToRelocateBefore in arcToRelocateBeforeCandidates:
-        arcPositionInsert = routeMapping[arcToRelocateBefore]
-        relocateAccurate = arcPositionRemove > arcPositionInsert or arcPositionInsert > arcPositionRemove + arcPositionRemoveAdd
-        if not relocateAccurate: continue
-        (netCostInsert, arcToRelocateBeforePre) = _calcInsertCostMCARPTIF(arcPositionInsert, arcRelocate)
-        relocateCost = netCostRemove + netCostInsert
-        if relocateCost < threshold:
-            savings.append((relocateCost, (arcRelocate, removePreArc, removePostArc, arcToRelocateBefore, arcToRelocateBeforePre, None), 'relocate' + specialIF, (netCostRemove, netCostInsert)))
-    return(savings)
-    
-def relocateMovesMCARPTIF(relocateCandidates, arcToRelocateBeforeCandidates, threshold = None, nNearest = None):
-    '''
-    Calculate the move cost of relocating an arc from current position to another. Exceptions are not calculated, such as moving
-    an arc to the end of a route and replacing an arc with its inverse 
-    '''
-    savings = []
-    (arcToRelocateBeforeCandidates, threshold) = _initiateMoveCostCalculations(arcToRelocateBeforeCandidates, threshold)
-    for arcRelocate in relocateCandidates:
-        arcToRelocateBeforeCandidates = _findNearestNeighboursCandidates(arcRelocate, nNearest, arcToRelocateBeforeCandidates)      
-        savings += _relocateBeforeArc(arcRelocate, arcToRelocateBeforeCandidates, threshold)
-    return(savings)
-
-def _threeSeqCost(arcPosition, n):
-    '''
-    Calculate the cost of three consecutive arcs in a route.
-    '''         
-    preArc = route[arcPosition - 1]
-    arc = route[arcPosition]
-    postArc = route[arcPosition + 1]
-    
-    if preArc in _ifs: 
-        exchangePos = n + 'excPostIF'
-        preArc = route[arcPosition - 2]
-        cost = _if_cost[preArc][arc] + _d[arc][postArc]
-    elif postArc in _ifs: 
-        exchangePos = n + 'excPreIF'
-        postArc = route[arcPosition + 2]
-        cost = _d[preArc][arc] + _if_cost[arc][postArc]
-    else: 
-        exchangePos = ''
-        cost = _d[preArc][arc] + _d[arc][postArc]
-    return(cost, preArc, arc, postArc, exchangePos)
-
-def _replaceCost(preArc, postArc, replaceArc, exchangePos):
-    '''
-    Calculate the cost of three consecutive arcs in a route.
-    '''                  
-    if exchangePos.find('excPostIF') != -1: 
-        cost = _if_cost[preArc][replaceArc] + _d[replaceArc][postArc]
-    elif exchangePos.find('excPreIF') != -1:
-        cost = _d[preArc][replaceArc] + _if_cost[replaceArc][postArc]
-    else: 
-        cost = _d[preArc][replaceArc] + _d[replaceArc][postArc]
-    return(cost)
-
-def exchangeMovesMCARPTIF(exchangeCandidates1, exchangeCandidates2, threshold = None, nNearest = None):
-    '''
-    Calculate the move cost of relocating an arc from current position to another. Exceptions are not calculated, such as moving
-    an arc to the end of a route and replacing an arc with its inverse 
-    '''
-    savings = []
-    (exchangeCandidates1, threshold) = _initiateMoveCostCalculations(exchangeCandidates1, threshold)
-    for arcExchange1 in exchangeCandidates1:
-        arcPositionExc1 = routeMapping[arcExchange1]
-        (cost1, preArc1, arc1, postArc1, exchangePos1) = _threeSeqCost(arcPositionExc1, n= '_1')
-        exchangeCandidates2 = _findNearestNeighboursCandidates(preArc1, nNearest, exchangeCandidates2) 
-        for arcExchange2 in exchangeCandidates2:
-            arcPositionExc2 = routeMapping[arcExchange2]
-            (cost2, preArc2, arc2, postArc2, exchangePos2) = _threeSeqCost(arcPositionExc2, n = '_2')
-            if exchangePos1 == '_1excPreIF' and exchangePos2 == '_2excPostIF':
-                exchangeArcs = arcPositionExc2 > arcPositionExc1 + 2
-            else: 
-                exchangeArcs = arcPositionExc2 > arcPositionExc1 + 1
-            if not exchangeArcs: continue
-            cost1new = _replaceCost(preArc1, postArc1, arcExchange2, exchangePos1)
-            cost2new = _replaceCost(preArc2, postArc2, arcExchange1, exchangePos2)
-            netExc1 = cost1new - cost1
-            netExc2 = cost2new - cost2
-            netExc = netExc1 + netExc2
-            if netExc1 + netExc2 < threshold:
-                savings.append((netExc, (arcExchange1, preArc1, postArc1, arcExchange2, preArc2, postArc2), 'exchange' + exchangePos1 + exchangePos2, (netExc1, netExc2)))
-    return(savings)
-
-def _twoSeqCost(arcPosition, n):
-    '''
-    Calculate the cost of three consecutive arcs in a route.
-    '''       
-    preArc = route[arcPosition - 1]
-    arc = route[arcPosition]
-    
-    if preArc in _ifs: 
-        crossPos = n + 'crossPostIF'
-        preArc = route[arcPosition - 2]
-        cost = _if_cost[preArc][arc]
-    else: 
-        crossPos = ''
-        cost = _d[preArc][arc]
-    return(cost, preArc, arc, crossPos)
-
-def _relinkCost(preArc, relinkArc, crossPos):
-    '''
-    Calculate the cost of three consecutive arcs in a route.
-    '''                  
-    if crossPos.find('crossPostIF') != -1: 
-        cost = _if_cost[preArc][relinkArc]
-    else: 
-        cost = _d[preArc][relinkArc]
-    return(cost)
-
-def crossMovesMCARPTIF(relinkCandidates1, relinkCandidates2, threshold = None, nNearest = None):
-    '''
-    Calculate the move cost of relocating an arc from current position to another. Exceptions are not calculated, such as moving
-    an arc to the end of a route and replacing an arc with its inverse 
-    '''
-    savings = []
-    (relinkCandidates1, threshold) = _initiateMoveCostCalculations(relinkCandidates1, threshold)
-    for arcRelink1 in relinkCandidates1:
-        arcPositionRelink1 = routeMapping[arcRelink1]
-        (cost1, preArc1, arc1, relinkPos1) = _twoSeqCost(arcPositionRelink1, n= '_1')
-        relinkCandidates2 = _findNearestNeighboursCandidates(preArc1, nNearest, relinkCandidates2) 
-        for arcRelink2 in relinkCandidates2:
-            arcPositionRelink2 = routeMapping[arcRelink2]
-            (cost2, preArc2, arc2, relinkPos2) = _twoSeqCost(arcPositionRelink2, n = '_2')
-            if relinkPos1 == '_1crossPreIF' and relinkPos2 == '_2crossPostIF':
-                exchangeArcs = arcPositionRelink2 > arcPositionRelink1 + 2
-            else: 
-                exchangeArcs = arcPositionRelink2 > arcPositionRelink1 + 1
-            if not exchangeArcs: continue
-            cost1new = _relinkCost(preArc1, arcRelink2, relinkPos1)
-            cost2new = _relinkCost(preArc2, arcRelink1, relinkPos2)
-            netLink1 = cost1new - cost1
-            netLink2 = cost2new - cost2
-            netLinkNew = netLink1 + netLink2
-            if netLinkNew < threshold:
-                savings.append((netLinkNew, (arcRelink1, preArc1, None, arcRelink2, preArc2, None), 'cross' + relinkPos1 + relinkPos2, (netLink1, netLink2)))
-    return(savings)
-
-def flipMovesMCARPTIF(exchangeCandidates1, threshold = None):
-    '''
-    Calculate the move cost of relocating an arc from current position to another. Exceptions are not calculated, such as moving
-    an arc to the end of a route and replacing an arc with its inverse 
-    '''
-    savings = []
-    (exchangeCandidates1, threshold) = _initiateMoveCostCalculations(exchangeCandidates1, threshold)
-    for arcExchange1 in exchangeCandidates1:
-        invExchange = _inv[arcExchange1]
-        arcPositionExc1 = routeMapping[arcExchange1]
-        (cost1, preArc1, arc1, postArc1, exchangePos1) = _threeSeqCost(arcPositionExc1, n= '_')
-        cost1new = _replaceCost(preArc1, postArc1, invExchange, exchangePos1)
-        netFlip = cost1new - cost1
-        if netFlip < threshold:
-            savings.append((netFlip, (arcExchange1, preArc1, postArc1, invExchange, None, None), 'flip' + exchangePos1, (netFlip, 0)))
-    return(savings)
+            (netCostRemove, removePreArc, removePostArc) = self._calcRemoveCostMCARPTIF(arcPositionRemove)
+
+        for arcToRelocateBefore in arcToRelocateBeforeCandidates:
+            arcPositionInsert = self.routeMapping[arcToRelocateBefore]
+            relocateAccurate = arcPositionRemove > arcPositionInsert or arcPositionInsert > arcPositionRemove + 2
+            if not relocateAccurate: continue
+            move = self._cachedMove(MOVE_RELOCATE_POST_IF, arcRelocate, arcToRelocateBefore, threshold)
+            if move is not None:
+                self._addCachedMove(savings, move, threshold)
+                continue
+            (netCostInsert, arcToRelocateBeforePre) = self._calcInsertCostPostIF(arcPositionInsert, arcRelocate)
+            relocateCost = netCostRemove + netCostInsert
+            if self._keepMove(relocateCost, threshold):
+                move = (relocateCost, (arcRelocate, removePreArc, removePostArc, arcToRelocateBefore, arcToRelocateBeforePre, None), 'relocate' + specialIF + '_PostIF', (netCostRemove, netCostInsert))
+                self._addMove(savings, move)
+            else:
+                move = relocateCost
+            self._cacheMove(MOVE_RELOCATE_POST_IF, arcRelocate, arcToRelocateBefore, move)
+        return(savings)
+
+    def relocateMovesPostIF(self, relocateCandidates, arcToRelocateBeforeCandidates, threshold = None, nNearest = None):
+        '''
+        Calculate the move cost of relocating an arc from current position to another. Exceptions are not calculated, such as moving
+        an arc to the end of a route and replacing an arc with its inverse 
+        '''
+        savings = []
+        (arcToRelocateBeforeCandidates, threshold) = self._initiateMoveCostCalculations(arcToRelocateBeforeCandidates, threshold)
+        if self._useKernels():
+            relocateCandidates = list(relocateCandidates)
+            candidateLists = []
+            for arcRelocate in relocateCandidates:
+                arcToRelocateBeforeCandidates = self._findNearestNeighboursCandidates(arcRelocate, nNearest, arcToRelocateBeforeCandidates)
+                candidateLists.append(arcToRelocateBeforeCandidates)
+            return(self._evaluateInThreads(MOVE_RELOCATE_POST_IF, relocateCandidates, candidateLists, threshold))
+        for arcRelocate in relocateCandidates:
+            arcToRelocateBeforeCandidates = self._findNearestNeighboursCandidates(arcRelocate, nNearest, arcToRelocateBeforeCandidates)      
+            savings += self._relocateToPostIF(arcRelocate, arcToRelocateBeforeCandidates, threshold)
+        return(savings)
+
+    def _relocateBeforeArc(self, arcRelocate, arcToRelocateBeforeCandidates, threshold):
+        '''
+        Calculate the move cost of relocating a given from its current position to another. Exceptions are not calculated, such as moving
+        an arc to the end of a route and replacing an arc with its inverse 
+        '''
+        savings = []
+        arcPositionRemove = self.routeMapping[arcRelocate]
+        preArc = self.route[arcPositionRemove - 1]
+        postArc = self.route[arcPositionRemove + 1]            
+
+        if preArc in self._ifs: 
+            specialIF = 'PostArcIF'
+            (netCostRemove, removePreArc, removePostArc) = self._calcRemoveCostPostIF(arcPositionRemove)
+            arcPositionRemoveAdd = + 1
+        elif postArc in self._ifs: 
+            specialIF = 'PreArcIF'
+            (netCostRemove, removePreArc, removePostArc) = self._calcRemoveCostPreIF(arcPositionRemove)
+            arcPositionRemoveAdd = + 2
+        else:
+            specialIF = ''
+            (netCostRemove, removePreArc, removePostArc) = self._calcRemoveCostMCARPTIF(arcPositionRemove)
+            arcPositionRemoveAdd = + 1
+
+        for arcToRelocateBefore in arcToRelocateBeforeCandidates:
+            arcPositionInsert = self.routeMapping[arcToRelocateBefore]
+            relocateAccurate = arcPositionRemove > arcPositionInsert or arcPositionInsert > arcPositionRemove + arcPositionRemoveAdd
+            if not relocateAccurate: continue
+            move = self._cachedMove(MOVE_RELOCATE, arcRelocate, arcToRelocateBefore, threshold)
+            if move is not None:
+                self._addCachedMove(savings, move, threshold)
+                continue
+            (netCostInsert, arcToRelocateBeforePre) = self._calcInsertCostMCARPTIF(arcPositionInsert, arcRelocate)
+            relocateCost = netCostRemove + netCostInsert
+            if self._keepMove(relocateCost, threshold):
+                move = (relocateCost, (arcRelocate, removePreArc, removePostArc, arcToRelocateBefore, arcToRelocateBeforePre, None), 'relocate' + specialIF, (netCostRemove, netCostInsert))
+                self._addMove(savings, move)
+            else:
+                move = relocateCost
+            self._cacheMove(MOVE_RELOCATE, arcRelocate, arcToRelocateBefore, move)
+        return(savings)
+
+    def relocateMovesMCARPTIF(self, relocateCandidates, arcToRelocateBeforeCandidates, threshold = None, nNearest = None):
+        '''
+        Calculate the move cost of relocating an arc from current position to another. Exceptions are not calculated, such as moving
+        an arc to the end of a route and replacing an arc with its inverse 
+        '''
+        savings = []
+        (arcToRelocateBeforeCandidates, threshold) = self._initiateMoveCostCalculations(arcToRelocateBeforeCandidates, threshold)
+        if self._useKernels():
+            relocateCandidates = list(relocateCandidates)
+            candidateLists = []
+            for arcRelocate in relocateCandidates:
+                arcToRelocateBeforeCandidates = self._findNearestNeighboursCandidates(arcRelocate, nNearest, arcToRelocateBeforeCandidates)
+                candidateLists.append(arcToRelocateBeforeCandidates)
+            return(self._evaluateInThreads(MOVE_RELOCATE, relocateCandidates, candidateLists, threshold))
+        for arcRelocate in relocateCandidates:
+            arcToRelocateBeforeCandidates = self._findNearestNeighboursCandidates(arcRelocate, nNearest, arcToRelocateBeforeCandidates)      
+            savings += self._relocateBeforeArc(arcRelocate, arcToRelocateBeforeCandidates, threshold)
+        return(savings)
+
+    def _threeSeqCost(self, arcPosition, n):
+        '''
+        Calculate the cost of three consecutive arcs in a route.
+        '''         
+        preArc = self.route[arcPosition - 1]
+        arc = self.route[arcPosition]
+        postArc = self.route[arcPosition + 1]
+
+        if preArc in self._ifs: 
+            exchangePos = n + 'excPostIF'
+            preArc = self.route[arcPosition - 2]
+            cost = self._if_cost[preArc, arc] + self._d[arc, postArc]
+        elif postArc in self._ifs: 
+            exchangePos = n + 'excPreIF'
+            postArc = self.route[arcPosition + 2]
+            cost = self._d[preArc, arc] + self._if_cost[arc, postArc]
+        else: 
+            exchangePos = ''
+            cost = self._d[preArc, arc] + self._d[arc, postArc]
+        return(cost, preArc, arc, postArc, exchangePos)
+
+    def _replaceCost(self, preArc, postArc, replaceArc, exchangePos):
+        '''
+        Calculate the cost of three consecutive arcs in a route.
+        '''                  
+        if exchangePos.find('excPostIF') != -1: 
+            cost = self._if_cost[preArc, replaceArc] + self._d[replaceArc, postArc]
+        elif exchangePos.find('excPreIF') != -1:
+            cost = self._d[preArc, replaceArc] + self._if_cost[replaceArc, postArc]
+        else: 
+            cost = self._d[preArc, replaceArc] + self._d[replaceArc, postArc]
+        return(cost)
+
+    def exchangeMovesMCARPTIF(self, exchangeCandidates1, exchangeCandidates2, threshold = None, nNearest = None):
+        '''
+        Calculate the move cost of relocating an arc from current position to another. Exceptions are not calculated, such as moving
+        an arc to the end of a route and replacing an arc with its inverse 
+        '''
+        savings = []
+        (exchangeCandidates1, threshold) = self._initiateMoveCostCalculations(exchangeCandidates1, threshold)
+        if self._useKernels():
+            exchangeCandidates1 = list(exchangeCandidates1)
+            candidateLists = []
+            for arcExchange1 in exchangeCandidates1:
+                preArc1 = self._threeSeqCost(self.routeMapping[arcExchange1], n= '_1')[1]
+                exchangeCandidates2 = self._findNearestNeighboursCandidates(preArc1, nNearest, exchangeCandidates2)
+                candidateLists.append(exchangeCandidates2)
+            return(self._evaluateInThreads(MOVE_EXCHANGE, exchangeCandidates1, candidateLists, threshold))
+        for arcExchange1 in exchangeCandidates1:
+            arcPositionExc1 = self.routeMapping[arcExchange1]
+            (cost1, preArc1, arc1, postArc1, exchangePos1) = self._threeSeqCost(arcPositionExc1, n= '_1')
+            exchangeCandidates2 = self._findNearestNeighboursCandidates(preArc1, nNearest, exchangeCandidates2) 
+            for arcExchange2 in exchangeCandidates2:
+                arcPositionExc2 = self.routeMapping[arcExchange2]
+                (cost2, preArc2, arc2, postArc2, exchangePos2) = self._threeSeqCost(arcPositionExc2, n = '_2')
+                if exchangePos1 == '_1excPreIF' and exchangePos2 == '_2excPostIF':
+                    exchangeArcs = arcPositionExc2 > arcPositionExc1 + 2
+                else: 
+                    exchangeArcs = arcPositionExc2 > arcPositionExc1 + 1
+                if not exchangeArcs: continue
+                move = self._cachedMove(MOVE_EXCHANGE, arcExchange1, arcExchange2, threshold)
+                if move is not None:
+                    self._addCachedMove(savings, move, threshold)
+                    continue
+                cost1new = self._replaceCost(preArc1, postArc1, arcExchange2, exchangePos1)
+                cost2new = self._replaceCost(preArc2, postArc2, arcExchange1, exchangePos2)
+                netExc1 = cost1new - cost1
+                netExc2 = cost2new - cost2
+                netExc = netExc1 + netExc2
+                if self._keepMove(netExc, threshold):
+                    move = (netExc, (arcExchange1, preArc1, postArc1, arcExchange2, preArc2, postArc2), 'exchange' + exchangePos1 + exchangePos2, (netExc1, netExc2))
+                    self._addMove(savings, move)
+                else:
+                    move = netExc
+                self._cacheMove(MOVE_EXCHANGE, arcExchange1, arcExchange2, move)
+        return(savings)
+
+    def _twoSeqCost(self, arcPosition, n):
+        '''
+        Calculate the cost of three consecutive arcs in a route.
+        '''       
+        preArc = self.route[arcPosition - 1]
+        arc = self.route[arcPosition]
+
+        if preArc in self._ifs: 
+            crossPos = n + 'crossPostIF'
+            preArc = self.route[arcPosition - 2]
+            cost = self._if_cost[preArc, arc]
+        else: 
+            crossPos = ''
+            cost = self._d[preArc, arc]
+        return(cost, preArc, arc, crossPos)
+
+    def _relinkCost(self, preArc, relinkArc, crossPos):
+        '''
+        Calculate the cost of three consecutive arcs in a route.
+        '''                  
+        if crossPos.find('crossPostIF') != -1: 
+            cost = self._if_cost[preArc, relinkArc]
+        else: 
+            cost = self._d[preArc, relinkArc]
+        return(cost)
+
+    def crossMovesMCARPTIF(self, relinkCandidates1, relinkCandidates2, threshold = None, nNearest = None):
+        '''
+        Calculate the move cost of relocating an arc from current position to another. Exceptions are not calculated, such as moving
+        an arc to the end of a route and replacing an arc with its inverse 
+        '''
+        savings = []
+        (relinkCandidates1, threshold) = self._initiateMoveCostCalculations(relinkCandidates1, threshold)
+        if self._useKernels():
+            relinkCandidates1 = list(relinkCandidates1)
+            candidateLists = []
+            for arcRelink1 in relinkCandidates1:
+                preArc1 = self._twoSeqCost(self.routeMapping[arcRelink1], n= '_1')[1]
+                relinkCandidates2 = self._findNearestNeighboursCandidates(preArc1, nNearest, relinkCandidates2)
+                candidateLists.append(relinkCandidates2)
+            return(self._evaluateInThreads(MOVE_CROSS, relinkCandidates1, candidateLists, threshold))
+        for arcRelink1 in relinkCandidates1:
+            arcPositionRelink1 = self.routeMapping[arcRelink1]
+            (cost1, preArc1, arc1, relinkPos1) = self._twoSeqCost(arcPositionRelink1, n= '_1')
+            relinkCandidates2 = self._findNearestNeighboursCandidates(preArc1, nNearest, relinkCandidates2) 
+            for arcRelink2 in relinkCandidates2:
+                arcPositionRelink2 = self.routeMapping[arcRelink2]
+                (cost2, preArc2, arc2, relinkPos2) = self._twoSeqCost(arcPositionRelink2, n = '_2')
+                if relinkPos1 == '_1crossPreIF' and relinkPos2 == '_2crossPostIF':
+                    exchangeArcs = arcPositionRelink2 > arcPositionRelink1 + 2
+                else: 
+                    exchangeArcs = arcPositionRelink2 > arcPositionRelink1 + 1
+                if not exchangeArcs: continue
+                move = self._cachedMove(MOVE_CROSS, arcRelink1, arcRelink2, threshold)
+                if move is not None:
+                    self._addCachedMove(savings, move, threshold)
+                    continue
+                cost1new = self._relinkCost(preArc1, arcRelink2, relinkPos1)
+                cost2new = self._relinkCost(preArc2, arcRelink1, relinkPos2)
+                netLink1 = cost1new - cost1
+                netLink2 = cost2new - cost2
+                netLinkNew = netLink1 + netLink2
+                if self._keepMove(netLinkNew, threshold):
+                    move = (netLinkNew, (arcRelink1, preArc1, None, arcRelink2, preArc2, None), 'cross' + relinkPos1 + relinkPos2, (netLink1, netLink2))
+                    self._addMove(savings, move)
+                else:
+                    move = netLinkNew
+                self._cacheMove(MOVE_CROSS, arcRelink1, arcRelink2, move)
+        return(savings)
+
+    def flipMovesMCARPTIF(self, exchangeCandidates1, threshold = None):
+        '''
+        Calculate the move cost of relocating an arc from current position to another. Exceptions are not calculated, such as moving
+        an arc to the end of a route and replacing an arc with its inverse 
+        '''
+        savings = []
+        (exchangeCandidates1, threshold) = self._initiateMoveCostCalculations(exchangeCandidates1, threshold)
+        if self._useKernels():
+            exchangeCandidates1 = list(exchangeCandidates1)
+            return(self._evaluateInThreads(MOVE_FLIP, exchangeCandidates1, [()]*len(exchangeCandidates1), threshold))
+        for arcExchange1 in exchangeCandidates1:
+            move = self._cachedMove(MOVE_FLIP, arcExchange1, arcExchange1, threshold)
+            if move is not None:
+                self._addCachedMove(savings, move, threshold)
+                continue
+            invExchange = self._inv[arcExchange1]
+            arcPositionExc1 = self.routeMapping[arcExchange1]
+            (cost1, preArc1, arc1, postArc1, exchangePos1) = self._threeSeqCost(arcPositionExc1, n= '_')
+            cost1new = self._replaceCost(preArc1, postArc1, invExchange, exchangePos1)
+            netFlip = cost1new - cost1
+            if self._keepMove(netFlip, threshold):
+                move = (netFlip, (arcExchange1, preArc1, postArc1, invExchange, None, None), 'flip' + exchangePos1, (netFlip, 0))
+                self._addMove(savings, move)
+            else:
+                move = netFlip
+            self._cacheMove(MOVE_FLIP, arcExchange1, arcExchange1, move)
+        return(savings)
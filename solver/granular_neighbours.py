@@ -0,0 +1,91 @@
+# -*- coding: utf-8 -*-
+"""Granular neighbour lists of required arcs, for the MCARPTIF move costs.
+
+With `nnFrac` the move costs only consider the same fraction of each arc's
+nearest neighbours, `info.nn_list`, for every arc. Arcs in dense parts of
+the network then lose close neighbours, while arcs in sparse parts keep far
+away ones that never give improving moves. Granular neighbour lists, as in
+the granular tabu search of Toth and Vigo, instead keep the neighbours of
+each arc that are closer than a threshold based on the average deadhead
+between consecutive arcs of a good solution:
+
+    threshold = beta * deadhead / (n_arcs + n_routes)
+
+The lists are stored in compressed sparse row (CSR) format, as int32 arrays:
+
+    offsets (n + 1): the neighbours of arc i are
+        targets[offsets[i]:offsets[i + 1]].
+    targets: neighbour arc indices, nearest first for each arc.
+
+Example:
+
+    >>> neighbours = GranularNeighbours(info.d, info.nn_list)
+    >>> threshold = granular_threshold(deadhead, len(info.reqArcListActual),
+    ...                                solution['nVehicles'], beta=2)
+    >>> offsets, targets = neighbours.lists(threshold)
+"""
+
+import logging
+import numpy as np
+from solver.c_buffers import int32_buffer
+
+
+def granular_threshold(deadhead, n_arcs, n_routes, beta):
+    """Neighbour cost threshold, `beta` times the average deadhead cost
+    between consecutive arcs of a solution.
+
+    Args:
+        deadhead (int): total deadhead cost of the solution.
+        n_arcs (int): number of required arcs.
+        n_routes (int): number of routes of the solution.
+        beta (float): sparsification factor, larger values keep more
+            neighbours.
+
+    Return:
+        threshold (float): maximum deadhead cost to a granular neighbour.
+    """
+    if beta <= 0:
+        logging.error('Granular sparsification factor has to be positive, '
+                      'not {}'.format(beta))
+        raise ValueError
+    return beta * deadhead / (n_arcs + n_routes)
+
+
+class GranularNeighbours(object):
+    """Granular neighbour lists of an instance, see the module docstring."""
+
+    def __init__(self, d, nn_list, min_neighbours=5):
+        """
+        Args:
+            d (n*n matrix): deadhead cost between arcs.
+            nn_list (n*m matrix): nearest neighbours of each arc, nearest
+                first, such as `info.nn_list`.
+
+        Kwarg:
+            min_neighbours (int): nearest neighbours kept for each arc, even
+                if they are further than the threshold, so that arcs far from
+                all others can still be moved.
+        """
+        self.nn_list = int32_buffer(nn_list)
+        rows = np.arange(self.nn_list.shape[0])[:, None]
+        self.nn_costs = int32_buffer(d)[rows, self.nn_list]
+        self.min_neighbours = min(min_neighbours, self.nn_list.shape[1])
+
+    def lists(self, threshold):
+        """Return the neighbours of each arc whose deadhead cost is at most
+        `threshold`, and at least the `min_neighbours` nearest ones.
+
+        Arg:
+            threshold (float): maximum deadhead cost to a neighbour.
+
+        Returns:
+            offsets (np.array <int32>): neighbours of arc i are stored at
+                offsets[i]:offsets[i + 1].
+            targets (np.array <int32>): neighbour arc indices.
+        """
+        keep = self.nn_costs <= threshold
+        keep[:, :self.min_neighbours] = True
+        offsets = np.zeros(self.nn_list.shape[0] + 1, dtype=np.int32)
+        np.cumsum(keep.sum(axis=1), out=offsets[1:])
+        targets = self.nn_list[keep]
+        return offsets, targets
@@ -0,0 +1,161 @@
+# -*- coding: utf-8 -*-
+"""Build initial solutions with Extended Path Scanning on a process pool.
+
+`EPS_IF.EPS_all_rules` builds one solution per tie-break rule, one after the
+other, and the `EPS_IF_random*` variants build randomised solutions in serial
+loops. `construct_solutions` fans the rule runs and seeded random restarts
+out over worker processes, and returns the best solutions:
+
+    >>> solutions = construct_solutions(info, n_random=200, n_workers=4,
+    ...                                 best_k=3, seed=1)
+    >>> solutions[0]['TotalCost']
+
+Each job is a tie-break rule and a seed. Random tie-breaks use numpy's global
+random state, which is seeded per job with seeds drawn from `seed`, so the
+solutions do not depend on the number of workers or the order in which jobs
+finish. As in `EPS_IF.EPS_all_rules`, the trips of each solution can also be
+reduced with `Reduce_Trips.reduce_trip`, in which case the better of the
+built and reduced solutions is kept.
+
+The instance data is read-only, and is passed to each worker once, when it
+starts, where it builds one `EPS_IF` solver for all its jobs. Where
+processes are forked, workers share the parent's copy of the data.
+"""
+
+import logging
+import multiprocessing
+import numpy as np
+from copy import deepcopy
+from concurrent.futures import ProcessPoolExecutor
+import solver.py_alg_extended_path_scanning_rr as EPS
+
+#  Tie-break rules of `EPS_IF.EPS_all_rules`.
+ALL_RULES = ('MaxDepo', 'MinDepo', 'MaxIF', 'MinIF', 'MaxYield', 'MinYield',
+             'Hybrid', 'HybridIFdepto')
+
+#  Randomised tie-break rules, see `TieBreakRules.choose_arc`.
+RANDOM_RULES = ('RandomRule', 'RandomRuleIFs', 'RandomRuleAll', 'RandomArc')
+
+#  Solver of a worker process, see `_init_worker`.
+_worker_solver = None
+
+
+def _path_scanning_solver(info, test_solution=False, reduce_trips=False):
+    """EPS_IF solver with the settings of `solve.gen_solution`."""
+    initial_solver = EPS.EPS_IF(info)
+    initial_solver.testsolutions = test_solution
+    initial_solver.c_modules = True
+    initial_solver.reduce_all_trips = reduce_trips
+    return initial_solver
+
+
+def _init_worker(info, test_solution, reduce_trips):
+    global _worker_solver
+    _worker_solver = _path_scanning_solver(info, test_solution, reduce_trips)
+
+
+def _build_solution(initial_solver, job):
+    """Build the solution of a (rule, seed) job, and keep its reduced trip
+    version if that is better on number of vehicles then total cost."""
+    rule, job_seed = job
+    if job_seed is not None:
+        np.random.seed(job_seed)
+    initial_solver.rule = rule
+    solution = initial_solver.buildMultipleIFRoutes()
+    if initial_solver.reduce_all_trips:
+        reduced = initial_solver.Reduce_Trips.reduce_trip(
+            deepcopy(solution))[0]
+        if (reduced['nVehicles'], reduced['TotalCost']) < \
+                (solution['nVehicles'], solution['TotalCost']):
+            solution = reduced
+    return solution
+
+
+def _worker_build_solution(job):
+    return _build_solution(_worker_solver, job)
+
+
+def _pool_context():
+    """Fork where available, so that workers share the instance data."""
+    if 'fork' in multiprocessing.get_all_start_methods():
+        return multiprocessing.get_context('fork')
+    return multiprocessing.get_context()
+
+
+def construction_jobs(rules=ALL_RULES, n_random=0, random_rule='RandomRule',
+                      seed=None):
+    """Return the (rule, seed) jobs of the deterministic rules, followed by
+    the random restarts.
+
+    Kwargs:
+        rules (list <str>): deterministic tie-break rules.
+        n_random (int): number of random restarts.
+        random_rule (str): randomised tie-break rule of the restarts, one of
+            `RANDOM_RULES`.
+        seed (int): seed from which the seed of each restart is drawn, not
+            reproducible if None.
+
+    Return:
+        jobs (list <tuple>): rule and seed of each solution, the seed is None
+            for deterministic rules.
+
+    Raise:
+        ValueError: if a rule is unknown.
+    """
+    unknown = [rule for rule in list(rules) + [random_rule]
+               if rule not in ALL_RULES + RANDOM_RULES]
+    if unknown:
+        logging.error('Unknown path scanning rules: {}'.format(unknown))
+        raise ValueError
+    jobs = [(rule, None) for rule in rules]
+    if n_random:
+        seeds = np.random.SeedSequence(seed).generate_state(n_random)
+        jobs += [(random_rule, int(job_seed)) for job_seed in seeds]
+    return jobs
+
+
+def construct_solutions(info, rules=ALL_RULES, n_random=0,
+                        random_rule='RandomRule', seed=None, n_workers=1,
+                        best_k=1, reduce_trips=False, test_solution=False):
+    """Build solutions for each rule and random restart, and return the best.
+
+    Arg:
+        info (namedtuple): converted input data of a problem instance. See
+            help(`converter.load_data.load_instance`) for more info.
+
+    Kwargs:
+        rules, n_random, random_rule, seed: jobs to run, see
+            `construction_jobs`.
+        n_workers (int): number of worker processes, jobs are run in this
+            process if 1.
+        best_k (int): number of solutions to return.
+        reduce_trips (bool): whether to also try to reduce the trips of each
+            solution, keeping the better one.
+        test_solution (bool): whether the solutions should be tested.
+
+    Return:
+        solutions (list <dict>): the `best_k` best solutions on number of
+            vehicles then total cost, best first. Ties are ordered as the
+            jobs, so that the solutions do not depend on `n_workers`.
+    """
+    jobs = construction_jobs(rules, n_random, random_rule, seed)
+    if n_workers == 1 or len(jobs) == 1:
+        initial_solver = _path_scanning_solver(info, test_solution,
+                                               reduce_trips)
+        solutions = [_build_solution(initial_solver, job) for job in jobs]
+    else:
+        logging.info('Building {} solutions with {} workers'.format(
+            len(jobs), n_workers))
+        chunksize = max(1, len(jobs) // (4 * n_workers))
+        with ProcessPoolExecutor(max_workers=n_workers,
+                                 mp_context=_pool_context(),
+                                 initializer=_init_worker,
+                                 initargs=(info, test_solution,
+                                           reduce_trips)) as pool:
+            solutions = list(pool.map(_worker_build_solution, jobs,
+                                      chunksize=chunksize))
+
+    order = sorted(range(len(solutions)),
+                   key=lambda i: (solutions[i]['nVehicles'],
+                                  solutions[i]['TotalCost'], i))
+    return [solutions[i] for i in order[:best_k]]
@@ -34,12 +34,6 @@ from solver.py_display_solution import display_solution_stats
 huge = 1e300000
 HUGE = 1e300000
 
-def populate_c_local_search(info, full = False):
-    c_alg_extended_path_scanning.set_input(info, full)
-
-def free_c_local_search(full = False):
-    c_alg_extended_path_scanning.free_input(full)
-
 class TieBreakRules(object):
     '''
     Break ties if multiple arcs are close together. Rules are used
@@ -257,6 +251,18 @@ class ExtendedPathScanning_Operators(object):
     '''
     Basic Path Scanning Operators used with both the CARP and CLARPIF.
     '''    
+    c_context_full = False # Whether the C context needs the IF costs and max trip length.
+    
+    @property
+    def c_context(self):
+        '''
+        C copy of the instance data used by the `c_` operators, created on
+        first use and freed with the solver.
+        '''
+        if getattr(self, '_c_context', None) is None:
+            self._c_context = c_alg_extended_path_scanning.PathScanningContext(self.info, self.c_context_full)
+        return(self._c_context)
+    
     def testload(self, arc):
         '''
         Test if an arc can be added without exceeding vehicle capacity.
@@ -282,14 +288,14 @@ class ExtendedPathScanning_Operators(object):
         else: return(False)
 
     def c_findnearestarcs(self, previousarc):
-        (nearestarcs, nearest) = c_alg_extended_path_scanning.findnearestarcs(previousarc,   
+        (nearestarcs, nearest) = self.c_context.findnearestarcs(previousarc,   
                                                                               self.reqArcsUnassigned, 
                                                                               self.tripload, 
                                                                               self.routecost)
         return(nearestarcs, nearest)
 
     def c_findnearestarcs_elipse(self, previousarc):
-        (nearestarcs, nearest, k) = c_alg_extended_path_scanning.findnearestarcs_elipse(previousarc,   
+        (nearestarcs, nearest, k) = self.c_context.findnearestarcs_elipse(previousarc,   
                                                                               self.reqArcsUnassigned, 
                                                                               self.tripload, 
                                                                               self.routecost,
@@ -381,7 +387,7 @@ class ExtendedPathScanning_Operators(object):
         return(nearestarcs, nearest, k)
 
     def c_findnearestarcs_cap_elipse(self, previousarc):
-        (nearestarcs, nearest, k) = c_alg_extended_path_scanning.findnearestarcs_cap_elipse(previousarc,   
+        (nearestarcs, nearest, k) = self.c_context.findnearestarcs_cap_elipse(previousarc,   
                                                                               self.reqArcsUnassigned, 
                                                                               self.tripload, 
                                                                               self.routecost,
@@ -389,7 +395,7 @@ class ExtendedPathScanning_Operators(object):
         return(nearestarcs, nearest, k)
 
     def c_findnearestarcs_noload(self, previousarc, estimate_if_cost):
-        (nearestarcs, nearest) = c_alg_extended_path_scanning.findnearestarcs_noload(previousarc,   
+        (nearestarcs, nearest) = self.c_context.findnearestarcs_noload(previousarc,   
                                                                                       self.reqArcsUnassigned, 
                                                                                       self.tripload, 
                                                                                       self.routecost, 
@@ -417,8 +423,21 @@ class ExtendedPathScanning_Operators(object):
                         nearestarcs.append(nextarc)
         return(nearestarcs, nearest)
 
+    def c_findnearestarcs_nn(self, previousarc):
+        (nearestarcs, nearest) = self.c_context.findnearestarcs_nn(previousarc,
+                                                                   self.reqArcsUnassigned,
+                                                                   self.tripload,
+                                                                   self.routecost)
+        return(nearestarcs, nearest)
+
+    def c_findnearestIFarcs_nn(self, previousarc):
+        (nearestarcs, nearest) = self.c_context.findnearestIFarcs_nn(previousarc,
+                                                                     self.reqArcsUnassigned,
+                                                                     self.routecost)
+        return(nearestarcs, nearest)
+
     def c_findnearestIFarcs(self, previousarc):
-        (nearestarcs, nearest) = c_alg_extended_path_scanning.findnearestIFarcs(previousarc,
+        (nearestarcs, nearest) = self.c_context.findnearestIFarcs(previousarc,
                                                                                 self.reqArcsUnassigned,
                                                                                 self.tripload, 
                                                                                 self.routecost)
@@ -426,7 +445,7 @@ class ExtendedPathScanning_Operators(object):
         return(nearestarcs, nearest)
 
     def c_findnearestIFarcs_elipse(self, previousarc):
-        (nearestarcs, nearest, k) = c_alg_extended_path_scanning.findnearestIFarcs_elipse(previousarc,
+        (nearestarcs, nearest, k) = self.c_context.findnearestIFarcs_elipse(previousarc,
                                                                                             self.reqArcsUnassigned,
                                                                                             self.tripload, 
                                                                                             self.routecost,
@@ -526,13 +545,13 @@ class ExtendedPathScanning_Operators(object):
         return(nearestarcs, nearest)
 
     def c_findnearestarcs_nolimit(self, previousarc):
-        (nearestarcs, nearest) = c_alg_extended_path_scanning.findnearestarcs_nolimit(previousarc, 
+        (nearestarcs, nearest) = self.c_context.findnearestarcs_nolimit(previousarc, 
                                                                                       self.reqArcsUnassigned,
                                                                                       self.tripload)
         return(nearestarcs, nearest)
     
     def c_findnearestarcs_nolimit_elipse(self, previousarc):
-        (nearestarcs, nearest, k) = c_alg_extended_path_scanning.findnearestarcs_nolimit_elipse(previousarc, 
+        (nearestarcs, nearest, k) = self.c_context.findnearestarcs_nolimit_elipse(previousarc, 
                                                                                                   self.reqArcsUnassigned,
                                                                                                   self.tripload,
                                                                                                   self._tc, 
@@ -541,7 +560,7 @@ class ExtendedPathScanning_Operators(object):
     
     
     def c_findnearestarcsbalanced_sub1(self, previousarc):
-        (nearestarcs, nearest) = c_alg_extended_path_scanning.findnearestarcs_sub1(previousarc, self.reqArcsUnassigned)
+        (nearestarcs, nearest) = self.c_context.findnearestarcs_sub1(previousarc, self.reqArcsUnassigned)
         return(nearestarcs, nearest)
         
     def findnearestarcsbalanced_sub1(self, previousarc):
@@ -560,7 +579,7 @@ class ExtendedPathScanning_Operators(object):
         return(nearestarcs, nearest)
     
     def c_checknearestarcs(self, nearestarcs, nearest):
-        nextarcfine = c_alg_extended_path_scanning.checknearestarcs(nearestarcs, 
+        nextarcfine = self.c_context.checknearestarcs(nearestarcs, 
                                                                       nearest, 
                                                                       self.tripload,  
                                                                       self.routecost)
@@ -580,7 +599,7 @@ class ExtendedPathScanning_Operators(object):
         '''
         Check which nearest arcs does not exceed capacity and maxtrip restrictions.
         '''
-        nextarcfine = c_alg_extended_path_scanning.checknearestarcs_noload(nearestarcs, 
+        nextarcfine = self.c_context.checknearestarcs_noload(nearestarcs, 
                                                                           nearest, 
                                                                           self.tripload, 
                                                                           self.routecost,
@@ -1091,6 +1110,8 @@ class EPS_IF(ExtendedPathScanning_Operators, TieBreakRules):
     closest unserviced arc and use rules to break ties. Different rules
     yield different solutions, where the best one can be returned.
     '''
+    c_context_full = True
+    
     def __init__(self, info):
         TieBreakRules.__init__(self)
         self.capacity = info.capacity
@@ -1148,6 +1169,13 @@ class EPS_IF(ExtendedPathScanning_Operators, TieBreakRules):
         self._saveSolutions = False
         self._allFullSolutions = []
         self._allSolutionsTime = []
+        
+        # Walk the nearest neighbour lists to find the nearest arcs, and keep
+        # the unserved arcs in a `c_alg_extended_path_scanning.UnservedArcs`.
+        # Only used with the C modules, without the elipse rule and for
+        # unbalanced routes, and gives the same solutions.
+        self.nn_scan = True
+        self._nn_scan = False
 
     def _calc_elipse_input(self):
         ned = 0
@@ -1180,13 +1208,9 @@ class EPS_IF(ExtendedPathScanning_Operators, TieBreakRules):
         self.tripload += self.demand[arc]
         self.tripservicecosts += self.serveCost[arc]
         
-        arc1 = self.reqArcsUnassigned.index(arc)
+        self.reqArcsUnassigned.remove(arc)
         if self.invArcList[arc]:
-            arc2 = self.reqArcsUnassigned.index(self.invArcList[arc])
-            del self.reqArcsUnassigned[max(arc1, arc2)]
-            del self.reqArcsUnassigned[min(arc1, arc2)]
-        else: 
-            del self.reqArcsUnassigned[arc1]
+            self.reqArcsUnassigned.remove(self.invArcList[arc])
         
         #self._ned_left -= 1
         trip.append(arc)
@@ -1288,7 +1312,9 @@ class EPS_IF(ExtendedPathScanning_Operators, TieBreakRules):
                     (nearestarcs, nearest, k) = self.findnearestarcs_cap_elipse(previousarc)
                 #self._got_to_scan.append(k/self._ned_left)
             else:
-                if self.c_modules:
+                if self._nn_scan:
+                    (nearestarcs, nearest) = self.c_findnearestarcs_nn(previousarc)
+                elif self.c_modules:
                     (nearestarcs, nearest) = self.c_findnearestarcs(previousarc)
                 else:
                     (nearestarcs, nearest) = self.findnearestarcs(previousarc)
@@ -1305,7 +1331,9 @@ class EPS_IF(ExtendedPathScanning_Operators, TieBreakRules):
 #                         (nearestarcs, nearest, k) = self.findnearestIFarcs_elipse(previousarc)       
 #                     #self._got_to_scan.append(k/self._ned_left)                 
 #                 else:
-                if self.c_modules:
+                if self._nn_scan:
+                    (nearestarcs, nearest) = self.c_findnearestIFarcs_nn(previousarc)
+                elif self.c_modules:
                     (nearestarcs, nearest) = self.c_findnearestIFarcs(previousarc)
                 else:
                     (nearestarcs, nearest) = self.findnearestIFarcs(previousarc)
@@ -1396,7 +1424,13 @@ class EPS_IF(ExtendedPathScanning_Operators, TieBreakRules):
         Generate routes until all the required arcs are serviced.
         '''
         solution = {}
-        self.reqArcsUnassigned = deepcopy(self.reqArcs)
+        self._nn_scan = self.nn_scan and self.c_modules and not self.elipse_rule and not balanced and getattr(self.info, 'nn_list', None) is not None
+        if self._nn_scan:
+            if not self.c_context.has_nn_list:
+                self.c_context.set_nn_list(self.info.nn_list, self.reqArcs)
+            self.reqArcsUnassigned = c_alg_extended_path_scanning.UnservedArcs(len(self.d), self.reqArcs)
+        else:
+            self.reqArcsUnassigned = deepcopy(self.reqArcs)
         nVehicles = -1
         self.totalcost = 0
         while len(self.reqArcsUnassigned) != 0:
@@ -1606,7 +1640,6 @@ class EPS_IF(ExtendedPathScanning_Operators, TieBreakRules):
         Use one of eight rules, old and new, to break ties.
         '''
         if self.improve_IFs:
-            part.populate_c_local_search(self.info, True)
             improve_IFs = part.UlusoysIFs_1vehicle(self.info)
         
         # key print('EPS with IFs - %i Rules - Balanced %s\n' %(len(rules), balanced))
@@ -1622,8 +1655,6 @@ class EPS_IF(ExtendedPathScanning_Operators, TieBreakRules):
             self.updateIncumbent(s)
             solutions.append((s['TotalCost'], s['nVehicles'], clock()-t))
         if self.reduce_best_trips: self.bestVehComp = self.Reduce_Trips.reduce_trip(self.bestVehComp)[0]
-       
-        if self.improve_IFs:part.free_c_local_search(True)
         
         return(solutions)
 
@@ -1901,6 +1932,7 @@ class EPS_GiantRoute(ExtendedPathScanning_Operators, TieBreakRules):
         self.serveCost = info.serveCostL
         self.demand = info.demandL
         self.d = info.d
+        self.info = info
         self.c_modules = True
 
     def addarc(self, arc, nearest, trip):
@@ -1950,6 +1982,8 @@ class EPS_MultipleGiantRoute(ExtendedPathScanning_Operators, TieBreakRules):
     closest unserviced arc and use rules to break ties. Different rules
     yield different solutions, where the best one can be returned.
     '''
+    c_context_full = True
+    
     def __init__(self, info):
         TieBreakRules.__init__(self)
         self.capacity = info.capacity
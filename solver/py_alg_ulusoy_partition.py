@@ -26,6 +26,7 @@ import pyximport
 pyximport.install(setup_args={"include_dirs":np.get_include()})
 
 import alg_Ulusoy_part_c as c_alg_Ulusoy_part
+import solver.c_alg_split as c_alg_split
 
 from math import ceil
 
@@ -36,12 +37,6 @@ from py_display_solution import display_solution_stats
 
 huge = 1e30000 
 
-def populate_c(info, full = False):
-    c_alg_Ulusoy_part.set_input(info, full)
-
-def free_c(full = False):
-    c_alg_Ulusoy_part.free_input(full)
-
 def DagSP(G, verticeS, source):
     '''
     Computes the single source shortest path in a directed acyclic graph.
@@ -117,6 +112,7 @@ class Ulusoys(object):
     to cater for multiple depots.
     '''    
     def __init__(self, info):
+        self.c_split = c_alg_Ulusoy_part.SplitContext(info, False) # C copy of the instance data
         self.info = info
         self.capacity = info.capacity
         self.dumpCost = info.dumpCost
@@ -129,7 +125,7 @@ class Ulusoys(object):
         self.c_modules = True
     
     def c_genAuxGraphSP(self, routeOrig, min_k = True):
-        (dEst_end, Path, G, L) = c_alg_Ulusoy_part.genAuxGraphSP(routeOrig, min_k)
+        (dEst_end, Path, G, L) = self.c_split.genAuxGraphSP(routeOrig, min_k)
         return(dEst_end, Path, G, L) 
         
     def genAuxGraphSP(self, routeOrig):
@@ -267,6 +263,7 @@ class UlusoysIFs_1vehicle(object):
     '''
     
     def __init__(self, info):
+        self.c_split = c_alg_Ulusoy_part.SplitContext(info, True) # C copy of the instance data
         self.capacity = info.capacity
         self.maxTrip = info.maxTrip
         self.dumpCost = info.dumpCost
@@ -410,15 +407,15 @@ class UlusoysIFs_1vehicle(object):
         return(0, Path, [], [])
 
     def c_genAuxGraphSP(self, routeOrig):
-        (dEst_end, Path, G, L) = c_alg_Ulusoy_part.genAux1IFGraphSP(routeOrig)
+        (dEst_end, Path, G, L) = self.c_split.genAux1IFGraphSP(routeOrig)
         return(dEst_end, Path, G, L) 
 
     def c_genAuxGraphSP_article(self, routeOrig):
-        (dEst_end, Path, G, L) = c_alg_Ulusoy_part.genAuxGraphSP_article(routeOrig)
+        (dEst_end, Path, G, L) = self.c_split.genAuxGraphSP_article(routeOrig)
         return(dEst_end, Path, G, L)
 
     def c_genAuxGraphSP_efficient(self, routeOrig):
-        (dEst_end, Path, G, L) = c_alg_Ulusoy_part.genAuxGraphSP_efficient(routeOrig)
+        (dEst_end, Path, G, L) = self.c_split.genAuxGraphSP_efficient(routeOrig)
         return(dEst_end, Path, G, L)
     
     def gen_solution_list(self, bigRoute):
@@ -534,6 +531,7 @@ class UlusoysIFs(object):
     depot.
     '''    
     def __init__(self, info):
+        self.c_split = c_alg_Ulusoy_part.SplitContext(info, True) # C copy of the instance data
         self.capacity = info.capacity
         self.maxTrip = info.maxTrip
         self.dumpCost = info.dumpCost
@@ -780,21 +778,21 @@ class UlusoysIFs(object):
         '''
         cython implementation of genAuxGraph1_SP
         '''
-        (dEst, piEst) = c_alg_Ulusoy_part.genAuxGraph1_SP_IF(routeOrig)
+        (dEst, piEst) = self.c_split.genAuxGraph1_SP_IF(routeOrig)
         return(dEst, piEst)
     
     def c_genAuxGraph2_SP(self, dEstIFs, routeOrig):
         '''
         cython implementation of genAuxGraph2_SP
         '''
-        Path = c_alg_Ulusoy_part.genAuxGraph2_SP_IF(dEstIFs, routeOrig)
+        Path = self.c_split.genAuxGraph2_SP_IF(dEstIFs, routeOrig)
         return(Path)
     
     def c_genAuxGraph_SP_article(self, routeOrig):
         '''
         cython implementation of genAuxGraph_SP_article
         '''
-        (Path, piEst) = c_alg_Ulusoy_part.genAuxGraph_SP_IF_article(routeOrig)
+        (Path, piEst) = self.c_split.genAuxGraph_SP_IF_article(routeOrig)
         return(Path, piEst)
     
     def partition(self, routeOrig, Path, piEst):
@@ -890,6 +888,8 @@ class UlusoysIFs_efficient(object):
     '''  
     
     def __init__(self, info):
+        self.c_split = c_alg_Ulusoy_part.SplitContext(info, True) # C copy of the instance data
+        self.split_engine = c_alg_split.SplitEngine(info) # Array split, without auxiliary graphs
         self.info = info
         self.capacity = info.capacity
         self.maxTrip = info.maxTrip
@@ -1106,25 +1106,25 @@ class UlusoysIFs_efficient(object):
         '''
         Old cython version is not used anymore.
         '''
-#        (dEst_end, Path) = c_alg_Ulusoy_part.genAuxGraphSP_Est(routeOrig,
+#        (dEst_end, Path) = self.c_split.genAuxGraphSP_Est(routeOrig,
 #                                                                self.stats,
 #                                                                self.adjust_estimate,
 #                                                                self.adjust_up)
-        (dEst_end, Path) = c_alg_Ulusoy_part.genAuxGraphSP_Est_Advance(routeOrig)
+        (dEst_end, Path) = self.c_split.genAuxGraphSP_Est_Advance(routeOrig)
         return(dEst_end, Path) 
 
     def c_genAuxGraphSP(self, routeOrig, min_k = True):
         '''
         Advanced cython version used anymore. Unclear what the difference is.
         '''
-        (dEst_end, Path, if_visits, if_visits_opt) = c_alg_Ulusoy_part.genAuxGraphSP_Est_Advance(routeOrig, min_k)
+        (dEst_end, Path, if_visits, if_visits_opt) = self.c_split.genAuxGraphSP_Est_Advance(routeOrig, min_k)
         return(dEst_end, Path, if_visits, if_visits_opt) 
 
     def c_genAuxGraphSP_Supper_Advance(self, routeOrig):
         '''
         Advanced cython version used anymore. Unclear what the difference is.
         '''
-        (Path, if_visits) = c_alg_Ulusoy_part.genAuxGraphSP_Est_Supper_Advance(routeOrig)
+        (Path, if_visits) = self.c_split.genAuxGraphSP_Est_Supper_Advance(routeOrig)
         return(Path, if_visits) 
 
     def partition_pure_V0(self, routeOrig, piEst, Path):
@@ -1265,6 +1265,15 @@ class UlusoysIFs_efficient(object):
                                                      self.demand)
         return(solution)
 
+    def gen_solution_linear(self, bigRoute, min_k = True, oriented = False):
+        '''
+        Generate an optimally partitioned solution, with optimal IF visits, 
+        using the array split of `c_alg_split`, without auxiliary graphs. 
+        If oriented, the service direction of each edge is also optimised.
+        '''
+        solution = self.split_engine.solution(bigRoute, min_k, oriented)
+        return(solution)
+
     def gen_solution_efficient(self, bigRoute, min_k = True):
         '''
         Generate a partitioned solution
@@ -1304,6 +1313,7 @@ class UlusoysIFs_efficient2(object):
     
     def __init__(self, info):
         self.Part_1_route = UlusoysIFs_efficient(info)
+        self.c_split = self.Part_1_route.c_split # C copy of the instance data
         self.info = info
         self.capacity = info.capacity
         self.maxTrip = info.maxTrip
@@ -1375,7 +1385,7 @@ class UlusoysIFs_efficient2(object):
                 if (load > self.capacity) and (dDedge_temp >= self.adjust_estimate*maxTrip):
                     #print('calc IFs', load)
                     sp_if_cals += 1
-                    (if_cost_est, load, path) = c_alg_Ulusoy_part.genAux1IFGraphSP2(sRoute[i:j]) 
+                    (if_cost_est, load, path) = self.c_split.genAux1IFGraphSP2(sRoute[i:j]) 
                     spCosts = if_cost_est
                     if_visits[i] = path[:]
                     load_exc = True
@@ -1411,7 +1421,7 @@ class UlusoysIFs_efficient2(object):
         '''
         cython implementation for genAuxGraphSP.
         '''
-        (dEst_end, Path, if_visits_opt) = c_alg_Ulusoy_part.genAuxGraphSP_Est_Advance2(routeOrig)
+        (dEst_end, Path, if_visits_opt) = self.c_split.genAuxGraphSP_Est_Advance2(routeOrig)
         return(dEst_end, Path, if_visits_opt) 
 
     def gen_solution_list(self, bigRoute):
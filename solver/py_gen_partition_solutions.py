@@ -299,7 +299,6 @@ class Ulusoy_Partion(object):
             print('S %i \t Cost %i \t nVehicles %i '%(i+1, s['TotalCost'], s['nVehicles']))
         self.tester(self.bestVehComp)
         self.builder.display_solution_info(self.bestVehComp)
-        py_alg_extended_path_scanning.free_c_local_search()
         return(self.bestVehComp)
 
     def _printSolutionFinal(self, timeTotal, incumbents, i):
@@ -416,18 +415,6 @@ class Ulusoy_Partion(object):
 
             
     
-    def pop_ulusoy(self):
-        if self.problem_type == 'CLARPIF':
-            part.populate_c(self.info, True)
-        else:
-            part.populate_c(self.info, False)
-            
-    def free_ulusoy(self):
-        if self.problem_type == 'CLARPIF':
-            part.free_c(True)
-        else:
-            part.free_c(False) 
-                   
 import py_return_problem_data
 def test_ulusoy(problem_set = 'Centurion'):
     problem_sets = ['Lpr_IF_075L']
@@ -445,7 +432,6 @@ def test_ulusoy(problem_set = 'Centurion'):
                         info = return_problem_data(problem_set, filename)
                         NNS = Ulusoy_Partion(info)
                         NNS.problem_type = 'CLARPIF'
-                        NNS.pop_ulusoy()
                         NNS.write_output = True
                         NNS.file_write = open(name,'w')
                         if ext == '_v1': 
@@ -463,7 +449,6 @@ def test_ulusoy(problem_set = 'Centurion'):
                         if ext2 == '_RA': NNS.Ulusoy_EPS_solver('EPS_random_four_rules', 200)
                         if ext2 == '_4R': NNS.Ulusoy_EPS_solver('EPS_four_rules')
                         NNS.file_write.close()
-                        NNS.free_ulusoy()
 
 if __name__ == "__main__":
     print('Test Ulusoy on Lpr_data_set')
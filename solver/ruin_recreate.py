@@ -40,6 +40,9 @@ selected, optionally based on Local Search performance.
 * Restart option at incumbent possible instead of always ruining the current
 solution.
 
+* This module still imports legacy modules and cannot be imported, use
+`ruin_recreate_search.RuinRecreate` for the MCARPTIF instead.
+
 Solutions are represented as lists of lists of lists up-to subtrips which 
 consists of arc visitation sequences INCLUDING the required depot and IF visits.
 
@@ -390,11 +393,9 @@ def create_initial_solution(instance_info, problemType='MCARPTIF'):
     """
     
     if problemType == 'MCARPTIF':
-        EPS.populate_c_local_search(instance_info, True)
         NNS = EPS.EPS_IF(instance_info)
     elif problemType == 'MCARP':
         NNS = EPS.EPS(instance_info)
-        EPS.populate_c_local_search(instance_info)
     
     NNS.c_modules = True
     NNS.reduce_all_trips = True 
@@ -404,8 +405,6 @@ def create_initial_solution(instance_info, problemType='MCARPTIF'):
     elif problemType == 'MCARP':
         initial_solution = NNS.EPS_solver(rule_type = 'EPS_five_rules')[0]
     
-    EPS.free_c_local_search()
-    
     return initial_solution
     
 
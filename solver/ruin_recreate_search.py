@@ -0,0 +1,523 @@
+# -*- coding: utf-8 -*-
+"""Ruin and recreate search for the MCARPTIF.
+
+Each step removes a number of required arcs from the current solution, the
+ruin, and inserts them again, the recreate, after which the solution can be
+improved with Local Search or Tabu Search. Whether the new solution replaces
+the current one is decided by an acceptance criterion, which allows the
+search to move through worse solutions, and the best solution found is kept
+as the incumbent:
+
+    >>> search = RuinRecreate(info, improvement='LS', seed=1)
+    >>> solution, stats = search.run(initial_solution, time_limit=600)
+    >>> search.clear()
+
+Ruin operators, see `RUIN_OPERATORS`, select the arcs to remove:
+
+    random: arcs selected at random.
+    cluster: a random arc and the arcs closest to it, by deadhead cost `d`.
+    route: all the arcs of randomly selected routes.
+    worst: arcs whose removal saves the most deadhead cost, with a random
+        bias so that the same arcs are not always removed.
+    string: strings of consecutive arcs from the routes closest to a random
+        arc, as in the slack induction by string removals of Christiaens and
+        Vanden Berghe (2020).
+
+The remaining arcs of each route are joined into a giant route, in route
+order, and the removed arcs are inserted where they add the least deadhead
+cost to it, after which the giant route is split into routes, trips and IF
+visits with `c_alg_split.SplitEngine`. The split also chooses the service
+direction of edges, unless `oriented` is False.
+
+Acceptance criteria, see `ACCEPTANCE_CRITERIA`, compare total costs:
+
+    descent: only solutions that are not worse than the current one.
+    annealing: simulated annealing, with a temperature that decreases
+        geometrically over the search.
+    record: record-to-record travel, solutions within a deviation of the
+        incumbent cost, which decreases linearly over the search.
+    late: late acceptance hill climbing, solutions that are not worse than
+        the current solution of a fixed number of steps ago.
+
+The search stops after a time limit, a number of steps, or a number of steps
+without improving the incumbent. All random choices are made with a numpy
+generator seeded with `seed`, so that the same seed gives the same search,
+if it is limited by the number of steps.
+
+Christiaens, J., & Vanden Berghe, G. (2020). Slack induction by string
+removals for vehicle routing problems. Transportation Science, 54(2), 417-433.
+Ropke, S., & Pisinger, D. (2006). An adaptive large neighborhood search
+heuristic for the pickup and delivery problem with time windows.
+Transportation Science, 40(4), 455-472.
+"""
+
+import logging
+import math
+import numpy as np
+from collections import namedtuple
+from time import perf_counter as clock
+from solver.c_buffers import int32_buffer, inverse_arc_buffer
+from solver.c_alg_split import SplitEngine
+from solver.solve import gen_solution
+from solver.solve import initiate_local_search
+from solver.solve import initiate_tabu_search
+
+RuinRecreateStats = namedtuple('RuinRecreateStats', ['initial_cost',
+                                                     'cost',
+                                                     'initial_vehicles',
+                                                     'vehicles',
+                                                     'iterations',
+                                                     'accepted',
+                                                     'improvements',
+                                                     'time',
+                                                     'stop_reason'])
+
+
+def solution_routes(solution, required):
+    """Return the required arcs of each route, in service order.
+
+    Args:
+        solution (dict): standardised MCARPTIF solution dictionary.
+        required (np.array <bool>): whether each arc is a required arc.
+
+    Return:
+        routes (list <list>): arcs of each route, without depot and IF
+            visits.
+    """
+    return [[arc for trip in solution[i]['Trips'] for arc in trip
+             if required[arc]] for i in range(solution['nVehicles'])]
+
+
+def random_ruin(search, routes, n_remove, rng):
+    """Remove arcs selected at random."""
+    arcs = [arc for route in routes for arc in route]
+    return rng.choice(arcs, size=n_remove, replace=False).tolist()
+
+
+def cluster_ruin(search, routes, n_remove, rng):
+    """Remove a random arc and the arcs closest to it."""
+    arcs = np.array([arc for route in routes for arc in route])
+    seed = arcs[rng.integers(len(arcs))]
+    proximity = search.proximity(seed, arcs)
+    return arcs[np.argsort(proximity, kind='stable')[:n_remove]].tolist()
+
+
+def route_ruin(search, routes, n_remove, rng):
+    """Remove all the arcs of random routes, until at least `n_remove` arcs
+    are removed."""
+    removal = []
+    for i in rng.permutation(len(routes)):
+        removal += routes[i]
+        if len(removal) >= n_remove:
+            break
+    return removal
+
+
+def worst_ruin(search, routes, n_remove, rng, bias=3):
+    """Remove arcs whose removal saves the most deadhead cost, with the
+    randomisation of Ropke and Pisinger (2006): the arc at position
+    floor(y^bias * n) of the remaining arcs, sorted on decreasing savings, is
+    removed, with y uniform in [0, 1)."""
+    d = search.d
+    depot = search.depot
+    arcs = []
+    savings = []
+    for route in routes:
+        stops = [depot] + route + [depot]
+        for k in range(1, len(stops) - 1):
+            u, arc, v = stops[k - 1], stops[k], stops[k + 1]
+            arcs.append(arc)
+            savings.append(d[u, arc] + d[arc, v] - d[u, v])
+    order = [arcs[k] for k in np.argsort(-np.array(savings), kind='stable')]
+    removal = []
+    for y in rng.random(n_remove):
+        removal.append(order.pop(int(y ** bias * len(order))))
+    return removal
+
+
+def string_ruin(search, routes, n_remove, rng, max_string=10):
+    """Remove strings of consecutive arcs from the routes closest to a random
+    arc, at most one string per route and `max_string` arcs per string."""
+    route_of = {arc: i for i, route in enumerate(routes) for arc in route}
+    arcs = np.array(list(route_of))
+    seed = arcs[rng.integers(len(arcs))]
+    proximity = search.proximity(seed, arcs)
+    removal = []
+    ruined = set()
+    for arc in arcs[np.argsort(proximity, kind='stable')].tolist():
+        i = route_of[arc]
+        if i in ruined:
+            continue
+        ruined.add(i)
+        route = routes[i]
+        length = min(len(route), n_remove - len(removal),
+                     int(rng.integers(1, max_string + 1)))
+        position = route.index(arc)
+        start = int(rng.integers(max(0, position - length + 1),
+                                 min(position, len(route) - length) + 1))
+        removal += route[start:start + length]
+        if len(removal) >= n_remove:
+            break
+    return removal
+
+
+#  Ruin operators by name, called with the search, the arcs of each route,
+#  the number of arcs to remove and the random generator.
+RUIN_OPERATORS = {'random': random_ruin,
+                  'cluster': cluster_ruin,
+                  'route': route_ruin,
+                  'worst': worst_ruin,
+                  'string': string_ruin}
+
+
+class Descent(object):
+    """Accept solutions that are not worse than the current solution."""
+
+    def start(self, cost):
+        pass
+
+    def accept(self, cost, current_cost, best_cost, progress, rng):
+        return cost <= current_cost
+
+
+class SimulatedAnnealing(object):
+    """Accept worse solutions with probability exp(-(cost - current) / T),
+    with the temperature T decreasing geometrically over the search."""
+
+    def __init__(self, start_worse=0.01, end_worse=0.0005, probability=0.5):
+        """
+        Kwargs:
+            start_worse (float): at the start of the search, a solution this
+                fraction worse than the initial solution is accepted with
+                `probability`.
+            end_worse (float): the same at the end of the search.
+            probability (float): acceptance probability of the reference
+                solutions.
+        """
+        self.start_worse = start_worse
+        self.end_worse = end_worse
+        self.probability = probability
+        self.start_temperature = None
+        self.end_temperature = None
+
+    def start(self, cost):
+        scale = -cost / math.log(self.probability)
+        self.start_temperature = self.start_worse * scale
+        self.end_temperature = self.end_worse * scale
+
+    def temperature(self, progress):
+        return self.start_temperature * (
+            self.end_temperature / self.start_temperature) ** progress
+
+    def accept(self, cost, current_cost, best_cost, progress, rng):
+        if cost <= current_cost:
+            return True
+        return rng.random() < math.exp(-(cost - current_cost) /
+                                       self.temperature(progress))
+
+
+class RecordToRecord(object):
+    """Accept solutions within a fraction of the incumbent cost, which
+    decreases linearly over the search."""
+
+    def __init__(self, start_deviation=0.01, end_deviation=0):
+        """
+        Kwargs:
+            start_deviation (float): accepted fraction above the incumbent
+                cost at the start of the search.
+            end_deviation (float): the same at the end of the search.
+        """
+        self.start_deviation = start_deviation
+        self.end_deviation = end_deviation
+
+    def start(self, cost):
+        pass
+
+    def accept(self, cost, current_cost, best_cost, progress, rng):
+        deviation = self.start_deviation + progress * (
+            self.end_deviation - self.start_deviation)
+        return cost <= best_cost * (1 + deviation)
+
+
+class LateAcceptance(object):
+    """Accept solutions that are not worse than the current solution of
+    `length` steps ago, or than the current solution."""
+
+    def __init__(self, length=50):
+        self.length = length
+        self.history = None
+        self.step = 0
+
+    def start(self, cost):
+        self.history = [cost] * self.length
+        self.step = 0
+
+    def accept(self, cost, current_cost, best_cost, progress, rng):
+        k = self.step % self.length
+        accepted = cost <= self.history[k] or cost <= current_cost
+        self.history[k] = cost if accepted else current_cost
+        self.step += 1
+        return accepted
+
+
+#  Acceptance criteria by name, created with their default parameters.
+ACCEPTANCE_CRITERIA = {'descent': Descent,
+                       'annealing': SimulatedAnnealing,
+                       'record': RecordToRecord,
+                       'late': LateAcceptance}
+
+
+class RuinRecreate(object):
+    """Ruin and recreate search, see the module docstring."""
+
+    def __init__(self, info, improvement='LS', ruin_operators=None,
+                 acceptance='annealing', ruin_fraction=(0.05, 0.15),
+                 oriented=True, improve_move_limit=None,
+                 improve_time_limit=None, seed=None, test_solution=False):
+        """
+        Arg:
+            info (namedtuple): converted input data of a problem instance. See
+                help(`converter.load_data.load_instance`) for more info.
+
+        Kwargs:
+            improvement (str/class): `LS` for Local Search or `TS` for Tabu
+                Search, an improvement procedure with `improveSolution`, such
+                as `LS_MCARPTIF.LS_MCARPTIF`, or None to only ruin and
+                recreate.
+            ruin_operators (dict): weight of each ruin operator used, by name
+                in `RUIN_OPERATORS`. All are used equally often if None.
+            acceptance (str/class): acceptance criterion, by name in
+                `ACCEPTANCE_CRITERIA` or an instance with `start` and
+                `accept`.
+            ruin_fraction (tuple): minimum and maximum fraction of the
+                required arcs removed in each step.
+            oriented (bool): whether the split chooses the service direction
+                of edges.
+            improve_move_limit (int): move limit of each improvement, see
+                `LS_MCARPTIF.improveSolution`.
+            improve_time_limit (float): time limit of each improvement.
+            seed (int): seed of the random generator, not reproducible if
+                None.
+            test_solution (bool): whether the improvement procedure tests its
+                solutions.
+
+        Raise:
+            ValueError: if a ruin operator or acceptance criterion is unknown.
+        """
+        self.info = info
+        self.d = int32_buffer(info.d)
+        self.inverse = inverse_arc_buffer(info.reqInvArcList)
+        self.depot = info.depotnewkey
+        self.required = np.zeros(self.d.shape[0], dtype=bool)
+        self.required[list(info.reqArcListActual)] = True
+        self.splitter = SplitEngine(info)
+        self.oriented = oriented
+
+        if ruin_operators is None:
+            ruin_operators = {name: 1 for name in RUIN_OPERATORS}
+        unknown = [name for name in ruin_operators
+                   if name not in RUIN_OPERATORS]
+        if isinstance(acceptance, str):
+            if acceptance not in ACCEPTANCE_CRITERIA:
+                unknown.append(acceptance)
+            else:
+                acceptance = ACCEPTANCE_CRITERIA[acceptance]()
+        if unknown:
+            logging.error('Unknown ruin operators or acceptance criteria: '
+                          '{}'.format(unknown))
+            raise ValueError
+        self.ruin_names = list(ruin_operators)
+        weights = np.array([ruin_operators[name] for name in self.ruin_names],
+                           dtype=float)
+        self.ruin_weights = weights / weights.sum()
+        self.acceptance = acceptance
+        self.ruin_fraction = ruin_fraction
+
+        if improvement == 'LS':
+            improvement = initiate_local_search(info, test_solution)
+            improvement.setScreenPrint(False)
+        elif improvement == 'TS':
+            improvement = initiate_tabu_search(info, test_solution)
+        self.improvement = improvement
+        self.improve_move_limit = improve_move_limit
+        self.improve_time_limit = improve_time_limit
+        self.rng = np.random.default_rng(seed)
+
+    def proximity(self, arc, arcs):
+        """Deadhead cost between an arc and each of `arcs`, in the closest
+        direction, and also to the inverse arcs of edges."""
+        d = self.d
+        proximity = np.minimum(d[arc, arcs], d[arcs, arc])
+        inverse = self.inverse[arcs]
+        edges = inverse != -1
+        proximity[edges] = np.minimum(
+            proximity[edges], np.minimum(d[arc, inverse[edges]],
+                                         d[inverse[edges], arc]))
+        return proximity
+
+    def ruin(self, routes, operator=None):
+        """Select arcs to remove from the routes.
+
+        Arg:
+            routes (list <list>): arcs of each route, see `solution_routes`.
+
+        Kwarg:
+            operator (str): ruin operator, drawn with the operator weights if
+                None.
+
+        Return:
+            operator (str): ruin operator used.
+            removal (list <int>): arcs to remove.
+        """
+        rng = self.rng
+        if operator is None:
+            operator = self.ruin_names[rng.choice(len(self.ruin_names),
+                                                  p=self.ruin_weights)]
+        n_arcs = sum(len(route) for route in routes)
+        low, high = (max(1, int(round(fraction * n_arcs)))
+                     for fraction in self.ruin_fraction)
+        n_remove = min(n_arcs, int(rng.integers(low, max(low, high) + 1)))
+        removal = RUIN_OPERATORS[operator](self, routes, n_remove, rng)
+        return operator, removal
+
+    def recreate(self, routes, removal):
+        """Insert removed arcs into the giant route of the remaining arcs, and
+        split it into a solution.
+
+        Args:
+            routes (list <list>): arcs of each route, see `solution_routes`.
+            removal (list <int>): arcs to remove and insert again.
+
+        Return:
+            solution (dict): standardised MCARPTIF solution dictionary.
+        """
+        d = self.d
+        depot = self.depot
+        removed = set(removal)
+        giant_route = [arc for route in routes for arc in route
+                       if arc not in removed]
+        for arc in self.rng.permutation(removal).tolist():
+            stops = np.array([depot] + giant_route + [depot])
+            before, after = stops[:-1], stops[1:]
+            options = [arc]
+            if self.oriented and self.inverse[arc] != -1:
+                options.append(int(self.inverse[arc]))
+            costs = [d[before, x] + d[x, after] - d[before, after]
+                     for x in options]
+            best = [int(np.argmin(cost)) for cost in costs]
+            k = int(np.argmin([cost[b] for cost, b in zip(costs, best)]))
+            giant_route.insert(best[k], options[k])
+        return self.splitter.solution(giant_route, oriented=self.oriented)
+
+    def improve(self, solution):
+        """Improve a solution with the improvement procedure, if any."""
+        if self.improvement is None:
+            return solution
+        return self.improvement.improveSolution(
+            solution, tLimit=self.improve_time_limit,
+            moveLimit=self.improve_move_limit)
+
+    def step(self, solution, operator=None):
+        """Ruin, recreate and improve a solution.
+
+        Arg:
+            solution (dict): standardised MCARPTIF solution dictionary, which
+                is not changed.
+
+        Kwarg:
+            operator (str): ruin operator, drawn with the operator weights if
+                None.
+
+        Return:
+            solution (dict): new solution.
+        """
+        routes = solution_routes(solution, self.required)
+        removal = self.ruin(routes, operator)[1]
+        return self.improve(self.recreate(routes, removal))
+
+    def run(self, initial_solution=None, time_limit=None, iteration_limit=100,
+            max_non_improving=None):
+        """Improve a solution with ruin and recreate steps until the budget
+        runs out.
+
+        Kwargs:
+            initial_solution (dict): standardised MCARPTIF solution
+                dictionary, built with `solve.gen_solution` if None. It is
+                improved before the first step.
+            time_limit (float): wall-clock seconds after which the search
+                stops. Not bounded if None.
+            iteration_limit (int): number of ruin and recreate steps. Not
+                bounded if None.
+            max_non_improving (int): stop after this many consecutive steps
+                without improving the incumbent. Not bounded if None.
+
+        Return:
+            solution (dict): incumbent solution, with the fewest vehicles and
+                then the lowest cost, with an int `TotalCost`.
+            stats (RuinRecreateStats): costs, fleet sizes, number of steps,
+                accepted and improving steps, time and the reason the search
+                stopped.
+
+        Raise:
+            ValueError: if the search is not bounded.
+        """
+        if time_limit is None and iteration_limit is None:
+            logging.error('Ruin and recreate needs a time or iteration limit')
+            raise ValueError
+        start_time = clock()
+        if initial_solution is None:
+            initial_solution = gen_solution(self.info)
+        current = self.improve(initial_solution)
+        best = current
+        self.acceptance.start(current['TotalCost'])
+
+        iterations = accepted = improvements = non_improving = 0
+        stop_reason = 'iteration_limit'
+        while True:
+            elapsed = clock() - start_time
+            if time_limit is not None and elapsed >= time_limit:
+                stop_reason = 'time_limit'
+                break
+            if iteration_limit is not None and iterations >= iteration_limit:
+                break
+            if max_non_improving is not None and \
+                    non_improving >= max_non_improving:
+                stop_reason = 'max_non_improving'
+                break
+            progress = max(0 if time_limit is None else elapsed / time_limit,
+                           0 if iteration_limit is None else
+                           iterations / iteration_limit)
+
+            candidate = self.step(current)
+            iterations += 1
+            non_improving += 1
+            if self.acceptance.accept(candidate['TotalCost'],
+                                      current['TotalCost'],
+                                      best['TotalCost'], progress, self.rng):
+                current = candidate
+                accepted += 1
+            if (candidate['nVehicles'], candidate['TotalCost']) < \
+                    (best['nVehicles'], best['TotalCost']):
+                best = candidate
+                improvements += 1
+                non_improving = 0
+                logging.info('Ruin and recreate step {}: new incumbent {} '
+                             'with {} vehicles'.format(iterations,
+                                                       best['TotalCost'],
+                                                       best['nVehicles']))
+
+        #  Path-Scanning and LS give float costs, and the split int costs.
+        best = dict(best, TotalCost=int(best['TotalCost']))
+        stats = RuinRecreateStats(int(initial_solution['TotalCost']),
+                                  best['TotalCost'],
+                                  initial_solution['nVehicles'],
+                                  best['nVehicles'], iterations, accepted,
+                                  improvements, clock() - start_time,
+                                  stop_reason)
+        return best, stats
+
+    def clear(self):
+        """Clears cython modules of the improvement procedure."""
+        if self.improvement is not None and \
+                hasattr(self.improvement, 'clearCythonModules'):
+            self.improvement.clearCythonModules()
@@ -23,8 +23,8 @@ History:
     @license: GNU GENERAL PUBLIC LICENSE
 """
 
-import solver.py_alg_extended_path_scanning_rr as EPS
 import solver.LS_MCARPTIF as LS
+from solver.parallel_construction import construct_solutions
 from solver.py_solution_test import TestCLARPIFSolution
 from converter.load_data import load_instance
 from converter.load_data import ConvertedInputs
@@ -35,30 +35,32 @@ from copy import deepcopy
 import logging
 
 
-def gen_solution(info, reduce_trips=True, test_solution=False):
+def gen_solution(info, reduce_trips=False, test_solution=False, n_random=0,
+                 n_workers=1, seed=None):
     """Generate a feasible solution using a deterministic Path-Scanning
     constructive heuristic.
 
     Arg:
         info (namedtuple): converted input data of a problem instance. See
             help(`converter.load_data.load_instance`) for more info.
+        reduce_trips (bool): whether to also try to reduce the trips of each
+            solution, keeping the better one.
         test_solution (bool): whether the solution should be tested. Can slow
             down the algorithm but useful for debugging.
+        n_random (int): number of random restarts, in addition to the
+            deterministic rules.
+        n_workers (int): number of worker processes used to build the
+            solutions, see `parallel_construction.construct_solutions`. Does
+            not change the solution.
+        seed (int): seed of the random restarts.
 
     Returns:
         solution (dict): standardised solution dictionary for the problem
             instance.
     """
-
-    EPS.populate_c_local_search(info, True)
-    initial_solver = EPS.EPS_IF(info)
-    initial_solver.testsolutions = test_solution
-    initial_solver.c_modules = True
-    initial_solver.reduce_all_trips = reduce_trips
-    solution = initial_solver.EPS_IF_solver(rule_type='EPS_all_rules')[0][0]
-    EPS.free_c_local_search()
-
-    return solution
+    return construct_solutions(info, n_random=n_random, seed=seed,
+                               n_workers=n_workers, reduce_trips=reduce_trips,
+                               test_solution=test_solution)[0]
 
 
 def initiate_local_search(info, test_solution=False, nnFrac=1):
@@ -149,7 +151,11 @@ def improve_solution(info,
                      improvement='LS',
                      test_solution=False,
                      nnFracLS=1,
-                     nnFracTS=1):
+                     nnFracTS=1,
+                     time_limit=None,
+                     move_limit=None,
+                     max_non_improving_moves=None,
+                     return_stats=False):
     """Improve a give initial solution using metaheuristics.
 
     Arg:
@@ -163,27 +169,52 @@ def improve_solution(info,
     Kwarg:
         improvement (str): improvement procedure to be used to improve the
             solution, which can either be Local Search or Tabu Search.
+        time_limit (float): wall-clock seconds after which the search stops
+            and returns its incumbent. Not bounded if None.
+        move_limit (int): maximum number of compound moves (search
+            iterations). Not bounded if None.
+        max_non_improving_moves (int): stop after this many consecutive
+            compound moves without improving the incumbent. Not bounded for
+            LS and 50 for TS if None.
+        return_stats (bool): whether the search stats should also be
+            returned.
 
     Returns:
         solution (dict): standardised improved solution dictionary for the
             problem instance.
+        stats (LS.SearchStats): costs, fleet sizes, number of iterations
+            and moves, time and the reason the search stopped. Only returned
+            if `return_stats` is True.
     """
     if improvement == 'LS':
         improver = initiate_local_search(info, test_solution, nnFracLS)
     if improvement == 'TS':
         improver = initiate_tabu_search(info, test_solution, nnFracTS)
-    solution = improver.improveSolution(initial_solution)
+    solution = improver.improveSolution(initial_solution,
+                                        tLimit=time_limit,
+                                        moveLimit=move_limit,
+                                        maxNonImprovingMoves=max_non_improving_moves)
+    stats = improver.searchStats
     clear_improvement_setup(improver)
+    logging.info('{} stopped on {} after {} iterations and {:.2f} '
+                 'seconds'.format(improvement, stats.stop_reason,
+                                  stats.iterations, stats.time))
 
+    if return_stats:
+        return solution, stats
     return solution
 
 
 def solve_instance(file_path,
                    improve=None,
-                   reduce_initial_trips=True,
+                   reduce_initial_trips=False,
                    test_solution=False,
                    nnFracLS=1,
-                   nnFracTS=1):
+                   nnFracTS=1,
+                   time_limit=None,
+                   move_limit=None,
+                   max_non_improving_moves=None,
+                   return_stats=False):
     """Generate and improve a solution from a raw instance file.
 
     Arg:
@@ -197,6 +228,11 @@ def solve_instance(file_path,
             Increases the computation time to generate a solution if activated.
         reduce_initial_trips (bool): whether the routes in the initial solution should
             improved.
+        time_limit, move_limit, max_non_improving_moves (float, int, int):
+            search budget of the improvement procedure, see
+            `improve_solution`.
+        return_stats (bool): whether the search stats should also be
+            returned, None if the solution is not improved.
 
     Returns:
         solution (dict): standardised improved solution dictionary for the
@@ -239,21 +275,28 @@ def solve_instance(file_path,
     solution = gen_solution(info,
                             reduce_initial_trips,
                             test_solution=test_solution)
+    stats = None
     if improve is not None:
-        solution = improve_solution(info,
-                                    solution,
-                                    improve,
-                                    test_solution=test_solution,
-                                    nnFracLS=nnFracLS,
-                                    nnFracTS=nnFracTS)
-
+        solution, stats = improve_solution(info,
+                                           solution,
+                                           improve,
+                                           test_solution=test_solution,
+                                           nnFracLS=nnFracLS,
+                                           nnFracTS=nnFracTS,
+                                           time_limit=time_limit,
+                                           move_limit=move_limit,
+                                           max_non_improving_moves=max_non_improving_moves,
+                                           return_stats=True)
+
+    if return_stats:
+        return solution, stats
     return solution
 
 
 def solve_store_instance(file_path,
                          out_path=None,
                          improve=None,
-                         reduce_initial_trips=True,
+                         reduce_initial_trips=False,
                          full_output=True,
                          overwrite=True,
                          write_results=True,
@@ -262,7 +305,11 @@ def solve_store_instance(file_path,
                          debug_test_solution=False,
                          tollerance=0.1,
                          nnFracLS=1,
-                         nnFracTS=1):
+                         nnFracTS=1,
+                         time_limit=None,
+                         move_limit=None,
+                         max_non_improving_moves=None,
+                         return_stats=False):
     """Solve a specific problem instance and store the ,partial and full solution
     in the same folder as the raw input data. Two solution files are stored:
     one ending with `_sol_[solver].csv` and `_sol_full_[solver].csv`, where
@@ -307,8 +354,14 @@ def solve_store_instance(file_path,
         tollerance (float): tollerance for testing, due to float rounding.
         nnFrac (float): fraction of nearest neighbours to use, speeds up LS
             but reduces solution quality.
+        time_limit, move_limit, max_non_improving_moves (float, int, int):
+            search budget of the improvement procedure, see
+            `improve_solution`.
+        return_stats (bool): whether the search stats should also be
+            returned, None if the solution is not improved.
 
-    Returns solution_df (pandas df): full or partial solution data frame
+    Returns solution_df (pandas df): full or partial solution data frame,
+        and the search stats if `return_stats` is True.
 
     Examples:
 
@@ -513,11 +566,16 @@ def solve_store_instance(file_path,
 
     solution = gen_solution(info, reduce_initial_trips,
                             test_solution=debug_test_solution)
+    stats = None
     if improve is not None:
-        solution = improve_solution(info, solution, improve,
-                                    test_solution=debug_test_solution,
-                                    nnFracLS=nnFracLS,
-                                    nnFracTS=nnFracTS)
+        solution, stats = improve_solution(info, solution, improve,
+                                           test_solution=debug_test_solution,
+                                           nnFracLS=nnFracLS,
+                                           nnFracTS=nnFracTS,
+                                           time_limit=time_limit,
+                                           move_limit=move_limit,
+                                           max_non_improving_moves=max_non_improving_moves,
+                                           return_stats=True)
         ext += improvement_ext[improve]
 
     if test_solution:
@@ -544,15 +602,17 @@ def solve_store_instance(file_path,
             print('Writing full solution to {0}'.format(output_file_full))
             write_solution_df(solution_df_full, output_file_full, overwrite)
 
-        return solution_df_full
+        solution_df = solution_df_full
 
+    if return_stats:
+        return solution_df, stats
     return solution_df
 
 
 def solve_instance_circular(file_path,
                          out_path=None,
                          improve=None,
-                         reduce_initial_trips=True,
+                         reduce_initial_trips=False,
                          full_output=True,
                          overwrite=True,
                          write_results=True,
@@ -632,7 +692,7 @@ def solve_instance_circular(file_path,
 def solve_tweak_solution(file_path,
                          out_path=None,
                          improve=None,
-                         reduce_initial_trips=True,
+                         reduce_initial_trips=False,
                          full_output=True,
                          overwrite=True,
                          write_results=True,
@@ -338,6 +338,44 @@ class TestConverter(object):
             os.remove('tempdir/Lpr_IF-c-03_nn_list.dat')
 
 
+    def test_convert_instance_required_only(self):
+        """Test that only shortest paths from required arcs are stored, with
+        the same required arc info as a full conversion."""
+        conv = Converter(instance_path='tempdir/Lpr_IF-b-02.txt',
+                         output_folder='tempdir/tempdir5', overwrite=True)
+        os.makedirs('tempdir/tempdir5', exist_ok=True)
+        conv.convert_instance()
+
+        conv = Converter(instance_path='tempdir/Lpr_IF-b-02.txt',
+                         output_folder='tempdir/tempdir5',
+                         outfile_key='Lpr_IF-b-02_required',
+                         overwrite=True, required_only=True)
+        conv.convert_instance()
+
+        full = InstanceInfo('tempdir/tempdir5', 'Lpr_IF-b-02')
+        full.set_required_arc_instance_info()
+        full.set_instance_lists()
+        full.set_sp_lists()
+        required = InstanceInfo('tempdir/tempdir5', 'Lpr_IF-b-02_required')
+        required.set_required_arc_instance_info()
+        required.set_sp_lists()
+
+        assert required.d_np_req == full.d_np_req
+        assert required.if_cost_np == full.if_cost_np
+        assert required.if_arc_np == full.if_arc_np
+        assert required.d_full is None
+        assert len(required.p_full) == len(full.reqArcList)
+        for u in full.reqArcList:
+            for v in full.reqArcList:
+                path = required.p_full.path(u, v)
+                cost = sum(full.travelCostL[k] for k in path)
+                assert cost == full.d_full[u][v]
+
+        for file_name in os.listdir('tempdir/tempdir5'):
+            os.remove('tempdir/tempdir5/' + file_name)
+        os.rmdir('tempdir/tempdir5')
+
+
 class TestInstanceInfo(object):
 
     def test_input_not_found_error(self):
@@ -11,8 +11,12 @@ History:
 
 import pytest
 import os
+import shutil
+import numpy as np
 from converter.load_data import ConvertedInputs
 from converter.load_data import load_instance
+from converter.conversion_cache import ConversionCache
+from converter.lazy_data import release_display_info
 
 
 class TestConvertedInputs(object):
@@ -135,4 +139,126 @@ class TestLoadInstance():
         assert len(info.d_full) == 94
         assert info.travelCostL[5] == 22
         assert info.d_full[5][93] == 113
-        assert info.p_full[5][93] == 86
\ No newline at end of file
+        assert info.p_full[5][93] == 86
+
+    def test_binary_instance_info_return(self):
+        file_path = 'tempdir/lpr_if_in/Lpr_IF-c-01.txt'
+        part = 'tempdir/lpr_if_in/Lpr_IF-c-01'
+        info_pickled = load_instance(file_path, cache=False)
+        info = load_instance(file_path, binary=True)
+
+        assert os.path.isfile(part + '_problem_info.json') is True
+        assert os.path.isfile(part + '_problem_info.dat') is False
+        assert isinstance(info.d, np.ndarray)
+        assert info.d.flags.writeable is False
+        assert isinstance(info.nn_list, np.ndarray)
+        assert info.nn_list.flags.writeable is False
+        assert isinstance(info.d_full, np.ndarray)
+        assert info.d_full.flags.writeable is False
+        assert info.name == info_pickled.name
+        assert info.reqArcList == info_pickled.reqArcList
+        assert info.reqInvArcList == info_pickled.reqInvArcList
+        assert info.IFarcsnewkey == info_pickled.IFarcsnewkey
+        assert info.allIndexD == info_pickled.allIndexD
+        assert info.d.tolist() == info_pickled.d
+        assert info.if_cost_np.tolist() == info_pickled.if_cost_np
+        assert info.if_arc_np.tolist() == info_pickled.if_arc_np
+        assert info.nn_list.tolist() == info_pickled.nn_list
+        assert np.array_equal(info.d_full, info_pickled.d_full)
+        assert np.array_equal(info.p_full, info_pickled.p_full)
+
+        #  Loaded from the existing binary files the second time.
+        info = load_instance(file_path, binary=True, cache=False)
+        assert info.d[5][8] == 19
+        assert os.path.isfile(part + '_problem_info.json') is False
+        assert os.path.isfile(part + '_d_full.npy') is False
+
+    def test_conversion_cache(self, tmp_path):
+        file_path = 'tempdir/lpr_if_in/Lpr_IF-c-01.txt'
+        copy_path = str(tmp_path / 'copy-of-c-01.txt')
+        shutil.copy(file_path, copy_path)
+        cache_dir = str(tmp_path / 'cache')
+        conversion_cache = ConversionCache(cache_dir)
+        settings = {'sp_solver': 'Floyd-Warshall',
+                    'required_only': False,
+                    'binary': True}
+
+        info = load_instance(file_path, binary=True, cache=False,
+                             cache_dir=cache_dir)
+        key = conversion_cache.entry_key(file_path, settings)
+        assert os.listdir(cache_dir) == [key]
+        assert info.d[5][8] == 19
+        assert os.path.isfile('tempdir/lpr_if_in/Lpr_IF-c-01'
+                              '_problem_info.json') is False
+
+        #  Same content under a different name is a cache hit.
+        assert conversion_cache.entry_key(copy_path, settings) == key
+        info = load_instance(copy_path, binary=True, cache_dir=cache_dir)
+        assert os.listdir(cache_dir) == [key]
+        assert info.name == 'Lpr_IF-c-01'
+
+        #  Different settings or content is a new entry.
+        settings_pickled = dict(settings, binary=False)
+        assert conversion_cache.entry_key(file_path, settings_pickled) != key
+        with open(copy_path, 'a') as copy_file:
+            copy_file.write('\n')
+        assert conversion_cache.entry_key(copy_path, settings) != key
+
+        #  The least recently used entry is evicted beyond the maximum size.
+        os.utime(conversion_cache.entry_folder(key), (0, 0))
+        conversion_cache.max_size = conversion_cache.size() + 1
+        info = load_instance(file_path, cache_dir=cache_dir,
+                             cache_max_size=conversion_cache.max_size)
+        key_pickled = conversion_cache.entry_key(file_path, settings_pickled)
+        assert os.listdir(cache_dir) == [key_pickled]
+        assert info.d[5][8] == 19
+        assert conversion_cache.evict() == []
+
+    def test_conversion_cache_rename_failure(self, tmp_path, monkeypatch):
+        file_path = 'tempdir/lpr_if_in/Lpr_IF-c-01.txt'
+        cache_dir = str(tmp_path / 'cache')
+        conversion_cache = ConversionCache(cache_dir)
+        settings = {'sp_solver': 'Floyd-Warshall',
+                    'required_only': False,
+                    'binary': True}
+        key = conversion_cache.entry_key(file_path, settings)
+
+        def rename_failure(source, destination):
+            raise OSError
+
+        monkeypatch.setattr(os, 'rename', rename_failure)
+        with pytest.raises(OSError):
+            conversion_cache.fetch(file_path, settings)
+        assert os.listdir(cache_dir) == []
+
+        #  Another job added the same entry first.
+        def rename_after_other_job(source, destination):
+            os.mkdir(destination)
+            raise OSError
+
+        monkeypatch.setattr(os, 'rename', rename_after_other_job)
+        entry_folder = conversion_cache.fetch(file_path, settings)[0]
+        assert entry_folder == conversion_cache.entry_folder(key)
+        assert os.listdir(cache_dir) == [key]
+
+    def test_lazy_display_info(self):
+        file_path = 'tempdir/lpr_if_in/Lpr_IF-c-01.txt'
+        info_eager = load_instance(file_path)
+        for binary in [False, True]:
+            info = load_instance(file_path, binary=binary, lazy_display=True)
+            assert info.d_full.loaded is False
+            assert info.allIndexD.loaded is False
+            assert info.d[5][8] == 19
+            assert info.d_full[5][93] == 113
+            assert info.p_full.loaded is True
+            assert info.p_full[5][93] == 86
+            assert len(info.d_full) == 94
+            assert info.allIndexD == info_eager.allIndexD
+            assert info.travelCostL[5] == 22
+            assert info.reqArcs_map[5] == 5
+
+            release_display_info(info)
+            assert info.d_full.loaded is False
+            assert info.allIndexD.loaded is False
+            assert info.allIndexD[5] == (9, 4)
+            ConvertedInputs(file_path, binary=binary).remove_converted_input()
@@ -28,4 +28,14 @@ def test_correct_path():
 def test_correct_path_full():
     p_full = [[None, 0, 0, 2, 3, 4]]
     path = shortest_path.sp_full(p_full, origin=0, destination=5, full=True)
-    assert path == [0, 2, 3, 4, 5]
\ No newline at end of file
+    assert path == [0, 2, 3, 4, 5]
+
+def test_required_arc_paths():
+    p_req = [[0, 0, 0, 2, 3, 4], [1, 1, 0, 2, 3, 4]]
+    paths = shortest_path.RequiredArcPaths([0, 3], p_req)
+    assert shortest_path.sp_full(paths, origin=0, destination=5) == [2, 3, 4]
+    assert paths.path(0, 5, full=True) == [0, 2, 3, 4, 5]
+    assert 3 in paths
+    assert 1 not in paths
+    with pytest.raises(KeyError):
+        shortest_path.sp_full(paths, origin=1, destination=5)
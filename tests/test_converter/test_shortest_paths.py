@@ -0,0 +1,209 @@
+# -*- coding: utf-8 -*-
+"""
+pytest for shortest_paths.pyx and the shortest path options of the converter.
+"""
+import pytest
+import numpy as np
+import tables as tb
+import converter.py_data_write as data_write
+import converter.c_alg_shortest_paths as c_alg_shortest_paths
+import converter.shortest_paths as shortest_paths
+import converter.py_gen_nearest_neighbour_lists as gen_nn
+from converter import shortest_path
+from converter.network_prep import ShortestPath
+from converter.csr_graph import CSRGraph
+
+
+def gen_info_lists(file_path='tempdir/lpr_if_in/Lpr_IF-c-01.txt'):
+    info_list = data_write.ArcConvertLists(file_path)
+    info_list.generateLists()
+    return info_list
+
+
+def test_successor_csr():
+    successor_list = [[1, 2, 3], [4, 5], [], [], [0], [1, 2, 3]]
+    offsets, indices = shortest_paths.successor_csr(successor_list)
+    assert offsets.tolist() == [0, 3, 5, 5, 5, 6, 9]
+    assert indices.tolist() == [1, 2, 3, 4, 5, 0, 1, 2, 3]
+
+
+def test_dijkstra_same_costs_as_floyd_warshall():
+    info_list = gen_info_lists()
+    cost = info_list.travelCostL
+    d_fw, p_fw = shortest_paths.SP(cost, info_list.sucArcL)
+    d_dk, p_dk = shortest_paths.SP_dijkstra(cost, info_list.sucArcL)
+
+    assert d_dk.dtype == np.int32
+    assert p_dk.dtype == np.int32
+    assert np.array_equal(d_fw, d_dk)
+    assert np.array_equal(np.diag(p_dk), np.arange(len(cost)))
+
+    # Ties can give a different, but equally short path.
+    for u in range(len(cost)):
+        for v in range(len(cost)):
+            path = shortest_path.sp_full(p_dk, u, v)
+            assert sum(cost[k] for k in path) == d_fw[u][v]
+
+
+def test_dijkstra_unreachable_arc():
+    with pytest.raises(ValueError):
+        shortest_paths.SP_dijkstra([1, 1, 1], [[1], [0], []])
+
+
+def test_dijkstra_sp_ifs_complete():
+    info_list = gen_info_lists()
+    args = (info_list.travelCostL, info_list.sucArcL, info_list.reqArcList,
+            info_list.dumpCost, info_list.depotnewkey,
+            info_list.IFarcsnewkey)
+    fw = c_alg_shortest_paths.SP_IFs_complete(*args)
+    dk = c_alg_shortest_paths.SP_IFs_complete_dijkstra(*args)
+
+    assert np.array_equal(dk[0], fw[0])
+    assert dk[2] == fw[2]
+    assert dk[3] == fw[3]
+    assert dk[4] == fw[4]
+
+
+def test_sp_ifs_without_predecessors():
+    info_list = gen_info_lists()
+    args = (info_list.travelCostL, info_list.sucArcL, info_list.reqArcList,
+            info_list.dumpCost, info_list.depotnewkey,
+            info_list.IFarcsnewkey)
+    complete = c_alg_shortest_paths.SP_IFs_complete(*args)
+    costs_only = c_alg_shortest_paths.SP_IFs(*args)
+
+    assert costs_only[1] is None
+    assert np.array_equal(costs_only[0], complete[0])
+    assert costs_only[2:] == complete[2:]
+
+
+def test_shortest_path_class_solver():
+    info_list = gen_info_lists()
+    sp_calc = ShortestPath(solver='Dijkstra')
+    sp_calc.arc_cost = np.array(info_list.travelCostL)
+    sp_calc.arc_successor_index_list = info_list.sucArcL
+    sp_calc.calc_shortest_path_internal()
+    d_fw, _ = shortest_paths.SP(info_list.travelCostL, info_list.sucArcL)
+    assert np.array_equal(sp_calc.cost_matrix, d_fw)
+
+    with pytest.raises(ValueError):
+        ShortestPath(solver='Bellman-Ford')
+
+
+def test_dijkstra_parallel_identical_to_serial():
+    info_list = gen_info_lists('tempdir/lpr_if_in/Lpr_IF-c-03.txt')
+    cost = info_list.travelCostL
+    d_serial, p_serial = shortest_paths.SP_dijkstra(cost, info_list.sucArcL)
+    d_par, p_par = shortest_paths.SP_dijkstra(cost, info_list.sucArcL,
+                                              n_workers=4, block_size=7)
+    assert np.array_equal(d_serial, d_par)
+    assert np.array_equal(p_serial, p_par)
+
+    sources = info_list.reqArcList[::3]
+    d_src, p_src = shortest_paths.SP_dijkstra(cost, info_list.sucArcL,
+                                              sources=sources, n_workers=3)
+    assert np.array_equal(d_src, d_serial[sources])
+    assert np.array_equal(p_src, p_serial[sources])
+
+
+def test_blocked_floyd_warshall():
+    info_list = gen_info_lists('tempdir/lpr_if_in/Lpr_IF-c-03.txt')
+    cost = info_list.travelCostL
+    n_arcs = len(cost)
+    d_classic, p_classic = shortest_paths.SP(cost, info_list.sucArcL,
+                                             block_size=n_arcs)
+    d_dk, _ = shortest_paths.SP_dijkstra(cost, info_list.sucArcL)
+    assert np.array_equal(d_classic, d_dk)
+
+    for block_size in [1, 17, 64]:
+        d_blocked, p_blocked = shortest_paths.SP(cost, info_list.sucArcL,
+                                                 block_size=block_size)
+        assert d_blocked.flags['C_CONTIGUOUS']
+        assert np.array_equal(d_blocked, d_classic)
+        for u in range(0, n_arcs, 7):
+            for v in range(0, n_arcs, 5):
+                path = shortest_path.sp_full(p_blocked, u, v)
+                assert sum(cost[k] for k in path) == d_classic[u][v]
+
+
+def test_min_plus_in_place():
+    d, p = shortest_paths.init_sp_matrices([[1], [2], [0]])
+    assert d.tolist() == [[0, 0, 1000000], [1000000, 0, 0], [0, 1000000, 0]]
+    shortest_paths.floyd_warshall_blocked(d, p, [1, 2, 3], block_size=2)
+    assert d.tolist() == [[0, 0, 2], [3, 0, 0], [0, 1, 0]]
+    assert p.tolist() == [[0, 0, 1], [2, 1, 1], [2, 0, 2]]
+
+    with pytest.raises(ValueError):
+        shortest_paths.floyd_warshall_blocked(d, p, [1, 2, 3], block_size=0)
+
+
+def test_dijkstra_pytable_resume(tmp_path):
+    info_list = gen_info_lists()
+    cost = info_list.travelCostL
+    n_arcs = len(cost)
+    d_np, p_np = shortest_paths.SP_dijkstra(cost, info_list.sucArcL)
+
+    with tb.open_file(str(tmp_path / 'sp.h5'), 'w') as h5file:
+        cost_matrix = h5file.create_carray(h5file.root, 'cost_matrix',
+                                           tb.Int32Col(),
+                                           shape=(n_arcs, n_arcs))
+        predecessor_matrix = h5file.create_carray(h5file.root,
+                                                  'predecessor_matrix',
+                                                  tb.Int32Col(),
+                                                  shape=(n_arcs, n_arcs))
+        n_rows = shortest_paths.SP_pytable_dijkstra(
+            cost, info_list.sucArcL, cost_matrix, predecessor_matrix,
+            block_size=10)
+        assert n_rows == n_arcs
+        assert cost_matrix.attrs.rows_completed == n_arcs
+        assert np.array_equal(cost_matrix[:, :], d_np)
+        assert np.array_equal(predecessor_matrix[:, :], p_np)
+
+        # Interrupted after the first three blocks.
+        cost_matrix[30:, :] = 0
+        predecessor_matrix[30:, :] = 0
+        cost_matrix.attrs.rows_completed = 30
+        n_rows = shortest_paths.SP_pytable_dijkstra(
+            cost, info_list.sucArcL, cost_matrix, predecessor_matrix,
+            block_size=25)
+        assert n_rows == n_arcs - 30
+        assert np.array_equal(cost_matrix[:, :], d_np)
+        assert np.array_equal(predecessor_matrix[:, :], p_np)
+
+        assert shortest_paths.SP_pytable_dijkstra(
+            cost, info_list.sucArcL, cost_matrix, predecessor_matrix) == 0
+
+
+def test_csr_graph(tmp_path):
+    info_list = gen_info_lists()
+    graph = CSRGraph.from_arc_lists(info_list)
+    assert graph.n_arcs == len(info_list.travelCostL)
+    assert graph.successors(5).tolist() == info_list.sucArcL[5]
+    assert graph.inverse[20] == info_list.invArcL[20]
+    assert graph.required.sum() == len(info_list.reqArcListActual)
+    assert not graph.required[info_list.depotArc]
+
+    d_list, p_list = shortest_paths.SP_dijkstra(info_list.travelCostL,
+                                                info_list.sucArcL)
+    d_graph, p_graph = shortest_paths.SP_dijkstra(graph)
+    assert np.array_equal(d_list, d_graph)
+    assert np.array_equal(p_list, p_graph)
+    d_fw, _ = shortest_paths.SP(graph)
+    assert np.array_equal(d_fw, d_list)
+    assert gen_nn.return_nn_lists(graph) == gen_nn.return_nn_lists(d_list)
+
+    for file_name in ['graph.npz', 'graph.h5']:
+        path = str(tmp_path / file_name)
+        graph.save(path)
+        graph_loaded = CSRGraph.load(path)
+        for name in ['offsets', 'targets', 'costs', 'inverse', 'required']:
+            assert np.array_equal(getattr(graph_loaded, name),
+                                  getattr(graph, name))
+
+    sp_calc = ShortestPath(solver='Dijkstra')
+    sp_calc.load_from_graph(graph_loaded)
+    sp_calc.calc_shortest_path_internal()
+    assert np.array_equal(sp_calc.cost_matrix, d_list)
+
+    with pytest.raises(ValueError):
+        CSRGraph(graph.offsets[:-1], graph.targets, graph.costs)
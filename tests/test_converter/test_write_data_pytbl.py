@@ -7,10 +7,11 @@ import pandas as pd
 import numpy as np
 import os
 from converter import load_instance
-from pandas._testing import array_equivalent
+from pandas.core.dtypes.missing import array_equivalent
 from converter.network_prep import key_columns_not_exists
 from converter.network_prep import key_columns_exists
 from converter.network_prep import return_successor_arcs_indices
+from converter.network_prep import return_successor_arcs_csr
 from converter.network_prep import Network
 from converter.import_Belenguer_format import convert_file
 from converter.network_prep import ShortestPath
@@ -27,17 +28,17 @@ def gen_test_network():
 def gen_success_test_network():
     u = [1, 2, 2, 2, 3, 3]
     v = [2, 3, 4, 5, 1, 2]
-    success_array = np.array([[1, 2, 3],
-                             [4, 5],
-                             [],
-                             [],
-                             [0],
-                             [1, 2, 3]])
-
-    success_array = np.array([np.array(x) for x in success_array])
+    success_array = [[1, 2, 3],
+                     [4, 5],
+                     [],
+                     [],
+                     [0],
+                     [1, 2, 3]]
+
+    success_array = [np.array(x) for x in success_array]
     cost = [1] * len(v)
     df_test = pd.DataFrame({'arc_u': u, 'arc_v': v, 'arc_cost': cost})
-    return df_test.copy(), success_array.copy()
+    return df_test.copy(), list(success_array)
 
 
 def test_key_columns():
@@ -83,6 +84,22 @@ def test_return_successor_arcs():
         assert np.array_equal(success_arcs_index[i], success_array_test[i])
 
 
+def test_return_successor_arcs_csr():
+    df_test, success_array_test = gen_success_test_network()
+    offsets, indices = return_successor_arcs_csr(df_test['arc_u'],
+                                                 df_test['arc_v'])
+    assert offsets.tolist() == [0, 3, 5, 5, 5, 6, 9]
+    assert indices.tolist() == [1, 2, 3, 4, 5, 0, 1, 2, 3]
+
+    rng = np.random.RandomState(0)
+    u = rng.randint(0, 50, 500)
+    v = rng.randint(0, 50, 500)
+    offsets, indices = return_successor_arcs_csr(u, v)
+    for i in range(len(u)):
+        assert np.array_equal(indices[offsets[i]:offsets[i + 1]],
+                              np.where(v[i] == u)[0])
+
+
 def test_successor_list_prepare_network():
     df_test, success_array_test = gen_success_test_network()
     network = Network(df_test)
@@ -139,7 +156,12 @@ def test_create_pytable():
 
     network = Network(instance_df_convert)
     network.create_pytable('temp/temp_file.h5')
+    sp_calc = ShortestPath()
+    sp_calc.load_from_pytable('temp/temp_file.h5')
     os.remove('temp/temp_file.h5')
+    assert sp_calc.graph.n_arcs == len(network.arc_u)
+    for i, index_array in enumerate(sp_calc.graph.successor_lists()):
+        assert np.array_equal(index_array, network.arc_successor_index_list[i])
 
 
 def test_shortest_paths_pytable_load():
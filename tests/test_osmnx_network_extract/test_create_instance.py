@@ -0,0 +1,21 @@
+import numpy as np
+import pandas as pd
+from osmnx_network_extract.create_instance import network_graph
+
+
+def test_network_graph():
+    network = pd.DataFrame({'arc_index': [2, 0, 1, 3],
+                            'u': [3, 1, 2, 2],
+                            'v': [2, 2, 3, 1],
+                            'length': [10.4, 5.6, 10.4, 7.5]})
+    df_edges = pd.DataFrame({'arc_index': [1, 2], 'arc_index_inv': [2, 1]})
+    df_required_arcs = pd.DataFrame({'arc_index': [0, 2]})
+    graph = network_graph(network, df_edges, df_required_arcs)
+    assert graph.costs.dtype == np.int32
+    assert graph.costs.tolist() == [6, 10, 10, 8]
+    assert graph.successor_lists()[0].tolist() == [1, 3]
+    assert graph.successor_lists()[1].tolist() == [2]
+    assert graph.successor_lists()[2].tolist() == [1, 3]
+    assert graph.successor_lists()[3].tolist() == [0]
+    assert graph.inverse.tolist() == [-1, 2, 1, -1]
+    assert graph.required.tolist() == [True, False, True, False]
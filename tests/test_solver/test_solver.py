@@ -8,16 +8,31 @@ History:
     @contact: ejwillemse@gmail.com
     @license: GNU GENERAL PUBLIC LICENSE
 """
+import numpy as np
 import pandas as pd
 import os
+import itertools
 import pytest
 from converter.load_data import load_instance
 from solver.solve import gen_solution
+from solver.parallel_construction import construct_solutions
+from solver.solve import initiate_local_search
 from solver.solve import initiate_tabu_search
 from solver.solve import clear_improvement_setup
 from solver.solve import improve_solution
 from solver.solve import solve_instance
 from solver.solve import solve_store_instance
+from solver.c_buffers import int32_buffer
+from solver.array_solution import ArraySolution
+from solver.array_solution import InstanceArrays
+from solver.granular_neighbours import GranularNeighbours
+from solver.c_alg_extended_path_scanning_rr import UnservedArcs
+from solver.c_alg_split import SplitEngine
+from solver.ruin_recreate_search import RuinRecreate
+from solver.ruin_recreate_search import RUIN_OPERATORS
+from solver.ruin_recreate_search import solution_routes
+import solver.py_solution_test as solution_test
+import solver.py_alg_extended_path_scanning_rr as EPS
 
 
 def test_gen_initial_solution():
@@ -31,6 +46,217 @@ def test_gen_initial_solution():
     assert solution[3]['Cost'] == 28567
 
 
+def test_nn_scan_path_scanning():
+    info = load_instance('test_data/Lpr_IF-c-03.txt')
+    unserved = UnservedArcs(len(info.d), [3, 5, 8])
+    unserved.remove(3)
+    assert len(unserved) == 2
+    assert 3 not in unserved and 8 in unserved
+    assert sorted(unserved) == [5, 8]
+    with pytest.raises(ValueError):
+        unserved.remove(3)
+    for rule in ['MaxDepo', 'MaxIF', 'MaxYield', 'Hybrid']:
+        trips = []
+        for nn_scan in [False, True]:
+            initial_solver = EPS.EPS_IF(info)
+            initial_solver.nn_scan = nn_scan
+            initial_solver.rule = rule
+            solution = initial_solver.buildMultipleIFRoutes()
+            trips.append([solution[i]['Trips']
+                          for i in range(solution['nVehicles'])])
+        assert trips[0] == trips[1]
+
+
+def test_construct_solutions():
+    info = load_instance('test_data/Lpr_IF-c-03.txt')
+    solutions = construct_solutions(info, best_k=8, reduce_trips=False)
+    assert solutions[0]['TotalCost'] == 114908
+    assert [x['nVehicles'] for x in solutions] == sorted(
+        x['nVehicles'] for x in solutions)
+    serial = construct_solutions(info, n_random=12, seed=3, best_k=3)
+    parallel = construct_solutions(info, n_random=12, seed=3, best_k=3,
+                                   n_workers=2)
+    assert [x['TotalCost'] for x in serial] == \
+        [x['TotalCost'] for x in parallel]
+    assert serial[0]['TotalCost'] <= 114908
+    with pytest.raises(ValueError):
+        construct_solutions(info, rules=['Nearest'])
+
+
+def test_gen_solution_workers():
+    info = load_instance('test_data/Lpr_IF-c-03.txt')
+    for reduce_trips, cost in [(False, 114908), (True, 114763)]:
+        serial = gen_solution(info, reduce_trips=reduce_trips)
+        parallel = gen_solution(info, reduce_trips=reduce_trips, n_workers=2)
+        assert serial['TotalCost'] == cost
+        assert [serial[i]['Trips'] for i in range(serial['nVehicles'])] == \
+            [parallel[i]['Trips'] for i in range(parallel['nVehicles'])]
+
+
+def test_split_giant_route():
+    info = load_instance('test_data/Lpr_IF-c-03.txt')
+    solution = gen_solution(info)
+    required = set(info.reqArcListActual)
+    giant_route = [arc for i in range(solution['nVehicles'])
+                   for trip in solution[i]['Trips'] for arc in trip
+                   if arc in required]
+    splitter = SplitEngine(info)
+    cost, routes = splitter.split(giant_route)
+    assert [arc for route in routes for trip in route for arc in trip] == \
+        giant_route
+    split_solution = splitter.solution(giant_route)
+    assert split_solution['TotalCost'] == cost == 114908
+    assert split_solution['nVehicles'] == 4
+    for i in range(split_solution['nVehicles']):
+        assert split_solution[i]['Cost'] <= info.maxTrip
+        assert max(split_solution[i]['TripLoads']) <= info.capacity
+
+    cost, routes = splitter.split_capacity(giant_route)
+    assert [arc for route in routes for arc in route] == giant_route
+    assert max(sum(info.demandL[arc] for arc in route)
+               for route in routes) <= info.capacity
+    with pytest.raises(ValueError):
+        SplitEngine(info._replace(capacity=1)).split(giant_route)
+
+
+def test_split_oriented_giant_route():
+    info = load_instance('test_data/Lpr_IF-c-03.txt')
+    solution = gen_solution(info)
+    required = set(info.reqArcListActual)
+    giant_route = [arc for i in range(solution['nVehicles'])
+                   for trip in solution[i]['Trips'] for arc in trip
+                   if arc in required]
+    splitter = SplitEngine(info)
+    cost, routes = splitter.split_oriented(giant_route)
+    assert cost == 114889
+    arcs = [arc for route in routes for trip in route for arc in trip]
+    assert all(arc == giant_arc or arc == info.reqInvArcList[giant_arc]
+               for arc, giant_arc in zip(arcs, giant_route))
+    split_solution = splitter.solution(giant_route, oriented=True)
+    assert split_solution['TotalCost'] == cost
+    for i in range(split_solution['nVehicles']):
+        assert split_solution[i]['Cost'] <= info.maxTrip
+        assert max(split_solution[i]['TripLoads']) <= info.capacity
+
+    shuffled = list(np.random.RandomState(1).permutation(giant_route))
+    assert splitter.split_oriented(shuffled)[0] < splitter.split(shuffled)[0]
+    assert splitter.split_capacity_oriented(shuffled)[0] <= \
+        splitter.split_capacity(shuffled)[0]
+
+
+def brute_force_split(info, giant_route, ifs, min_k):
+    """Best number of routes and cost over every split of a giant route."""
+    depot = info.depotnewkey
+    d = info.d
+    best = None
+    #  Each arc after the first continues the trip (0), starts a trip after
+    #  an IF visit (1) or starts a new route (2).
+    for breaks in itertools.product([0, 1, 2] if ifs else [0, 2],
+                                    repeat=len(giant_route) - 1):
+        routes = [[[giant_route[0]]]]
+        for arc, new in zip(giant_route[1:], breaks):
+            if new == 2:
+                routes.append([[arc]])
+            elif new == 1:
+                routes[-1].append([arc])
+            else:
+                routes[-1][-1].append(arc)
+        cost = 0
+        feasible = True
+        for route in routes:
+            route_cost = d[depot][route[0][0]]
+            for i, trip in enumerate(route):
+                if sum(info.demandL[arc] for arc in trip) > info.capacity:
+                    feasible = False
+                route_cost += sum(info.serveCostL[arc] for arc in trip)
+                route_cost += sum(d[a][b] for a, b in zip(trip, trip[1:]))
+                if not ifs:
+                    route_cost += d[trip[-1]][depot] + info.dumpCost
+                else:
+                    next_arc = route[i + 1][0] if i + 1 < len(route) \
+                        else depot
+                    route_cost += info.if_cost_np[trip[-1]][next_arc]
+            if ifs and sum(len(trip) for trip in route) > 1 and \
+                    route_cost > info.maxTrip:
+                feasible = False
+            cost += route_cost
+        if feasible:
+            value = (len(routes), cost) if min_k else (cost, )
+            if best is None or value < best:
+                best = value
+    return best
+
+
+def test_split_brute_force():
+    info = load_instance('test_data/Lpr_IF-c-03.txt')
+    solution = gen_solution(info)
+    required = set(info.reqArcListActual)
+    giant_route = [arc for i in range(solution['nVehicles'])
+                   for trip in solution[i]['Trips'] for arc in trip
+                   if arc in required]
+    giant_route = np.random.RandomState(1).permutation(giant_route)[:6]
+    giant_route = [int(arc) for arc in giant_route]
+    info = info._replace(capacity=600, maxTrip=3000)
+    splitter = SplitEngine(info)
+    for ifs, split in [(True, splitter.split),
+                       (False, splitter.split_capacity)]:
+        for min_k in [True, False]:
+            cost, routes = split(giant_route, min_k=min_k)
+            value = (len(routes), cost) if min_k else (cost, )
+            assert value == brute_force_split(info, giant_route, ifs, min_k)
+
+    #  Every orientation of the edges in the giant route.
+    orientations = list(itertools.product(
+        *[[arc] if info.reqInvArcList[arc] is None
+          else [arc, info.reqInvArcList[arc]] for arc in giant_route]))
+    for ifs, split in [(True, splitter.split_oriented),
+                       (False, splitter.split_capacity_oriented)]:
+        for min_k in [True, False]:
+            cost, routes = split(giant_route, min_k=min_k)
+            value = (len(routes), cost) if min_k else (cost, )
+            assert value == min(brute_force_split(info, list(arcs), ifs,
+                                                  min_k)
+                                for arcs in orientations)
+
+
+def test_ruin_recreate_search():
+    info = load_instance('test_data/Lpr_IF-c-03.txt')
+    initial_solution = gen_solution(info)
+    search = RuinRecreate(info, improvement=None, seed=1)
+    routes = solution_routes(initial_solution, search.required)
+    arcs = set(arc for route in routes for arc in route)
+    for name in RUIN_OPERATORS:
+        operator, removal = search.ruin(routes, name)
+        assert operator == name
+        assert len(set(removal)) == len(removal) > 0
+        assert set(removal) <= arcs
+
+    costs = []
+    for acceptance in ['descent', 'annealing', 'record', 'late', 'late']:
+        search = RuinRecreate(info, improvement=None, acceptance=acceptance,
+                              seed=3)
+        solution, stats = search.run(initial_solution, iteration_limit=40)
+        assert stats.iterations == 40
+        assert solution['TotalCost'] == stats.cost <= 114908
+        tester = solution_test.TestCLARPIFSolution(info, solution)
+        tester.testCLARPIF()
+        assert not tester.Error
+        costs.append(stats.cost)
+    assert costs[-1] == costs[-2]
+
+    search = RuinRecreate(info, improvement='LS', improve_move_limit=5,
+                          seed=3)
+    solution, stats = search.run(initial_solution, iteration_limit=2,
+                                 max_non_improving=1)
+    search.clear()
+    assert stats.iterations <= 2
+    assert solution['TotalCost'] < 114908
+    assert stats.initial_cost == 114908
+    assert type(stats.initial_cost) is type(solution['TotalCost']) is int
+    with pytest.raises(ValueError):
+        RuinRecreate(info, improvement=None, ruin_operators={'nearest': 1})
+
+
 def test_initiate_tabu_search():
     info = load_instance('test_data/Lpr_IF-c-03.txt')
     improver = initiate_tabu_search(info)
@@ -61,6 +287,143 @@ def test_improve_solution_ls():
     assert solution[3]['Cost'] == 28708
 
 
+def test_independent_local_searches():
+    info = load_instance('test_data/Lpr_IF-c-03.txt')
+    initial_solution = gen_solution(info)
+    improver_1 = initiate_local_search(info)
+    improver_2 = initiate_local_search(info)
+    clear_improvement_setup(improver_2)
+    solution = improver_1.improveSolution(initial_solution)
+    clear_improvement_setup(improver_1)
+    assert solution['TotalCost'] == 112977.0
+    assert solution['nVehicles'] == 4
+
+
+def test_verify_route_info():
+    info = load_instance('test_data/Lpr_IF-c-03.txt')
+    initial_solution = gen_solution(info)
+    improver = initiate_local_search(info)
+    improver.verifyRouteInfo = 1
+    solution = improver.improveSolution(initial_solution)
+    clear_improvement_setup(improver)
+    assert solution['TotalCost'] == 112977.0
+
+
+def test_move_heap_selection():
+    info = load_instance('test_data/Lpr_IF-c-03.txt')
+    initial_solution = gen_solution(info)
+    improver = initiate_local_search(info)
+    improver.moveHeapSize = 20
+    move_costs = improver._MoveCosts
+    all_moves = improver._calculateMoveCosts(initial_solution, allMoves=True)
+    best_moves = improver._calculateMoveCosts(initial_solution)
+    assert move_costs.moveSelectionTruncated()
+    assert best_moves == sorted(all_moves, key=lambda x: x[0])[:20]
+    solution = improver.improveSolution(initial_solution)
+    clear_improvement_setup(improver)
+    assert solution['TotalCost'] < 114908
+
+
+def test_move_heap_truncated_by_bound():
+    info = load_instance('test_data/Lpr_IF-c-03.txt')
+    initial_solution = gen_solution(info)
+    improver = initiate_local_search(info)
+    move_costs = improver._MoveCosts
+    for move_cache in [False, True]:
+        move_costs.setInputValues(improver.thresholdUse, improver.nnFrac)
+        move_costs.setMoveCache(move_cache)
+        move_costs.setSolution(initial_solution)
+        improver.setNonAdjacentArcRestriction()
+        move_costs.startMoveSelection(2)
+        heap = move_costs._moveHeap
+        heap.push((-10**9, None))
+        heap.push((-10**9, None))
+        assert not move_costs.moveSelectionTruncated()
+        move_costs.calcAllPossibleMoveCosts()
+        assert heap.nOffered == len(heap) == 2
+        assert move_costs.moveSelectionTruncated()
+    clear_improvement_setup(improver)
+
+
+def test_move_cache():
+    info = load_instance('test_data/Lpr_IF-c-03.txt')
+    initial_solution = gen_solution(info)
+    improver = initiate_local_search(info)
+    improver.moveCache = True
+    solution = improver.improveSolution(initial_solution)
+    hits, misses, hit_rate = improver._MoveCosts.moveCacheStats()
+    clear_improvement_setup(improver)
+    assert solution['TotalCost'] == 112977.0
+    assert hits > 0
+    assert hit_rate == hits / (hits + misses)
+
+
+def test_threaded_move_costs():
+    info = load_instance('test_data/Lpr_IF-c-03.txt')
+    initial_solution = gen_solution(info)
+    improver = initiate_local_search(info)
+    improver.moveCache = True
+    moves = improver._calculateMoveCosts(initial_solution)
+    improver.moveCache = False
+    assert improver._calculateMoveCosts(initial_solution) == moves
+    improver.moveCostThreads = 3
+    assert improver._calculateMoveCosts(initial_solution) == moves
+    solution = improver.improveSolution(initial_solution)
+    clear_improvement_setup(improver)
+    assert solution['TotalCost'] == 112977.0
+
+
+def test_granular_neighbours():
+    info = load_instance('test_data/Lpr_IF-c-03.txt')
+    initial_solution = gen_solution(info)
+    d = np.asarray(info.d)
+    neighbours = GranularNeighbours(d, info.nn_list, min_neighbours=5)
+    offsets, targets = neighbours.lists(50)
+    assert offsets[-1] == len(targets)
+    assert (np.diff(offsets) >= 5).all()
+    for arc in range(len(offsets) - 1):
+        arc_targets = targets[offsets[arc]:offsets[arc + 1]]
+        assert (d[arc, arc_targets[5:]] <= 50).all()
+    improver = initiate_local_search(info)
+    moves = improver._calculateMoveCosts(initial_solution)
+    improver.granularBeta = 10
+    improver._setGranularThreshold(initial_solution)
+    granular_moves = improver._calculateMoveCosts(initial_solution)
+    assert set(granular_moves) < set(moves)
+    improver.granularBeta = 40
+    solution = improver.improveSolution(initial_solution)
+    clear_improvement_setup(improver)
+    assert solution['TotalCost'] == 112977.0
+
+
+def test_int32_buffer():
+    info = load_instance('test_data/Lpr_IF-c-03.txt')
+    d = int32_buffer(info.d)
+    assert d.dtype == np.int32
+    assert d.flags['C_CONTIGUOUS']
+    assert d.tolist() == info.d
+    assert np.shares_memory(int32_buffer(d), d)
+
+
+def test_array_solution():
+    info = load_instance('test_data/Lpr_IF-c-03.txt')
+    solution = gen_solution(info)
+    array_solution = ArraySolution.from_dict(solution, InstanceArrays(info))
+    assert array_solution.total_cost == 114908
+    assert array_solution.route_costs().tolist() == [28770, 28773, 28798,
+                                                     28567]
+    arc = solution[1]['Trips'][0][5]
+    assert array_solution.arc_trip(arc) == (1, 0, 5)
+
+    solution_copy = array_solution.copy().to_dict()
+    assert solution_copy['TotalCost'] == solution['TotalCost']
+    assert solution_copy['nVehicles'] == solution['nVehicles']
+    for i in range(solution['nVehicles']):
+        assert solution_copy[i]['Trips'] == solution[i]['Trips']
+        assert solution_copy[i]['TripLoads'] == solution[i]['TripLoads']
+        assert solution_copy[i]['Cost'] == solution[i]['Cost']
+
+
 def test_solver_initial():
     solution = solve_instance('test_data/Lpr_IF-c-03.txt')
     assert solution['TotalCost'] == 114908
@@ -190,3 +553,60 @@ def test_solve_store_no_overwrite():
         solve_store_instance('test_data/Lpr_IF-c-03.txt',
                              out_path='../test_data/',
                              overwrite=False)
+
+
+def test_improve_solution_move_limit():
+    info = load_instance('test_data/Lpr_IF-c-03.txt')
+    initial_solution = gen_solution(info)
+    solution, stats = improve_solution(info, initial_solution,
+                                       improvement='LS', move_limit=2,
+                                       return_stats=True)
+    assert stats.stop_reason == 'move_limit'
+    assert stats.iterations == 2
+    assert stats.initial_cost == 114908
+    assert stats.cost == solution['TotalCost']
+    assert 112977 < solution['TotalCost'] < 114908
+
+
+def test_improve_solution_time_limit():
+    info = load_instance('test_data/Lpr_IF-c-03.txt')
+    initial_solution = gen_solution(info)
+    solution, stats = improve_solution(info, initial_solution,
+                                       improvement='TS', time_limit=0,
+                                       return_stats=True)
+    assert stats.stop_reason == 'time_limit'
+    assert stats.iterations == 0
+    assert solution['TotalCost'] == 114908
+    assert solution['nVehicles'] == 4
+
+
+def test_improve_solution_non_improving_limit_per_call():
+    info = load_instance('test_data/Lpr_IF-c-03.txt')
+    initial_solution = gen_solution(info)
+    improver = initiate_tabu_search(info, False)
+    improver.improveSolution(initial_solution, maxNonImprovingMoves=1)
+    assert improver._nMovesNoImprovement == 50
+    clear_improvement_setup(improver)
+
+
+def test_incremental_giant_route_mapping():
+    info = load_instance('test_data/Lpr_IF-c-03.txt')
+    initial_solution = gen_solution(info)
+    improved_solution = improve_solution(info, initial_solution,
+                                         improvement='LS', move_limit=2)
+    improver = initiate_local_search(info)
+    move_costs = improver._MoveCosts
+    move_costs.setSolution(initial_solution)
+    move_costs.setSolution(improved_solution)
+    giant_route_info = move_costs._genMCARPTIFgiantRouteMapping(improved_solution)
+    route_mapping = list(move_costs._MoveCosts_MCARPTIF._c_context.routeMapping)
+    assert move_costs._giantRoute == giant_route_info[0]
+    assert move_costs._solutionArcs == giant_route_info[1]
+    assert move_costs._specialArcs == giant_route_info[2]
+    assert move_costs._normalArcsF == giant_route_info[4]
+    assert move_costs._dummyIFArcPositions == giant_route_info[6]
+
+    move_costs.freeSolution()
+    move_costs.setSolution(improved_solution)
+    assert move_costs._MoveCosts_MCARPTIF._c_context.routeMapping == route_mapping
+    clear_improvement_setup(improver)